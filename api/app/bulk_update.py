@@ -0,0 +1,128 @@
+"""Bulk partial product updates in a single statement.
+
+Patches travel as one JSONB array parameter and are applied with one
+``UPDATE ... FROM jsonb_array_elements(...)``. A column is set only for the
+patches that carry its key, so ``{"market_price": null}`` clears a price while
+a missing key leaves it alone. Rows whose values would not change are not
+rewritten, so a nightly repricing that mostly confirms prices neither bumps
+``updated_at`` nor leaves dead tuples behind.
+"""
+
+import json
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass, field
+from typing import Any
+from uuid import UUID
+
+from sqlalchemy import Uuid, select, text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .models import Product
+from .queries import uuid_in
+from .schemas.products import ProductPatch, ProductUpdate
+
+UPDATE_COLUMNS = tuple(ProductUpdate.model_fields)
+
+
+@dataclass
+class BulkUpdateReport:
+    """Which patched products changed, were already up to date, or don't exist."""
+
+    columns: frozenset[str]
+    updated: list[UUID] = field(default_factory=list)
+    unchanged: list[UUID] = field(default_factory=list)
+    missing: list[UUID] = field(default_factory=list)
+
+
+def merge_patches(patches: Iterable[ProductPatch]) -> dict[UUID, dict[str, Any]]:
+    """JSON-ready changes per product; later patches to the same product win."""
+    merged: dict[UUID, dict[str, Any]] = {}
+    for patch in patches:
+        changes = patch.model_dump(mode="json", exclude_unset=True, exclude={"id"})
+        merged.setdefault(patch.id, {}).update(changes)
+    return merged
+
+
+def _column_type(name: str) -> str:
+    return Product.__table__.c[name].type.compile(dialect=postgresql.dialect())
+
+
+def bulk_update_sql(columns: Sequence[str]) -> str:
+    """The bulk update statement for patches touching ``columns``.
+
+    Takes one ``:patches`` parameter, a JSON array of objects with an ``id``,
+    and returns one ``(id, updated, found)`` row per patch.
+    """
+    new_values = {
+        column: (
+            f"CASE WHEN patch.doc ? '{column}' "
+            f"THEN CAST(patch.doc ->> '{column}' AS {_column_type(column)}) "
+            f"ELSE products.{column} END"
+        )
+        for column in columns
+    }
+    assignments = ",\n        ".join(
+        f"{column} = {value}" for column, value in new_values.items()
+    )
+    return f"""
+WITH patch AS (
+    SELECT CAST(doc ->> 'id' AS UUID) AS id, doc
+    FROM jsonb_array_elements(CAST(:patches AS JSONB)) AS doc
+),
+changed AS (
+    UPDATE products SET
+        {assignments},
+        updated_at = now()
+    FROM patch
+    WHERE products.id = patch.id
+      AND ({", ".join(new_values.values())})
+          IS DISTINCT FROM ({", ".join(f"products.{column}" for column in columns)})
+    RETURNING products.id
+)
+SELECT patch.id, changed.id IS NOT NULL AS updated, products.id IS NOT NULL AS found
+FROM patch
+LEFT JOIN changed ON changed.id = patch.id
+LEFT JOIN products ON products.id = patch.id
+"""  # noqa: S608
+
+
+async def apply_patches(
+    session: AsyncSession,
+    patches: Iterable[ProductPatch],
+) -> BulkUpdateReport:
+    """Apply partial updates in one round trip; the caller commits."""
+    merged = merge_patches(patches)
+    columns = [
+        column
+        for column in UPDATE_COLUMNS
+        if any(column in changes for changes in merged.values())
+    ]
+    report = BulkUpdateReport(columns=frozenset(columns))
+    if not columns:
+        # Every patch is empty, so only existence matters
+        result = await session.execute(
+            select(Product.id).where(uuid_in(Product.id, list(merged))),
+        )
+        found = set(result.scalars())
+        for product_id in merged:
+            (report.unchanged if product_id in found else report.missing).append(
+                product_id,
+            )
+        return report
+
+    payload = json.dumps(
+        [{"id": str(product_id), **changes} for product_id, changes in merged.items()],
+    )
+    statement = text(bulk_update_sql(columns)).columns(id=Uuid)
+    result = await session.execute(statement, {"patches": payload})
+    outcomes = {row.id: row for row in result}
+    for product_id in merged:
+        outcome = outcomes[product_id]
+        if not outcome.found:
+            report.missing.append(product_id)
+        elif outcome.updated:
+            report.updated.append(product_id)
+        else:
+            report.unchanged.append(product_id)
+    return report
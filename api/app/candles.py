@@ -0,0 +1,187 @@
+"""Incrementally maintained OHLC price candles and derived product prices.
+
+``price_candles`` holds daily, weekly and monthly open/high/low/close,
+volume and median per product. Each append recomputes only the buckets its
+new sales fall into, each from one index range read of ``prices_raw``, and
+then re-derives the catalog prices of the products involved from their
+candles. Read paths never aggregate raw sales.
+"""
+
+from collections.abc import Collection, Iterable
+from datetime import UTC, datetime, timedelta
+from typing import Literal, get_args
+from uuid import UUID
+
+import asyncpg
+
+CandlePeriod = Literal["day", "week", "month"]
+CANDLE_PERIODS: tuple[CandlePeriod, ...] = get_args(CandlePeriod)
+
+# Candles don't convert currencies; other currencies are stored raw only
+CANDLE_CURRENCY = "USD"
+
+# market_price: volume-weighted median of the product's most recent month
+# of daily candles
+MARKET_PRICE_WINDOW_DAYS = 30
+
+Bucket = tuple[UUID, CandlePeriod, datetime, datetime]
+
+# Advisory lock class of per-product candle refreshes, paired with a hash of
+# the product ID; two-key locks never collide with one-key ones
+_CANDLE_LOCK_CLASS = 0x63616E64
+
+# Locks in key order, so concurrent appends cannot deadlock on each other
+_LOCK_PRODUCTS_SQL = """
+SELECT pg_advisory_xact_lock($2, key)
+FROM (
+    SELECT DISTINCT hashtext(product_id::text) AS key
+    FROM unnest($1::uuid[]) AS product_id
+    ORDER BY key
+) AS keys
+"""
+
+_REFRESH_CANDLES_SQL = """
+INSERT INTO price_candles AS candle (
+    product_id, period, bucket_start,
+    open, high, low, close, volume, median_price, updated_at
+)
+SELECT
+    bucket.product_id,
+    bucket.period,
+    bucket.bucket_start,
+    (array_agg(sale.price ORDER BY sale.sold_at, sale.source, sale.listing_id))[1],
+    max(sale.price),
+    min(sale.price),
+    (array_agg(
+        sale.price ORDER BY sale.sold_at DESC, sale.source DESC, sale.listing_id DESC
+    ))[1],
+    count(*),
+    CAST(percentile_cont(0.5) WITHIN GROUP (ORDER BY sale.price) AS DECIMAL(10, 2)),
+    now()
+FROM unnest($1::uuid[], $2::text[], $3::timestamptz[], $4::timestamptz[])
+    AS bucket(product_id, period, bucket_start, bucket_end)
+JOIN prices_raw sale
+    ON sale.product_id = bucket.product_id
+    AND sale.sold_at >= bucket.bucket_start
+    AND sale.sold_at < bucket.bucket_end
+    AND sale.currency = $5
+GROUP BY bucket.product_id, bucket.period, bucket.bucket_start
+ON CONFLICT (product_id, period, bucket_start) DO UPDATE SET
+    open = EXCLUDED.open,
+    high = EXCLUDED.high,
+    low = EXCLUDED.low,
+    close = EXCLUDED.close,
+    volume = EXCLUDED.volume,
+    median_price = EXCLUDED.median_price,
+    updated_at = EXCLUDED.updated_at
+"""
+
+# market_price from recent daily candles; low/high over the monthly ones
+_DERIVE_PRODUCT_PRICES_SQL = """
+WITH latest AS (
+    SELECT product_id, max(bucket_start) AS bucket_start
+    FROM price_candles
+    WHERE period = 'day' AND product_id = ANY($1::uuid[])
+    GROUP BY product_id
+),
+recent AS (
+    SELECT
+        candle.product_id,
+        round(sum(candle.median_price * candle.volume) / sum(candle.volume), 2)
+            AS market_price
+    FROM price_candles candle
+    JOIN latest ON latest.product_id = candle.product_id
+    WHERE candle.period = 'day'
+        AND candle.bucket_start > latest.bucket_start - make_interval(days => $2)
+    GROUP BY candle.product_id
+),
+extremes AS (
+    SELECT product_id, min(low) AS low_price, max(high) AS high_price
+    FROM price_candles
+    WHERE period = 'month' AND product_id = ANY($1::uuid[])
+    GROUP BY product_id
+)
+UPDATE products SET
+    market_price = recent.market_price,
+    low_price = extremes.low_price,
+    high_price = extremes.high_price,
+    updated_at = now()
+FROM recent
+JOIN extremes ON extremes.product_id = recent.product_id
+WHERE products.id = recent.product_id
+    AND (products.market_price, products.low_price, products.high_price)
+        IS DISTINCT FROM (recent.market_price, extremes.low_price, extremes.high_price)
+RETURNING products.id
+"""
+
+
+def bucket_bounds(period: CandlePeriod, moment: datetime) -> tuple[datetime, datetime]:
+    """UTC start and end of the ``period`` bucket holding ``moment``.
+
+    Weeks start on Monday, like PostgreSQL's ``date_trunc('week', ...)``.
+    """
+    moment = moment.astimezone(UTC)
+    day = datetime(moment.year, moment.month, moment.day, tzinfo=UTC)
+    if period == "day":
+        return day, day + timedelta(days=1)
+    if period == "week":
+        start = day - timedelta(days=day.weekday())
+        return start, start + timedelta(weeks=1)
+    start = day.replace(day=1)
+    return start, (start + timedelta(days=32)).replace(day=1)
+
+
+def affected_buckets(sales: Iterable[tuple[UUID, datetime]]) -> list[Bucket]:
+    """Every (product, period, start, end) bucket some sale falls into."""
+    buckets = {
+        (product_id, period, *bucket_bounds(period, sold_at))
+        for product_id, sold_at in sales
+        for period in CANDLE_PERIODS
+    }
+    return sorted(buckets, key=lambda bucket: (str(bucket[0]), bucket[1], bucket[2]))
+
+
+async def refresh_candles(
+    conn: asyncpg.Connection,
+    sales: Iterable[tuple[UUID, datetime]],
+) -> list[UUID]:
+    """Recompute the candles new sales fall into and reprice their products.
+
+    Takes (product_id, sold_at) of the sales just written and returns the
+    IDs of products whose derived prices changed. The caller owns the
+    transaction, which must be READ COMMITTED (the default).
+
+    Each bucket is recomputed from a snapshot of ``prices_raw``, so two
+    appends to one product could each miss the other's sales. The products
+    are locked until commit first: a refresh that waited then takes its
+    snapshot after the other append committed and sees both.
+    """
+    buckets = affected_buckets(sales)
+    if not buckets:
+        return []
+    product_ids, periods, starts, ends = (
+        list(column) for column in zip(*buckets, strict=True)
+    )
+    await conn.execute(_LOCK_PRODUCTS_SQL, list(set(product_ids)), _CANDLE_LOCK_CLASS)
+    await conn.execute(
+        _REFRESH_CANDLES_SQL,
+        product_ids,
+        periods,
+        starts,
+        ends,
+        CANDLE_CURRENCY,
+    )
+    return await derive_product_prices(conn, set(product_ids))
+
+
+async def derive_product_prices(
+    conn: asyncpg.Connection,
+    product_ids: Collection[UUID],
+) -> list[UUID]:
+    """Set market, low and high prices from candles; return changed IDs."""
+    records = await conn.fetch(
+        _DERIVE_PRODUCT_PRICES_SQL,
+        list(product_ids),
+        MARKET_PRICE_WINDOW_DAYS,
+    )
+    return [record["id"] for record in records]
@@ -0,0 +1,420 @@
+"""Collectr CSV import into portfolio holdings.
+
+An upload is spooled to a temporary file and imported by a background job
+whose progress clients poll. The job parses the CSV incrementally, in a
+worker thread so the event loop keeps serving requests, and resolves rows
+to products a batch at a time: one query per batch finds every product
+whose name or alias matches a row's name, and the rows' set, card number,
+variant and game narrow those candidates in Python. Rows that match
+exactly one product become holdings; ambiguous, unmatched and invalid rows
+are reported. The whole file is imported in one transaction, so a failed
+import adds nothing and can simply be retried.
+
+Jobs live in the API process that accepted the upload, so polls must reach
+the same process.
+"""
+
+import asyncio
+import csv
+import io
+import logging
+import os
+import re
+import tempfile
+from collections import defaultdict
+from collections.abc import AsyncIterable, Iterator, Sequence
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from decimal import Decimal, InvalidOperation
+from typing import IO, Any
+from uuid import UUID, uuid4
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .cache import TTLCache
+from .database import async_session_maker
+from .portfolios import insert_holdings, valuation_cache
+from .schemas.portfolios import HoldingCreate, ImportIssue, ImportJob
+
+logger = logging.getLogger(__name__)
+
+COLLECTR_IMPORT_MAX_BYTES = int(os.getenv("COLLECTR_IMPORT_MAX_BYTES", "52428800"))
+COLLECTR_IMPORT_BATCH_ROWS = int(os.getenv("COLLECTR_IMPORT_BATCH_ROWS", "1000"))
+COLLECTR_IMPORT_MAX_ISSUES = 1000
+# Uploads larger than this are spooled to disk
+COLLECTR_SPOOL_MEMORY_BYTES = 1024 * 1024
+COLLECTR_JOB_TTL = float(os.getenv("COLLECTR_JOB_TTL_SECONDS", "3600"))
+
+# Collectr export headers (case-insensitive) and the row fields they fill
+COLLECTR_COLUMNS = {
+    "product name": "name",
+    "set": "set_name",
+    "card number": "card_number",
+    "variance": "variant",
+    "category": "game",
+    "quantity": "quantity",
+    "average cost paid": "cost_basis",
+    "date added": "acquired_at",
+}
+
+_CANDIDATES_SQL = text("""
+WITH row AS (
+    SELECT DISTINCT name FROM unnest(CAST(:names AS TEXT[])) AS row(name)
+)
+SELECT
+    row.name AS row_name,
+    product.id,
+    product.set_name,
+    product.card_number,
+    product.variant,
+    product.game
+FROM row
+JOIN products product ON lower(product.name) = row.name
+UNION
+SELECT
+    row.name,
+    product.id,
+    product.set_name,
+    product.card_number,
+    product.variant,
+    product.game
+FROM row
+JOIN product_aliases alias ON lower(alias.alias) = row.name
+JOIN products product ON product.id = alias.product_id
+""")
+
+
+@dataclass
+class CollectrRow:
+    """One parsed Collectr row."""
+
+    line: int
+    name: str
+    set_name: str | None = None
+    card_number: str | None = None
+    variant: str | None = None
+    game: str | None = None
+    quantity: int = 1
+    cost_basis: Decimal = Decimal("0.00")
+    acquired_at: datetime | None = None
+
+
+@dataclass
+class Candidate:
+    """A product a row's name or alias matched."""
+
+    id: UUID
+    set_name: str | None
+    card_number: str | None
+    variant: str | None
+    game: str | None
+
+
+def column_positions(header: Sequence[str]) -> dict[str, int]:
+    """Row field -> column index for a Collectr header row.
+
+    Raises ``ValueError`` when there is no product name column.
+    """
+    positions: dict[str, int] = {}
+    for index, title in enumerate(header):
+        field = COLLECTR_COLUMNS.get(" ".join(title.split()).lower())
+        if field is not None:
+            positions.setdefault(field, index)
+    if "name" not in positions:
+        msg = "Not a Collectr export: no 'Product Name' column"
+        raise ValueError(msg)
+    return positions
+
+
+def _cell(record: Sequence[str], positions: dict[str, int], field: str) -> str | None:
+    index = positions.get(field)
+    if index is None or index >= len(record):
+        return None
+    return record[index].strip() or None
+
+
+def parse_row(
+    line: int,
+    record: Sequence[str],
+    positions: dict[str, int],
+) -> CollectrRow:
+    """Build a row from one CSV record; raises ``ValueError`` if malformed."""
+    name = _cell(record, positions, "name")
+    if name is None:
+        msg = "Product Name is empty"
+        raise ValueError(msg)
+    row = CollectrRow(
+        line,
+        name,
+        set_name=_cell(record, positions, "set_name"),
+        card_number=_cell(record, positions, "card_number"),
+        variant=_cell(record, positions, "variant"),
+        game=_cell(record, positions, "game"),
+    )
+    quantity = _cell(record, positions, "quantity")
+    if quantity is not None:
+        try:
+            count = Decimal(quantity)
+        except InvalidOperation as e:
+            msg = f"Quantity {quantity!r} is not a number"
+            raise ValueError(msg) from e
+        if count <= 0 or count != count.to_integral_value():
+            msg = f"Quantity {quantity!r} is not a positive whole number"
+            raise ValueError(msg)
+        row.quantity = int(count)
+    cost = _cell(record, positions, "cost_basis")
+    if cost is not None:
+        try:
+            row.cost_basis = Decimal(cost.replace("$", "").replace(",", ""))
+        except InvalidOperation as e:
+            msg = f"Average Cost Paid {cost!r} is not a price"
+            raise ValueError(msg) from e
+        if row.cost_basis < 0:
+            msg = f"Average Cost Paid {cost!r} is negative"
+            raise ValueError(msg)
+        row.cost_basis = row.cost_basis.quantize(Decimal("0.01"))
+    added = _cell(record, positions, "acquired_at")
+    if added is not None:
+        try:
+            acquired_at = datetime.fromisoformat(added)
+        except ValueError as e:
+            msg = f"Date Added {added!r} is not a date"
+            raise ValueError(msg) from e
+        if acquired_at.tzinfo is None:
+            acquired_at = acquired_at.replace(tzinfo=UTC)
+        row.acquired_at = acquired_at
+    return row
+
+
+def read_batches(
+    file: IO[bytes],
+    batch_rows: int = COLLECTR_IMPORT_BATCH_ROWS,
+) -> Iterator[tuple[list[CollectrRow], list[ImportIssue]]]:
+    """Parse a Collectr CSV incrementally into batches of rows and issues.
+
+    Raises ``ValueError`` when the header isn't a Collectr export's.
+    """
+    reader = csv.reader(io.TextIOWrapper(file, encoding="utf-8-sig", newline=""))
+    positions = column_positions(next(reader, []))
+    rows: list[CollectrRow] = []
+    issues: list[ImportIssue] = []
+    for record in reader:
+        if not any(cell.strip() for cell in record):
+            continue
+        try:
+            rows.append(parse_row(reader.line_num, record, positions))
+        except ValueError as e:
+            issues.append(
+                ImportIssue(
+                    line=reader.line_num,
+                    status="invalid",
+                    name=_cell(record, positions, "name"),
+                    detail=str(e),
+                ),
+            )
+        if len(rows) + len(issues) >= batch_rows:
+            yield rows, issues
+            rows, issues = [], []
+    if rows or issues:
+        yield rows, issues
+
+
+def _text_key(value: str | None) -> str:
+    return " ".join((value or "").split()).casefold()
+
+
+def _number_key(value: str | None) -> str:
+    # "004/102" and "4/102" are the same card
+    return "/".join(
+        part.lstrip("0") or "0" for part in re.split(r"\s*/\s*", _text_key(value))
+    )
+
+
+def resolve(row: CollectrRow, candidates: Sequence[Candidate]) -> list[Candidate]:
+    """The candidates consistent with a row; exactly one is a match.
+
+    Set and card number must agree when the row has them. Variant and game
+    spellings differ between Collectr and the catalog, so they only break
+    ties: candidates agreeing on them are preferred when any do.
+    """
+    unique = list({candidate.id: candidate for candidate in candidates}.values())
+    if row.set_name:
+        unique = [c for c in unique if _text_key(c.set_name) == _text_key(row.set_name)]
+    if row.card_number:
+        number = _number_key(row.card_number)
+        unique = [c for c in unique if _number_key(c.card_number) == number]
+    for field in ("variant", "game"):
+        wanted = _text_key(getattr(row, field))
+        if len(unique) > 1 and wanted:
+            preferred = [c for c in unique if _text_key(getattr(c, field)) == wanted]
+            unique = preferred or unique
+    return unique
+
+
+async def find_candidates(
+    session: AsyncSession,
+    names: Sequence[str],
+) -> dict[str, list[Candidate]]:
+    """Products whose name or alias matches each lower-cased name, by name."""
+    result = await session.execute(_CANDIDATES_SQL, {"names": list(names)})
+    candidates: dict[str, list[Candidate]] = defaultdict(list)
+    for record in result:
+        candidates[record.row_name].append(
+            Candidate(
+                record.id,
+                record.set_name,
+                record.card_number,
+                record.variant,
+                record.game,
+            ),
+        )
+    return candidates
+
+
+async def match_batch(
+    session: AsyncSession,
+    rows: Sequence[CollectrRow],
+) -> tuple[list[HoldingCreate], list[ImportIssue]]:
+    """Resolve a batch of rows to holdings with one candidate query."""
+    candidates = await find_candidates(session, [row.name.lower() for row in rows])
+    holdings, issues = [], []
+    for row in rows:
+        matches = resolve(row, candidates.get(row.name.lower(), []))
+        if len(matches) == 1:
+            holdings.append(
+                HoldingCreate(
+                    product_id=matches[0].id,
+                    quantity=row.quantity,
+                    cost_basis=row.cost_basis,
+                    acquired_at=row.acquired_at,
+                ),
+            )
+        elif matches:
+            issues.append(
+                ImportIssue(
+                    line=row.line,
+                    status="ambiguous",
+                    name=row.name,
+                    detail=f"{len(matches)} products match",
+                    candidates=[match.id for match in matches],
+                ),
+            )
+        else:
+            issues.append(
+                ImportIssue(
+                    line=row.line,
+                    status="unmatched",
+                    name=row.name,
+                    detail="No product matches name, set and number",
+                ),
+            )
+    return holdings, issues
+
+
+async def _copy(chunks: AsyncIterable[bytes], file: IO[bytes]) -> int:
+    size = 0
+    async for chunk in chunks:
+        size += len(chunk)
+        if size > COLLECTR_IMPORT_MAX_BYTES:
+            msg = f"Imports are limited to {COLLECTR_IMPORT_MAX_BYTES} bytes"
+            raise ValueError(msg)
+        file.write(chunk)
+    return size
+
+
+async def spool(chunks: AsyncIterable[bytes]) -> tuple[IO[bytes], int]:
+    """Copy an upload to a temporary file the import job can own.
+
+    Raises ``ValueError`` past ``COLLECTR_IMPORT_MAX_BYTES``.
+    """
+    # Handed to the caller open, so not a context manager here
+    file = tempfile.SpooledTemporaryFile(  # noqa: SIM115
+        max_size=COLLECTR_SPOOL_MEMORY_BYTES,
+    )
+    try:
+        size = await _copy(chunks, file)
+    except BaseException:
+        file.close()
+        raise
+    file.seek(0)
+    return file, size
+
+
+def _record(job: ImportJob, issues: Sequence[ImportIssue]) -> None:
+    for issue in issues:
+        setattr(job, issue.status, getattr(job, issue.status) + 1)
+    room = COLLECTR_IMPORT_MAX_ISSUES - len(job.issues)
+    job.issues.extend(issues[: max(room, 0)])
+
+
+async def run_import(job: ImportJob, file: IO[bytes]) -> None:
+    """Import an uploaded file into the job's portfolio, updating ``job``."""
+    job.status = "running"
+    try:
+        batches = read_batches(file)
+        async with async_session_maker() as session:
+            # Parsing is CPU-bound, so each batch is read off the event loop
+            while batch := await asyncio.to_thread(next, batches, None):
+                rows, issues = batch
+                holdings, unresolved = await match_batch(session, rows)
+                if holdings:
+                    await insert_holdings(session, job.portfolio_id, holdings)
+                job.rows += len(rows) + len(issues)
+                job.matched += len(holdings)
+                _record(job, [*issues, *unresolved])
+                job.bytes_read = file.tell()
+            await session.commit()
+    except asyncio.CancelledError:
+        job.status = "failed"
+        job.error = "Import cancelled"
+        raise
+    except Exception as e:
+        logger.exception("Collectr import %s failed", job.id)
+        job.status = "failed"
+        job.error = str(e) if isinstance(e, ValueError) else "Import failed"
+        return
+    finally:
+        file.close()
+    valuation_cache.invalidate(job.portfolio_id)
+    job.bytes_read = job.bytes_total
+    job.status = "succeeded"
+
+
+class ImportJobs:
+    """Running and recently finished imports of this process."""
+
+    def __init__(self, max_jobs: int = 1000, ttl: float = 3600):
+        self._jobs: TTLCache[UUID, ImportJob] = TTLCache(maxsize=max_jobs, ttl=ttl)
+        self._tasks: set[asyncio.Task[Any]] = set()
+
+    def start(self, portfolio_id: UUID, file: IO[bytes], size: int) -> ImportJob:
+        """Queue an import of a spooled upload; it owns and closes ``file``."""
+        job = ImportJob(
+            id=uuid4(),
+            portfolio_id=portfolio_id,
+            status="queued",
+            bytes_total=size,
+        )
+        self._jobs.set(job.id, job)
+        task = asyncio.create_task(run_import(job, file))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return job
+
+    def get(self, job_id: UUID) -> ImportJob | None:
+        """A job's current state, if it is known to this process."""
+        return self._jobs.get(job_id)
+
+    async def wait(self) -> None:
+        """Wait for the running imports to finish."""
+        await asyncio.gather(*self._tasks)
+
+    async def close(self) -> None:
+        """Cancel running imports; their transactions roll back."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+
+import_jobs = ImportJobs(ttl=COLLECTR_JOB_TTL)
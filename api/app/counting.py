@@ -0,0 +1,106 @@
+"""Result-total strategies for product search.
+
+Counting every match of a broad full-text query costs as much as the search
+itself, so callers choose how ``total`` is produced:
+
+- ``exact``: a full ``count(*)`` of the search query.
+- ``capped``: count at most ``SEARCH_COUNT_CAP`` matches; larger results are
+  reported as a lower bound ("1000+").
+- ``estimate``: the planner's row estimate from ``EXPLAIN``, no scan at all.
+
+Exact and capped totals are kept in a short-lived cache keyed by the
+normalized query and filters, so paging through one search counts once.
+"""
+
+import json
+import os
+from dataclasses import dataclass
+from typing import Any, Literal
+
+from sqlalchemy import Select, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .cache import TTLCache
+
+CountMode = Literal["exact", "capped", "estimate"]
+TotalAccuracy = Literal["exact", "lower_bound", "estimate"]
+
+SEARCH_COUNT_CAP = int(os.getenv("SEARCH_COUNT_CAP", "1000"))
+SEARCH_COUNT_CACHE_TTL = float(os.getenv("SEARCH_COUNT_CACHE_TTL", "30"))
+SEARCH_COUNT_CACHE_SIZE = int(os.getenv("SEARCH_COUNT_CACHE_SIZE", "10000"))
+
+
+@dataclass(frozen=True)
+class SearchTotal:
+    """A result total and how far it can be trusted."""
+
+    total: int
+    accuracy: TotalAccuracy
+
+
+count_cache: TTLCache[tuple[str | None, ...], SearchTotal] = TTLCache(
+    maxsize=SEARCH_COUNT_CACHE_SIZE,
+    ttl=SEARCH_COUNT_CACHE_TTL,
+)
+
+
+def count_cache_key(
+    mode: CountMode,
+    q: str,
+    *filters: str | None,
+) -> tuple[str | None, ...]:
+    """Normalize query text and filters so equivalent searches share a count."""
+    return (
+        mode,
+        " ".join(q.casefold().split()),
+        *(value.casefold().strip() if value else None for value in filters),
+    )
+
+
+async def count_search_total(
+    session: AsyncSession,
+    query: Select[Any],
+    mode: CountMode,
+    cache_key: tuple[str | None, ...],
+) -> SearchTotal:
+    """Produce the total for an unpaginated search query using ``mode``."""
+    if mode == "estimate":
+        return SearchTotal(await _estimate_rows(session, query), "estimate")
+
+    cached = count_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    if mode == "capped":
+        capped = select(func.count()).select_from(
+            query.limit(SEARCH_COUNT_CAP + 1).subquery(),
+        )
+        count = (await session.execute(capped)).scalar() or 0
+        total = (
+            SearchTotal(SEARCH_COUNT_CAP, "lower_bound")
+            if count > SEARCH_COUNT_CAP
+            else SearchTotal(count, "exact")
+        )
+    else:
+        exact = select(func.count()).select_from(query.subquery())
+        total = SearchTotal((await session.execute(exact)).scalar() or 0, "exact")
+
+    count_cache.set(cache_key, total)
+    return total
+
+
+async def _estimate_rows(session: AsyncSession, query: Select[Any]) -> int:
+    """Ask the planner how many rows ``query`` returns without running it."""
+    connection = await session.connection()
+    compiled = query.compile(dialect=connection.dialect)
+    params = tuple(compiled.params[name] for name in compiled.positiontup or ())
+    result = await connection.exec_driver_sql(
+        f"EXPLAIN (FORMAT JSON) {compiled}",
+        params,
+    )
+    # asyncpg decodes json columns only when a codec is set; accept both
+    output = result.scalar_one()
+    plan: list[dict[str, Any]] = (
+        json.loads(output) if isinstance(output, str) else output
+    )
+    return int(plan[0]["Plan"]["Plan Rows"])
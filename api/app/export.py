@@ -0,0 +1,125 @@
+"""Streaming catalog export for mirrors.
+
+The whole (optionally filtered) catalog is read through a server-side
+cursor ``EXPORT_BATCH_ROWS`` rows at a time and written to the response as
+NDJSON or CSV as each batch arrives, so memory use does not grow with the
+catalog. Rows come in ``(updated_at, id)`` order; the export's watermark,
+passed back as ``since``, fetches only what changed afterwards.
+"""
+
+import csv
+import io
+import os
+from collections.abc import AsyncIterator, Iterable
+from datetime import UTC, date, datetime, timedelta
+from decimal import Decimal
+from typing import Any, Literal
+from uuid import UUID
+
+from sqlalchemy import Select, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .models import Product
+from .projection import Projection
+from .serialization import dumps
+
+ExportFormat = Literal["ndjson", "csv"]
+
+EXPORT_BATCH_ROWS = int(os.getenv("EXPORT_BATCH_ROWS", "2000"))
+
+# Products are stamped with their writing transaction's start time, so a
+# write committed just after the export's snapshot can carry an earlier
+# updated_at. The watermark is set back by this much to catch it next time.
+EXPORT_WATERMARK_OVERLAP = timedelta(
+    seconds=float(os.getenv("EXPORT_WATERMARK_OVERLAP_SECONDS", "300")),
+)
+
+MEDIA_TYPES: dict[ExportFormat, str] = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+
+def export_query(
+    projection: Projection,
+    game: str | None = None,
+    category: str | None = None,
+    since: datetime | None = None,
+) -> Select[Any]:
+    """The export's select; filters match ``GET /products``."""
+    query = projection.select()
+    if game:
+        query = query.where(Product.game.ilike(f"%{game}%"))
+    if category:
+        query = query.where(Product.category.ilike(f"%{category}%"))
+    if since is not None:
+        query = query.where(Product.updated_at >= _as_naive_utc(since))
+    return query.order_by(Product.updated_at, Product.id)
+
+
+def _as_naive_utc(value: datetime) -> datetime:
+    """``updated_at`` is a naive UTC column; naive times are taken as UTC."""
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(UTC).replace(tzinfo=None)
+
+
+async def export_watermark(session: AsyncSession) -> datetime:
+    """The ``since`` that picks up every change the export may not include."""
+    now: datetime = (
+        await session.execute(select(func.timezone("utc", func.now())))
+    ).scalar_one()
+    return now - EXPORT_WATERMARK_OVERLAP
+
+
+def csv_header(projection: Projection) -> list[str]:
+    """CSV column names: the projection's fields, then aliases if included."""
+    return [*projection.fields, *(["aliases"] if projection.aliases else [])]
+
+
+def _csv_value(value: Any) -> Any:
+    if value is None:
+        return ""
+    if isinstance(value, datetime | date):
+        return value.isoformat()
+    if isinstance(value, Decimal | UUID):
+        return str(value)
+    if isinstance(value, list):
+        # Aliases: one JSON array per cell
+        return dumps(value).decode()
+    return value
+
+
+def encode_batch(
+    products: Iterable[dict[str, Any]],
+    export_format: ExportFormat,
+) -> bytes:
+    """One batch of products as NDJSON lines or CSV records."""
+    if export_format == "ndjson":
+        return b"".join(dumps(product) + b"\n" for product in products)
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerows(
+        [_csv_value(value) for value in product.values()] for product in products
+    )
+    return buffer.getvalue().encode()
+
+
+async def stream_export(
+    session: AsyncSession,
+    query: Select[Any],
+    projection: Projection,
+    export_format: ExportFormat,
+    batch_rows: int = EXPORT_BATCH_ROWS,
+) -> AsyncIterator[bytes]:
+    """Encoded export chunks, one per cursor batch, header first for CSV."""
+    if export_format == "csv":
+        buffer = io.StringIO()
+        csv.writer(buffer, lineterminator="\n").writerow(csv_header(projection))
+        yield buffer.getvalue().encode()
+
+    result = await session.stream(query.execution_options(yield_per=batch_rows))
+    async for rows in result.partitions(batch_rows):
+        # Aliases of the batch come from one query between cursor fetches
+        products = await projection.load(session, rows, fast=True)
+        yield encode_batch(products, export_format)
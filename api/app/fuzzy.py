@@ -0,0 +1,75 @@
+"""Trigram fuzzy matching for product search.
+
+Used as a fallback when full-text search finds too few hits, so misspellings
+like "charzard" still resolve without hand-curated ``misspelling`` aliases.
+Requires ``pg_trgm`` and the indexes in ``warehouse/ddl/02_trigram.sql``.
+"""
+
+import os
+from uuid import UUID
+
+from sqlalchemy import func, literal, select, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .models import Product, ProductAlias
+
+FUZZY_MIN_HITS = int(os.getenv("SEARCH_FUZZY_MIN_HITS", "3"))
+FUZZY_DEFAULT_THRESHOLD = float(os.getenv("SEARCH_FUZZY_THRESHOLD", "0.4"))
+
+
+async def fuzzy_product_ids(
+    session: AsyncSession,
+    q: str,
+    *,
+    threshold: float,
+    limit: int,
+    game: str | None = None,
+    category: str | None = None,
+    set_name: str | None = None,
+) -> list[UUID]:
+    """Return product IDs whose name or an alias resembles ``q``, best first.
+
+    Matching uses trigram word similarity (``<%``) so a short query can match
+    one word of a longer name; ``threshold`` is the minimum similarity.
+    """
+    needle = func.lower(literal(q))
+    name = func.lower(Product.name)
+    alias = func.lower(ProductAlias.alias)
+
+    # Threshold for the index-backed <% operator, scoped to this transaction
+    await session.execute(
+        select(
+            func.set_config("pg_trgm.word_similarity_threshold", str(threshold), True),
+        ),
+    )
+
+    candidates = union_all(
+        select(
+            Product.id.label("product_id"),
+            func.word_similarity(needle, name).label("score"),
+        ).where(needle.op("<%")(name)),
+        select(
+            ProductAlias.product_id,
+            func.word_similarity(needle, alias).label("score"),
+        ).where(needle.op("<%")(alias)),
+    ).subquery()
+
+    best = func.max(candidates.c.score)
+    query = (
+        select(candidates.c.product_id)
+        .join(Product, Product.id == candidates.c.product_id)
+        .group_by(candidates.c.product_id, Product.name)
+        .order_by(best.desc(), Product.name, candidates.c.product_id)
+        .limit(limit)
+    )
+
+    # Apply filters
+    if game:
+        query = query.where(Product.game.ilike(f"%{game}%"))
+    if category:
+        query = query.where(Product.category.ilike(f"%{category}%"))
+    if set_name:
+        query = query.where(Product.set_name.ilike(f"%{set_name}%"))
+
+    result = await session.execute(query)
+    return list(result.scalars().all())
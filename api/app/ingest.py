@@ -0,0 +1,371 @@
+"""Bulk catalog ingest over the PostgreSQL COPY protocol.
+
+Rows are streamed into session-local staging tables with COPY, then merged
+into ``products`` and ``product_aliases`` with one upsert statement each,
+keyed on the natural key (game, set, number, variant). The functions
+take a raw asyncpg connection so the API and the catalog loader share them;
+the caller owns the transaction.
+"""
+
+import codecs
+import json
+import os
+import re
+from collections.abc import AsyncIterable, Sequence
+from dataclasses import dataclass, field
+from typing import Any
+from uuid import UUID
+
+import asyncpg
+from pydantic import ValidationError
+
+from .schemas.products import IngestStatus, ProductIngest, ProductIngestOutcome
+
+BULK_INGEST_MAX_ROWS = int(os.getenv("BULK_INGEST_MAX_ROWS", "50000"))
+
+PRODUCT_COLUMNS = tuple(
+    name for name in ProductIngest.model_fields if name != "aliases"
+)
+ALIAS_COLUMNS = ("alias", "alias_type", "search_weight")
+
+
+def natural_key_sql(table: str | None = None) -> list[str]:
+    """Expressions of the ``uq_products_natural_key`` index, optionally qualified.
+
+    Cards without a number (e.g. Alpha) are told apart by name instead.
+    """
+    prefix = f"{table}." if table else ""
+    return [
+        f"{prefix}game",
+        f"COALESCE({prefix}set_name, '')",
+        f"COALESCE(NULLIF({prefix}card_number, ''), {prefix}name)",
+        f"COALESCE({prefix}variant, '')",
+    ]
+
+
+def _key_join(left: str, right: str) -> str:
+    """SQL join condition matching two tables on the natural key."""
+    return " AND ".join(
+        f"{a} = {b}"
+        for a, b in zip(natural_key_sql(left), natural_key_sql(right), strict=True)
+    )
+
+
+_COLUMNS = ", ".join(PRODUCT_COLUMNS)
+
+_CREATE_STAGING_SQL = f"""
+CREATE TEMP TABLE IF NOT EXISTS products_staging ON COMMIT DELETE ROWS AS
+    SELECT NULL::integer AS row_index, {_COLUMNS} FROM products WITH NO DATA;
+CREATE TEMP TABLE IF NOT EXISTS product_aliases_staging ON COMMIT DELETE ROWS AS
+    SELECT NULL::integer AS row_index, {", ".join(ALIAS_COLUMNS)}
+    FROM product_aliases WITH NO DATA;
+TRUNCATE products_staging, product_aliases_staging;
+"""  # noqa: S608
+
+# Latest row per natural key wins; unchanged rows are not rewritten, so
+# updated_at (and incremental exports) only move for real changes
+_MERGE_PRODUCTS_SQL = f"""
+INSERT INTO products ({_COLUMNS})
+SELECT {_COLUMNS} FROM (
+    SELECT DISTINCT ON ({", ".join(natural_key_sql())}) *
+    FROM products_staging
+    ORDER BY {", ".join(natural_key_sql())}, row_index DESC
+) latest
+ON CONFLICT ({", ".join(
+    f"({expr})" if "(" in expr else expr for expr in natural_key_sql()
+)}) DO UPDATE SET
+    {", ".join(f"{column} = EXCLUDED.{column}" for column in PRODUCT_COLUMNS)}
+WHERE ({", ".join(f"products.{column}" for column in PRODUCT_COLUMNS)})
+    IS DISTINCT FROM ({", ".join(f"EXCLUDED.{column}" for column in PRODUCT_COLUMNS)})
+RETURNING id, (xmax = 0) AS inserted
+"""  # noqa: S608
+
+_ROW_PRODUCTS_SQL = f"""
+SELECT s.row_index, p.id
+FROM products_staging s
+JOIN products p ON {_key_join("p", "s")}
+"""  # noqa: S608
+
+_MERGE_ALIASES_SQL = f"""
+INSERT INTO product_aliases (product_id, {", ".join(ALIAS_COLUMNS)})
+SELECT DISTINCT ON (p.id, lower(a.alias)) p.id, a.alias, a.alias_type, a.search_weight
+FROM product_aliases_staging a
+JOIN products_staging s USING (row_index)
+JOIN products p ON {_key_join("p", "s")}
+ORDER BY p.id, lower(a.alias), a.row_index DESC
+ON CONFLICT (product_id, (lower(alias))) DO UPDATE SET
+    alias_type = EXCLUDED.alias_type,
+    search_weight = EXCLUDED.search_weight
+WHERE (product_aliases.alias_type, product_aliases.search_weight)
+    IS DISTINCT FROM (EXCLUDED.alias_type, EXCLUDED.search_weight)
+RETURNING product_id
+"""  # noqa: S608
+
+
+class TooManyRowsError(ValueError):
+    """A bulk ingest has more than ``BULK_INGEST_MAX_ROWS`` rows."""
+
+    def __init__(self) -> None:
+        super().__init__(f"Bulk ingest is limited to {BULK_INGEST_MAX_ROWS} rows")
+
+
+class NotAnArrayError(ValueError):
+    """A bulk ingest body is valid JSON but not an array."""
+
+    def __init__(self) -> None:
+        super().__init__("Expected a JSON array of products")
+
+
+@dataclass
+class IngestRow:
+    """One input row: a validated product or the reason it was rejected."""
+
+    index: int
+    product: ProductIngest | None = None
+    error: str | None = None
+
+
+@dataclass
+class IngestReport:
+    """Per-row outcomes of a merge plus the alias rows it wrote."""
+
+    outcomes: list[ProductIngestOutcome]
+    aliases_written: int
+    # Products with an alias inserted or updated, even if their row was not
+    alias_product_ids: set[UUID] = field(default_factory=set)
+
+    @property
+    def changed_ids(self) -> set[UUID]:
+        """IDs of products that were inserted or updated, or whose aliases were."""
+        return self.alias_product_ids | {
+            outcome.id
+            for outcome in self.outcomes
+            if outcome.id is not None and outcome.status in {"inserted", "updated"}
+        }
+
+
+def natural_key(product: ProductIngest) -> tuple[str, str, str, str]:
+    """Python mirror of the ``uq_products_natural_key`` index expression."""
+    return (
+        product.game,
+        product.set_name or "",
+        product.card_number or product.name,
+        product.variant or "",
+    )
+
+
+def validation_message(error: ValidationError) -> str:
+    """Condense a validation error into one line per failing field."""
+    return "; ".join(
+        f"{'.'.join(str(part) for part in err['loc']) or 'row'}: {err['msg']}"
+        for err in error.errors()
+    )
+
+
+def parse_row(index: int, payload: Any) -> IngestRow:
+    """Validate one decoded row into an ``IngestRow``."""
+    try:
+        return IngestRow(index, product=ProductIngest.model_validate(payload))
+    except ValidationError as e:
+        return IngestRow(index, error=validation_message(e))
+
+
+async def parse_ndjson(chunks: AsyncIterable[bytes]) -> list[IngestRow]:
+    """Parse newline-delimited JSON incrementally as chunks arrive.
+
+    Raises ``TooManyRowsError`` once more than ``BULK_INGEST_MAX_ROWS`` rows
+    are seen.
+    """
+    rows: list[IngestRow] = []
+    buffer = b""
+
+    def _consume(line: bytes) -> None:
+        if not line.strip():
+            return
+        if len(rows) >= BULK_INGEST_MAX_ROWS:
+            raise TooManyRowsError
+        try:
+            payload = json.loads(line)
+        except json.JSONDecodeError as e:
+            rows.append(IngestRow(len(rows), error=f"Invalid JSON: {e.msg}"))
+            return
+        except UnicodeDecodeError:
+            rows.append(IngestRow(len(rows), error="Invalid UTF-8"))
+            return
+        rows.append(parse_row(len(rows), payload))
+
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            _consume(line)
+    _consume(buffer)
+    return rows
+
+
+_JSON_DECODER = json.JSONDecoder()
+_NON_WHITESPACE = re.compile(r"[^ \t\n\r]")
+
+
+class _TextStream:
+    """UTF-8 text of a byte stream, read a chunk at a time as it is needed."""
+
+    def __init__(self, chunks: AsyncIterable[bytes]) -> None:
+        self._chunks = aiter(chunks)
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self._done = False
+        self.text = ""
+        self.pos = 0
+
+    async def read(self, size: int = 0) -> bool:
+        """Append chunks until ``size`` characters are unconsumed, at least one.
+
+        Consumed text is dropped. Returns False if the stream had ended.
+        """
+        if self._done:
+            return False
+        parts = [self.text[self.pos :]]
+        length = len(parts[0])
+        while True:
+            chunk = await anext(self._chunks, None)
+            self._done = chunk is None
+            parts.append(self._decoder.decode(chunk or b"", final=self._done))
+            length += len(parts[-1])
+            if self._done or length >= size:
+                break
+        self.text = "".join(parts)
+        self.pos = 0
+        return True
+
+    async def peek(self) -> str:
+        """Skip whitespace; the next character, or "" at the end."""
+        while (match := _NON_WHITESPACE.search(self.text, self.pos)) is None:
+            self.pos = len(self.text)
+            if not await self.read():
+                return ""
+        self.pos = match.start()
+        return self.text[self.pos]
+
+    async def element(self) -> Any:
+        """Decode the array element at the current position once it is complete.
+
+        An element is complete once ``,`` or ``]`` follows it, as a number
+        may go on in the next chunk. Until then it is retried each time the
+        unconsumed text has doubled, so large elements take linear time.
+        """
+        while True:
+            size = 2 * (len(self.text) - self.pos)
+            try:
+                value, end = _JSON_DECODER.raw_decode(self.text, self.pos)
+            except json.JSONDecodeError:
+                if not await self.read(size):
+                    raise
+                continue
+            after = _NON_WHITESPACE.search(self.text, end)
+            if (after is None or after.group() not in ",]") and await self.read(size):
+                continue
+            self.pos = end
+            return value
+
+
+async def parse_json_array(chunks: AsyncIterable[bytes]) -> list[IngestRow]:
+    """Parse a JSON array of products incrementally as chunks arrive.
+
+    Each element is validated as soon as it is complete, so more than
+    ``BULK_INGEST_MAX_ROWS`` rows raise ``TooManyRowsError`` before the rest
+    of the body is read. Malformed JSON raises ``json.JSONDecodeError``,
+    invalid UTF-8 ``UnicodeDecodeError`` and any other JSON value
+    ``NotAnArrayError``.
+    """
+    stream = _TextStream(chunks)
+    if await stream.peek() != "[":
+        # Decode the whole body to tell malformed JSON from another value
+        while await stream.read():
+            pass
+        json.loads(stream.text[stream.pos :])
+        raise NotAnArrayError
+    stream.pos += 1
+
+    rows: list[IngestRow] = []
+    delimiter = await stream.peek()
+    while delimiter != "]":
+        if len(rows) >= BULK_INGEST_MAX_ROWS:
+            raise TooManyRowsError
+        await stream.peek()
+        rows.append(parse_row(len(rows), await stream.element()))
+        delimiter = await stream.peek()
+        if delimiter == ",":
+            stream.pos += 1
+        elif delimiter != "]":
+            msg = "Expecting ',' delimiter"
+            raise json.JSONDecodeError(msg, stream.text, stream.pos)
+    stream.pos += 1
+    if await stream.peek():
+        msg = "Extra data"
+        raise json.JSONDecodeError(msg, stream.text, stream.pos)
+    return rows
+
+
+async def merge_products(
+    conn: asyncpg.Connection,
+    rows: Sequence[IngestRow],
+) -> IngestReport:
+    """COPY rows into staging and upsert them into the catalog."""
+    valid = [(row.index, row.product) for row in rows if row.product is not None]
+
+    await conn.execute(_CREATE_STAGING_SQL)
+    await conn.copy_records_to_table(
+        "products_staging",
+        columns=["row_index", *PRODUCT_COLUMNS],
+        records=(
+            (index, *(getattr(product, column) for column in PRODUCT_COLUMNS))
+            for index, product in valid
+        ),
+    )
+    await conn.copy_records_to_table(
+        "product_aliases_staging",
+        columns=["row_index", *ALIAS_COLUMNS],
+        records=(
+            (index, alias.alias, alias.alias_type, alias.search_weight)
+            for index, product in valid
+            for alias in product.aliases
+        ),
+    )
+
+    merged = {
+        record["id"]: record["inserted"]
+        for record in await conn.fetch(_MERGE_PRODUCTS_SQL)
+    }
+    row_products = {
+        record["row_index"]: record["id"]
+        for record in await conn.fetch(_ROW_PRODUCTS_SQL)
+    }
+    alias_records = await conn.fetch(_MERGE_ALIASES_SQL)
+
+    # The last row for each natural key is the one that was merged
+    latest = {natural_key(product): index for index, product in valid}
+
+    outcomes = []
+    status: IngestStatus
+    for row in rows:
+        if row.product is None:
+            outcomes.append(
+                ProductIngestOutcome(row=row.index, status="invalid", error=row.error),
+            )
+            continue
+        product_id = row_products.get(row.index)
+        if latest[natural_key(row.product)] != row.index:
+            status = "duplicate"
+        elif product_id in merged:
+            status = "inserted" if merged[product_id] else "updated"
+        else:
+            status = "unchanged"
+        outcomes.append(
+            ProductIngestOutcome(row=row.index, status=status, id=product_id),
+        )
+
+    return IngestReport(
+        outcomes=outcomes,
+        aliases_written=len(alias_records),
+        alias_product_ids={record["product_id"] for record in alias_records},
+    )
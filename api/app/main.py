@@ -1,9 +1,17 @@
-from contextlib import asynccontextmanager
+import asyncio
+from contextlib import asynccontextmanager, suppress
 
 from fastapi import FastAPI
 
-from .database import init_db
-from .routers import products
+from .collectr import import_jobs
+from .database import PrimaryPinMiddleware, async_session_maker, init_db
+from .prices import (
+    maintain_price_partitions,
+    price_buffer,
+    run_partition_maintenance,
+)
+from .routers import metrics, portfolios, prices, products
+from .search_index import SEARCH_INDEX_ENABLED, search_index
 
 
 @asynccontextmanager
@@ -11,7 +19,20 @@ async def lifespan(app: FastAPI):
     """Application lifespan events."""
     # Initialize database on startup
     await init_db()
+    # Build the in-memory search index before serving traffic
+    if SEARCH_INDEX_ENABLED:
+        async with async_session_maker() as session:
+            await search_index.rebuild(session)
+    # Price partitions must exist before sales arrive; afterwards keep them
+    # ahead of the calendar and retire expired ones
+    await maintain_price_partitions()
+    maintenance = asyncio.create_task(run_partition_maintenance())
     yield
+    maintenance.cancel()
+    with suppress(asyncio.CancelledError):
+        await maintenance
+    await price_buffer.close()
+    await import_jobs.close()
 
 
 app = FastAPI(
@@ -21,8 +42,14 @@ app = FastAPI(
     lifespan=lifespan,
 )
 
+# Writers' next reads go to the primary; see get_write_session
+app.add_middleware(PrimaryPinMiddleware)
+
 # Include routers
 app.include_router(products.router, prefix="/api/v1")
+app.include_router(prices.router, prefix="/api/v1")
+app.include_router(portfolios.router, prefix="/api/v1")
+app.include_router(metrics.router, prefix="/api/v1")
 
 
 @app.get("/health")
@@ -4,7 +4,18 @@ from datetime import datetime
 from decimal import Decimal
 from uuid import UUID
 
-from sqlalchemy import DECIMAL, ForeignKey, Integer, String, Text, func
+from sqlalchemy import (
+    DECIMAL,
+    CheckConstraint,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    Text,
+    func,
+    text,
+)
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.dialects.postgresql import UUID as PostgresUUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.sql.sqltypes import DateTime
@@ -16,6 +27,22 @@ class Product(Base):
     """Product model representing cards and collectibles."""
 
     __tablename__ = "products"
+    __table_args__ = (
+        # Keyset pagination walks (name, id) in order
+        Index("idx_products_name_id", "name", "id"),
+        # Catalog exports stream in change order from a watermark
+        Index("idx_products_updated_at_id", "updated_at", "id"),
+        Index("idx_products_search_vector", "search_vector", postgresql_using="gin"),
+        # Natural key for bulk upserts (warehouse/ddl/04_natural_keys.sql)
+        Index(
+            "uq_products_natural_key",
+            "game",
+            text("COALESCE(set_name, '')"),
+            text("COALESCE(NULLIF(card_number, ''), name)"),
+            text("COALESCE(variant, '')"),
+            unique=True,
+        ),
+    )
 
     id: Mapped[UUID] = mapped_column(
         PostgresUUID(as_uuid=True),
@@ -39,8 +66,13 @@ class Product(Base):
     high_price: Mapped[Decimal | None] = mapped_column(DECIMAL(10, 2))
     created_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now())
     updated_at: Mapped[datetime] = mapped_column(
-        DateTime, server_default=func.now(), onupdate=func.now()
+        DateTime,
+        server_default=func.now(),
+        onupdate=func.now(),
     )
+    # Weighted name/set/variant/alias vector, maintained by database triggers
+    # (warehouse/ddl/01_search_vector.sql); never loaded unless asked for
+    search_vector: Mapped[str | None] = mapped_column(TSVECTOR, deferred=True)
 
     # Relationships
     aliases: Mapped[list["ProductAlias"]] = relationship(
@@ -54,6 +86,14 @@ class ProductAlias(Base):
     """Product alias model for search optimization."""
 
     __tablename__ = "product_aliases"
+    __table_args__ = (
+        Index(
+            "uq_product_aliases_product_alias",
+            "product_id",
+            text("lower(alias)"),
+            unique=True,
+        ),
+    )
 
     id: Mapped[UUID] = mapped_column(
         PostgresUUID(as_uuid=True),
@@ -72,3 +112,136 @@ class ProductAlias(Base):
 
     # Relationships
     product: Mapped[Product] = relationship("Product", back_populates="aliases")
+
+
+class PriceObservation(Base):
+    """One observed sale price, range-partitioned by sale month.
+
+    Partitions are created and retired by ``prices.maintain_partitions``
+    (warehouse/ddl/05_prices.sql has the same layout).
+    """
+
+    __tablename__ = "prices_raw"
+    __table_args__ = (
+        # Per-product range reads within the pruned partitions
+        Index("idx_prices_raw_product_sold_at", "product_id", "sold_at"),
+        # Tiny time index for cross-product scans of append-ordered data
+        Index("idx_prices_raw_sold_at_brin", "sold_at", postgresql_using="brin"),
+        {"postgresql_partition_by": "RANGE (sold_at)"},
+    )
+
+    # (source, listing_id, sold_at) identifies a sale, so re-scraped sales
+    # are dropped on append; the partition key has to be part of it
+    source: Mapped[str] = mapped_column(String(50), primary_key=True)
+    listing_id: Mapped[str] = mapped_column(String(100), primary_key=True)
+    sold_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), primary_key=True)
+    # No foreign key: checking products on every appended row costs more
+    # than the odd orphan left by a deleted product, which joins skip anyway
+    product_id: Mapped[UUID] = mapped_column(PostgresUUID(as_uuid=True), nullable=False)
+    price: Mapped[Decimal] = mapped_column(DECIMAL(10, 2), nullable=False)
+    currency: Mapped[str] = mapped_column(
+        String(3),
+        nullable=False,
+        server_default="USD",
+    )
+    condition: Mapped[str | None] = mapped_column(String(50))
+    observed_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=func.now(),
+    )
+
+
+class PriceCandle(Base):
+    """OHLC, volume and median of one product's sales in one time bucket.
+
+    Maintained by ``candles.refresh_candles`` as sales are appended
+    (warehouse/ddl/06_candles.sql has the same layout).
+    """
+
+    __tablename__ = "price_candles"
+    __table_args__ = (
+        CheckConstraint("period IN ('day', 'week', 'month')", name="period"),
+        # Cached portfolio valuations fetch only candles changed since loading
+        Index("idx_price_candles_updated_at", "updated_at"),
+    )
+
+    # The primary key is the chart read: one product, one period, in order
+    product_id: Mapped[UUID] = mapped_column(
+        PostgresUUID(as_uuid=True),
+        primary_key=True,
+    )
+    period: Mapped[str] = mapped_column(String(10), primary_key=True)
+    bucket_start: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        primary_key=True,
+    )
+    open: Mapped[Decimal] = mapped_column(DECIMAL(10, 2), nullable=False)
+    high: Mapped[Decimal] = mapped_column(DECIMAL(10, 2), nullable=False)
+    low: Mapped[Decimal] = mapped_column(DECIMAL(10, 2), nullable=False)
+    close: Mapped[Decimal] = mapped_column(DECIMAL(10, 2), nullable=False)
+    volume: Mapped[int] = mapped_column(Integer, nullable=False)
+    median_price: Mapped[Decimal] = mapped_column(DECIMAL(10, 2), nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=func.now(),
+    )
+
+
+class Portfolio(Base):
+    """A named collection of holdings."""
+
+    __tablename__ = "portfolios"
+
+    id: Mapped[UUID] = mapped_column(
+        PostgresUUID(as_uuid=True),
+        primary_key=True,
+        server_default=func.gen_random_uuid(),
+    )
+    name: Mapped[str] = mapped_column(String(255), nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now())
+
+    # Relationships
+    holdings: Mapped[list["Holding"]] = relationship(
+        "Holding",
+        back_populates="portfolio",
+        cascade="all, delete-orphan",
+    )
+
+
+class Holding(Base):
+    """A quantity of one product added to a portfolio at a unit cost."""
+
+    __tablename__ = "holdings"
+    __table_args__ = (
+        CheckConstraint("quantity > 0", name="quantity_positive"),
+        # Valuation loads a portfolio's holdings in product order
+        Index("idx_holdings_portfolio_product", "portfolio_id", "product_id"),
+    )
+
+    id: Mapped[UUID] = mapped_column(
+        PostgresUUID(as_uuid=True),
+        primary_key=True,
+        server_default=func.gen_random_uuid(),
+    )
+    portfolio_id: Mapped[UUID] = mapped_column(
+        PostgresUUID(as_uuid=True),
+        ForeignKey("portfolios.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    product_id: Mapped[UUID] = mapped_column(
+        PostgresUUID(as_uuid=True),
+        ForeignKey("products.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    quantity: Mapped[int] = mapped_column(Integer, nullable=False)
+    cost_basis: Mapped[Decimal] = mapped_column(DECIMAL(10, 2), nullable=False)
+    acquired_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=func.now(),
+    )
+
+    # Relationships
+    portfolio: Mapped[Portfolio] = relationship("Portfolio", back_populates="holdings")
@@ -0,0 +1,37 @@
+"""Keyset (cursor) pagination helpers for Cardfolio 2.0.
+
+A cursor is the sort key of the last row on a page, serialized as URL-safe
+base64 JSON. Clients treat it as opaque and pass it back to get the next page,
+which the database answers with an index range scan instead of an OFFSET walk.
+"""
+
+import base64
+import binascii
+import json
+from typing import Any
+
+
+def encode_cursor(*values: Any) -> str:
+    """Encode sort-key values (UUIDs become strings) into an opaque cursor."""
+    payload = json.dumps(
+        [value if isinstance(value, int | float) else str(value) for value in values],
+        separators=(",", ":"),
+    )
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> list[Any]:
+    """Decode a cursor into its ``size`` sort-key values.
+
+    Raises ``ValueError`` when the cursor is malformed or has the wrong shape.
+    """
+    padded = cursor + "=" * (-len(cursor) % 4)
+    try:
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (binascii.Error, UnicodeDecodeError, json.JSONDecodeError) as e:
+        msg = "Malformed pagination cursor"
+        raise ValueError(msg) from e
+    if not isinstance(values, list) or len(values) != size:
+        msg = "Pagination cursor does not match this endpoint"
+        raise ValueError(msg)
+    return values
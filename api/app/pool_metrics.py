@@ -0,0 +1,169 @@
+"""Connection pool and prepared-statement cache instrumentation.
+
+``InstrumentedPool`` times every checkout, counting waiters, timeouts and new
+connections, so pool exhaustion under bursts shows up as rising acquire
+times and waiters instead of opaque request latency. Statement cache hits
+are counted by checking the asyncpg adapter's prepared-statement LRU before
+each execute.
+"""
+
+import statistics
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, PoolProxiedConnection
+
+ACQUIRE_SAMPLES = 1024
+
+
+@dataclass
+class PoolMetrics:
+    """Counters and recent acquire times for one engine's pool."""
+
+    checkouts: int = 0
+    timeouts: int = 0
+    connects: int = 0
+    invalidations: int = 0
+    waiting: int = 0
+    statement_cache_hits: int = 0
+    statement_cache_misses: int = 0
+    acquire_seconds_total: float = 0.0
+    acquire_seconds_max: float = 0.0
+    _recent: deque[float] = field(
+        default_factory=lambda: deque(maxlen=ACQUIRE_SAMPLES),
+        repr=False,
+    )
+
+    def record_acquire(self, seconds: float) -> None:
+        """Record how long one checkout took, including any wait."""
+        self.checkouts += 1
+        self.acquire_seconds_total += seconds
+        self.acquire_seconds_max = max(self.acquire_seconds_max, seconds)
+        self._recent.append(seconds)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Counters plus acquire-time percentiles over recent checkouts, in ms."""
+        recent = sorted(self._recent)
+        percentiles = (
+            statistics.quantiles(recent, n=100, method="inclusive")
+            if len(recent) > 1
+            else recent * 99
+        )
+        lookups = self.statement_cache_hits + self.statement_cache_misses
+        return {
+            "checkouts": self.checkouts,
+            "timeouts": self.timeouts,
+            "connects": self.connects,
+            "invalidations": self.invalidations,
+            "waiting": self.waiting,
+            "acquire_ms": {
+                "mean": (
+                    self.acquire_seconds_total / self.checkouts * 1000
+                    if self.checkouts
+                    else 0.0
+                ),
+                "p50": percentiles[49] * 1000 if percentiles else 0.0,
+                "p95": percentiles[94] * 1000 if percentiles else 0.0,
+                "p99": percentiles[98] * 1000 if percentiles else 0.0,
+                "max": self.acquire_seconds_max * 1000,
+            },
+            "statement_cache": {
+                "hits": self.statement_cache_hits,
+                "misses": self.statement_cache_misses,
+                "hit_ratio": self.statement_cache_hits / lookups if lookups else 0.0,
+            },
+        }
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """Async queue pool that records checkout timings in ``metrics``."""
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+    def connect(self) -> PoolProxiedConnection:
+        """Check out a connection, timing the wait for a free slot."""
+        self.metrics.waiting += 1
+        started = time.perf_counter()
+        try:
+            return super().connect()
+        except PoolTimeoutError:
+            self.metrics.timeouts += 1
+            raise
+        finally:
+            self.metrics.waiting -= 1
+            self.metrics.record_acquire(time.perf_counter() - started)
+
+    def _create_connection(self) -> Any:
+        self.metrics.connects += 1
+        return super()._create_connection()
+
+    def recreate(self) -> "InstrumentedPool":
+        """Recreate the pool (e.g. on ``dispose()``), keeping its metrics."""
+        pool = super().recreate()
+        assert isinstance(pool, InstrumentedPool)
+        pool.metrics = self.metrics
+        return pool
+
+
+def instrument(engine: AsyncEngine) -> None:
+    """Count invalidations and prepared-statement cache lookups on ``engine``."""
+    sync_engine = engine.sync_engine
+
+    def _metrics() -> PoolMetrics | None:
+        pool = sync_engine.pool
+        return pool.metrics if isinstance(pool, InstrumentedPool) else None
+
+    @event.listens_for(sync_engine, "before_cursor_execute", named=True)
+    def _count_statement_cache(
+        conn: Connection,
+        statement: str,
+        executemany: bool,
+        **_: Any,
+    ) -> None:
+        metrics = _metrics()
+        cache = getattr(
+            conn.connection.dbapi_connection,
+            "_prepared_statement_cache",
+            None,
+        )
+        if metrics is None or cache is None or executemany:
+            return
+        if statement in cache:
+            metrics.statement_cache_hits += 1
+        else:
+            metrics.statement_cache_misses += 1
+
+    @event.listens_for(sync_engine, "invalidate")
+    def _count_invalidation(*_: Any) -> None:
+        metrics = _metrics()
+        if metrics is not None:
+            metrics.invalidations += 1
+
+
+def pool_stats(engine: AsyncEngine) -> dict[str, Any]:
+    """Live pool occupancy plus the pool's accumulated metrics."""
+    pool = engine.sync_engine.pool
+    stats: dict[str, Any] = {"class": type(pool).__name__}
+    if isinstance(pool, AsyncAdaptedQueuePool):
+        stats.update(
+            size=pool.size(),
+            checked_out=pool.checkedout(),
+            checked_in=pool.checkedin(),
+            # overflow() counts down from -size; only positive values are
+            # connections opened beyond pool_size
+            overflow=max(pool.overflow(), 0),
+            # QueuePool has no public accessor for its configured overflow
+            max_overflow=pool._max_overflow,  # noqa: SLF001
+            timeout=pool.timeout(),
+        )
+    if isinstance(pool, InstrumentedPool):
+        stats.update(pool.metrics.as_dict())
+    return stats
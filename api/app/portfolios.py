@@ -0,0 +1,305 @@
+"""Portfolio valuation: columnar loading and an incrementally repriced cache.
+
+Holdings and daily candle prices are loaded straight into NumPy arrays and
+valued by ``valuation.value_portfolio``. Valuations are cached per
+portfolio; a later read only fetches the daily candles that changed since
+the entry was loaded and applies them with ``valuation.reprice``. They are
+kept in a small overlay on the loaded prices, which is merged into them
+once it outgrows ``COMPACT_RATIO`` of them. Changing a portfolio's holdings
+drops its entry.
+"""
+
+import os
+from collections.abc import Sequence
+from dataclasses import dataclass, field, replace
+from datetime import UTC, date, datetime, timedelta
+from uuid import UUID
+
+import asyncpg
+import numpy as np
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .cache import TTLCache
+from .schemas.portfolios import HoldingCreate
+from .valuation import (
+    DAYS_PER_YEAR,
+    HoldingEvents,
+    PriceEvents,
+    Valuation,
+    reprice,
+    value_portfolio,
+)
+
+VALUATION_CACHE_SIZE = int(os.getenv("VALUATION_CACHE_SIZE", "256"))
+VALUATION_CACHE_TTL = float(os.getenv("VALUATION_CACHE_TTL_SECONDS", "3600"))
+
+# Candles written by transactions still open when an entry was loaded carry
+# an earlier updated_at than the load; refreshes re-read this far back
+VALUATION_REFRESH_OVERLAP = timedelta(minutes=1)
+
+# Merge the overlay of refreshed prices into the loaded ones, and revalue
+# from scratch, once it holds this fraction of their rows
+COMPACT_RATIO = 0.05
+
+# Each held product's daily prices in the window, plus its last price before
+# the window so the first day is valued. Day numbers are UTC calendar days
+# from the window start.
+_LOAD_PRICES_SQL = """
+SELECT
+    array_agg(held.idx - 1) AS product,
+    array_agg(CAST(candle.bucket_start AT TIME ZONE 'UTC' AS DATE) - $2::date) AS day,
+    array_agg(CAST(candle.median_price AS FLOAT8)) AS price,
+    now() AS loaded_at
+FROM unnest($1::uuid[]) WITH ORDINALITY AS held(product_id, idx)
+CROSS JOIN LATERAL (
+    (
+        SELECT bucket_start, median_price
+        FROM price_candles
+        WHERE product_id = held.product_id
+            AND period = 'day'
+            AND bucket_start < $3
+        ORDER BY bucket_start DESC
+        LIMIT 1
+    )
+    UNION ALL
+    SELECT bucket_start, median_price
+    FROM price_candles
+    WHERE product_id = held.product_id
+        AND period = 'day'
+        AND bucket_start >= $3
+        AND bucket_start < $4
+) AS candle
+"""
+
+_CHANGED_PRICES_SQL = """
+SELECT
+    array_agg(held.idx - 1) AS product,
+    array_agg(CAST(candle.bucket_start AT TIME ZONE 'UTC' AS DATE) - $2::date) AS day,
+    array_agg(CAST(candle.median_price AS FLOAT8)) AS price,
+    now() AS loaded_at
+FROM price_candles candle
+JOIN unnest($1::uuid[]) WITH ORDINALITY AS held(product_id, idx)
+    ON held.product_id = candle.product_id
+WHERE candle.updated_at > $5
+    AND candle.period = 'day'
+    AND candle.bucket_start >= $3
+    AND candle.bucket_start < $4
+"""
+
+_LOAD_HOLDINGS_SQL = """
+SELECT
+    product_id,
+    CAST(acquired_at AT TIME ZONE 'UTC' AS DATE) - $2::date AS day,
+    quantity,
+    CAST(cost_basis AS FLOAT8) AS cost_basis
+FROM holdings
+WHERE portfolio_id = $1
+ORDER BY product_id
+"""
+
+_INSERT_HOLDINGS_SQL = text("""
+INSERT INTO holdings (portfolio_id, product_id, quantity, cost_basis, acquired_at)
+SELECT
+    :portfolio_id,
+    holding.product_id,
+    holding.quantity,
+    holding.cost_basis,
+    COALESCE(holding.acquired_at, now())
+FROM unnest(
+    CAST(:product_ids AS UUID[]),
+    CAST(:quantities AS INTEGER[]),
+    CAST(:cost_bases AS DECIMAL(10, 2)[]),
+    CAST(:acquired_ats AS TIMESTAMPTZ[])
+) AS holding(product_id, quantity, cost_basis, acquired_at)
+""")
+
+
+async def insert_holdings(
+    session: AsyncSession,
+    portfolio_id: UUID,
+    holdings: Sequence[HoldingCreate],
+) -> None:
+    """Insert holdings with one statement; the caller commits.
+
+    Unknown products raise ``IntegrityError``. The portfolio's cached
+    valuation is the caller's to invalidate once the rows are committed.
+    """
+    await session.execute(
+        _INSERT_HOLDINGS_SQL,
+        {
+            "portfolio_id": portfolio_id,
+            "product_ids": [holding.product_id for holding in holdings],
+            "quantities": [holding.quantity for holding in holdings],
+            "cost_bases": [holding.cost_basis for holding in holdings],
+            "acquired_ats": [holding.acquired_at for holding in holdings],
+        },
+    )
+
+
+def _no_prices() -> PriceEvents:
+    """An empty price list."""
+    return PriceEvents.from_arrays([], [], [])
+
+
+def valuation_window(years: int, today: date | None = None) -> tuple[date, int]:
+    """First day and length of a window of ``years`` years ending today."""
+    today = today or datetime.now(UTC).date()
+    days = years * DAYS_PER_YEAR
+    return today - timedelta(days=days - 1), days
+
+
+@dataclass
+class PortfolioSnapshot:
+    """A portfolio's loaded arrays and valuation over one window.
+
+    ``recent`` holds the prices refreshed since ``prices`` were loaded; its
+    rows replace same-day ones in ``prices``.
+    """
+
+    product_ids: list[UUID]
+    holdings: HoldingEvents
+    prices: PriceEvents
+    valuation: Valuation
+    loaded_at: datetime
+    recent: PriceEvents = field(default_factory=_no_prices)
+
+    @property
+    def start(self) -> date:
+        """First day valued."""
+        return self.valuation.start
+
+    @property
+    def days(self) -> int:
+        """Number of days valued."""
+        return self.valuation.days
+
+
+def _bounds(start: date, days: int) -> tuple[datetime, datetime]:
+    """The window as UTC timestamps for bucket_start comparisons."""
+    first = datetime(start.year, start.month, start.day, tzinfo=UTC)
+    return first, first + timedelta(days=days)
+
+
+def _price_events(record: asyncpg.Record, days: int) -> PriceEvents:
+    """Price arrays from one aggregated row (arrays are NULL when empty)."""
+    return PriceEvents.from_arrays(
+        record["product"] or [],
+        record["day"] or [],
+        record["price"] or [],
+        days,
+    )
+
+
+async def load_snapshot(
+    conn: asyncpg.Connection,
+    portfolio_id: UUID,
+    start: date,
+    days: int,
+) -> PortfolioSnapshot:
+    """Load a portfolio's holdings and prices and value it from ``start``."""
+    rows = await conn.fetch(_LOAD_HOLDINGS_SQL, portfolio_id, start)
+    product_ids = sorted({row["product_id"] for row in rows})
+    index = {product_id: i for i, product_id in enumerate(product_ids)}
+    holdings = HoldingEvents.from_arrays(
+        np.fromiter((index[row["product_id"]] for row in rows), np.int64, len(rows)),
+        np.fromiter((row["day"] for row in rows), np.int64, len(rows)),
+        np.fromiter((row["quantity"] for row in rows), np.float64, len(rows)),
+        np.fromiter((row["cost_basis"] for row in rows), np.float64, len(rows)),
+    )
+    record = await conn.fetchrow(
+        _LOAD_PRICES_SQL,
+        product_ids,
+        start,
+        *_bounds(start, days),
+    )
+    prices = _price_events(record, days)
+    return PortfolioSnapshot(
+        product_ids,
+        holdings,
+        prices,
+        value_portfolio(start, days, prices, holdings),
+        record["loaded_at"],
+    )
+
+
+async def refresh_snapshot(
+    conn: asyncpg.Connection,
+    snapshot: PortfolioSnapshot,
+) -> PortfolioSnapshot:
+    """``snapshot`` with daily candles changed since it was loaded applied.
+
+    The changes are added to the overlay and the valuation repriced by
+    their differences; a large overlay is merged and the series recomputed.
+    """
+    record = await conn.fetchrow(
+        _CHANGED_PRICES_SQL,
+        snapshot.product_ids,
+        snapshot.start,
+        *_bounds(snapshot.start, snapshot.days),
+        snapshot.loaded_at - VALUATION_REFRESH_OVERLAP,
+    )
+    changed = _price_events(record, snapshot.days)
+    if not len(changed.day):
+        return replace(snapshot, loaded_at=record["loaded_at"])
+    recent = snapshot.recent.merge(changed)
+    if len(recent.day) > COMPACT_RATIO * max(len(snapshot.prices.day), 1):
+        prices = snapshot.prices.merge(recent)
+        return PortfolioSnapshot(
+            snapshot.product_ids,
+            snapshot.holdings,
+            prices,
+            value_portfolio(snapshot.start, snapshot.days, prices, snapshot.holdings),
+            record["loaded_at"],
+        )
+    return PortfolioSnapshot(
+        snapshot.product_ids,
+        snapshot.holdings,
+        snapshot.prices,
+        reprice(
+            snapshot.valuation,
+            snapshot.prices,
+            snapshot.recent,
+            changed,
+            snapshot.holdings,
+        ),
+        record["loaded_at"],
+        recent,
+    )
+
+
+class ValuationCache:
+    """Per-portfolio valuation snapshots, repriced with changed candles on read."""
+
+    def __init__(self, max_entries: int = 256, ttl: float = 3600):
+        self._snapshots: TTLCache[UUID, PortfolioSnapshot] = TTLCache(
+            maxsize=max_entries,
+            ttl=ttl,
+        )
+
+    async def valuation(
+        self,
+        conn: asyncpg.Connection,
+        portfolio_id: UUID,
+        start: date,
+        days: int,
+    ) -> PortfolioSnapshot:
+        """The portfolio's snapshot over a window, loading or refreshing it."""
+        snapshot = self._snapshots.get(portfolio_id)
+        if snapshot is None or (snapshot.start, snapshot.days) != (start, days):
+            snapshot = await load_snapshot(conn, portfolio_id, start, days)
+        else:
+            snapshot = await refresh_snapshot(conn, snapshot)
+        self._snapshots.set(portfolio_id, snapshot)
+        return snapshot
+
+    def invalidate(self, portfolio_id: UUID) -> None:
+        """Drop a portfolio's snapshot after its holdings changed."""
+        self._snapshots.pop(portfolio_id)
+
+    def stats(self) -> dict[str, int]:
+        """Hit, miss, eviction and size counters."""
+        return {**self._snapshots.stats.as_dict(), "size": len(self._snapshots)}
+
+
+valuation_cache = ValuationCache(VALUATION_CACHE_SIZE, VALUATION_CACHE_TTL)
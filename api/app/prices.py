@@ -0,0 +1,352 @@
+"""Price observation store: partition maintenance and batched appends.
+
+``prices_raw`` is range-partitioned by sale month. ``maintain_partitions``
+keeps one partition per month from the retention cutoff to a few months
+ahead and drops older ones, so retention is a metadata operation rather than
+a bulk DELETE, and range reads only touch the months they ask for.
+
+Appends are coalesced by ``PriceAppendBuffer``: concurrent callers' rows go
+into one COPY and one ``INSERT ... ON CONFLICT DO NOTHING`` per batch, and
+each caller waits until its rows are committed (group commit). Each batch
+also refreshes the candles its new sales fall into (see ``candles``).
+"""
+
+import asyncio
+import logging
+import os
+import re
+from collections.abc import Awaitable, Callable, Iterable, Sequence
+from dataclasses import dataclass, field
+from datetime import UTC, date, datetime
+from uuid import UUID
+
+import asyncpg
+
+from .candles import refresh_candles
+from .database import async_session_maker, driver_transaction
+from .result_cache import result_cache
+from .schemas.prices import PriceObservationCreate
+
+logger = logging.getLogger(__name__)
+
+PRICE_RETENTION_MONTHS = int(os.getenv("PRICE_RETENTION_MONTHS", "60"))
+PRICE_PARTITIONS_AHEAD = int(os.getenv("PRICE_PARTITIONS_AHEAD", "2"))
+PRICE_MAINTENANCE_INTERVAL = float(
+    os.getenv("PRICE_MAINTENANCE_INTERVAL_SECONDS", "21600"),
+)
+PRICE_APPEND_BATCH_ROWS = int(os.getenv("PRICE_APPEND_BATCH_ROWS", "5000"))
+PRICE_APPEND_MAX_DELAY = float(os.getenv("PRICE_APPEND_MAX_DELAY_MS", "10")) / 1000
+
+PRICE_COLUMNS = (
+    "source",
+    "listing_id",
+    "sold_at",
+    "product_id",
+    "price",
+    "currency",
+    "condition",
+)
+
+# Arbitrary advisory lock ID so only one API worker maintains partitions
+_MAINTENANCE_LOCK = 0x70726963
+
+_PARTITION_NAME = re.compile(r"^prices_raw_(\d{4})_(\d{2})$")
+
+_LIST_PARTITIONS_SQL = """
+SELECT child.relname
+FROM pg_inherits
+JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+WHERE pg_inherits.inhparent = 'prices_raw'::regclass
+"""
+
+_CREATE_DEFAULT_SQL = """
+CREATE TABLE IF NOT EXISTS prices_raw_default PARTITION OF prices_raw DEFAULT
+"""
+
+_COLUMNS = ", ".join(PRICE_COLUMNS)
+
+_CREATE_STAGING_SQL = f"""
+CREATE TEMP TABLE IF NOT EXISTS prices_raw_staging ON COMMIT DELETE ROWS AS
+    SELECT {_COLUMNS} FROM prices_raw WITH NO DATA;
+TRUNCATE prices_raw_staging;
+"""  # noqa: S608
+
+# Sales older than the retention cutoff would be dropped with their
+# partition anyway, so they are not written at all
+_APPEND_SQL = f"""
+INSERT INTO prices_raw ({_COLUMNS})
+SELECT {_COLUMNS} FROM prices_raw_staging
+WHERE sold_at >= $1
+ON CONFLICT (source, listing_id, sold_at) DO NOTHING
+RETURNING source, listing_id, sold_at, product_id
+"""  # noqa: S608
+
+SaleKey = tuple[str, str, datetime]
+
+
+def month_start(day: date) -> date:
+    """First day of ``day``'s month."""
+    return day.replace(day=1)
+
+
+def add_months(month: date, months: int) -> date:
+    """The first of the month ``months`` after (or before) ``month``."""
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    """Name of the partition holding sales from ``month``."""
+    return f"prices_raw_{month:%Y_%m}"
+
+
+def retention_cutoff(
+    today: date,
+    retention_months: int = PRICE_RETENTION_MONTHS,
+) -> datetime:
+    """Start of the oldest month still kept."""
+    month = add_months(month_start(today), -retention_months)
+    return datetime(month.year, month.month, 1, tzinfo=UTC)
+
+
+@dataclass
+class AppendReport:
+    """Sales written by an append and products it repriced."""
+
+    written: set[SaleKey] = field(default_factory=set)
+    repriced: list[UUID] = field(default_factory=list)
+
+
+@dataclass
+class PartitionPlan:
+    """Monthly partitions to create and partitions to drop."""
+
+    create: list[date] = field(default_factory=list)
+    drop: list[str] = field(default_factory=list)
+
+
+def plan_partitions(
+    existing: Iterable[str],
+    today: date,
+    retention_months: int = PRICE_RETENTION_MONTHS,
+    months_ahead: int = PRICE_PARTITIONS_AHEAD,
+) -> PartitionPlan:
+    """Compare existing partitions with the retention window.
+
+    Every month from the retention cutoff through ``months_ahead`` months
+    from now should have a partition; monthly partitions before the cutoff
+    are dropped. Other partitions (the default one) are left alone.
+    """
+    months = {}
+    for name in existing:
+        match = _PARTITION_NAME.match(name)
+        if match:
+            months[date(int(match[1]), int(match[2]), 1)] = name
+
+    first = retention_cutoff(today, retention_months).date()
+    wanted = [
+        add_months(first, offset)
+        for offset in range(retention_months + months_ahead + 1)
+    ]
+    return PartitionPlan(
+        create=[month for month in wanted if month not in months],
+        drop=[name for month, name in sorted(months.items()) if month < first],
+    )
+
+
+def _create_partition_sql(month: date) -> str:
+    # Partition bounds can't be bind parameters; both values are generated
+    start, end = month, add_months(month, 1)
+    return (
+        f"CREATE TABLE IF NOT EXISTS {partition_name(month)} PARTITION OF prices_raw "
+        f"FOR VALUES FROM ('{start.isoformat()} 00:00+00') "
+        f"TO ('{end.isoformat()} 00:00+00')"
+    )
+
+
+async def maintain_partitions(
+    conn: asyncpg.Connection,
+    today: date | None = None,
+) -> PartitionPlan | None:
+    """Create upcoming partitions and drop expired ones.
+
+    Returns ``None`` when another connection is already maintaining them.
+    """
+    today = today or datetime.now(UTC).date()
+    async with conn.transaction():
+        if not await conn.fetchval(
+            "SELECT pg_try_advisory_xact_lock($1)",
+            _MAINTENANCE_LOCK,
+        ):
+            return None
+        await conn.execute(_CREATE_DEFAULT_SQL)
+        existing = [
+            record["relname"] for record in await conn.fetch(_LIST_PARTITIONS_SQL)
+        ]
+        plan = plan_partitions(existing, today)
+        for month in plan.create:
+            await conn.execute(_create_partition_sql(month))
+        for name in plan.drop:
+            await conn.execute(f"DROP TABLE IF EXISTS {name}")
+    return plan
+
+
+async def maintain_price_partitions() -> None:
+    """Run one partition maintenance pass, logging rather than raising."""
+    try:
+        async with (
+            async_session_maker() as session,
+            driver_transaction(session) as conn,
+        ):
+            plan = await maintain_partitions(conn)
+    except Exception:
+        logger.exception("Price partition maintenance failed")
+        return
+    if plan is not None and (plan.create or plan.drop):
+        logger.info(
+            "Price partitions: created %d, dropped %s",
+            len(plan.create),
+            ", ".join(plan.drop) or "none",
+        )
+
+
+async def run_partition_maintenance(
+    interval: float = PRICE_MAINTENANCE_INTERVAL,
+) -> None:
+    """Repeat partition maintenance every ``interval`` seconds, forever."""
+    while True:
+        await asyncio.sleep(interval)
+        await maintain_price_partitions()
+
+
+async def append_observations(
+    conn: asyncpg.Connection,
+    observations: Sequence[PriceObservationCreate],
+    today: date | None = None,
+) -> AppendReport:
+    """COPY observations into staging and append the new ones.
+
+    Sales already stored and sales before the retention cutoff are skipped.
+    The candles the new sales fall into are refreshed, and their products
+    repriced, in the same transaction, which the caller owns.
+    """
+    if not observations:
+        return AppendReport()
+    await conn.execute(_CREATE_STAGING_SQL)
+    await conn.copy_records_to_table(
+        "prices_raw_staging",
+        columns=list(PRICE_COLUMNS),
+        records=(
+            tuple(getattr(observation, column) for column in PRICE_COLUMNS)
+            for observation in observations
+        ),
+    )
+    cutoff = retention_cutoff(today or datetime.now(UTC).date())
+    records = await conn.fetch(_APPEND_SQL, cutoff)
+    return AppendReport(
+        written={
+            (record["source"], record["listing_id"], record["sold_at"])
+            for record in records
+        },
+        repriced=await refresh_candles(
+            conn,
+            ((record["product_id"], record["sold_at"]) for record in records),
+        ),
+    )
+
+
+async def write_observations(
+    observations: Sequence[PriceObservationCreate],
+) -> set[SaleKey]:
+    """Append observations on a primary connection in their own transaction."""
+    async with (
+        async_session_maker() as session,
+        driver_transaction(session) as conn,
+    ):
+        report = await append_observations(conn, observations)
+    await result_cache.invalidate_bulk(report.repriced)
+    return report.written
+
+
+Writer = Callable[[Sequence[PriceObservationCreate]], Awaitable[set[SaleKey]]]
+
+
+class PriceAppendBuffer:
+    """Coalesces concurrent appends into one write per batch.
+
+    A batch is written once it holds ``max_rows`` rows or its first rows have
+    waited ``max_delay`` seconds, whichever comes first. ``append`` returns
+    once the batch holding the caller's rows is committed, so buffering never
+    acknowledges rows that could still be lost.
+    """
+
+    def __init__(
+        self,
+        writer: Writer = write_observations,
+        max_rows: int = PRICE_APPEND_BATCH_ROWS,
+        max_delay: float = PRICE_APPEND_MAX_DELAY,
+    ):
+        self.writer = writer
+        self.max_rows = max_rows
+        self.max_delay = max_delay
+        self._pending: list[
+            tuple[Sequence[PriceObservationCreate], asyncio.Future[int]]
+        ] = []
+        self._pending_rows = 0
+        self._timer: asyncio.TimerHandle | None = None
+        self._writes: set[asyncio.Task[None]] = set()
+
+    async def append(self, observations: Sequence[PriceObservationCreate]) -> int:
+        """Queue observations for the next batch; return how many were new."""
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future[int] = loop.create_future()
+        self._pending.append((observations, future))
+        self._pending_rows += len(observations)
+        if self._pending_rows >= self.max_rows:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_delay, self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._pending:
+            return
+        batch, self._pending, self._pending_rows = self._pending, [], 0
+        task = asyncio.create_task(self._write(batch))
+        self._writes.add(task)
+        task.add_done_callback(self._writes.discard)
+
+    async def _write(
+        self,
+        batch: list[tuple[Sequence[PriceObservationCreate], asyncio.Future[int]]],
+    ) -> None:
+        try:
+            written = await self.writer(
+                [
+                    observation
+                    for observations, _ in batch
+                    for observation in observations
+                ],
+            )
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for observations, future in batch:
+            if not future.done():
+                keys = {observation.key for observation in observations}
+                future.set_result(len(keys & written))
+
+    async def close(self) -> None:
+        """Write anything still queued and wait for in-flight batches."""
+        self._flush()
+        if self._writes:
+            await asyncio.gather(*self._writes, return_exceptions=True)
+
+
+# Global append buffer
+price_buffer = PriceAppendBuffer()
@@ -0,0 +1,241 @@
+"""Sparse fieldsets for product read endpoints.
+
+``fields=`` picks the product columns a response carries and
+``include=aliases`` adds each product's aliases. A projection compiles to a
+column-only ``select()`` and a lean response model, so list views neither
+load nor serialize columns and aliases they don't show. Rows are encoded
+with the fast JSON path unless ``FAST_JSON_ENABLED`` is off, in which case
+they are validated through the response models.
+"""
+
+from collections.abc import Collection, Sequence
+from dataclasses import dataclass
+from functools import lru_cache
+from types import GenericAlias
+from typing import Any, TypeVar, cast
+from uuid import UUID
+
+from pydantic import BaseModel, TypeAdapter, create_model
+from sqlalchemy import Row, Select, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import InstrumentedAttribute
+
+from .models import Product, ProductAlias
+from .queries import row_mapping, uuid_in
+from .schemas.products import Product as ProductSchema
+from .schemas.products import ProductAlias as ProductAliasSchema
+from .serialization import FAST_JSON_ENABLED, RowEncoder, dumps, envelope_values
+
+PRODUCT_FIELDS = tuple(name for name in ProductSchema.model_fields if name != "aliases")
+ALIAS_FIELDS = tuple(ProductAliasSchema.model_fields)
+INCLUDES = frozenset({"aliases"})
+
+# Always selected: rows are matched to aliases by id, cursors need name
+KEY_FIELDS = ("id", "name")
+
+EnvelopeT = TypeVar("EnvelopeT", bound=BaseModel)
+
+
+@dataclass(frozen=True)
+class Projection:
+    """Which product fields and relations a read endpoint returns."""
+
+    fields: tuple[str, ...] = PRODUCT_FIELDS
+    aliases: bool = True
+
+    @classmethod
+    def parse(cls, fields: str | None, include: str | None) -> "Projection":
+        """Build a projection from ``fields`` and ``include`` query strings.
+
+        ``id`` is always returned. Without ``fields`` every column is; without
+        ``include``, aliases come along only when ``fields`` wasn't given
+        either, so existing clients see no change. Raises ``ValueError`` on
+        unknown names.
+        """
+        selected = PRODUCT_FIELDS
+        if fields is not None:
+            names = _split(fields)
+            unknown = sorted(set(names) - set(PRODUCT_FIELDS))
+            if unknown:
+                msg = f"Unknown fields: {', '.join(unknown)}"
+                raise ValueError(msg)
+            # Keep the schema's field order so equal sets share one model
+            selected = tuple(
+                name for name in PRODUCT_FIELDS if name in names or name == "id"
+            )
+
+        if include is None:
+            return cls(selected, aliases=fields is None)
+        relations = _split(include)
+        unknown = sorted(set(relations) - INCLUDES)
+        if unknown:
+            msg = f"Unknown includes: {', '.join(unknown)}"
+            raise ValueError(msg)
+        return cls(selected, aliases="aliases" in relations)
+
+    @property
+    def full(self) -> bool:
+        """Whether this is the default, complete product representation."""
+        return self.fields == PRODUCT_FIELDS and self.aliases
+
+    @property
+    def cache_key(self) -> str | None:
+        """Stable cache key component; ``None`` for the full projection."""
+        if self.full:
+            return None
+        return ",".join(self.fields) + ("+aliases" if self.aliases else "")
+
+    def columns(self) -> list[InstrumentedAttribute[Any]]:
+        """Product columns of the requested fields plus the key fields."""
+        names = dict.fromkeys([*KEY_FIELDS, *self.fields])
+        return [getattr(Product, name) for name in names]
+
+    def select(self) -> Select[Any]:
+        """Column-only select of the requested fields plus the key fields."""
+        return select(*self.columns())
+
+    @property
+    def model(self) -> type[BaseModel]:
+        """Response model for one product under this projection."""
+        return _product_model(self.fields, self.aliases)
+
+    def envelope(self, base: type[EnvelopeT]) -> type[EnvelopeT]:
+        """``base`` with its ``products`` list narrowed to the lean model."""
+        return cast("type[EnvelopeT]", _envelope_model(base, self.fields, self.aliases))
+
+    async def load(
+        self,
+        session: AsyncSession,
+        rows: Sequence[Row[Any]],
+        fast: bool = FAST_JSON_ENABLED,
+        aliases: dict[UUID, list[Row[Any]]] | None = None,
+    ) -> list[Any]:
+        """Turn selected rows into products, fetching aliases in one query.
+
+        Products are JSON-ready dicts on the fast path and response model
+        instances otherwise; either goes into ``model_construct`` envelopes
+        and out through ``dump``. Callers that already hold the alias rows
+        (from ``load_aliases``) pass them in to skip the query.
+        """
+        if aliases is None:
+            aliases = (
+                await load_aliases(session, [row.id for row in rows])
+                if self.aliases
+                else {}
+            )
+        if fast:
+            encode = _row_encoder(self.fields)
+            if not self.aliases:
+                return [encode(row_mapping(row)) for row in rows]
+            return [
+                {
+                    **encode(row_mapping(row)),
+                    "aliases": [
+                        _ALIAS_ENCODER(row_mapping(alias)) for alias in aliases[row.id]
+                    ],
+                }
+                for row in rows
+            ]
+
+        model = self.model
+        if not self.aliases:
+            return [model.model_validate(row_mapping(row)) for row in rows]
+        return [
+            model.model_validate({**row_mapping(row), "aliases": aliases[row.id]})
+            for row in rows
+        ]
+
+    def dump(self, envelope: BaseModel) -> bytes:
+        """Serialize an envelope built with ``model_construct`` around ``load``."""
+        values = envelope_values(envelope)
+        if _is_fast(values.get("products")):
+            return dumps(values)
+        return self.envelope(type(envelope))(**values).model_dump_json().encode()
+
+    def dump_product(self, product: Any) -> bytes:
+        """Serialize one product returned by ``load``."""
+        if isinstance(product, dict):
+            return dumps(product)
+        model: BaseModel = product
+        return model.model_dump_json().encode()
+
+    def dump_list(self, products: list[Any]) -> bytes:
+        """Serialize a bare list of products returned by ``load``."""
+        if _is_fast(products):
+            return dumps(products)
+        return _list_adapter(self.fields, self.aliases).dump_json(products)
+
+
+def _is_fast(products: Any) -> bool:
+    return bool(products) and isinstance(products[0], dict)
+
+
+def _split(value: str) -> list[str]:
+    return [name.strip() for name in value.split(",") if name.strip()]
+
+
+async def load_aliases(
+    session: AsyncSession,
+    product_ids: Collection[UUID],
+) -> dict[UUID, list[Row[Any]]]:
+    """Alias rows of many products with one ``product_id = ANY($1)`` query."""
+    aliases: dict[UUID, list[Row[Any]]] = {product_id: [] for product_id in product_ids}
+    if not aliases:
+        return aliases
+    result = await session.execute(
+        select(*(getattr(ProductAlias, name) for name in ALIAS_FIELDS))
+        .where(uuid_in(ProductAlias.product_id, list(aliases)))
+        .order_by(ProductAlias.product_id, ProductAlias.created_at),
+    )
+    for alias in result:
+        aliases[alias.product_id].append(alias)
+    return aliases
+
+
+@lru_cache(maxsize=256)
+def _product_model(fields: tuple[str, ...], aliases: bool) -> type[BaseModel]:
+    if fields == PRODUCT_FIELDS and aliases:
+        return ProductSchema
+    definitions: dict[str, Any] = {
+        name: (ProductSchema.model_fields[name].annotation, ...) for name in fields
+    }
+    if aliases:
+        definitions["aliases"] = (list[ProductAliasSchema], [])
+    return create_model(
+        "ProductFields",
+        __config__={"from_attributes": True},
+        **definitions,
+    )
+
+
+def _list_of(model: type[BaseModel]) -> Any:
+    """``list[model]`` for a model built at runtime, which mypy can't express."""
+    return GenericAlias(list, (model,))
+
+
+@lru_cache(maxsize=256)
+def _envelope_model(
+    base: type[BaseModel],
+    fields: tuple[str, ...],
+    aliases: bool,
+) -> type[BaseModel]:
+    if fields == PRODUCT_FIELDS and aliases:
+        return base
+    return create_model(
+        f"{base.__name__}Fields",
+        __base__=base,
+        products=(_list_of(_product_model(fields, aliases)), ...),
+    )
+
+
+@lru_cache(maxsize=256)
+def _list_adapter(fields: tuple[str, ...], aliases: bool) -> TypeAdapter[list[Any]]:
+    return TypeAdapter(_list_of(_product_model(fields, aliases)))
+
+
+_ALIAS_ENCODER = RowEncoder(ProductAliasSchema)
+
+
+@lru_cache(maxsize=256)
+def _row_encoder(fields: tuple[str, ...]) -> RowEncoder:
+    return RowEncoder(ProductSchema, fields)
@@ -0,0 +1,35 @@
+"""Reusable SQL expression helpers for Cardfolio 2.0."""
+
+from collections.abc import Collection
+from typing import Any
+from uuid import UUID
+
+from sqlalchemy import ColumnElement, Row, RowMapping, any_, bindparam
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import QueryableAttribute
+
+
+def uuid_in(
+    column: QueryableAttribute[UUID],
+    values: Collection[UUID],
+) -> ColumnElement[bool]:
+    """``column = ANY($1)`` with the IDs sent as one array parameter.
+
+    Unlike ``in_()``, this keeps one bind parameter and one cached prepared
+    statement no matter how many IDs are passed.
+    """
+    ids = bindparam(
+        None,
+        list(values),
+        type_=postgresql.ARRAY(postgresql.UUID(as_uuid=True)),
+    )
+    return column == any_(ids)
+
+
+def row_mapping(row: Row[Any]) -> RowMapping:
+    """A row's columns by name.
+
+    ``Row._mapping`` is SQLAlchemy's public mapping view; the underscore only
+    keeps it clear of column names.
+    """
+    return row._mapping  # noqa: SLF001
@@ -0,0 +1,378 @@
+"""Query-result cache for product read endpoints.
+
+Serialized JSON responses are cached under a key derived from the endpoint's
+normalized parameters. Every entry is tagged with the products it contains,
+and listing entries (search and list) also carry a *scope* tag describing
+their query and filters. A product write invalidates its own tag plus every
+scope whose query and filters the old or new version of the product could
+match, so unrelated cached pages survive the write.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import time
+from abc import ABC, abstractmethod
+from collections.abc import Collection, Iterable
+from dataclasses import dataclass
+from typing import Any
+from uuid import UUID
+
+from redis import asyncio as redis_asyncio
+from redis.exceptions import RedisError
+
+from .cache import CacheStats, TTLCache
+from .search_index import normalize, tokenize
+
+logger = logging.getLogger(__name__)
+
+SCOPE_PREFIX = "scope:"
+FILTER_FIELDS = ("game", "category", "set_name")
+TEXT_PARAMS = frozenset({"q", *FILTER_FIELDS})
+# Tokens sharing this many leading characters may stem alike
+STEM_PREFIX = 4
+
+
+class CacheBackend(ABC):
+    """Abstract base class for result cache backends."""
+
+    @abstractmethod
+    async def get(self, key: str) -> bytes | None:
+        """Return the cached payload for a key, if present."""
+
+    @abstractmethod
+    async def set(self, key: str, value: bytes, tags: Collection[str]) -> None:
+        """Store a payload and associate it with invalidation tags."""
+
+    @abstractmethod
+    async def invalidate(self, tags: Collection[str]) -> int:
+        """Drop every entry carrying any of the tags; return how many."""
+
+    @abstractmethod
+    async def scopes(self) -> list[str]:
+        """Return the scope tags that currently have entries."""
+
+    @abstractmethod
+    async def stats(self) -> dict[str, int]:
+        """Return hit, miss, eviction and size counters."""
+
+
+class MemoryCacheBackend(CacheBackend):
+    """In-process LRU cache with TTL and a bound on the number of entries."""
+
+    def __init__(self, max_entries: int = 10_000, ttl: float = 60):
+        self._entries: TTLCache[str, bytes] = TTLCache(
+            maxsize=max_entries,
+            ttl=ttl,
+            on_evict=self._forget,
+        )
+        self._tags: dict[str, set[str]] = {}
+        self._key_tags: dict[str, Collection[str]] = {}
+
+    async def get(self, key: str) -> bytes | None:
+        """Return the cached payload for a key, if present."""
+        return self._entries.get(key)
+
+    async def set(self, key: str, value: bytes, tags: Collection[str]) -> None:
+        """Store a payload and associate it with invalidation tags."""
+        self._forget(key)
+        self._key_tags[key] = tags
+        for tag in tags:
+            self._tags.setdefault(tag, set()).add(key)
+        self._entries.set(key, value)
+
+    async def invalidate(self, tags: Collection[str]) -> int:
+        """Drop every entry carrying any of the tags; return how many."""
+        keys = set().union(*(self._tags.get(tag, ()) for tag in tags))
+        for key in keys:
+            self._entries.pop(key)
+            self._forget(key)
+        return len(keys)
+
+    async def scopes(self) -> list[str]:
+        """Return the scope tags that currently have entries."""
+        return [tag for tag in self._tags if tag.startswith(SCOPE_PREFIX)]
+
+    async def stats(self) -> dict[str, int]:
+        """Return hit, miss, eviction and size counters."""
+        return {**self._entries.stats.as_dict(), "entries": len(self._entries)}
+
+    def _forget(self, key: str) -> None:
+        for tag in self._key_tags.pop(key, ()):
+            keys = self._tags.get(tag)
+            if keys is None:
+                continue
+            keys.discard(key)
+            if not keys:
+                del self._tags[tag]
+
+
+def _text(reply: Any) -> str:
+    """A Redis reply as text; the client returns bytes unless told otherwise."""
+    return reply.decode() if isinstance(reply, bytes) else str(reply)
+
+
+class RedisCacheBackend(CacheBackend):
+    """Redis-compatible backend, shared by every worker that points at it.
+
+    Scope tags live in a sorted set scored by when their newest entry
+    expires, so scopes whose entries have all expired are skipped and then
+    trimmed on the next write. Redis errors are logged and treated as
+    misses, so an outage falls through to the database.
+    """
+
+    def __init__(self, url: str, ttl: float = 60, namespace: str = "cardfolio"):
+        self.client = redis_asyncio.from_url(url)
+        self.ttl = int(ttl)
+        self.namespace = namespace
+        self._stats = CacheStats()
+
+    def _key(self, name: str) -> str:
+        return f"{self.namespace}:{name}"
+
+    async def get(self, key: str) -> bytes | None:
+        """Return the cached payload for a key, if present."""
+        try:
+            value = await self.client.get(self._key(key))
+        except RedisError as e:
+            logger.warning("Result cache read failed: %s", e)
+            value = None
+        if isinstance(value, str):
+            value = value.encode()
+        if value is None:
+            self._stats.misses += 1
+        else:
+            self._stats.hits += 1
+        return value
+
+    async def set(self, key: str, value: bytes, tags: Collection[str]) -> None:
+        """Store a payload and associate it with invalidation tags."""
+        now = time.time()
+        scopes = {tag: now + self.ttl for tag in tags if tag.startswith(SCOPE_PREFIX)}
+        try:
+            async with self.client.pipeline(transaction=False) as pipe:
+                pipe.set(self._key(key), value, ex=self.ttl)
+                for tag in tags:
+                    pipe.sadd(self._key(f"tag:{tag}"), key)
+                    # Tag sets outlive their entries a little, never indefinitely
+                    pipe.expire(self._key(f"tag:{tag}"), self.ttl * 2)
+                if scopes:
+                    pipe.zadd(self._key("scopes"), scopes)
+                pipe.zremrangebyscore(self._key("scopes"), "-inf", now)
+                await pipe.execute()
+        except RedisError as e:
+            logger.warning("Result cache write failed: %s", e)
+
+    async def invalidate(self, tags: Collection[str]) -> int:
+        """Drop every entry carrying any of the tags; return how many."""
+        tag_keys = [self._key(f"tag:{tag}") for tag in tags]
+        if not tag_keys:
+            return 0
+        try:
+            members = await self.client.sunion(tag_keys)
+            keys = [self._key(_text(member)) for member in members]
+            async with self.client.pipeline(transaction=False) as pipe:
+                if keys:
+                    pipe.delete(*keys)
+                pipe.delete(*tag_keys)
+                scope_tags = [tag for tag in tags if tag.startswith(SCOPE_PREFIX)]
+                if scope_tags:
+                    pipe.zrem(self._key("scopes"), *scope_tags)
+                await pipe.execute()
+        except RedisError as e:
+            # Entries still expire with their TTL
+            logger.warning("Result cache invalidation failed: %s", e)
+            return 0
+        return len(keys)
+
+    async def scopes(self) -> list[str]:
+        """Return the scope tags that currently have entries."""
+        try:
+            members = await self.client.zrangebyscore(
+                self._key("scopes"),
+                time.time(),
+                "+inf",
+            )
+        except RedisError as e:
+            logger.warning("Result cache scope lookup failed: %s", e)
+            return []
+        return [_text(member) for member in members]
+
+    async def stats(self) -> dict[str, int]:
+        """Return hit, miss, eviction and size counters."""
+        try:
+            info = await self.client.info("stats")
+        except RedisError as e:
+            logger.warning("Result cache stats failed: %s", e)
+            info = {}
+        return {
+            **self._stats.as_dict(),
+            "evictions": int(info.get("evicted_keys", 0)),
+        }
+
+
+@dataclass(frozen=True)
+class ProductScope:
+    """The parts of a product that decide which listings it can appear in."""
+
+    id: UUID
+    game: str
+    category: str
+    set_name: str | None
+    tokens: frozenset[str]
+
+    @classmethod
+    def of(cls, product: Any, aliases: Iterable[str] = ()) -> "ProductScope":
+        """Capture a product's scope before or after a write."""
+        texts = [product.name, product.set_name, product.variant, *aliases]
+        return cls(
+            id=product.id,
+            game=product.game,
+            category=product.category,
+            set_name=product.set_name,
+            tokens=frozenset(token for text in texts for token in tokenize(text)),
+        )
+
+
+def _related(query_token: str, token: str) -> bool:
+    """Loose token match that over- rather than under-approximates stemming."""
+    if query_token.startswith(token) or token.startswith(query_token):
+        return True
+    return (
+        len(query_token) >= STEM_PREFIX
+        and query_token[:STEM_PREFIX] == token[:STEM_PREFIX]
+    )
+
+
+def scope_matches(scope: dict[str, Any], product: ProductScope) -> bool:
+    """Whether a product could appear in listings described by ``scope``."""
+    for field in FILTER_FIELDS:
+        needle = normalize(scope.get(field))
+        if needle and needle not in normalize(getattr(product, field)):
+            return False
+    if scope.get("fuzzy"):
+        # Trigram matches can't be predicted from tokens; filters decide
+        return True
+    query_tokens = tokenize(scope.get("q"))
+    return all(
+        any(_related(query_token, token) for token in product.tokens)
+        for query_token in query_tokens
+    )
+
+
+class ResultCache:
+    """Front-end over a cache backend used by the product routers."""
+
+    def __init__(self, backend: CacheBackend | None):
+        self.backend = backend
+
+    @property
+    def enabled(self) -> bool:
+        """Whether a backend is configured."""
+        return self.backend is not None
+
+    @staticmethod
+    def key(endpoint: str, **params: Any) -> str:
+        """Build a cache key from an endpoint name and normalized parameters."""
+        normalized = {
+            name: (" ".join(value.casefold().split()) if name in TEXT_PARAMS else value)
+            for name, value in sorted(params.items())
+            if value is not None
+        }
+        digest = hashlib.sha256(
+            json.dumps(normalized, default=str, separators=(",", ":")).encode(),
+        ).hexdigest()
+        return f"{endpoint}:{digest}"
+
+    @staticmethod
+    def scope(kind: str, **params: str | None) -> str:
+        """Scope tag for a listing, from its query and filter parameters."""
+        normalized = {
+            name: " ".join(value.casefold().split())
+            for name, value in sorted(params.items())
+            if value
+        }
+        return SCOPE_PREFIX + json.dumps(
+            {"kind": kind, **normalized},
+            separators=(",", ":"),
+        )
+
+    async def get(self, key: str) -> bytes | None:
+        """Return a cached payload, or ``None`` on a miss or when disabled."""
+        if self.backend is None:
+            return None
+        return await self.backend.get(key)
+
+    async def set(
+        self,
+        key: str,
+        payload: bytes,
+        product_ids: Iterable[UUID],
+        scope: str | None = None,
+    ) -> None:
+        """Cache a payload tagged with its products and listing scope."""
+        if self.backend is None:
+            return
+        tags = {f"product:{product_id}" for product_id in product_ids}
+        if scope is not None:
+            tags.add(scope)
+        await self.backend.set(key, payload, tags)
+
+    async def invalidate_product(
+        self,
+        before: ProductScope | None,
+        after: ProductScope | None,
+    ) -> int:
+        """Invalidate entries affected by a write that turned before into after."""
+        if self.backend is None:
+            return 0
+        versions = [version for version in (before, after) if version is not None]
+        tags = {f"product:{version.id}" for version in versions}
+        for scope in await self.backend.scopes():
+            descriptor = json.loads(scope.removeprefix(SCOPE_PREFIX))
+            if any(scope_matches(descriptor, version) for version in versions):
+                tags.add(scope)
+        return await self.backend.invalidate(tags)
+
+    async def invalidate_bulk(self, product_ids: Collection[UUID]) -> int:
+        """Invalidate after a bulk write: the products' entries and all listings.
+
+        Matching every scope against thousands of products costs more than
+        recomputing the listings, so bulk writes drop every scope.
+        """
+        if self.backend is None or not product_ids:
+            return 0
+        tags = {f"product:{product_id}" for product_id in product_ids}
+        tags.update(await self.backend.scopes())
+        return await self.backend.invalidate(tags)
+
+    async def stats(self) -> dict[str, int]:
+        """Backend counters, or an empty dict when caching is disabled."""
+        if self.backend is None:
+            return {}
+        return await self.backend.stats()
+
+
+def get_result_cache() -> ResultCache:
+    """Get the configured result cache."""
+    backend_type = os.getenv("RESULT_CACHE_BACKEND", "none")
+    ttl = float(os.getenv("RESULT_CACHE_TTL", "60"))
+
+    if backend_type == "redis":
+        url = os.getenv("RESULT_CACHE_URL")
+        if not url:
+            msg = "RESULT_CACHE_URL must be set for the Redis result cache"
+            raise ValueError(msg)
+        return ResultCache(RedisCacheBackend(url, ttl=ttl))
+
+    if backend_type == "memory":
+        max_entries = int(os.getenv("RESULT_CACHE_MAX_ENTRIES", "10000"))
+        return ResultCache(MemoryCacheBackend(max_entries=max_entries, ttl=ttl))
+
+    # default to no caching
+    return ResultCache(None)
+
+
+# Global result cache instance
+result_cache = get_result_cache()
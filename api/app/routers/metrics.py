@@ -0,0 +1,42 @@
+"""Operational metrics endpoints."""
+
+from typing import Any
+
+from fastapi import APIRouter
+
+from api.app.counting import count_cache
+from api.app.database import engine, replicas
+from api.app.pool_metrics import pool_stats
+from api.app.result_cache import result_cache
+
+router = APIRouter(prefix="/metrics", tags=["metrics"])
+
+
+@router.get("/cache")
+async def cache_metrics() -> dict[str, Any]:
+    """Hit, miss and eviction counters for the result and count caches."""
+    return {
+        "result_cache": {
+            "enabled": result_cache.enabled,
+            **await result_cache.stats(),
+        },
+        "count_cache": {
+            **count_cache.stats.as_dict(),
+            "entries": len(count_cache),
+        },
+    }
+
+
+@router.get("/pool")
+async def pool_metrics() -> dict[str, Any]:
+    """Connection pool occupancy, acquire times and statement cache hits."""
+    return {
+        "primary": pool_stats(engine),
+        "replicas": [
+            {
+                "url": replica.url.render_as_string(hide_password=True),
+                **pool_stats(replica),
+            }
+            for replica in replicas.engines
+        ],
+    }
@@ -0,0 +1,187 @@
+"""Portfolio API endpoints."""
+
+from datetime import timedelta
+from uuid import UUID
+
+from fastapi import (
+    APIRouter,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    status,
+)
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from api.app.collectr import import_jobs, spool
+from api.app.database import (
+    ReadSession,
+    WriteSession,
+    driver_transaction,
+)
+from api.app.models import Portfolio
+from api.app.portfolios import insert_holdings, valuation_cache, valuation_window
+from api.app.schemas.portfolios import (
+    VALUATION_MAX_YEARS,
+    HoldingsAdd,
+    HoldingsAddResult,
+    ImportJob,
+    PortfolioCreate,
+    PortfolioValuation,
+)
+from api.app.schemas.portfolios import Portfolio as PortfolioSchema
+from api.app.serialization import dumps
+
+router = APIRouter(prefix="/portfolios", tags=["portfolios"])
+
+
+async def _require_portfolio(session: AsyncSession, portfolio_id: UUID) -> Portfolio:
+    """The portfolio, or a 404."""
+    portfolio = await session.get(Portfolio, portfolio_id)
+    if portfolio is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Portfolio with ID {portfolio_id} not found",
+        )
+    return portfolio
+
+
+@router.post("/", response_model=PortfolioSchema, status_code=status.HTTP_201_CREATED)
+async def create_portfolio(
+    portfolio_data: PortfolioCreate,
+    session: WriteSession,
+) -> PortfolioSchema:
+    """Create an empty portfolio."""
+    result = await session.execute(
+        insert(Portfolio)
+        .values(**portfolio_data.model_dump())
+        .returning(Portfolio.id, Portfolio.name, Portfolio.created_at),
+    )
+    row = result.one()
+    await session.commit()
+    return PortfolioSchema.model_validate(row)
+
+
+@router.get("/{portfolio_id}", response_model=PortfolioSchema)
+async def get_portfolio(
+    portfolio_id: UUID,
+    session: ReadSession,
+) -> PortfolioSchema:
+    """Get a portfolio by ID."""
+    return PortfolioSchema.model_validate(
+        await _require_portfolio(session, portfolio_id),
+    )
+
+
+@router.post(
+    "/{portfolio_id}/holdings",
+    response_model=HoldingsAddResult,
+    status_code=status.HTTP_201_CREATED,
+)
+async def add_holdings(
+    portfolio_id: UUID,
+    batch: HoldingsAdd,
+    session: WriteSession,
+) -> HoldingsAddResult:
+    """Add acquisitions to a portfolio in one statement."""
+    await _require_portfolio(session, portfolio_id)
+    holdings = batch.holdings
+    try:
+        await insert_holdings(session, portfolio_id, holdings)
+        await session.commit()
+    except IntegrityError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Holdings reference unknown products: {e.orig}",
+        ) from e
+
+    valuation_cache.invalidate(portfolio_id)
+    return HoldingsAddResult(inserted=len(holdings))
+
+
+@router.get("/{portfolio_id}/valuation", response_model=PortfolioValuation)
+async def get_portfolio_valuation(
+    *,
+    portfolio_id: UUID,
+    years: int = Query(1, ge=1, le=VALUATION_MAX_YEARS, description="Window length"),
+    session: ReadSession,
+) -> Response:
+    """Daily value, cost, returns and drawdown up to today, plus totals.
+
+    Values use each product's daily median sale price, carried forward over
+    days without sales. Returns are time-weighted: adding cards is not a
+    gain. Repeat requests only revalue the days after the earliest price
+    that changed since the last one.
+    """
+    await _require_portfolio(session, portfolio_id)
+    start, days = valuation_window(years)
+    async with driver_transaction(session) as conn:
+        snapshot = await valuation_cache.valuation(conn, portfolio_id, start, days)
+
+    valuation = snapshot.valuation
+    series = [
+        {
+            "day": day,
+            "value": value,
+            "cost": cost,
+            "daily_return": daily_return,
+            "drawdown": drawdown,
+        }
+        for day, value, cost, daily_return, drawdown in zip(
+            valuation.dates(),
+            valuation.value.round(2).tolist(),
+            valuation.cost.round(2).tolist(),
+            valuation.returns.tolist(),
+            valuation.drawdown.tolist(),
+            strict=True,
+        )
+    ]
+    payload = {
+        "portfolio_id": portfolio_id,
+        "start": start,
+        "end": start + timedelta(days=days - 1),
+        "products": len(snapshot.product_ids),
+        **valuation.summary(),
+        "series": series,
+    }
+    return Response(content=dumps(payload), media_type="application/json")
+
+
+@router.post(
+    "/{portfolio_id}/imports/collectr",
+    response_model=ImportJob,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+async def import_collectr(
+    portfolio_id: UUID,
+    request: Request,
+    session: WriteSession,
+) -> ImportJob:
+    """Start importing a Collectr CSV export (the request body) as holdings.
+
+    The file is imported in the background; poll the returned job for
+    progress and for rows that matched no product or several.
+    """
+    await _require_portfolio(session, portfolio_id)
+    try:
+        file, size = await spool(request.stream())
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=str(e),
+        ) from e
+    return import_jobs.start(portfolio_id, file, size)
+
+
+@router.get("/{portfolio_id}/imports/{job_id}", response_model=ImportJob)
+async def get_import(portfolio_id: UUID, job_id: UUID) -> ImportJob:
+    """Progress of an import this process started; finished ones expire."""
+    job = import_jobs.get(job_id)
+    if job is None or job.portfolio_id != portfolio_id:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Import with ID {job_id} not found",
+        )
+    return job
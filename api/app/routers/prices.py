@@ -0,0 +1,189 @@
+"""Price observation API endpoints."""
+
+from datetime import UTC, datetime, timedelta
+from typing import Annotated, Any
+from uuid import UUID
+
+from fastapi import APIRouter, HTTPException, Query, Response, status
+from sqlalchemy import select, tuple_
+
+from api.app.candles import CandlePeriod
+from api.app.database import ReadSession
+from api.app.models import PriceCandle, PriceObservation
+from api.app.pagination import decode_cursor, encode_cursor
+from api.app.prices import price_buffer
+from api.app.queries import row_mapping
+from api.app.schemas.prices import (
+    Candle,
+    CandleSeries,
+    PriceAppend,
+    PriceAppendResult,
+    PriceHistory,
+)
+from api.app.schemas.prices import PriceObservation as PriceObservationSchema
+from api.app.serialization import RowEncoder, dumps, envelope_values
+
+router = APIRouter(tags=["prices"])
+
+PRICE_HISTORY_DEFAULT_DAYS = 365
+
+_encode_observation = RowEncoder(PriceObservationSchema)
+_encode_candle = RowEncoder(Candle)
+
+
+@router.post("/prices", response_model=PriceAppendResult)
+async def append_prices(batch: PriceAppend) -> PriceAppendResult:
+    """Append observed sales.
+
+    Requests are batched with concurrent ones into a single COPY and return
+    once their rows are committed. Sales already stored (same source,
+    listing and sale time) and sales older than the retention window are
+    skipped.
+    """
+    inserted = await price_buffer.append(batch.observations)
+    return PriceAppendResult(received=len(batch.observations), inserted=inserted)
+
+
+@router.get("/products/{product_id}/prices", response_model=PriceHistory)
+async def get_price_history(
+    *,
+    product_id: UUID,
+    start: Annotated[
+        datetime | None,
+        Query(description="Earliest sale time (default: a year before end)"),
+    ] = None,
+    end: Annotated[
+        datetime | None,
+        Query(description="Sale time cutoff (default: now)"),
+    ] = None,
+    source: str | None = Query(None, description="Only sales from this source"),
+    limit: int = Query(500, ge=1, le=5000, description="Sales per page"),
+    cursor: str | None = Query(None, description="Cursor from the previous page"),
+    session: ReadSession,
+) -> Response:
+    """A product's sales in ``[start, end)``, oldest first.
+
+    The sale-time bounds let the planner prune to the months in range, and
+    each month is read through its (product_id, sold_at) index.
+    """
+    end = _as_utc(end) if end is not None else datetime.now(UTC)
+    start = (
+        _as_utc(start)
+        if start is not None
+        else end - timedelta(days=PRICE_HISTORY_DEFAULT_DAYS)
+    )
+    if start >= end:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="start must be before end",
+        )
+
+    order = (
+        PriceObservation.sold_at,
+        PriceObservation.source,
+        PriceObservation.listing_id,
+    )
+    query = (
+        select(
+            *(getattr(PriceObservation, name) for name in _encode_observation.fields),
+        )
+        .where(
+            PriceObservation.product_id == product_id,
+            PriceObservation.sold_at >= start,
+            PriceObservation.sold_at < end,
+        )
+        .order_by(*order)
+        .limit(limit + 1)
+    )
+    if source is not None:
+        query = query.where(PriceObservation.source == source)
+    if cursor is not None:
+        try:
+            sold_at, after_source, after_listing = decode_cursor(cursor, 3)
+            after = (datetime.fromisoformat(sold_at), after_source, after_listing)
+        except (TypeError, ValueError) as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Malformed pagination cursor",
+            ) from e
+        query = query.where(tuple_(*order) > tuple_(*after))
+
+    result = await session.execute(query)
+    rows = result.all()
+    page = rows[:limit]
+    next_cursor = (
+        encode_cursor(
+            page[-1].sold_at.isoformat(),
+            page[-1].source,
+            page[-1].listing_id,
+        )
+        if len(rows) > limit
+        else None
+    )
+
+    # Encoded dicts stand in for the models; envelope_values passes them on
+    observations: list[Any] = [_encode_observation(row_mapping(row)) for row in page]
+    history = PriceHistory.model_construct(
+        product_id=product_id,
+        observations=observations,
+        next_cursor=next_cursor,
+    )
+    return Response(
+        content=dumps(envelope_values(history)),
+        media_type="application/json",
+    )
+
+
+@router.get("/products/{product_id}/candles", response_model=CandleSeries)
+async def get_candles(
+    *,
+    product_id: UUID,
+    period: Annotated[CandlePeriod, Query(description="Bucket size")] = "day",
+    start: Annotated[
+        datetime | None,
+        Query(
+            description="Earliest bucket start (default: the latest `limit` buckets)",
+        ),
+    ] = None,
+    end: Annotated[datetime | None, Query(description="Bucket start cutoff")] = None,
+    limit: int = Query(365, ge=1, le=5000, description="Maximum candles"),
+    session: ReadSession,
+) -> Response:
+    """Chart data: a product's candles, oldest first.
+
+    One range read of the candles' primary key; nothing is aggregated at
+    request time. Without ``start`` the most recent ``limit`` candles
+    before ``end`` are returned.
+    """
+    query = select(
+        *(getattr(PriceCandle, name) for name in _encode_candle.fields),
+    ).where(PriceCandle.product_id == product_id, PriceCandle.period == period)
+    if end is not None:
+        query = query.where(PriceCandle.bucket_start < _as_utc(end))
+    if start is not None:
+        query = query.where(PriceCandle.bucket_start >= _as_utc(start)).order_by(
+            PriceCandle.bucket_start,
+        )
+    else:
+        query = query.order_by(PriceCandle.bucket_start.desc())
+
+    result = await session.execute(query.limit(limit))
+    rows = list(result.all())
+    if start is None:
+        rows.reverse()
+
+    candles: list[Any] = [_encode_candle(row_mapping(row)) for row in rows]
+    series = CandleSeries.model_construct(
+        product_id=product_id,
+        period=period,
+        candles=candles,
+    )
+    return Response(
+        content=dumps(envelope_values(series)),
+        media_type="application/json",
+    )
+
+
+def _as_utc(value: datetime) -> datetime:
+    """Treat naive query times as UTC, like appended sale times."""
+    return value if value.tzinfo is not None else value.replace(tzinfo=UTC)
@@ -1,70 +1,307 @@
 """Product API endpoints."""
 
+import json
+from collections import Counter
+from collections.abc import AsyncIterator, Collection, Sequence
+from datetime import datetime
+from types import SimpleNamespace
+from typing import Annotated, Any, Literal
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy import func, or_, select
+from fastapi import (
+    APIRouter,
+    Depends,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    status,
+)
+from fastapi.responses import StreamingResponse
+from sqlalchemy import (
+    ColumnElement,
+    Executable,
+    Row,
+    Select,
+    and_,
+    delete,
+    func,
+    insert,
+    or_,
+    select,
+    tuple_,
+    union_all,
+    update,
+)
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
-from ..database import get_async_session
-from ..models import Product, ProductAlias
-from ..schemas.products import (
+from api.app.bulk_update import apply_patches
+from api.app.counting import CountMode, count_cache_key, count_search_total
+from api.app.database import (
+    ReadSession,
+    WriteSession,
+    driver_transaction,
+    get_read_session,
+)
+from api.app.export import (
+    MEDIA_TYPES,
+    ExportFormat,
+    export_query,
+    export_watermark,
+    stream_export,
+)
+from api.app.fuzzy import FUZZY_DEFAULT_THRESHOLD, FUZZY_MIN_HITS, fuzzy_product_ids
+from api.app.ingest import (
+    NotAnArrayError,
+    TooManyRowsError,
+    merge_products,
+    parse_json_array,
+    parse_ndjson,
+)
+from api.app.models import Product, ProductAlias
+from api.app.pagination import decode_cursor, encode_cursor
+from api.app.projection import Projection, load_aliases
+from api.app.queries import row_mapping, uuid_in
+from api.app.result_cache import ProductScope, result_cache
+from api.app.schemas.products import (
     Product as ProductSchema,
 )
-from ..schemas.products import (
+from api.app.schemas.products import (
+    ProductBatchRequest,
+    ProductBatchResult,
+    ProductBulkUpdate,
+    ProductBulkUpdateResult,
     ProductCreate,
+    ProductIngestResult,
+    ProductPage,
     ProductSearchResult,
+    ProductSuggestion,
     ProductUpdate,
 )
+from api.app.search_index import INDEXED_FIELDS, search_index
 
 router = APIRouter(prefix="/products", tags=["products"])
 
+SearchSort = Literal["relevance", "name"]
+
+# Writes respond with the full product, like GET /products/{id}
+WRITE_PROJECTION = Projection()
+
+# Columns ProductScope needs to invalidate listings a product leaves
+SCOPE_FIELDS = ("id", "name", "game", "category", "set_name", "variant")
+
+
+def get_projection(
+    fields: str | None = Query(
+        None,
+        description="Comma-separated product fields to return (id is always included)",
+    ),
+    include: str | None = Query(None, description="Related data to include: aliases"),
+) -> Projection:
+    """Parse ``fields`` and ``include`` into a projection."""
+    try:
+        return Projection.parse(fields, include)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        ) from e
+
+
+RequestedProjection = Annotated[Projection, Depends(get_projection)]
+
 
 @router.get("/search", response_model=ProductSearchResult)
 async def search_products(
+    *,
     q: str = Query(..., min_length=1, description="Search query"),
     game: str | None = Query(None, description="Filter by game"),
     category: str | None = Query(None, description="Filter by category"),
     set_name: str | None = Query(None, description="Filter by set name"),
     page: int = Query(1, ge=1, description="Page number"),
     per_page: int = Query(20, ge=1, le=100, description="Items per page"),
-    session: AsyncSession = Depends(get_async_session),
-) -> ProductSearchResult:
+    cursor: str | None = Query(
+        None,
+        description="Opaque cursor from a previous page (overrides page)",
+    ),
+    count: Annotated[
+        CountMode,
+        Query(description="How to compute total: exact, capped or estimate"),
+    ] = "capped",
+    sort: Annotated[
+        SearchSort,
+        Query(description="Order by relevance (ts_rank) or by name"),
+    ] = "relevance",
+    fuzzy: bool = Query(
+        True,
+        description="Fall back to trigram matching when few results match",
+    ),
+    similarity: float = Query(
+        FUZZY_DEFAULT_THRESHOLD,
+        ge=0.1,
+        le=1.0,
+        description="Minimum trigram similarity for fuzzy matches",
+    ),
+    projection: RequestedProjection,
+    session: ReadSession,
+) -> Response:
     """
     Search products with optimized performance (<10ms target).
 
-    Uses PostgreSQL full-text search with GIN indexes for fast results.
+    Uses PostgreSQL full-text search with GIN indexes for fast results, or
+    the in-memory search index when it is enabled. When the first page has
+    fewer than ``SEARCH_FUZZY_MIN_HITS`` results, trigram matches on names and
+    aliases are appended. ``fields`` and ``include`` trim each product to a
+    column-only projection. Serialized results are served from the result
+    cache when one is configured.
     """
-    # Calculate offset for pagination
-    offset = (page - 1) * per_page
+    cache_key = result_cache.key(
+        "search",
+        q=q,
+        game=game,
+        category=category,
+        set_name=set_name,
+        page=page,
+        per_page=per_page,
+        cursor=cursor,
+        count=count,
+        sort=sort,
+        fuzzy=fuzzy,
+        similarity=similarity,
+        index=search_index.ready,
+        fields=projection.cache_key,
+    )
+    cached = await result_cache.get(cache_key)
+    if cached is not None:
+        return _json_response(cached)
+
+    search = _search_with_index if search_index.ready else _search_with_sql
+    result = await search(
+        session,
+        q,
+        game=game,
+        category=category,
+        set_name=set_name,
+        page=page,
+        per_page=per_page,
+        cursor=cursor,
+        count=count,
+        sort=sort,
+        projection=projection,
+    )
 
-    # Build base query with full-text search
-    query = select(Product).options(selectinload(Product.aliases))
+    first_page = page == 1 and cursor is None
+    if fuzzy and first_page and len(result.products) < min(FUZZY_MIN_HITS, per_page):
+        result = await _append_fuzzy_matches(
+            session,
+            result,
+            q,
+            threshold=similarity,
+            game=game,
+            category=category,
+            set_name=set_name,
+            projection=projection,
+        )
+
+    payload = projection.dump(result)
+    await result_cache.set(
+        cache_key,
+        payload,
+        [product.id for product in result.products],
+        scope=result_cache.scope(
+            "search",
+            q=q,
+            game=game,
+            category=category,
+            set_name=set_name,
+            fuzzy="1" if result.fuzzy else None,
+        ),
+    )
+    return _json_response(payload)
+
+
+async def _append_fuzzy_matches(
+    session: AsyncSession,
+    result: ProductSearchResult,
+    q: str,
+    *,
+    threshold: float,
+    game: str | None,
+    category: str | None,
+    set_name: str | None,
+    projection: Projection,
+) -> ProductSearchResult:
+    """Fill a sparse first page with trigram matches not already present."""
+    seen = {product.id for product in result.products}
+    product_ids = [
+        product_id
+        for product_id in await fuzzy_product_ids(
+            session,
+            q,
+            threshold=threshold,
+            limit=result.per_page,
+            game=game,
+            category=category,
+            set_name=set_name,
+        )
+        if product_id not in seen
+    ][: result.per_page - len(result.products)]
+    if not product_ids:
+        return result
 
-    # Full-text search across product name, set_name, and variant
-    search_conditions = []
+    loaded = await session.execute(
+        projection.select().where(uuid_in(Product.id, product_ids)),
+    )
+    by_id = {row.id: row for row in loaded}
+    extra = await projection.load(
+        session,
+        [by_id[pid] for pid in product_ids if pid in by_id],
+    )
 
-    # Primary search on product fields
-    search_conditions.append(
-        func.to_tsvector(
-            "english",
-            func.coalesce(Product.name, "")
-            + " "
-            + func.coalesce(Product.set_name, "")
-            + " "
-            + func.coalesce(Product.variant, ""),
-        ).match(q),
+    return result.model_copy(
+        update={
+            "products": [*result.products, *extra],
+            "total": result.total + len(extra),
+            "fuzzy": True,
+        },
     )
 
-    # Search aliases with subquery for high performance
-    alias_subquery = select(ProductAlias.product_id).where(
-        func.to_tsvector("english", ProductAlias.alias).match(q),
+
+def _json_response(payload: bytes, status_code: int = status.HTTP_200_OK) -> Response:
+    """Wrap pre-serialized JSON in a response."""
+    return Response(
+        content=payload,
+        media_type="application/json",
+        status_code=status_code,
     )
-    search_conditions.append(Product.id.in_(alias_subquery))
 
-    # Combine search conditions with OR
-    query = query.where(or_(*search_conditions))
+
+async def _search_with_sql(
+    session: AsyncSession,
+    q: str,
+    *,
+    game: str | None,
+    category: str | None,
+    set_name: str | None,
+    page: int,
+    per_page: int,
+    cursor: str | None,
+    count: CountMode,
+    sort: SearchSort,
+    projection: Projection,
+) -> ProductSearchResult:
+    """Full-text search in PostgreSQL over products and their aliases.
+
+    Matches against the stored ``search_vector`` (name, set, variant and
+    weighted aliases) so the whole predicate is one GIN index lookup.
+    """
+    # Calculate offset for pagination
+    offset = (page - 1) * per_page
+
+    ts_query = func.plainto_tsquery("english", q)
+    query = projection.select().where(Product.search_vector.op("@@")(ts_query))
 
     # Apply filters
     if game:
@@ -74,151 +311,677 @@ async def search_products(
     if set_name:
         query = query.where(Product.set_name.ilike(f"%{set_name}%"))
 
-    # Count total results for pagination
-    count_query = select(func.count()).select_from(query.subquery())
-    total_result = await session.execute(count_query)
-    total = total_result.scalar() or 0
-
-    # Apply pagination and ordering
-    query = query.order_by(Product.name).offset(offset).limit(per_page)
+    # Count total results (possibly capped, estimated or cached)
+    total = await count_search_total(
+        session,
+        query.with_only_columns(Product.id),
+        count,
+        count_cache_key(count, q, game, category, set_name),
+    )
 
-    # Execute search query
-    result = await session.execute(query)
-    products = result.scalars().all()
+    # Apply pagination and ordering, fetching one extra row for has_next
+    if sort == "name":
+        query = _paginate(query, offset=offset, limit=per_page + 1, cursor=cursor)
+        result = await session.execute(query)
+        rows = list(result.all())
+    else:
+        rank = func.ts_rank(Product.search_vector, ts_query)
+        query = _paginate_by_rank(
+            query.add_columns(rank.label("rank")),
+            rank,
+            offset=offset,
+            limit=per_page + 1,
+            cursor=cursor,
+        )
+        result = await session.execute(query)
+        rows = list(result.all())
 
     # Calculate pagination info
-    has_next = offset + per_page < total
-    has_prev = page > 1
+    has_next = len(rows) > per_page
+    rows = rows[:per_page]
+    has_prev = page > 1 or cursor is not None
+
+    next_cursor = None
+    if has_next:
+        last = rows[-1]
+        next_cursor = (
+            _next_cursor(rows)
+            if sort == "name"
+            else encode_cursor(last.rank, last.name, last.id)
+        )
 
-    return ProductSearchResult(
-        products=products,
-        total=total,
+    return ProductSearchResult.model_construct(
+        products=await projection.load(session, rows),
+        total=total.total,
+        total_accuracy=total.accuracy,
         page=page,
         per_page=per_page,
         has_next=has_next,
         has_prev=has_prev,
+        next_cursor=next_cursor,
+    )
+
+
+def _paginate(
+    query: Select[Any],
+    *,
+    offset: int,
+    limit: int,
+    cursor: str | None,
+) -> Select[Any]:
+    """Order by ``(name, id)`` and page by keyset cursor or by offset."""
+    query = query.order_by(Product.name, Product.id).limit(limit)
+    if cursor is None:
+        return query.offset(offset)
+
+    try:
+        name, product_id = decode_cursor(cursor, 2)
+        after = tuple_(Product.name, Product.id) > tuple_(
+            str(name),
+            UUID(str(product_id)),
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        ) from e
+    return query.where(after)
+
+
+def _paginate_by_rank(
+    query: Select[Any],
+    rank: ColumnElement[float],
+    *,
+    offset: int,
+    limit: int,
+    cursor: str | None,
+) -> Select[Any]:
+    """Order by rank (best first), then ``(name, id)``; page by cursor or offset."""
+    query = query.order_by(rank.desc(), Product.name, Product.id).limit(limit)
+    if cursor is None:
+        return query.offset(offset)
+
+    try:
+        last_rank, name, product_id = decode_cursor(cursor, 3)
+        last_rank = float(last_rank)
+        after = or_(
+            rank < last_rank,
+            and_(
+                rank == last_rank,
+                tuple_(Product.name, Product.id)
+                > tuple_(str(name), UUID(str(product_id))),
+            ),
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        ) from e
+    return query.where(after)
+
+
+def _next_cursor(rows: Sequence[Row[Any]]) -> str | None:
+    """Cursor pointing just past the last product row of a page."""
+    if not rows:
+        return None
+    return encode_cursor(rows[-1].name, rows[-1].id)
+
+
+async def _search_with_index(
+    session: AsyncSession,
+    q: str,
+    *,
+    game: str | None,
+    category: str | None,
+    set_name: str | None,
+    page: int,
+    per_page: int,
+    cursor: str | None,
+    count: CountMode,  # noqa: ARG001
+    sort: SearchSort,  # noqa: ARG001
+    projection: Projection,
+) -> ProductSearchResult:
+    """Resolve matching IDs in memory, then load only that page by primary key.
+
+    The in-memory total is always exact and hits are always ordered by score,
+    so ``count`` and ``sort`` are accepted but unused.
+    """
+    offset = (page - 1) * per_page
+    after = None
+    if cursor is not None:
+        try:
+            score, name, product_id = decode_cursor(cursor, 3)
+            after = (float(score), str(name), str(product_id))
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e),
+            ) from e
+
+    hits = search_index.search(
+        q,
+        game=game,
+        category=category,
+        set_name=set_name,
+        offset=offset,
+        limit=per_page,
+        after=after,
+    )
+
+    rows: list[Row[Any]] = []
+    if hits.product_ids:
+        result = await session.execute(
+            projection.select().where(uuid_in(Product.id, hits.product_ids)),
+        )
+        by_id = {row.id: row for row in result}
+        rows = [by_id[pid] for pid in hits.product_ids if pid in by_id]
+
+    has_next = hits.has_more
+    return ProductSearchResult.model_construct(
+        products=await projection.load(session, rows),
+        total=hits.total,
+        page=page,
+        per_page=per_page,
+        has_next=has_next,
+        has_prev=page > 1 or cursor is not None,
+        next_cursor=(
+            encode_cursor(*hits.last_key) if has_next and hits.last_key else None
+        ),
+    )
+
+
+@router.get("/suggest", response_model=list[ProductSuggestion])
+async def suggest_products(
+    *,
+    q: str = Query(..., min_length=1, max_length=100, description="Typed prefix"),
+    limit: int = Query(10, ge=1, le=20, description="Maximum suggestions"),
+    session: ReadSession,
+) -> list[ProductSuggestion]:
+    """
+    Suggest products as the user types (<5ms target).
+
+    Served from the in-memory prefix structure when the search index is
+    enabled, otherwise from the ``text_pattern_ops`` prefix indexes.
+    Only the fields a dropdown needs are returned.
+    """
+    if search_index.ready:
+        return [
+            ProductSuggestion(
+                id=entry.id,
+                name=entry.name,
+                set_name=entry.set_name,
+                thumbnail_url=entry.image_url,
+            )
+            for entry in search_index.suggest(q, limit)
+        ]
+
+    prefix = q.strip().lower().replace("\\", "\\\\")
+    prefix = prefix.replace("%", "\\%").replace("_", "\\_") + "%"
+    name = func.lower(Product.name)
+    alias = func.lower(ProductAlias.alias)
+
+    # Each branch is a bounded range scan on its prefix index
+    matches = union_all(
+        select(Product.id.label("product_id"), name.label("phrase"))
+        .where(name.like(prefix, escape="\\"))
+        .limit(limit),
+        select(ProductAlias.product_id, alias.label("phrase"))
+        .where(alias.like(prefix, escape="\\"))
+        .limit(limit),
+    ).subquery()
+    best = func.min(matches.c.phrase)
+    query = (
+        select(Product.id, Product.name, Product.set_name, Product.image_url)
+        .join(matches, matches.c.product_id == Product.id)
+        .group_by(Product.id)
+        .order_by(best, Product.id)
+        .limit(limit)
+    )
+    result = await session.execute(query)
+    return [
+        ProductSuggestion(
+            id=row.id,
+            name=row.name,
+            set_name=row.set_name,
+            thumbnail_url=row.image_url,
+        )
+        for row in result
+    ]
+
+
+@router.get("/page", response_model=ProductPage)
+async def list_products_page(
+    *,
+    per_page: int = Query(20, ge=1, le=100, description="Items per page"),
+    cursor: str | None = Query(None, description="Opaque cursor from a previous page"),
+    game: str | None = Query(None, description="Filter by game"),
+    category: str | None = Query(None, description="Filter by category"),
+    projection: RequestedProjection,
+    session: ReadSession,
+) -> Response:
+    """List products by keyset cursor; every page costs the same to fetch."""
+    cache_key = result_cache.key(
+        "page",
+        per_page=per_page,
+        cursor=cursor,
+        game=game,
+        category=category,
+        fields=projection.cache_key,
+    )
+    cached = await result_cache.get(cache_key)
+    if cached is not None:
+        return _json_response(cached)
+
+    query = projection.select()
+
+    # Apply filters
+    if game:
+        query = query.where(Product.game.ilike(f"%{game}%"))
+    if category:
+        query = query.where(Product.category.ilike(f"%{category}%"))
+
+    # Fetch one extra row to learn whether another page exists
+    query = _paginate(query, offset=0, limit=per_page + 1, cursor=cursor)
+    result = await session.execute(query)
+    rows = list(result.all())
+
+    has_next = len(rows) > per_page
+    rows = rows[:per_page]
+
+    payload = projection.dump(
+        ProductPage.model_construct(
+            products=await projection.load(session, rows),
+            per_page=per_page,
+            next_cursor=_next_cursor(rows) if has_next else None,
+        ),
+    )
+    await result_cache.set(
+        cache_key,
+        payload,
+        [row.id for row in rows],
+        scope=result_cache.scope("list", game=game, category=category),
+    )
+    return _json_response(payload)
+
+
+@router.get("/export")
+async def export_products(
+    *,
+    request: Request,
+    export_format: Annotated[ExportFormat, Query(alias="format")] = "ndjson",
+    game: str | None = Query(None, description="Filter by game"),
+    category: str | None = Query(None, description="Filter by category"),
+    since: Annotated[
+        datetime | None,
+        Query(description="Only products updated at or after this time"),
+    ] = None,
+    fields: str | None = Query(
+        None,
+        description="Comma-separated product fields to export (id is always included)",
+    ),
+    include: str | None = Query(None, description="Related data to include: aliases"),
+    session: ReadSession,
+) -> StreamingResponse:
+    """Stream the catalog as NDJSON or CSV, oldest change first.
+
+    Rows are read through a server-side cursor and sent batch by batch, so
+    mirrors can take the whole catalog in one request instead of paging.
+    Aliases are only exported with ``include=aliases`` (a JSON array per
+    CSV cell). The ``X-Export-Watermark`` header is the ``since`` for the
+    next incremental sync; rows near it may be sent twice, never missed.
+    Deleted products are not reported.
+    """
+    try:
+        projection = Projection.parse(fields, include or "")
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        ) from e
+    query = export_query(projection, game=game, category=category, since=since)
+    watermark = await export_watermark(session)
+
+    async def body() -> AsyncIterator[bytes]:
+        # The request's session is closed before the body is sent
+        async for stream_session in get_read_session(request):
+            async for chunk in stream_export(
+                stream_session,
+                query,
+                projection,
+                export_format,
+            ):
+                yield chunk
+
+    return StreamingResponse(
+        body(),
+        media_type=MEDIA_TYPES[export_format],
+        headers={
+            "X-Export-Watermark": watermark.isoformat(),
+            "Content-Disposition": f'attachment; filename="products.{export_format}"',
+        },
     )
 
 
 @router.get("/{product_id}", response_model=ProductSchema)
 async def get_product(
     product_id: UUID,
-    session: AsyncSession = Depends(get_async_session),
-) -> ProductSchema:
+    projection: RequestedProjection,
+    session: ReadSession,
+) -> Response:
     """Get a specific product by ID."""
-    query = (
-        select(Product)
-        .options(selectinload(Product.aliases))
-        .where(Product.id == product_id)
+    cache_key = result_cache.key(
+        "product",
+        product_id=product_id,
+        fields=projection.cache_key,
     )
+    cached = await result_cache.get(cache_key)
+    if cached is not None:
+        return _json_response(cached)
+
+    query = projection.select().where(Product.id == product_id)
     result = await session.execute(query)
-    product = result.scalar_one_or_none()
+    row = result.one_or_none()
 
-    if not product:
+    if row is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Product with ID {product_id} not found",
         )
 
-    return product
+    (product,) = await projection.load(session, [row])
+    payload = projection.dump_product(product)
+    await result_cache.set(cache_key, payload, [row.id])
+    return _json_response(payload)
 
 
 @router.post("/", response_model=ProductSchema, status_code=status.HTTP_201_CREATED)
 async def create_product(
     product_data: ProductCreate,
-    session: AsyncSession = Depends(get_async_session),
-) -> ProductSchema:
-    """Create a new product."""
-    # Create product
-    product = Product(**product_data.model_dump())
-    session.add(product)
+    session: WriteSession,
+) -> Response:
+    """Create a new product with one ``INSERT ... RETURNING``."""
+    result = await session.execute(
+        insert(Product)
+        .values(**product_data.model_dump())
+        .returning(*WRITE_PROJECTION.columns()),
+    )
+    row = result.one()
     await session.commit()
-    await session.refresh(product)
 
-    # Load with aliases
-    query = (
-        select(Product)
-        .options(selectinload(Product.aliases))
-        .where(Product.id == product.id)
+    # A new product has no aliases yet
+    return await _written_product(
+        session,
+        row,
+        None,
+        aliases=[],
+        status_code=status.HTTP_201_CREATED,
     )
-    result = await session.execute(query)
-    product = result.scalar_one()
 
-    return product
+
+@router.post("/bulk", response_model=ProductIngestResult)
+async def bulk_ingest_products(
+    request: Request,
+    session: WriteSession,
+) -> ProductIngestResult:
+    """Upsert many products and their aliases in one COPY-backed merge.
+
+    Accepts a JSON array or, with ``Content-Type: application/x-ndjson``, one
+    product per line. Rows are matched on their natural key; invalid rows are
+    reported without failing the batch.
+    """
+    try:
+        if request.headers.get("content-type", "").startswith("application/x-ndjson"):
+            rows = await parse_ndjson(request.stream())
+        else:
+            rows = await parse_json_array(request.stream())
+    except json.JSONDecodeError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Malformed JSON body: {e.msg}",
+        ) from e
+    except UnicodeDecodeError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Body is not valid UTF-8",
+        ) from e
+    except NotAnArrayError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=str(e),
+        ) from e
+    except TooManyRowsError as e:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=str(e),
+        ) from e
+
+    async with driver_transaction(session) as connection:
+        report = await merge_products(connection, rows)
+
+    changed = report.changed_ids
+    await _reindex(session, changed)
+    await result_cache.invalidate_bulk(changed)
+
+    counts = Counter(outcome.status for outcome in report.outcomes)
+    return ProductIngestResult(
+        inserted=counts["inserted"],
+        updated=counts["updated"],
+        unchanged=counts["unchanged"],
+        duplicate=counts["duplicate"],
+        invalid=counts["invalid"],
+        aliases_written=report.aliases_written,
+        outcomes=report.outcomes,
+    )
+
+
+@router.patch("/bulk", response_model=ProductBulkUpdateResult)
+async def bulk_update_products(
+    batch: ProductBulkUpdate,
+    session: WriteSession,
+) -> ProductBulkUpdateResult:
+    """Apply many partial updates, e.g. a nightly repricing, in one statement.
+
+    Each entry carries a product ``id`` and the fields to change; fields left
+    out are untouched and later entries for the same product win. Unknown IDs
+    are listed under ``missing`` instead of failing the batch.
+    """
+    try:
+        report = await apply_patches(session, batch.products)
+        await session.commit()
+    except IntegrityError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Update violates a constraint: {e.orig}",
+        ) from e
+
+    if report.columns & INDEXED_FIELDS:
+        await _reindex(session, report.updated)
+    await result_cache.invalidate_bulk(report.updated)
+
+    return ProductBulkUpdateResult(
+        updated=report.updated,
+        unchanged=report.unchanged,
+        missing=report.missing,
+    )
+
+
+@router.post("/batch", response_model=ProductBatchResult)
+async def get_products_batch(
+    *,
+    batch: ProductBatchRequest,
+    fields: str | None = Query(
+        None,
+        description="Comma-separated product fields to return (id is always included)",
+    ),
+    session: ReadSession,
+) -> Response:
+    """Fetch many products by ID in one round trip.
+
+    IDs that don't exist are listed under ``missing`` instead of failing the
+    request. Products come back in request order, without duplicates.
+    Aliases, when requested, are loaded with one more ``ANY($1)`` query
+    rather than selectinload's chunked ``IN`` lists.
+    """
+    projection = get_projection(fields, "aliases" if batch.include_aliases else "")
+    ids = list(dict.fromkeys(batch.ids))
+    result = await session.execute(projection.select().where(uuid_in(Product.id, ids)))
+    found = {row.id: row for row in result}
+
+    batch_result = ProductBatchResult.model_construct(
+        products=await projection.load(
+            session,
+            [found[product_id] for product_id in ids if product_id in found],
+        ),
+        missing=[product_id for product_id in ids if product_id not in found],
+    )
+    return _json_response(projection.dump(batch_result))
 
 
 @router.put("/{product_id}", response_model=ProductSchema)
+@router.patch("/{product_id}", response_model=ProductSchema)
 async def update_product(
     product_id: UUID,
     product_data: ProductUpdate,
-    session: AsyncSession = Depends(get_async_session),
-) -> ProductSchema:
-    """Update an existing product."""
-    # Find product
-    query = select(Product).where(Product.id == product_id)
+    session: WriteSession,
+) -> Response:
+    """Update an existing product; only the fields sent are changed.
+
+    The row is locked, updated and returned, together with the values the
+    cache invalidation needs from before the write, by one statement.
+    """
+    update_data = product_data.model_dump(exclude_unset=True)
+    before = (
+        select(*(getattr(Product, name) for name in SCOPE_FIELDS))
+        .where(Product.id == product_id)
+        .with_for_update()
+        .cte("before")
+    )
+    query: Executable
+    if update_data:
+        query = (
+            update(Product)
+            .where(Product.id == before.c.id)
+            .values(**update_data)
+            .returning(
+                *WRITE_PROJECTION.columns(),
+                *(before.c[name].label(f"before_{name}") for name in SCOPE_FIELDS),
+            )
+            .execution_options(synchronize_session=False)
+        )
+    else:
+        query = select(
+            *WRITE_PROJECTION.columns(),
+            *(before.c[name].label(f"before_{name}") for name in SCOPE_FIELDS),
+        ).where(Product.id == before.c.id)
     result = await session.execute(query)
-    product = result.scalar_one_or_none()
+    row = result.one_or_none()
 
-    if not product:
+    if row is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Product with ID {product_id} not found",
         )
 
-    # Update product
-    update_data = product_data.model_dump(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(product, field, value)
-
+    aliases = (await load_aliases(session, [row.id]))[row.id]
     await session.commit()
-    await session.refresh(product)
 
-    # Load with aliases
-    query = (
-        select(Product)
-        .options(selectinload(Product.aliases))
-        .where(Product.id == product_id)
+    before_scope = ProductScope.of(
+        SimpleNamespace(
+            **{name: row_mapping(row)[f"before_{name}"] for name in SCOPE_FIELDS},
+        ),
     )
-    result = await session.execute(query)
-    product = result.scalar_one()
-
-    return product
+    return await _written_product(session, row, before_scope, aliases=aliases)
 
 
 @router.delete("/{product_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_product(
     product_id: UUID,
-    session: AsyncSession = Depends(get_async_session),
+    session: WriteSession,
 ) -> None:
-    """Delete a product."""
-    # Find product
-    query = select(Product).where(Product.id == product_id)
-    result = await session.execute(query)
-    product = result.scalar_one_or_none()
+    """Delete a product with one ``DELETE ... RETURNING``.
 
-    if not product:
+    Aliases go with it through the foreign key's ``ON DELETE CASCADE``.
+    """
+    result = await session.execute(
+        delete(Product)
+        .where(Product.id == product_id)
+        .returning(*(getattr(Product, name) for name in SCOPE_FIELDS))
+        .execution_options(synchronize_session=False),
+    )
+    row = result.one_or_none()
+
+    if row is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Product with ID {product_id} not found",
         )
-
-    # Delete product (aliases will be deleted automatically due to cascade)
-    await session.delete(product)
     await session.commit()
 
+    if search_index.ready:
+        search_index.discard(product_id)
+    await result_cache.invalidate_product(ProductScope.of(row), None)
+
+
+async def _written_product(
+    session: AsyncSession,
+    row: Row[Any],
+    before: ProductScope | None,
+    aliases: list[Row[Any]],
+    status_code: int = status.HTTP_200_OK,
+) -> Response:
+    """Reindex, invalidate and serialize a product returned by a write."""
+    if search_index.ready:
+        search_index.add(
+            row,
+            [(alias.alias, alias.search_weight or 1) for alias in aliases],
+        )
+    await result_cache.invalidate_product(
+        before,
+        ProductScope.of(row, [alias.alias for alias in aliases]),
+    )
+    (product,) = await WRITE_PROJECTION.load(session, [row], aliases={row.id: aliases})
+    return _json_response(WRITE_PROJECTION.dump_product(product), status_code)
+
+
+async def _reindex(session: AsyncSession, product_ids: Collection[UUID]) -> None:
+    """Refresh bulk-written products in the in-memory search index."""
+    if not product_ids or not search_index.ready:
+        return
+    result = await session.execute(
+        select(Product)
+        .options(selectinload(Product.aliases))
+        .where(uuid_in(Product.id, product_ids)),
+    )
+    for product in result.scalars():
+        search_index.add_product(product)
+
 
 @router.get("/", response_model=list[ProductSchema])
 async def list_products(
+    *,
     page: int = Query(1, ge=1, description="Page number"),
     per_page: int = Query(20, ge=1, le=100, description="Items per page"),
     game: str | None = Query(None, description="Filter by game"),
     category: str | None = Query(None, description="Filter by category"),
-    session: AsyncSession = Depends(get_async_session),
-) -> list[ProductSchema]:
+    projection: RequestedProjection,
+    session: ReadSession,
+) -> Response:
     """List products with pagination and filtering."""
+    cache_key = result_cache.key(
+        "list",
+        page=page,
+        per_page=per_page,
+        game=game,
+        category=category,
+        fields=projection.cache_key,
+    )
+    cached = await result_cache.get(cache_key)
+    if cached is not None:
+        return _json_response(cached)
+
     offset = (page - 1) * per_page
 
-    query = select(Product).options(selectinload(Product.aliases))
+    query = projection.select()
 
     # Apply filters
     if game:
@@ -227,9 +990,16 @@ async def list_products(
         query = query.where(Product.category.ilike(f"%{category}%"))
 
     # Apply pagination
-    query = query.order_by(Product.name).offset(offset).limit(per_page)
+    query = query.order_by(Product.name, Product.id).offset(offset).limit(per_page)
 
     result = await session.execute(query)
-    products = result.scalars().all()
-
-    return list(products)
+    rows = list(result.all())
+
+    payload = projection.dump_list(await projection.load(session, rows))
+    await result_cache.set(
+        cache_key,
+        payload,
+        [row.id for row in rows],
+        scope=result_cache.scope("list", game=game, category=category),
+    )
+    return _json_response(payload)
@@ -0,0 +1,131 @@
+"""Pydantic schemas for portfolios, holdings and valuations."""
+
+from datetime import UTC, date, datetime
+from decimal import Decimal
+from typing import Literal
+from uuid import UUID
+
+from pydantic import BaseModel, Field, field_validator
+
+PORTFOLIO_HOLDINGS_MAX_ROWS = 10000
+VALUATION_MAX_YEARS = 5
+
+
+class PortfolioCreate(BaseModel):
+    """Schema for creating a portfolio."""
+
+    name: str = Field(..., min_length=1, max_length=255)
+
+
+class Portfolio(PortfolioCreate):
+    """Schema for Portfolio response."""
+
+    id: UUID
+    created_at: datetime
+
+    class Config:
+        """Pydantic configuration."""
+
+        from_attributes = True
+
+
+class HoldingCreate(BaseModel):
+    """Schema for adding a quantity of a product to a portfolio."""
+
+    product_id: UUID
+    quantity: int = Field(..., gt=0)
+    cost_basis: Decimal = Field(
+        ...,
+        ge=0,
+        decimal_places=2,
+        description="Unit price paid",
+    )
+    acquired_at: datetime | None = Field(
+        None,
+        description="Acquisition time (default: now); naive values are UTC",
+    )
+
+    @field_validator("acquired_at")
+    @classmethod
+    def _acquired_at_is_utc(cls, value: datetime | None) -> datetime | None:
+        if value is not None and value.tzinfo is None:
+            value = value.replace(tzinfo=UTC)
+        return value
+
+
+class HoldingsAdd(BaseModel):
+    """Schema for adding a batch of holdings."""
+
+    holdings: list[HoldingCreate] = Field(
+        ...,
+        min_length=1,
+        max_length=PORTFOLIO_HOLDINGS_MAX_ROWS,
+    )
+
+
+class HoldingsAddResult(BaseModel):
+    """Schema for the result of adding holdings."""
+
+    inserted: int
+
+
+class ValuationPoint(BaseModel):
+    """Schema for a portfolio's value on one day."""
+
+    day: date
+    value: float
+    cost: float
+    daily_return: float
+    drawdown: float
+
+
+class PortfolioValuation(BaseModel):
+    """Schema for a portfolio's daily valuation over a window, oldest first."""
+
+    portfolio_id: UUID
+    start: date
+    end: date
+    products: int = Field(..., description="Distinct products held")
+    value: float
+    cost: float
+    profit: float
+    total_return: float = Field(..., description="Time-weighted, over the window")
+    volatility: float = Field(..., description="Annualized, of daily returns")
+    max_drawdown: float
+    series: list[ValuationPoint]
+
+
+ImportStatus = Literal["queued", "running", "succeeded", "failed"]
+
+
+class ImportIssue(BaseModel):
+    """Schema for an imported row that did not become a holding."""
+
+    line: int = Field(..., description="Line number in the uploaded file")
+    status: Literal["ambiguous", "unmatched", "invalid"]
+    name: str | None = None
+    detail: str
+    candidates: list[UUID] = Field(
+        default_factory=list,
+        description="Products an ambiguous row could be",
+    )
+
+
+class ImportJob(BaseModel):
+    """Schema for a CSV import's progress and outcome."""
+
+    id: UUID
+    portfolio_id: UUID
+    status: ImportStatus
+    bytes_total: int
+    bytes_read: int = 0
+    rows: int = 0
+    matched: int = 0
+    ambiguous: int = 0
+    unmatched: int = 0
+    invalid: int = 0
+    issues: list[ImportIssue] = Field(
+        default_factory=list,
+        description="Rows not imported (capped)",
+    )
+    error: str | None = Field(default=None, description="Why a failed import stopped")
@@ -0,0 +1,103 @@
+"""Pydantic schemas for price observations."""
+
+from datetime import UTC, datetime, timedelta
+from decimal import Decimal
+from uuid import UUID
+
+from pydantic import BaseModel, Field, field_validator
+
+PRICE_APPEND_MAX_ROWS = 10000
+
+# Clock skew allowance for sources that report sale times ahead of ours
+SOLD_AT_MAX_SKEW = timedelta(days=1)
+
+
+class PriceObservationCreate(BaseModel):
+    """Schema for appending one observed sale."""
+
+    product_id: UUID
+    source: str = Field(..., min_length=1, max_length=50, description="e.g. ebay")
+    listing_id: str = Field(
+        ...,
+        min_length=1,
+        max_length=100,
+        description="Source's ID for the sale",
+    )
+    sold_at: datetime = Field(..., description="Sale time; naive values are UTC")
+    price: Decimal = Field(..., ge=0, decimal_places=2)
+    currency: str = Field("USD", min_length=3, max_length=3)
+    condition: str | None = Field(None, max_length=50)
+
+    @field_validator("sold_at")
+    @classmethod
+    def _sold_at_is_past_utc(cls, value: datetime) -> datetime:
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=UTC)
+        if value > datetime.now(UTC) + SOLD_AT_MAX_SKEW:
+            msg = "sold_at is in the future"
+            raise ValueError(msg)
+        return value
+
+    @property
+    def key(self) -> tuple[str, str, datetime]:
+        """The sale's identity: (source, listing_id, sold_at)."""
+        return (self.source, self.listing_id, self.sold_at)
+
+
+class PriceObservation(BaseModel):
+    """Schema for an observed sale in a price history."""
+
+    sold_at: datetime
+    price: Decimal
+    currency: str
+    condition: str | None = None
+    source: str
+    listing_id: str
+
+
+class PriceAppend(BaseModel):
+    """Schema for appending a batch of observed sales."""
+
+    observations: list[PriceObservationCreate] = Field(
+        ...,
+        min_length=1,
+        max_length=PRICE_APPEND_MAX_ROWS,
+    )
+
+
+class PriceAppendResult(BaseModel):
+    """Schema for append results; duplicates and expired sales are skipped."""
+
+    received: int
+    inserted: int
+
+
+class PriceHistory(BaseModel):
+    """Schema for one page of a product's price history, oldest first."""
+
+    product_id: UUID
+    observations: list[PriceObservation]
+    next_cursor: str | None = Field(
+        None,
+        description="Pass as ``cursor`` for the next page; null on the last",
+    )
+
+
+class Candle(BaseModel):
+    """Schema for one time bucket of a product's sales."""
+
+    bucket_start: datetime
+    open: Decimal
+    high: Decimal
+    low: Decimal
+    close: Decimal
+    volume: int
+    median_price: Decimal
+
+
+class CandleSeries(BaseModel):
+    """Schema for a product's candles of one period, oldest first."""
+
+    product_id: UUID
+    period: str
+    candles: list[Candle]
@@ -2,6 +2,7 @@
 
 from datetime import datetime
 from decimal import Decimal
+from typing import Literal
 from uuid import UUID
 
 from pydantic import BaseModel, Field
@@ -11,7 +12,10 @@ class ProductAliasBase(BaseModel):
     """Base schema for ProductAlias."""
 
     alias: str = Field(
-        ..., min_length=1, max_length=255, description="Alternative name or search term"
+        ...,
+        min_length=1,
+        max_length=255,
+        description="Alternative name or search term",
     )
     alias_type: str = Field(
         ...,
@@ -20,7 +24,10 @@ class ProductAliasBase(BaseModel):
         description="Type of alias (name, abbreviation, etc.)",
     )
     search_weight: int = Field(
-        default=1, ge=1, le=10, description="Search relevance weight (1-10)"
+        default=1,
+        ge=1,
+        le=10,
+        description="Search relevance weight (1-10)",
     )
 
 
@@ -55,31 +62,49 @@ class ProductBase(BaseModel):
     name: str = Field(..., min_length=1, max_length=255, description="Product name")
     game: str = Field(..., min_length=1, max_length=100, description="Game/franchise")
     set_name: str | None = Field(
-        None, max_length=255, description="Set or collection name"
+        None,
+        max_length=255,
+        description="Set or collection name",
     )
     card_number: str | None = Field(None, max_length=50, description="Card number")
     rarity: str | None = Field(None, max_length=50, description="Rarity level")
     condition: str = Field(default="NM", max_length=50, description="Card condition")
     variant: str | None = Field(
-        None, max_length=100, description="Variant (Holo, 1st Edition, etc.)"
+        None,
+        max_length=100,
+        description="Variant (Holo, 1st Edition, etc.)",
     )
     category: str = Field(
-        ..., min_length=1, max_length=100, description="Product category"
+        ...,
+        min_length=1,
+        max_length=100,
+        description="Product category",
     )
     subcategory: str | None = Field(
-        None, max_length=100, description="Product subcategory"
+        None,
+        max_length=100,
+        description="Product subcategory",
     )
     release_date: datetime | None = Field(None, description="Release date")
     image_url: str | None = Field(None, description="Image URL")
     description: str | None = Field(None, description="Product description")
     market_price: Decimal | None = Field(
-        None, ge=0, decimal_places=2, description="Current market price"
+        None,
+        ge=0,
+        decimal_places=2,
+        description="Current market price",
     )
     low_price: Decimal | None = Field(
-        None, ge=0, decimal_places=2, description="Historical low price"
+        None,
+        ge=0,
+        decimal_places=2,
+        description="Historical low price",
     )
     high_price: Decimal | None = Field(
-        None, ge=0, decimal_places=2, description="Historical high price"
+        None,
+        ge=0,
+        decimal_places=2,
+        description="Historical high price",
     )
 
 
@@ -126,10 +151,116 @@ class ProductSearchResult(BaseModel):
 
     products: list[Product]
     total: int
+    total_accuracy: Literal["exact", "lower_bound", "estimate"] = Field(
+        "exact",
+        description="Whether total is exact, a lower bound (capped) or an estimate",
+    )
     page: int
     per_page: int
     has_next: bool
     has_prev: bool
+    next_cursor: str | None = Field(
+        None,
+        description="Opaque cursor for the next page, if there is one",
+    )
+    fuzzy: bool = Field(
+        False,
+        description="Whether trigram fuzzy matches were appended",
+    )
+
+
+class ProductPage(BaseModel):
+    """Schema for a cursor-paginated page of products."""
+
+    products: list[Product]
+    per_page: int
+    next_cursor: str | None = Field(
+        None,
+        description="Opaque cursor for the next page, if there is one",
+    )
+
+
+class ProductSuggestion(BaseModel):
+    """Schema for a typeahead suggestion."""
+
+    id: UUID
+    name: str
+    set_name: str | None = None
+    thumbnail_url: str | None = None
+
+
+class ProductIngest(ProductCreate):
+    """Schema for one bulk-ingested product with its aliases."""
+
+    aliases: list[ProductAliasCreate] = Field(default_factory=list)
+
+
+IngestStatus = Literal["inserted", "updated", "unchanged", "duplicate", "invalid"]
+
+
+class ProductIngestOutcome(BaseModel):
+    """Schema for the outcome of one bulk-ingested row."""
+
+    row: int = Field(..., description="Zero-based position in the request")
+    status: IngestStatus
+    id: UUID | None = None
+    error: str | None = None
+
+
+class ProductIngestResult(BaseModel):
+    """Schema for bulk ingest results."""
+
+    inserted: int
+    updated: int
+    unchanged: int
+    duplicate: int
+    invalid: int
+    aliases_written: int
+    outcomes: list[ProductIngestOutcome]
+
+
+PRODUCT_BATCH_MAX_IDS = 5000
+
+
+class ProductBatchRequest(BaseModel):
+    """Schema for fetching many products by ID."""
+
+    ids: list[UUID] = Field(..., min_length=1, max_length=PRODUCT_BATCH_MAX_IDS)
+    include_aliases: bool = Field(True, description="Load each product's aliases")
+
+
+class ProductBatchResult(BaseModel):
+    """Schema for a batch fetch: found products in request order, plus misses."""
+
+    products: list[Product]
+    missing: list[UUID]
+
+
+PRODUCT_BULK_UPDATE_MAX_ROWS = 10000
+
+
+class ProductPatch(ProductUpdate):
+    """Schema for one product's partial update within a bulk update."""
+
+    id: UUID
+
+
+class ProductBulkUpdate(BaseModel):
+    """Schema for applying many partial product updates at once."""
+
+    products: list[ProductPatch] = Field(
+        ...,
+        min_length=1,
+        max_length=PRODUCT_BULK_UPDATE_MAX_ROWS,
+    )
+
+
+class ProductBulkUpdateResult(BaseModel):
+    """Schema for bulk update results, by product ID."""
+
+    updated: list[UUID]
+    unchanged: list[UUID]
+    missing: list[UUID]
 
 
 class ProductSearchQuery(BaseModel):
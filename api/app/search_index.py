@@ -0,0 +1,383 @@
+"""In-memory product search index for Cardfolio 2.0.
+
+The index mirrors the searchable parts of ``products`` and ``product_aliases``
+inside the API process so alias and name lookups can be answered without a
+database round trip. It is optional (``SEARCH_INDEX_ENABLED``), built once at
+startup and kept current by the product write endpoints. Each worker process
+holds its own copy.
+"""
+
+import heapq
+import os
+import re
+import unicodedata
+from bisect import bisect_left, bisect_right
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from typing import Any
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .models import Product, ProductAlias
+
+SEARCH_INDEX_ENABLED = os.getenv("SEARCH_INDEX_ENABLED", "false").lower() in {
+    "1",
+    "true",
+    "yes",
+}
+
+# Token weights; alias tokens use their own ``search_weight`` (1-10)
+NAME_WEIGHT = 10
+FIELD_WEIGHT = 2
+PREFIX_FACTOR = 0.5
+MIN_PREFIX_LENGTH = 2
+MAX_PREFIX_LENGTH = 16
+
+STOPWORDS = frozenset({"a", "an", "and", "of", "the", "to", "in", "on", "for"})
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def normalize(text: str | None) -> str:
+    """Casefold text and strip accents (``Pokémon`` -> ``pokemon``)."""
+    if not text:
+        return ""
+    decomposed = unicodedata.normalize("NFKD", text.casefold())
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+
+def tokenize(text: str | None) -> list[str]:
+    """Split text into normalized search tokens, dropping stopwords."""
+    return [
+        token for token in _TOKEN_RE.findall(normalize(text)) if token not in STOPWORDS
+    ]
+
+
+def suggest_phrases(name: str, aliases: Iterable[str] = ()) -> tuple[str, ...]:
+    """Typeahead phrases for a product.
+
+    Every name suffix starting at a word boundary (so "lot" finds
+    "Black Lotus") plus each full alias.
+    """
+    tokens = tokenize(name)
+    phrases = {" ".join(tokens[start:]) for start in range(len(tokens))}
+    phrases.update(" ".join(tokenize(alias)) for alias in aliases)
+    phrases.discard("")
+    return tuple(sorted(phrases))
+
+
+# Product columns the index holds; writes that touch none can skip reindexing
+INDEXED_FIELDS = frozenset(
+    {"name", "game", "category", "set_name", "variant", "image_url"},
+)
+
+
+@dataclass
+class IndexedProduct:
+    """Searchable projection of a product held by the index."""
+
+    id: UUID
+    name: str
+    game: str
+    category: str
+    set_name: str | None
+    variant: str | None
+    image_url: str | None = None
+    weights: dict[str, int] = field(default_factory=dict)
+    phrases: tuple[str, ...] = ()
+
+    @property
+    def sort_key(self) -> tuple[str, str]:
+        """Tie-breaking order, matching the SQL ``ORDER BY name, id``."""
+        return (self.name, str(self.id))
+
+
+@dataclass
+class IndexSearchResult:
+    """Ordered product IDs for one page plus the total match count.
+
+    ``last_key`` is the sort key of the final hit, for use as a cursor, and
+    ``has_more`` tells whether further hits follow this page.
+    """
+
+    product_ids: list[UUID]
+    total: int
+    last_key: tuple[float, str, str] | None = None
+    has_more: bool = False
+
+
+class SearchIndex:
+    """Token and prefix index over product names, fields and aliases."""
+
+    def __init__(self) -> None:
+        self.ready = False
+        self._products: dict[UUID, IndexedProduct] = {}
+        self._postings: dict[str, dict[UUID, int]] = {}
+        self._prefixes: dict[str, set[str]] = {}
+        # Sorted typeahead phrases and the product owning each, in parallel
+        self._phrases: list[str] = []
+        self._phrase_owners: list[UUID] = []
+        self._bulk = False
+
+    def __len__(self) -> int:
+        return len(self._products)
+
+    async def rebuild(self, session: AsyncSession) -> None:
+        """Load every product and alias from the database and swap them in."""
+        product_rows = await session.execute(
+            select(
+                Product.id,
+                Product.name,
+                Product.game,
+                Product.category,
+                Product.set_name,
+                Product.variant,
+                Product.image_url,
+            ),
+        )
+        alias_rows = await session.execute(
+            select(
+                ProductAlias.product_id,
+                ProductAlias.alias,
+                ProductAlias.search_weight,
+            ),
+        )
+        aliases: dict[UUID, list[tuple[str, int]]] = {}
+        for product_id, alias, weight in alias_rows:
+            aliases.setdefault(product_id, []).append((alias, weight or 1))
+
+        self.load(product_rows, aliases)
+
+    def load(
+        self,
+        products: Iterable[Any],
+        aliases: dict[UUID, list[tuple[str, int]]],
+    ) -> None:
+        """Replace the whole index with ``products`` and their ``aliases``."""
+        fresh = SearchIndex()
+        fresh._bulk = True
+        for product in products:
+            fresh.add(product, aliases.get(product.id, []))
+        order = sorted(range(len(fresh._phrases)), key=fresh._phrases.__getitem__)
+
+        self._products = fresh._products
+        self._postings = fresh._postings
+        self._prefixes = fresh._prefixes
+        self._phrases = [fresh._phrases[i] for i in order]
+        self._phrase_owners = [fresh._phrase_owners[i] for i in order]
+        self.ready = True
+
+    def add(self, product: Any, aliases: Iterable[tuple[str, int]] = ()) -> None:
+        """Index a product (replacing any previous version of it).
+
+        ``product`` is anything exposing the ``Product`` column attributes,
+        e.g. an ORM instance or a result row.
+        """
+        self.discard(product.id)
+        aliases = list(aliases)
+
+        weights: dict[str, int] = {}
+
+        def _merge(text: str | None, weight: int) -> None:
+            for token in tokenize(text):
+                if weights.get(token, 0) < weight:
+                    weights[token] = weight
+
+        _merge(product.name, NAME_WEIGHT)
+        _merge(product.set_name, FIELD_WEIGHT)
+        _merge(product.variant, FIELD_WEIGHT)
+        for alias, weight in aliases:
+            _merge(alias, weight)
+
+        entry = IndexedProduct(
+            id=product.id,
+            name=product.name,
+            game=product.game,
+            category=product.category,
+            set_name=product.set_name,
+            variant=product.variant,
+            image_url=getattr(product, "image_url", None),
+            weights=weights,
+            phrases=suggest_phrases(product.name, [alias for alias, _ in aliases]),
+        )
+        self._products[entry.id] = entry
+        for token, weight in weights.items():
+            postings = self._postings.get(token)
+            if postings is None:
+                postings = self._postings[token] = {}
+                self._add_prefixes(token)
+            postings[entry.id] = weight
+        for phrase in entry.phrases:
+            if self._bulk:
+                # Sorted once at the end of a rebuild
+                self._phrases.append(phrase)
+                self._phrase_owners.append(entry.id)
+            else:
+                position = bisect_right(self._phrases, phrase)
+                self._phrases.insert(position, phrase)
+                self._phrase_owners.insert(position, entry.id)
+
+    def add_product(self, product: Product) -> None:
+        """Index an ORM product whose ``aliases`` relationship is loaded."""
+        self.add(
+            product,
+            [(alias.alias, alias.search_weight or 1) for alias in product.aliases],
+        )
+
+    def discard(self, product_id: UUID) -> None:
+        """Remove a product from the index if present."""
+        entry = self._products.pop(product_id, None)
+        if entry is None:
+            return
+        for token in entry.weights:
+            postings = self._postings.get(token)
+            if postings is None:
+                continue
+            postings.pop(product_id, None)
+            if not postings:
+                del self._postings[token]
+                self._remove_prefixes(token)
+        for phrase in entry.phrases:
+            position = bisect_left(self._phrases, phrase)
+            while position < len(self._phrases) and self._phrases[position] == phrase:
+                if self._phrase_owners[position] == product_id:
+                    del self._phrases[position]
+                    del self._phrase_owners[position]
+                    break
+                position += 1
+
+    def suggest(self, prefix: str, limit: int = 10) -> list[IndexedProduct]:
+        """Products with a name word or alias starting with ``prefix``.
+
+        A binary search finds the first matching phrase, so cost depends on
+        ``limit`` rather than catalog size. Results are in phrase order, which
+        puts exact and shorter completions first.
+        """
+        words = _TOKEN_RE.findall(normalize(prefix))
+        # The last word is still being typed, so never treat it as a stopword
+        words = [word for word in words[:-1] if word not in STOPWORDS] + words[-1:]
+        needle = " ".join(words)
+        if not needle:
+            return []
+
+        suggestions: dict[UUID, IndexedProduct] = {}
+        position = bisect_left(self._phrases, needle)
+        while (
+            len(suggestions) < limit
+            and position < len(self._phrases)
+            and self._phrases[position].startswith(needle)
+        ):
+            owner = self._phrase_owners[position]
+            if owner not in suggestions:
+                suggestions[owner] = self._products[owner]
+            position += 1
+        return list(suggestions.values())
+
+    def search(
+        self,
+        query: str,
+        *,
+        game: str | None = None,
+        category: str | None = None,
+        set_name: str | None = None,
+        offset: int = 0,
+        limit: int = 20,
+        after: tuple[float, str, str] | None = None,
+    ) -> IndexSearchResult:
+        """Return matching product IDs ordered by score, then name and ID.
+
+        Every query token must match a product token exactly or as a prefix;
+        prefix matches count for ``PREFIX_FACTOR`` of the token weight.
+        Filters are case-insensitive substring matches, like the SQL ``ilike``.
+        When ``after`` (a previous ``last_key``) is given, results resume
+        after that key and ``offset`` is ignored.
+        """
+        scores = self._score(tokenize(query))
+        if not scores:
+            return IndexSearchResult(product_ids=[], total=0)
+
+        filters = [
+            (attr, normalize(value))
+            for attr, value in (
+                ("game", game),
+                ("category", category),
+                ("set_name", set_name),
+            )
+            if value
+        ]
+        matches = [
+            entry
+            for entry in (self._products[pid] for pid in scores)
+            if all(
+                needle in normalize(getattr(entry, attr)) for attr, needle in filters
+            )
+        ]
+
+        def _key(entry: IndexedProduct) -> tuple[float, str, str]:
+            return (-scores[entry.id], *entry.sort_key)
+
+        remaining = matches
+        if after is not None:
+            offset = 0
+            remaining = [entry for entry in matches if _key(entry) > after]
+
+        page = heapq.nsmallest(offset + limit, remaining, key=_key)[offset:]
+        return IndexSearchResult(
+            product_ids=[entry.id for entry in page],
+            total=len(matches),
+            last_key=_key(page[-1]) if page else None,
+            has_more=len(remaining) > offset + limit,
+        )
+
+    def _score(self, tokens: list[str]) -> dict[UUID, float]:
+        """Score products matching all tokens; empty when any token misses."""
+        if not tokens:
+            return {}
+        per_token = sorted(
+            (self._candidates(token) for token in tokens),
+            key=len,
+        )
+        scores: dict[UUID, float] = dict(per_token[0])
+        for candidates in per_token[1:]:
+            scores = {
+                pid: score + candidates[pid]
+                for pid, score in scores.items()
+                if pid in candidates
+            }
+            if not scores:
+                break
+        return scores
+
+    def _candidates(self, token: str) -> dict[UUID, float]:
+        """Products containing ``token`` or a token it is a prefix of."""
+        candidates: dict[UUID, float] = dict(self._postings.get(token, {}))
+        if len(token) < MIN_PREFIX_LENGTH:
+            return candidates
+        for completion in self._prefixes.get(token[:MAX_PREFIX_LENGTH], ()):
+            if completion == token or not completion.startswith(token):
+                continue
+            for pid, weight in self._postings[completion].items():
+                partial = weight * PREFIX_FACTOR
+                if candidates.get(pid, 0) < partial:
+                    candidates[pid] = partial
+        return candidates
+
+    def _add_prefixes(self, token: str) -> None:
+        for length in range(MIN_PREFIX_LENGTH, min(len(token), MAX_PREFIX_LENGTH) + 1):
+            self._prefixes.setdefault(token[:length], set()).add(token)
+
+    def _remove_prefixes(self, token: str) -> None:
+        for length in range(MIN_PREFIX_LENGTH, min(len(token), MAX_PREFIX_LENGTH) + 1):
+            prefix = token[:length]
+            completions = self._prefixes.get(prefix)
+            if completions is None:
+                continue
+            completions.discard(token)
+            if not completions:
+                del self._prefixes[prefix]
+
+
+# Global search index instance
+search_index = SearchIndex()
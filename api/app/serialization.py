@@ -0,0 +1,70 @@
+"""Fast JSON encoding for product responses.
+
+Row mappings go straight to JSON bytes with orjson, skipping Pydantic
+validation, while matching the JSON Pydantic produces for the same schema:
+Decimals as strings, UTC datetimes with a ``Z`` suffix, and dates widened to
+midnight datetimes where the schema declares ``datetime``.
+"""
+
+import os
+import types
+import typing
+from collections.abc import Mapping, Sequence
+from datetime import date, datetime, time
+from decimal import Decimal
+from typing import Any
+
+import orjson
+from pydantic import BaseModel
+
+FAST_JSON_ENABLED = os.getenv("FAST_JSON_ENABLED", "true").lower() == "true"
+
+_OPTIONS = orjson.OPT_UTC_Z
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, Decimal):
+        return str(value)
+    msg = f"Type is not JSON serializable: {type(value).__name__}"
+    raise TypeError(msg)
+
+
+def dumps(value: Any) -> bytes:
+    """Encode plain data (dicts, lists, scalars) as Pydantic-compatible JSON."""
+    return orjson.dumps(value, default=_default, option=_OPTIONS)
+
+
+def _declares_datetime(annotation: Any) -> bool:
+    if annotation is datetime:
+        return True
+    if typing.get_origin(annotation) in (typing.Union, types.UnionType):
+        return datetime in typing.get_args(annotation)
+    return False
+
+
+class RowEncoder:
+    """Builds JSON-ready dicts from row mappings in a model's field order."""
+
+    def __init__(self, model: type[BaseModel], fields: Sequence[str] | None = None):
+        self.fields = tuple(model.model_fields if fields is None else fields)
+        self._widen = tuple(
+            name
+            for name in self.fields
+            if _declares_datetime(model.model_fields[name].annotation)
+        )
+
+    def __call__(self, row: Mapping[Any, Any]) -> dict[str, Any]:
+        item = {name: row[name] for name in self.fields}
+        for name in self._widen:
+            value = item[name]
+            if isinstance(value, date) and not isinstance(value, datetime):
+                item[name] = datetime.combine(value, time())
+        return item
+
+
+def envelope_values(envelope: BaseModel) -> dict[str, Any]:
+    """Field values of an envelope model in declaration order, unvalidated.
+
+    Works with ``model_construct`` instances whose lists hold plain dicts.
+    """
+    return {name: getattr(envelope, name) for name in type(envelope).model_fields}
@@ -1,18 +1,55 @@
 """Image storage configuration for Cardfolio 2.0."""
 
+import asyncio
+import contextlib
+import hashlib
 import os
+import re
 from abc import ABC, abstractmethod
-from uuid import UUID
+from pathlib import Path
+from typing import BinaryIO
+from uuid import UUID, uuid4
 
 from fastapi import UploadFile
 
+STORAGE_UPLOAD_MAX_BYTES = int(os.getenv("STORAGE_UPLOAD_MAX_BYTES", "20971520"))
+STORAGE_CHUNK_BYTES = 1024 * 1024
+
+_EXTENSION = re.compile(r"^[a-z0-9]{1,5}$")
+# ``{product_id}.{sha256}.{extension}``, a link to the blob with that hash
+_REFERENCE = re.compile(r"^[0-9a-f-]{36}\.([0-9a-f]{64})\.[a-z0-9]{1,5}$")
+
+
+def _extension(filename: str | None) -> str:
+    """An upload's lower-cased file extension, ``jpg`` if missing or odd."""
+    if filename and "." in filename:
+        extension = filename.rsplit(".", 1)[1].lower()
+        if _EXTENSION.match(extension):
+            return extension
+    return "jpg"
+
+
+async def _copy(file: UploadFile, out: BinaryIO, sha256: "hashlib._Hash") -> None:
+    """Write an upload to ``out`` chunk by chunk, hashing it as it goes."""
+    size = 0
+    while chunk := await file.read(STORAGE_CHUNK_BYTES):
+        size += len(chunk)
+        if size > STORAGE_UPLOAD_MAX_BYTES:
+            msg = f"Images are limited to {STORAGE_UPLOAD_MAX_BYTES} bytes"
+            raise ValueError(msg)
+        sha256.update(chunk)
+        await asyncio.to_thread(out.write, chunk)
+
 
 class StorageBackend(ABC):
     """Abstract base class for storage backends."""
 
     @abstractmethod
     async def upload_image(self, file: UploadFile, product_id: UUID) -> str:
-        """Upload an image and return the URL."""
+        """Upload an image and return the URL.
+
+        Raises ``ValueError`` past ``STORAGE_UPLOAD_MAX_BYTES``.
+        """
 
     @abstractmethod
     async def delete_image(self, image_url: str) -> bool:
@@ -24,43 +61,89 @@ class StorageBackend(ABC):
 
 
 class LocalStorageBackend(StorageBackend):
-    """Local filesystem storage backend for development."""
+    """Local filesystem storage backend for development.
+
+    Uploads are streamed to disk in chunks off the event loop and hashed as
+    they stream. Each distinct image is stored once, as a blob named by its
+    SHA-256 under ``blobs/``, and every upload's URL names a hard link to
+    that blob, so the blob's link count is its reference count: deleting the
+    last URL of an image deletes its blob. Concurrent uploads and deletes in
+    other workers can at worst store an image twice, never lose one.
+    """
 
     def __init__(
         self,
         base_path: str = "storage/images",
         base_url: str = "http://localhost:8000/static",
     ):
-        self.base_path = base_path
+        self.base_path = Path(base_path)
         self.base_url = base_url
+        self.blob_path = self.base_path / "blobs"
         # Create directory if it doesn't exist
-        os.makedirs(base_path, exist_ok=True)
+        self.blob_path.mkdir(parents=True, exist_ok=True)
 
-    async def upload_image(self, file: UploadFile, product_id: UUID) -> str:
-        """Upload an image to local storage."""
-        # Generate filename
-        file_extension = file.filename.split(".")[-1] if file.filename else "jpg"
-        filename = f"{product_id}.{file_extension}"
-        file_path = os.path.join(self.base_path, filename)
+    def _blob(self, digest: str) -> Path:
+        return self.blob_path / digest[:2] / digest
 
-        # Save file
-        with open(file_path, "wb") as f:
-            content = await file.read()
-            f.write(content)
+    async def _spool(self, file: UploadFile) -> tuple[Path, str]:
+        """Stream an upload to a temporary blob; return its path and SHA-256."""
+        path = self.blob_path / f"upload-{uuid4()}.tmp"
+        sha256 = hashlib.sha256()
+        out = await asyncio.to_thread(path.open, "wb")
+        try:
+            await _copy(file, out, sha256)
+        except BaseException:
+            await asyncio.to_thread(out.close)
+            await asyncio.to_thread(path.unlink)
+            raise
+        await asyncio.to_thread(out.close)
+        return path, sha256.hexdigest()
+
+    def _store(self, path: Path, digest: str, reference: Path) -> None:
+        """Keep a spooled upload as its blob (unless stored) and link to it."""
+        blob = self._blob(digest)
+        try:
+            blob.parent.mkdir(exist_ok=True)
+            with contextlib.suppress(FileExistsError):
+                blob.hardlink_to(path)
+            try:
+                reference.hardlink_to(blob)
+            except FileNotFoundError:
+                # A delete collected the blob meanwhile; keep this copy
+                reference.hardlink_to(path)
+        except FileExistsError:
+            # The same image was already uploaded for this product
+            pass
+        finally:
+            path.unlink()
 
-        # Return URL
+    async def upload_image(self, file: UploadFile, product_id: UUID) -> str:
+        """Upload an image to local storage, sharing identical ones."""
+        path, digest = await self._spool(file)
+        filename = f"{product_id}.{digest}.{_extension(file.filename)}"
+        await asyncio.to_thread(self._store, path, digest, self.base_path / filename)
         return f"{self.base_url}/{filename}"
 
-    async def delete_image(self, image_url: str) -> bool:
-        """Delete an image from local storage."""
+    def _delete(self, filename: str) -> bool:
         try:
-            filename = image_url.split("/")[-1]
-            file_path = os.path.join(self.base_path, filename)
-            if os.path.exists(file_path):
-                os.remove(file_path)
-                return True
+            (self.base_path / filename).unlink()
+        except FileNotFoundError:
             return False
-        except Exception:
+        if match := _REFERENCE.match(filename):
+            blob = self._blob(match[1])
+            with contextlib.suppress(FileNotFoundError):
+                if blob.stat().st_nlink == 1:
+                    blob.unlink()
+        return True
+
+    async def delete_image(self, image_url: str) -> bool:
+        """Delete an image from local storage, and its blob if unshared."""
+        filename = image_url.rsplit("/", 1)[-1]
+        if not filename or filename.startswith("."):
+            return False
+        try:
+            return await asyncio.to_thread(self._delete, filename)
+        except OSError:
             return False
 
     async def get_image_url(self, image_path: str) -> str:
@@ -72,7 +155,10 @@ class SupabaseStorageBackend(StorageBackend):
     """Supabase storage backend for production."""
 
     def __init__(
-        self, supabase_url: str, supabase_key: str, bucket_name: str = "card-images"
+        self,
+        supabase_url: str,
+        supabase_key: str,
+        bucket_name: str = "card-images",
     ):
         self.supabase_url = supabase_url
         self.supabase_key = supabase_key
@@ -101,7 +187,9 @@ class MinIOStorageBackend(StorageBackend):
     """MinIO storage backend for development with Docker Compose."""
 
     def __init__(
-        self, endpoint: str = "localhost:9000", bucket_name: str = "card-images"
+        self,
+        endpoint: str = "localhost:9000",
+        bucket_name: str = "card-images",
     ):
         self.endpoint = endpoint
         self.bucket_name = bucket_name
@@ -132,9 +220,8 @@ def get_storage_backend() -> StorageBackend:
         supabase_url = os.getenv("SUPABASE_URL")
         supabase_key = os.getenv("SUPABASE_ANON_KEY")
         if not supabase_url or not supabase_key:
-            raise ValueError(
-                "SUPABASE_URL and SUPABASE_ANON_KEY must be set for Supabase storage"
-            )
+            msg = "SUPABASE_URL and SUPABASE_ANON_KEY must be set for Supabase storage"
+            raise ValueError(msg)
         return SupabaseStorageBackend(supabase_url, supabase_key)
 
     if storage_type == "minio":
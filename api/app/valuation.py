@@ -0,0 +1,365 @@
+"""Vectorized portfolio valuation over daily price series.
+
+A portfolio's value only moves when a held product's price changes or a
+holding is added, so valuation works on those events rather than on a dense
+days-by-products grid: for the value V(d) = sum_p Q_p(d) * P_p(d),
+
+    V(d) - V(d-1) = sum_p Q_p(d-1) * (P_p(d) - P_p(d-1))   (price events)
+                  + sum_p (Q_p(d) - Q_p(d-1)) * P_p(d)     (quantity events)
+
+Each event's delta is computed with array lookups, the deltas are binned per
+day with ``np.bincount`` and the value series is their running sum. Work is
+proportional to the number of price changes, not days times cards.
+
+Prices that arrive later are applied with ``reprice``: a new price for
+product p on day d changes V only until p's next price event, by the
+quantity held times the difference to the price it replaces, so a handful
+of lookups update the series without revisiting the other events.
+"""
+
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from typing import Any
+
+import numpy as np
+import numpy.typing as npt
+
+DAYS_PER_YEAR = 365
+
+# Event keys pack (product, day) into an int64, leaving this many bits for day
+DAY_BITS = 16
+
+IntArray = npt.NDArray[np.int64]
+FloatArray = npt.NDArray[np.float64]
+
+
+@dataclass
+class PriceEvents:
+    """Daily prices of the held products, one row per (product, day).
+
+    Rows are sorted by product, then day. ``day`` counts from the start of
+    the valuation window; earlier prices are clamped to day 0 so the window
+    opens at each product's last known price. ``key`` packs (product, day)
+    and ``jump`` is each row's change from the product's previous price (the
+    price itself for its first row). Build with ``from_arrays``.
+    """
+
+    product: IntArray
+    day: IntArray
+    price: FloatArray
+    key: IntArray
+    jump: FloatArray
+
+    @classmethod
+    def from_arrays(
+        cls,
+        product: Any,
+        day: Any,
+        price: Any,
+        days: int | None = None,
+    ) -> "PriceEvents":
+        """Sort and clamp raw (product, day, price) arrays.
+
+        A later row for the same (product, day) replaces an earlier one, and
+        of several rows before the window only the latest is kept. Rows on
+        or after ``days`` (the window length) are dropped.
+        """
+        product = np.asarray(product, dtype=np.int64)
+        day = np.asarray(day, dtype=np.int64)
+        price = np.asarray(price, dtype=np.float64)
+        if days is not None:
+            keep = day < days
+            product, day, price = product[keep], day[keep], price[keep]
+        # Stable sort keeps arrival order within (product, day) for the dedupe
+        order = np.lexsort((np.arange(len(day)), day, product))
+        product, day, price = product[order], np.maximum(day[order], 0), price[order]
+        last = np.ones(len(day), dtype=bool)
+        last[:-1] = (product[1:] != product[:-1]) | (day[1:] != day[:-1])
+        product, day, price = product[last], day[last], price[last]
+        jump = price.copy()
+        jump[1:] -= np.where(product[1:] == product[:-1], price[:-1], 0.0)
+        return cls(product, day, price, _event_keys(product, day), jump)
+
+    def merge(self, newer: "PriceEvents") -> "PriceEvents":
+        """These prices with ``newer`` ones added or replacing same-day rows.
+
+        ``newer`` is expected to be small: its rows are spliced into place
+        and only the jumps next to them recomputed, rather than the whole
+        list being sorted again.
+        """
+        at = np.searchsorted(self.key, newer.key)
+        found = at < len(self.key)
+        found[found] = self.key[at[found]] == newer.key[found]
+        price = self.price.copy()
+        price[at[found]] = newer.price[found]
+        added, gaps = ~found, at[~found]
+        product = np.insert(self.product, gaps, newer.product[added])
+        price = np.insert(price, gaps, newer.price[added])
+        jump = np.insert(self.jump, gaps, 0.0)
+
+        # Positions after the splice of the rows written and of the rows
+        # following them, whose previous price may have changed
+        written = np.concatenate(
+            [
+                gaps + np.arange(len(gaps)),
+                at[found] + np.searchsorted(gaps, at[found], side="right"),
+            ],
+        )
+        touched = np.union1d(written, written + 1)
+        touched = touched[touched < len(price)]
+        follows = (touched > 0) & (product[touched - 1] == product[touched])
+        jump[touched] = price[touched] - np.where(follows, price[touched - 1], 0.0)
+        return PriceEvents(
+            product,
+            np.insert(self.day, gaps, newer.day[added]),
+            price,
+            np.insert(self.key, gaps, newer.key[added]),
+            jump,
+        )
+
+
+@dataclass
+class HoldingEvents:
+    """Quantities added to the portfolio, sorted by product, then day.
+
+    ``added[j]`` is the total quantity of the rows before row ``j``.
+    """
+
+    product: IntArray
+    day: IntArray
+    quantity: FloatArray
+    cost: FloatArray
+    key: IntArray = field(init=False)
+    added: FloatArray = field(init=False)
+
+    def __post_init__(self) -> None:
+        self.key = _event_keys(self.product, self.day)
+        self.added = np.concatenate([[0.0], np.cumsum(self.quantity)])
+
+    @classmethod
+    def from_arrays(
+        cls,
+        product: Any,
+        day: Any,
+        quantity: Any,
+        cost: Any,
+    ) -> "HoldingEvents":
+        """Sort raw holding arrays; acquisitions before the window are day 0."""
+        product = np.asarray(product, dtype=np.int64)
+        day = np.maximum(np.asarray(day, dtype=np.int64), 0)
+        order = np.lexsort((day, product))
+        return cls(
+            product[order],
+            day[order],
+            np.asarray(quantity, dtype=np.float64)[order],
+            np.asarray(cost, dtype=np.float64)[order],
+        )
+
+
+def _event_keys(product: IntArray, day: IntArray) -> IntArray:
+    """One sortable integer per (product, day); days must be non-negative."""
+    if len(day) and day.max() >= 1 << DAY_BITS:
+        msg = f"valuation windows are limited to {1 << DAY_BITS} days"
+        raise ValueError(msg)
+    return (product << DAY_BITS) | day
+
+
+@dataclass
+class Valuation:
+    """Daily portfolio value, cost, flows and derived return series."""
+
+    start: date
+    value: FloatArray
+    cost: FloatArray
+    flows: FloatArray
+    returns: FloatArray = field(init=False)
+    drawdown: FloatArray = field(init=False)
+
+    def __post_init__(self) -> None:
+        self.returns, self.drawdown = _performance(self.value, self.flows)
+
+    @property
+    def days(self) -> int:
+        """Number of days valued."""
+        return len(self.value)
+
+    def dates(self) -> list[date]:
+        """Calendar date of each day."""
+        return [self.start + timedelta(days=offset) for offset in range(self.days)]
+
+    def summary(self) -> dict[str, float]:
+        """Headline figures for the whole window."""
+        value = float(self.value[-1]) if self.days else 0.0
+        cost = float(self.cost[-1]) if self.days else 0.0
+        # Volatility from the first day after anything was worth something
+        invested = np.flatnonzero(self.value > 0)
+        active = self.returns[invested[0] + 1 :] if len(invested) else self.returns[:0]
+        return {
+            "value": round(value, 2),
+            "cost": round(cost, 2),
+            "profit": round(value - cost, 2),
+            "total_return": float(np.prod(1 + self.returns) - 1),
+            "volatility": (
+                float(np.std(active, ddof=1) * np.sqrt(DAYS_PER_YEAR))
+                if len(active) > 1
+                else 0.0
+            ),
+            "max_drawdown": float(self.drawdown.min()) if self.days else 0.0,
+        }
+
+
+def _performance(value: FloatArray, flows: FloatArray) -> tuple[FloatArray, FloatArray]:
+    """Time-weighted daily returns and drawdown of the return index.
+
+    Adding cards is a flow, not a gain: r(d) = (V(d) - flow(d)) / V(d-1) - 1.
+    """
+    returns = np.zeros_like(value)
+    if len(value) > 1:
+        previous = value[:-1]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            daily = (value[1:] - flows[1:]) / previous - 1
+        returns[1:] = np.where(previous > 0, daily, 0.0)
+    index = np.cumprod(1 + returns)
+    drawdown = index / np.maximum.accumulate(index) - 1
+    return returns, drawdown
+
+
+def _deltas(
+    prices: PriceEvents,
+    holdings: HoldingEvents,
+    days: int,
+) -> tuple[FloatArray, FloatArray, FloatArray]:
+    """Per-day value change, cost added and flows."""
+    # Quantity events: the quantity added times that day's price. Both event
+    # lists are sorted by key, so the last price at or before each holding
+    # is one searchsorted of the few holdings into the many prices.
+    last_price = np.searchsorted(prices.key, holdings.key, side="right") - 1
+    priced = last_price >= 0
+    priced[priced] = prices.product[last_price[priced]] == holdings.product[priced]
+    flow = np.zeros_like(holdings.quantity)
+    flow[priced] = holdings.quantity[priced] * prices.price[last_price[priced]]
+    cost = holdings.quantity * holdings.cost
+
+    # Price events: the quantity held the day before times the price jump,
+    # as a running sum over the price events of the quantity of each holding
+    # from where it sorts in, and of minus each product's total from after
+    # its last price event
+    run_end = np.flatnonzero(np.diff(holdings.product, append=-1))
+    totals = np.diff(holdings.added[run_end + 1], prepend=0.0)
+    ends = np.searchsorted(prices.key, (holdings.product[run_end] + 1) << DAY_BITS)
+    added = np.bincount(
+        np.concatenate([last_price + 1, ends]),
+        weights=np.concatenate([holdings.quantity, -totals]),
+        minlength=len(prices.day) + 1,
+    )[:-1]
+    price_delta = np.cumsum(added) * prices.jump
+
+    # Holdings acquired after the window (future acquired_at) aren't held yet
+    holding_day = holdings.day
+    selected = holding_day < days
+    holding_day, flow, cost = holding_day[selected], flow[selected], cost[selected]
+
+    # Weighted bincounts are float64; numpy's stubs only know the unweighted kind
+    flows = np.bincount(holding_day, weights=flow, minlength=days).astype(
+        np.float64,
+        copy=False,
+    )
+    prices_sum = np.bincount(prices.day, weights=price_delta, minlength=days)
+    costs = np.bincount(holding_day, weights=cost, minlength=days)
+    return (
+        prices_sum.astype(np.float64, copy=False) + flows,
+        costs.astype(np.float64, copy=False),
+        flows,
+    )
+
+
+def value_portfolio(
+    start: date,
+    days: int,
+    prices: PriceEvents,
+    holdings: HoldingEvents,
+) -> Valuation:
+    """Value a portfolio on each of ``days`` days from ``start``."""
+    value, cost, flows = _deltas(prices, holdings, days)
+    return Valuation(start, np.cumsum(value), np.cumsum(cost), flows)
+
+
+def _in_effect(events: PriceEvents, key: IntArray) -> tuple[IntArray, FloatArray]:
+    """Key and price of the event in effect at each key; -1 and 0 if none."""
+    row = np.searchsorted(events.key, key, side="right") - 1
+    found = row >= 0
+    found[found] = events.key[row[found]] >> DAY_BITS == key[found] >> DAY_BITS
+    found_key = np.full(len(key), -1, dtype=np.int64)
+    found_key[found] = events.key[row[found]]
+    price = np.zeros(len(key))
+    price[found] = events.price[row[found]]
+    return found_key, price
+
+
+def _next_day(events: PriceEvents, key: IntArray, days: int) -> IntArray:
+    """Day of the same product's next event after each key; ``days`` if none."""
+    row = np.searchsorted(events.key, key, side="right")
+    found = row < len(events.key)
+    found[found] = events.key[row[found]] >> DAY_BITS == key[found] >> DAY_BITS
+    day = np.full(len(key), days, dtype=np.int64)
+    day[found] = events.day[row[found]]
+    return day
+
+
+def reprice(
+    valuation: Valuation,
+    prices: PriceEvents,
+    recent: PriceEvents,
+    changed: PriceEvents,
+    holdings: HoldingEvents,
+) -> Valuation:
+    """``valuation`` with ``changed`` prices applied.
+
+    ``valuation`` must be the value of ``prices`` overlaid with ``recent``
+    (whose rows win on the same day); the result is that of ``prices``
+    overlaid with ``recent.merge(changed)``. Each change alters the value
+    from its day until its product's next price event, so the work is a few
+    searches per change and one pass over the days.
+    """
+    days = valuation.days
+    product, day, key = changed.product, changed.day, changed.key
+    base_key, base_price = _in_effect(prices, key)
+    recent_key, recent_price = _in_effect(recent, key)
+    replaced = np.where(recent_key >= base_key, recent_price, base_price)
+    difference = changed.price - replaced
+    end = np.minimum(
+        _next_day(prices, key, days),
+        _next_day(recent.merge(changed), key, days),
+    )
+
+    # The quantity held before each change, and the holdings acquired from
+    # its day to its end, whose flows were valued at the replaced price
+    first = np.searchsorted(holdings.key, key, side="left")
+    last = np.searchsorted(holdings.key, (product << DAY_BITS) | end, side="left")
+    held = (
+        holdings.added[first]
+        - holdings.added[np.searchsorted(holdings.product, product, side="left")]
+    )
+    count = last - first
+    rows = np.arange(count.sum()) + np.repeat(first - np.cumsum(count) + count, count)
+    acquired = holdings.quantity[rows] * np.repeat(difference, count)
+    acquired_on = holdings.day[rows]
+
+    value_change = np.bincount(
+        np.concatenate([day, acquired_on, end]),
+        weights=np.concatenate(
+            [
+                held * difference,
+                acquired,
+                -(held + holdings.added[last] - holdings.added[first]) * difference,
+            ],
+        ),
+        minlength=days + 1,
+    )[:days]
+    flow_change = np.bincount(acquired_on, weights=acquired, minlength=days)
+    return Valuation(
+        valuation.start,
+        valuation.value + np.cumsum(value_change),
+        valuation.cost,
+        valuation.flows + flow_change,
+    )
@@ -0,0 +1,62 @@
+"""Tests for bulk partial product updates."""
+
+from decimal import Decimal
+from http import HTTPStatus
+from uuid import uuid4
+
+from fastapi.testclient import TestClient
+
+from api.app.bulk_update import bulk_update_sql, merge_patches
+from api.app.main import app
+from api.app.schemas.products import PRODUCT_BULK_UPDATE_MAX_ROWS, ProductPatch
+
+client = TestClient(app)
+
+
+def test_merge_patches_keeps_only_sent_fields() -> None:
+    """Unset fields are dropped, explicit nulls kept, later patches win."""
+    first, second = uuid4(), uuid4()
+    merged = merge_patches(
+        [
+            ProductPatch.model_validate(
+                {"id": first, "market_price": Decimal("10.50"), "low_price": None},
+            ),
+            ProductPatch.model_validate({"id": second, "name": "Blastoise"}),
+            ProductPatch.model_validate(
+                {"id": first, "market_price": Decimal("12.00")},
+            ),
+        ],
+    )
+    assert list(merged) == [first, second]
+    assert merged[first] == {"market_price": "12.00", "low_price": None}
+    assert merged[second] == {"name": "Blastoise"}
+
+
+def test_sql_sets_only_patched_columns() -> None:
+    """Untouched columns are neither assigned nor compared."""
+    sql = bulk_update_sql(["market_price", "low_price"])
+    assert (
+        "market_price = CASE WHEN patch.doc ? 'market_price' "
+        "THEN CAST(patch.doc ->> 'market_price' AS DECIMAL(10, 2)) "
+        "ELSE products.market_price END"
+    ) in sql
+    assert "IS DISTINCT FROM (products.market_price, products.low_price)" in sql
+    assert "name =" not in sql
+
+
+def test_bulk_update_validates_before_touching_the_db() -> None:
+    """Empty, oversized and id-less batches are rejected with 422."""
+    url = "/api/v1/products/bulk"
+    assert (
+        client.patch(url, json={"products": []}).status_code
+        == HTTPStatus.UNPROCESSABLE_ENTITY
+    )
+    assert (
+        client.patch(url, json={"products": [{"name": "x"}]}).status_code
+        == HTTPStatus.UNPROCESSABLE_ENTITY
+    )
+    too_many = [{"id": str(uuid4())} for _ in range(PRODUCT_BULK_UPDATE_MAX_ROWS + 1)]
+    assert (
+        client.patch(url, json={"products": too_many}).status_code
+        == HTTPStatus.UNPROCESSABLE_ENTITY
+    )
@@ -0,0 +1,47 @@
+"""Tests for in-process caching primitives."""
+
+from api.app.cache import TTLCache
+from api.app.counting import count_cache_key
+
+
+class FakeClock:
+    """Manually advanced monotonic clock."""
+
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_ttl_cache_expires_entries() -> None:
+    """Entries disappear once their TTL has elapsed."""
+    clock = FakeClock()
+    cache: TTLCache[str, int] = TTLCache(maxsize=10, ttl=30, clock=clock)
+    cache.set("pokemon", 1200)
+
+    clock.now = 29.9
+    assert cache.get("pokemon") is not None
+    clock.now = 30.0
+    assert cache.get("pokemon") is None
+    assert cache.stats.as_dict() == {"hits": 1, "misses": 1, "evictions": 0}
+
+
+def test_ttl_cache_evicts_least_recently_used() -> None:
+    """The size bound evicts the entry that was used longest ago."""
+    cache: TTLCache[str, int] = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert [cache.get(key) for key in "abc"] == [1, None, 3]
+    assert cache.stats.evictions == 1
+
+
+def test_count_cache_key_normalizes_query_and_filters() -> None:
+    """Case and whitespace differences share one count cache entry."""
+    assert count_cache_key("capped", "  Base   SET ", "Pokemon", None) == (
+        count_cache_key("capped", "base set", "pokemon ", None)
+    )
+    assert count_cache_key("exact", "base set") != count_cache_key("capped", "base set")
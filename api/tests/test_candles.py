@@ -0,0 +1,46 @@
+"""Tests for incrementally maintained price candles."""
+
+from datetime import UTC, datetime, timedelta, timezone
+from http import HTTPStatus
+from uuid import uuid4
+
+from fastapi.testclient import TestClient
+
+from api.app.candles import affected_buckets, bucket_bounds
+from api.app.main import app
+
+client = TestClient(app)
+
+
+def utc(year: int, month: int, day: int, hour: int = 0) -> datetime:
+    """A UTC datetime."""
+    return datetime(year, month, day, hour, tzinfo=UTC)
+
+
+def test_bucket_bounds_are_utc_days_mondays_and_months() -> None:
+    """Buckets follow date_trunc in UTC, whatever the sale's offset."""
+    # 2024-12-31 23:30 in UTC-5 is 2025-01-01 04:30 UTC
+    moment = datetime(2024, 12, 31, 23, 30, tzinfo=timezone(timedelta(hours=-5)))
+    assert bucket_bounds("day", moment) == (utc(2025, 1, 1), utc(2025, 1, 2))
+    assert bucket_bounds("week", moment) == (utc(2024, 12, 30), utc(2025, 1, 6))
+    assert bucket_bounds("month", moment) == (utc(2025, 1, 1), utc(2025, 2, 1))
+
+
+def test_affected_buckets_touch_each_bucket_once() -> None:
+    """Sales sharing buckets produce each (product, period, bucket) once."""
+    product = uuid4()
+    buckets = affected_buckets(
+        [(product, utc(2024, 3, 4, 9)), (product, utc(2024, 3, 4, 17))],
+    )
+    assert [(period, start) for _, period, start, _ in buckets] == [
+        ("day", utc(2024, 3, 4)),
+        ("month", utc(2024, 3, 1)),
+        ("week", utc(2024, 3, 4)),
+    ]
+    assert affected_buckets([]) == []
+
+
+def test_candles_reject_unknown_period() -> None:
+    """Only day, week and month candles exist."""
+    response = client.get(f"/api/v1/products/{uuid4()}/candles?period=hour")
+    assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
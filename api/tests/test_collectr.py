@@ -0,0 +1,218 @@
+"""Tests for Collectr CSV import."""
+
+import csv
+import io
+import threading
+from collections.abc import Sequence
+from datetime import UTC, datetime
+from decimal import Decimal
+from http import HTTPStatus
+from typing import Any, Self
+from uuid import UUID, uuid4
+
+import pytest
+from fastapi.testclient import TestClient
+
+from api.app import collectr
+from api.app.collectr import (
+    Candidate,
+    CollectrRow,
+    ImportJobs,
+    column_positions,
+    parse_row,
+    read_batches,
+    resolve,
+)
+from api.app.main import app
+from api.app.schemas.portfolios import HoldingCreate, ImportIssue
+
+client = TestClient(app)
+
+HEADER = (
+    "Portfolio Name,Category,Set,Product Name,Card Number,Rarity,Variance,"
+    "Grade,Card Condition,Average Cost Paid,Quantity,Market Price,Date Added\n"
+)
+
+
+def export(*lines: str) -> io.BytesIO:
+    """A Collectr export file with a BOM, as the app writes it."""
+    return io.BytesIO(("\ufeff" + HEADER + "".join(lines)).encode())
+
+
+def candidate(
+    set_name: str | None = "Base Set",
+    card_number: str | None = "4/102",
+    variant: str | None = None,
+    game: str | None = "Pokemon",
+) -> Candidate:
+    """A catalog product matched by name."""
+    return Candidate(uuid4(), set_name, card_number, variant, game)
+
+
+def test_header_columns_are_found_by_name() -> None:
+    """Column order doesn't matter; the product name column is required."""
+    positions = column_positions(["Quantity", " product  NAME ", "Set"])
+    assert positions == {"quantity": 0, "name": 1, "set_name": 2}
+    with pytest.raises(ValueError, match="Product Name"):
+        column_positions(["Name", "Set"])
+
+
+def test_row_values_are_parsed() -> None:
+    """Prices may carry $ and thousands separators; dates default to UTC."""
+    positions = column_positions(HEADER.strip().split(","))
+    record = "Main,Pokemon,Base Set,Charizard,4/102,Holo Rare,Holofoil,,NM,"
+    record += '"$1,234.5",2,9999,2024-03-01'
+    row = parse_row(7, next(csv.reader([record])), positions)
+    assert (row.line, row.name, row.variant, row.game) == (
+        7,
+        "Charizard",
+        "Holofoil",
+        "Pokemon",
+    )
+    assert (row.cost_basis, row.quantity, row.acquired_at) == (
+        Decimal("1234.50"),
+        2,
+        datetime(2024, 3, 1, tzinfo=UTC),
+    )
+
+
+def test_reader_batches_rows_and_reports_invalid_ones() -> None:
+    """Batches hold rows and issues; quoted newlines keep line numbers right."""
+    file = export(
+        'Main,Pokemon,Base Set,"Charizard\nHolo",4/102,,,,,1,1,,\n',
+        "\n",
+        "Main,Pokemon,Base Set,Blastoise,2/102,,,,,1,1.5,,\n",
+        "Main,Pokemon,Base Set,Venusaur,15/102,,,,,1,1,,\n",
+    )
+    batches = list(read_batches(file, batch_rows=2))
+    assert [len(rows) + len(issues) for rows, issues in batches] == [2, 1]
+    (first_rows, first_issues), (last_rows, _) = batches
+    assert first_rows[0].name == "Charizard\nHolo"
+    assert (first_issues[0].line, first_issues[0].status) == (5, "invalid")
+    assert "whole number" in first_issues[0].detail
+    assert [row.line for row in last_rows] == [6]
+
+
+def test_set_and_number_must_agree() -> None:
+    """Set and card number filter candidates; zero padding is ignored."""
+    right = candidate(card_number="004/102")
+    wrong_set = candidate(set_name="Base Set 2")
+    wrong_number = candidate(card_number="5/102")
+    row = CollectrRow(2, "Charizard", set_name="base set", card_number="4/102")
+    assert resolve(row, [right, wrong_set, wrong_number, right]) == [right]
+    assert resolve(CollectrRow(2, "Charizard", set_name="Jungle"), [right]) == []
+
+
+def test_variant_breaks_ties_without_excluding() -> None:
+    """Variant picks among candidates but never rules out the only one."""
+    holo = candidate(variant="Holofoil")
+    plain = candidate(variant=None)
+    row = CollectrRow(2, "Charizard", variant="Holofoil")
+    assert resolve(row, [holo, plain]) == [holo]
+    assert resolve(CollectrRow(2, "Charizard", variant="Holo"), [holo]) == [holo]
+    assert resolve(CollectrRow(2, "Charizard"), [holo, plain]) == [holo, plain]
+
+
+async def test_import_job_reports_progress_and_outcomes(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """A job runs in the background and tallies matched and unresolved rows."""
+    inserted: list[object] = []
+
+    class Session:
+        async def __aenter__(self) -> Self:
+            return self
+
+        async def __aexit__(self, *exc: object) -> bool:
+            return False
+
+        async def commit(self) -> None:
+            inserted.append("commit")
+
+    async def match_batch(
+        _session: object,
+        rows: Sequence[CollectrRow],
+    ) -> tuple[list[CollectrRow], list[ImportIssue]]:
+        matched = [row for row in rows if row.name == "Charizard"]
+        unmatched = [
+            ImportIssue(line=row.line, status="unmatched", detail="none")
+            for row in rows
+            if row.name != "Charizard"
+        ]
+        return matched, unmatched
+
+    async def insert_holdings(
+        _session: object,
+        _portfolio_id: UUID,
+        holdings: Sequence[HoldingCreate],
+    ) -> None:
+        inserted.extend(holdings)
+
+    monkeypatch.setattr(collectr, "async_session_maker", Session)
+    monkeypatch.setattr(collectr, "match_batch", match_batch)
+    monkeypatch.setattr(collectr, "insert_holdings", insert_holdings)
+
+    file = export(
+        "Main,Pokemon,Base Set,Charizard,4/102,,,,,1,1,,\n",
+        "Main,Pokemon,Base Set,Missingno,0/102,,,,,1,1,,\n",
+        "Main,Pokemon,Base Set,Pikachu,58/102,,,,,1,0,,\n",
+    )
+    jobs = ImportJobs()
+    job = jobs.start(uuid4(), file, len(file.getvalue()))
+    queued = job.status
+    await jobs.wait()
+
+    assert (queued, job.status) == ("queued", "succeeded")
+    assert (job.rows, job.matched, job.unmatched, job.invalid) == (3, 1, 1, 1)
+    assert job.bytes_read == job.bytes_total
+    # One holding matched, then the commit
+    assert inserted[1:] == ["commit"]
+    assert file.closed
+
+
+async def test_import_job_parses_off_the_event_loop(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Rows are parsed in a worker thread; batches are matched on the loop."""
+    threads: dict[str, set[int]] = {"parse": set(), "match": set()}
+
+    class Session:
+        async def __aenter__(self) -> Self:
+            return self
+
+        async def __aexit__(self, *exc: object) -> bool:
+            return False
+
+        async def commit(self) -> None:
+            pass
+
+    def parse_row(*args: Any) -> CollectrRow:
+        threads["parse"].add(threading.get_ident())
+        return real_parse_row(*args)
+
+    async def match_batch(
+        *_: object,
+    ) -> tuple[list[HoldingCreate], list[ImportIssue]]:
+        threads["match"].add(threading.get_ident())
+        return [], []
+
+    real_parse_row = collectr.parse_row
+    monkeypatch.setattr(collectr, "async_session_maker", Session)
+    monkeypatch.setattr(collectr, "parse_row", parse_row)
+    monkeypatch.setattr(collectr, "match_batch", match_batch)
+
+    file = export("Main,Pokemon,Base Set,Charizard,4/102,,,,,1,1,,\n")
+    jobs = ImportJobs()
+    job = jobs.start(uuid4(), file, len(file.getvalue()))
+    await jobs.wait()
+
+    assert job.status == "succeeded"
+    assert threads["match"] == {threading.get_ident()}
+    assert threads["parse"]
+    assert threading.get_ident() not in threads["parse"]
+
+
+def test_unknown_import_is_not_found() -> None:
+    """Polling a job this process doesn't know is a 404."""
+    response = client.get(f"/api/v1/portfolios/{uuid4()}/imports/{uuid4()}")
+    assert response.status_code == HTTPStatus.NOT_FOUND
@@ -0,0 +1,93 @@
+"""Tests for the streaming catalog export."""
+
+import csv
+import io
+import json
+from datetime import UTC, datetime, timedelta, timezone
+from decimal import Decimal
+from http import HTTPStatus
+from typing import Any
+from unittest.mock import AsyncMock
+from uuid import uuid4
+
+from fastapi.testclient import TestClient
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from api.app.export import csv_header, encode_batch, export_query, stream_export
+from api.app.main import app
+from api.app.projection import Projection
+
+client = TestClient(app)
+
+
+def product(**overrides: Any) -> dict[str, Any]:
+    """A JSON-ready product as ``Projection.load`` returns it."""
+    values = {
+        "id": uuid4(),
+        "name": 'Black Lotus "Alpha"',
+        "market_price": Decimal("25000.00"),
+        "updated_at": datetime(2024, 5, 1, 12, 30, tzinfo=UTC),
+        "set_name": None,
+    }
+    values.update(overrides)
+    return values
+
+
+def test_ndjson_is_one_object_per_line() -> None:
+    """Each product is a complete JSON document on its own line."""
+    products = [product(), product(name="Mox Pearl")]
+    lines = encode_batch(products, "ndjson").decode().splitlines()
+    assert [json.loads(line)["name"] for line in lines] == [
+        'Black Lotus "Alpha"',
+        "Mox Pearl",
+    ]
+    assert json.loads(lines[0])["market_price"] == "25000.00"
+
+
+def test_csv_round_trips_quotes_nulls_and_aliases() -> None:
+    """CSV cells are quoted as needed; aliases are a JSON array per cell."""
+    projection = Projection(("id", "name", "set_name"), aliases=True)
+    row = product(aliases=[{"alias": "Lotus"}])
+    del row["market_price"], row["updated_at"]
+    text = encode_batch([row], "csv").decode()
+    (record,) = csv.reader(io.StringIO(text))
+    assert csv_header(projection) == ["id", "name", "set_name", "aliases"]
+    assert record[1:] == ['Black Lotus "Alpha"', "", '[{"alias":"Lotus"}]']
+
+
+def test_export_streams_in_change_order_from_watermark() -> None:
+    """Rows are ordered by (updated_at, id) and filtered inclusively by since.
+
+    ``updated_at`` is a naive UTC column, which asyncpg won't compare with an
+    aware time, so an offset ``since`` is bound as naive UTC.
+    """
+    since = datetime(2024, 1, 1, 2, 30, tzinfo=timezone(timedelta(hours=2)))
+    query = export_query(Projection(("id", "name")), game="Magic", since=since)
+    compiled = query.compile(dialect=postgresql.dialect())
+    assert "products.updated_at >= " in str(compiled)
+    assert str(compiled).endswith("ORDER BY products.updated_at, products.id")
+    bound = [value for value in compiled.params.values() if isinstance(value, datetime)]
+    assert bound == [datetime(2024, 1, 1, 0, 30)]  # noqa: DTZ001
+
+
+async def test_csv_header_is_sent_before_rows() -> None:
+    """The header goes out before the first cursor batch is fetched."""
+
+    session = AsyncMock(spec=AsyncSession)
+    projection = Projection(("id", "name"), aliases=False)
+    chunks = stream_export(session, export_query(projection), projection, "csv")
+    assert await chunks.__anext__() == b"id,name\n"
+    session.stream.assert_not_called()
+
+
+def test_export_rejects_unknown_format_and_fields() -> None:
+    """Unsupported formats are 422s; unknown fields are 400s."""
+    assert (
+        client.get("/api/v1/products/export?format=xml").status_code
+        == HTTPStatus.UNPROCESSABLE_ENTITY
+    )
+    assert (
+        client.get("/api/v1/products/export?fields=nope").status_code
+        == HTTPStatus.BAD_REQUEST
+    )
@@ -0,0 +1,227 @@
+"""Tests for the trigram fuzzy-search fallback."""
+
+import json
+from datetime import UTC, datetime
+from http import HTTPStatus
+from types import SimpleNamespace
+from typing import Any
+from unittest.mock import AsyncMock, MagicMock
+from uuid import UUID, uuid4
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import ClauseElement
+
+from api.app.fuzzy import FUZZY_MIN_HITS, fuzzy_product_ids
+from api.app.main import app
+from api.app.projection import Projection
+from api.app.routers import products as products_router
+from api.app.routers.products import _append_fuzzy_matches
+from api.app.schemas.products import Product as ProductSchema
+from api.app.schemas.products import ProductSearchResult
+
+client = TestClient(app)
+
+
+def compiled(statement: ClauseElement) -> str:
+    """SQL of a statement with its parameters inlined."""
+    return str(
+        statement.compile(
+            dialect=postgresql.dialect(),
+            compile_kwargs={"literal_binds": True},
+        ),
+    )
+
+
+def fake_session(*results: object) -> AsyncMock:
+    """A session whose executes return ``results`` in turn."""
+    session = AsyncMock(spec=AsyncSession)
+    session.execute.side_effect = list(results)
+    return session
+
+
+def scalars(values: list[Any]) -> MagicMock:
+    result = MagicMock()
+    result.scalars.return_value.all.return_value = values
+    return result
+
+
+def product(name: str) -> ProductSchema:
+    now = datetime.now(UTC)
+    return ProductSchema.model_validate(
+        {
+            "id": uuid4(),
+            "name": name,
+            "game": "Pokemon",
+            "category": "Pokemon",
+            "created_at": now,
+            "updated_at": now,
+        },
+    )
+
+
+async def test_threshold_is_set_for_the_transaction_only() -> None:
+    """The similarity threshold is a transaction-local setting, set first."""
+    session = fake_session(None, scalars([]))
+    await fuzzy_product_ids(session, "charzard", threshold=0.55, limit=5)
+
+    setting, _ = (call.args[0] for call in session.execute.call_args_list)
+    # is_local=true: the pooled connection goes back with the default
+    assert "set_config('pg_trgm.word_similarity_threshold', '0.55', true)" in (
+        compiled(setting)
+    )
+
+
+async def test_match_query_uses_indexed_word_similarity() -> None:
+    """Names and aliases are matched with ``<%`` on the indexed expressions."""
+    found = [uuid4(), uuid4()]
+    session = fake_session(None, scalars(found))
+    product_ids = await fuzzy_product_ids(
+        session,
+        "Charzard",
+        threshold=0.4,
+        limit=5,
+        game="poke",
+        set_name="base",
+    )
+
+    assert product_ids == found
+    # The driver's paramstyle doubles each %
+    sql = compiled(session.execute.call_args_list[1].args[0])
+    assert "lower('Charzard') <%% lower(products.name)" in sql
+    assert "lower('Charzard') <%% lower(product_aliases.alias)" in sql
+    assert "products.game ILIKE '%%poke%%'" in sql
+    assert "products.set_name ILIKE '%%base%%'" in sql
+    assert sql.endswith("LIMIT 5")
+
+
+@pytest.fixture
+def search(monkeypatch: pytest.MonkeyPatch) -> SimpleNamespace:
+    """SQL search returning ``search.hits`` products; records fuzzy lookups."""
+    state = SimpleNamespace(hits=0, fuzzy_calls=[])
+
+    async def search_with_sql(
+        _session: object,
+        _q: str,
+        *,
+        page: int,
+        per_page: int,
+        **_options: object,
+    ) -> ProductSearchResult:
+        products = [product(f"Charizard {n}") for n in range(state.hits)]
+        return ProductSearchResult.model_validate(
+            {
+                "products": products,
+                "total": len(products),
+                "page": page,
+                "per_page": per_page,
+                "has_next": False,
+                "has_prev": page > 1,
+            },
+        )
+
+    async def fuzzy(_session: object, _q: str, **options: object) -> list[UUID]:
+        state.fuzzy_calls.append(options)
+        return []
+
+    monkeypatch.setattr(products_router, "_search_with_sql", search_with_sql)
+    monkeypatch.setattr(products_router, "fuzzy_product_ids", fuzzy)
+    return state
+
+
+def test_sparse_first_page_falls_back(search: SimpleNamespace) -> None:
+    """Fewer hits than ``FUZZY_MIN_HITS`` asks for trigram matches."""
+    search.hits = FUZZY_MIN_HITS - 1
+    response = client.get(
+        "/api/v1/products/search",
+        params={"q": "charzard", "game": "poke", "similarity": 0.7, "per_page": 10},
+    )
+    assert response.status_code == HTTPStatus.OK
+    assert search.fuzzy_calls == [
+        {
+            "threshold": 0.7,
+            "limit": 10,
+            "game": "poke",
+            "category": None,
+            "set_name": None,
+        },
+    ]
+
+
+@pytest.mark.parametrize(
+    ("hits", "params"),
+    [
+        (FUZZY_MIN_HITS, {}),
+        (2, {"per_page": 2}),
+        (0, {"page": 2}),
+        (0, {"fuzzy": "false"}),
+    ],
+)
+def test_no_fallback_otherwise(
+    search: SimpleNamespace,
+    hits: int,
+    params: dict[str, Any],
+) -> None:
+    """Enough hits, a full short page, later pages and opting out skip it."""
+    search.hits = hits
+    response = client.get("/api/v1/products/search", params={"q": "x", **params})
+    assert response.status_code == HTTPStatus.OK
+    assert search.fuzzy_calls == []
+
+
+@pytest.mark.parametrize("similarity", [0.05, 1.5])
+def test_similarity_outside_range_is_rejected(
+    search: SimpleNamespace,
+    similarity: float,
+) -> None:
+    """Thresholds must lie in [0.1, 1]."""
+    response = client.get(
+        "/api/v1/products/search",
+        params={"q": "x", "similarity": similarity},
+    )
+    assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+    assert search.fuzzy_calls == []
+
+
+async def test_appended_matches_skip_hits_and_fill_the_page(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Fuzzy matches already on the page are dropped; the rest fill it."""
+    hit = product("Charizard")
+    extra = [uuid4(), uuid4()]
+
+    async def fuzzy(_session: object, _q: str, **_options: object) -> list[UUID]:
+        return [hit.id, *extra]
+
+    monkeypatch.setattr(products_router, "fuzzy_product_ids", fuzzy)
+    rows = [
+        SimpleNamespace(_mapping={"id": pid, "name": "Charzard"}, id=pid)
+        for pid in extra
+    ]
+    projection = Projection.parse("name", None)
+    result = ProductSearchResult.model_validate(
+        {
+            "products": [hit],
+            "total": 1,
+            "page": 1,
+            "per_page": 2,
+            "has_next": False,
+            "has_prev": False,
+        },
+    )
+
+    result = await _append_fuzzy_matches(
+        fake_session(rows),
+        result,
+        "charzard",
+        threshold=0.4,
+        game=None,
+        category=None,
+        set_name=None,
+        projection=projection,
+    )
+    page = json.loads(projection.dump(result))
+    assert [found["id"] for found in page["products"]] == [str(hit.id), str(extra[0])]
+    assert (result.total, result.fuzzy) == (2, True)
@@ -0,0 +1,230 @@
+"""Tests for bulk ingest parsing and natural keys."""
+
+import json
+from collections.abc import AsyncIterator
+from http import HTTPStatus
+from uuid import uuid4
+
+import pytest
+from fastapi.testclient import TestClient
+
+from api.app import ingest
+from api.app.ingest import (
+    IngestReport,
+    NotAnArrayError,
+    TooManyRowsError,
+    _key_join,
+    natural_key,
+    parse_json_array,
+    parse_ndjson,
+)
+from api.app.main import app
+from api.app.schemas.products import ProductIngest, ProductIngestOutcome
+
+client = TestClient(app)
+
+
+async def chunked(data: bytes, size: int) -> AsyncIterator[bytes]:
+    """Yield ``data`` in fixed-size chunks, like a request body stream."""
+    for start in range(0, len(data), size):
+        yield data[start : start + size]
+
+
+async def test_parse_ndjson_across_chunk_boundaries() -> None:
+    """Lines split across chunks are reassembled; bad rows are reported."""
+    body = (
+        b'{"name": "Charizard", "game": "Pokemon", "category": "Pokemon"}\n'
+        b"\n"
+        b"{not json}\n"
+        b'{"game": "Pokemon"}\n'
+        b'{"name": "Pok\xe9mon"}\n'
+        b'{"name": "Black Lotus", "game": "Magic", "category": "Magic", "aliases": [{"alias": "Lotus", "alias_type": "nickname"}]}'
+    )
+    rows = await parse_ndjson(chunked(body, 7))
+
+    assert [row.index for row in rows] == [0, 1, 2, 3, 4]
+    charizard, undecodable, invalid, not_utf8, lotus = rows
+    assert charizard.product is not None
+    assert charizard.product.name == "Charizard"
+    assert undecodable.error is not None
+    assert undecodable.error.startswith("Invalid JSON")
+    assert invalid.error is not None
+    assert "name" in invalid.error
+    assert not_utf8.error == "Invalid UTF-8"
+    assert lotus.product is not None
+    assert lotus.product.aliases[0].alias == "Lotus"
+
+
+async def test_parse_ndjson_enforces_row_limit(monkeypatch: pytest.MonkeyPatch) -> None:
+    """More rows than the limit is rejected while streaming."""
+    monkeypatch.setattr(ingest, "BULK_INGEST_MAX_ROWS", 2)
+    body = b'{"name": "A", "game": "G"}\n' * 3
+    with pytest.raises(TooManyRowsError):
+        await parse_ndjson(chunked(body, 64))
+
+
+def test_bulk_ingest_only_maps_the_row_limit_to_413(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Too many rows is 413; a body that is not UTF-8 is a 400."""
+    monkeypatch.setattr(ingest, "BULK_INGEST_MAX_ROWS", 1)
+    rows = [{"name": "A", "game": "G", "category": "G"}] * 2
+    assert (
+        client.post("/api/v1/products/bulk", json=rows).status_code
+        == HTTPStatus.REQUEST_ENTITY_TOO_LARGE
+    )
+
+    response = client.post(
+        "/api/v1/products/bulk",
+        content=b'[{"name": "Pok\xe9mon"}]',
+        headers={"Content-Type": "application/json"},
+    )
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+    assert response.json()["detail"] == "Body is not valid UTF-8"
+
+
+@pytest.mark.parametrize(
+    ("body", "status_code"),
+    [
+        (b"[{}, ", HTTPStatus.BAD_REQUEST),
+        (b'{"name": "A"}', HTTPStatus.UNPROCESSABLE_ENTITY),
+    ],
+)
+def test_bulk_ingest_rejects_bodies_that_are_not_arrays(
+    body: bytes,
+    status_code: HTTPStatus,
+) -> None:
+    """Malformed JSON is a 400; well-formed JSON other than an array a 422."""
+    response = client.post(
+        "/api/v1/products/bulk",
+        content=body,
+        headers={"Content-Type": "application/json"},
+    )
+    assert response.status_code == status_code
+
+
+async def test_parse_json_array_across_chunk_boundaries() -> None:
+    """Elements split across chunks are reassembled and validated one by one."""
+    body = (
+        b' [ {"name": "Pikachu", "game": "Pokemon", "category": "Pokemon",'
+        b' "market_price": 12.5} ,\n{"name": ""}, 12345, null ]\n'
+    )
+    rows = await parse_json_array(chunked(body, 3))
+
+    assert [row.index for row in rows] == [0, 1, 2, 3]
+    pikachu, *invalid = rows
+    assert pikachu.product is not None
+    assert str(pikachu.product.market_price) == "12.5"
+    assert all(row.product is None and row.error for row in invalid)
+    assert await parse_json_array(chunked(b"[ ]", 1)) == []
+
+
+@pytest.mark.parametrize(
+    ("body", "error"),
+    [
+        (b"", json.JSONDecodeError),
+        (b'{"name": "Pikachu"}', NotAnArrayError),
+        (b"[{}, ]", json.JSONDecodeError),
+        (b"[{} {}]", json.JSONDecodeError),
+        (b"[{}", json.JSONDecodeError),
+        (b"[{}] []", json.JSONDecodeError),
+        (b'[{"name": "Pok\xe9mon"}]', UnicodeDecodeError),
+    ],
+)
+async def test_parse_json_array_rejects_malformed_bodies(
+    body: bytes,
+    error: type[Exception],
+) -> None:
+    """Bad JSON, bad UTF-8 and values other than an array are errors."""
+    with pytest.raises(error):
+        await parse_json_array(chunked(body, 4))
+
+
+async def test_parse_json_array_enforces_row_limit_while_streaming(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """The row past the limit is rejected before the rest is read."""
+    monkeypatch.setattr(ingest, "BULK_INGEST_MAX_ROWS", 2)
+    row = b'{"name": "A", "game": "G", "category": "G"}'
+
+    async def body() -> AsyncIterator[bytes]:
+        yield b"[" + b",".join([row] * 3)
+        pytest.fail("read past the row limit")
+
+    with pytest.raises(TooManyRowsError):
+        await parse_json_array(body())
+
+
+def test_natural_key_treats_missing_parts_as_empty() -> None:
+    """Missing set and variant compare equal, as in the unique index."""
+    products = [
+        ProductIngest.model_validate(payload)
+        for payload in [
+            {
+                "name": "Black Lotus",
+                "game": "Magic",
+                "category": "Magic",
+                "set_name": "Alpha",
+            },
+            {
+                "name": "Black Lotus",
+                "game": "Magic",
+                "category": "Magic",
+                "set_name": "Alpha",
+                "variant": "",
+                "card_number": "",
+            },
+            {
+                "name": "Mox Pearl",
+                "game": "Magic",
+                "category": "Magic",
+                "set_name": "Alpha",
+            },
+        ]
+    ]
+    keys = [natural_key(product) for product in products]
+    assert keys[0] == keys[1] == ("Magic", "Alpha", "Black Lotus", "")
+    assert keys[2] != keys[0]
+
+
+def test_natural_key_ignores_the_name_of_numbered_cards() -> None:
+    """A corrected name keys to the same numbered card."""
+    first, second = (
+        ProductIngest.model_validate(
+            {
+                "name": name,
+                "game": "Pokemon",
+                "category": "Pokemon",
+                "set_name": "Base Set",
+                "card_number": "4/102",
+            },
+        )
+        for name in ("Charizard", "Charizard Holo")
+    )
+    assert natural_key(first) == natural_key(second)
+
+
+def test_key_join_matches_index_expressions() -> None:
+    """Staging rows join to products on the same expressions as the index."""
+    join = _key_join("p", "s")
+    assert "COALESCE(p.set_name, '') = COALESCE(s.set_name, '')" in join
+    assert (
+        "COALESCE(NULLIF(p.card_number, ''), p.name)"
+        " = COALESCE(NULLIF(s.card_number, ''), s.name)"
+    ) in join
+    assert "p.name = s.name" not in join
+
+
+def test_changed_ids_include_products_with_changed_aliases() -> None:
+    """A product whose row was unchanged but whose aliases changed is changed."""
+    inserted, unchanged, untouched = uuid4(), uuid4(), uuid4()
+    report = IngestReport(
+        outcomes=[
+            ProductIngestOutcome(row=0, status="inserted", id=inserted),
+            ProductIngestOutcome(row=1, status="unchanged", id=unchanged),
+            ProductIngestOutcome(row=2, status="unchanged", id=untouched),
+        ],
+        aliases_written=2,
+        alias_product_ids={inserted, unchanged},
+    )
+    assert report.changed_ids == {inserted, unchanged}
@@ -0,0 +1,124 @@
+"""Tests for the seed and catalog loader script."""
+
+import gzip
+from pathlib import Path
+
+import pytest
+
+from scripts import load_seed_data
+from scripts.load_seed_data import csv_payload, data_format, iter_rows, sql_files
+
+CSV_HEADER = "name,game,category,set_name,aliases\n"
+CSV_ROWS = (
+    'Charizard,Pokemon,Pokemon,Base Set,"[{""alias"": ""Zard"", '
+    '""alias_type"": ""nickname"", ""search_weight"": 9}]"\n'
+    "Pikachu,Pokemon,Pokemon,,\n"
+    "Broken,Pokemon,Pokemon,,[not json\n"
+)
+NDJSON_ROWS = (
+    '{"name": "Charizard", "game": "Pokemon", "category": "Pokemon"}\n'
+    "\n"
+    "{not json\n"
+    '{"name": "", "game": "Pokemon", "category": "Pokemon"}\n'
+)
+
+
+def write(path: Path, text: str) -> Path:
+    """Write ``text`` to ``path``, gzipped when it ends in ``.gz``."""
+    if path.suffix == ".gz":
+        path.write_bytes(gzip.compress(text.encode()))
+    else:
+        path.write_text(text)
+    return path
+
+
+@pytest.mark.parametrize(
+    ("name", "expected"),
+    [
+        ("catalog.csv", "csv"),
+        ("catalog.csv.gz", "csv"),
+        ("catalog.ndjson", "ndjson"),
+        ("catalog.jsonl", "ndjson"),
+        ("dump.2024.ndjson.gz", "ndjson"),
+    ],
+)
+def test_data_format_looks_through_gzip(name: str, expected: str) -> None:
+    """The format comes from the suffix before any ``.gz``."""
+    assert data_format(Path(name)) == expected
+
+
+@pytest.mark.parametrize("name", ["catalog.json", "catalog.gz", "catalog", "a.txt.gz"])
+def test_unsupported_files_are_rejected(name: str) -> None:
+    """Anything else is refused before loading starts."""
+    with pytest.raises(ValueError, match="Unsupported catalog file"):
+        data_format(Path(name))
+
+
+def test_csv_payload_drops_empty_cells_and_decodes_aliases() -> None:
+    """Empty cells are left out and the aliases cell is a JSON array."""
+    payload = csv_payload(
+        {
+            "name": "Charizard",
+            "set_name": "",
+            "aliases": '[{"alias": "Zard", "alias_type": "nickname"}]',
+        },
+    )
+    assert payload == {
+        "name": "Charizard",
+        "aliases": [{"alias": "Zard", "alias_type": "nickname"}],
+    }
+
+
+@pytest.mark.parametrize("name", ["catalog.csv", "catalog.csv.gz"])
+def test_iter_rows_reads_csv(tmp_path: Path, name: str) -> None:
+    """CSV rows validate like API rows; bad alias JSON rejects only its row."""
+    rows = list(iter_rows(write(tmp_path / name, CSV_HEADER + CSV_ROWS)))
+
+    assert [row.index for row in rows] == [0, 1, 2]
+    charizard, pikachu, broken = rows
+    assert charizard.product is not None
+    assert [alias.alias for alias in charizard.product.aliases] == ["Zard"]
+    assert pikachu.product is not None
+    assert pikachu.product.set_name is None
+    assert broken.product is None
+    assert broken.error is not None
+    assert broken.error.startswith("Invalid aliases JSON")
+
+
+@pytest.mark.parametrize("name", ["catalog.ndjson", "catalog.jsonl.gz"])
+def test_iter_rows_reads_ndjson(tmp_path: Path, name: str) -> None:
+    """Blank lines are skipped; undecodable and invalid lines become errors."""
+    rows = list(iter_rows(write(tmp_path / name, NDJSON_ROWS)))
+
+    assert [row.index for row in rows] == [0, 1, 2]
+    valid, undecodable, invalid = rows
+    assert valid.product is not None
+    assert valid.product.name == "Charizard"
+    assert undecodable.error is not None
+    assert undecodable.error.startswith("Invalid JSON")
+    assert invalid.product is None
+    assert invalid.error is not None
+
+
+def test_sql_files_run_schema_then_seeds_in_name_order(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Every DDL file comes before any seed file; other files are ignored."""
+    for name in [
+        "warehouse/seeds/02_b.sql",
+        "warehouse/seeds/01_a.sql",
+        "warehouse/ddl/10_late.sql",
+        "warehouse/ddl/02_early.sql",
+        "warehouse/ddl/README.md",
+    ]:
+        (tmp_path / name).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / name).write_text("")
+    monkeypatch.setattr(load_seed_data, "project_root", tmp_path)
+
+    assert [path.relative_to(tmp_path).as_posix() for path in sql_files()] == [
+        "warehouse/ddl/02_early.sql",
+        "warehouse/ddl/10_late.sql",
+        "warehouse/seeds/01_a.sql",
+        "warehouse/seeds/02_b.sql",
+    ]
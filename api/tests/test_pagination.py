@@ -0,0 +1,38 @@
+"""Tests for keyset pagination cursors."""
+
+from uuid import uuid4
+
+import pytest
+
+from api.app.pagination import decode_cursor, encode_cursor
+
+from .test_search_index import build_index
+
+
+def test_cursor_round_trip() -> None:
+    """Cursors decode back to the sort-key values they were built from."""
+    product_id = uuid4()
+    cursor = encode_cursor("Black Lotus", product_id)
+
+    assert "=" not in cursor
+    assert decode_cursor(cursor, 2) == ["Black Lotus", str(product_id)]
+
+
+@pytest.mark.parametrize("cursor", ["not-base64!", "bm90LWpzb24", encode_cursor(1)])
+def test_invalid_cursor_rejected(cursor: str) -> None:
+    """Garbage or wrongly shaped cursors raise ValueError."""
+    with pytest.raises(ValueError, match="cursor"):
+        decode_cursor(cursor, 2)
+
+
+def test_index_search_resumes_after_cursor_key() -> None:
+    """Walking the index by last_key visits every hit exactly once."""
+    index, charizard, pikachu, _ = build_index()
+
+    first = index.search("base", limit=1)
+    second = index.search("base", limit=1, after=first.last_key)
+    third = index.search("base", limit=1, after=second.last_key)
+
+    assert first.product_ids == [charizard.id]
+    assert second.product_ids == [pikachu.id]
+    assert (third.product_ids, third.total) == ([], 2)
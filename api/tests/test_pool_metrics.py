@@ -0,0 +1,66 @@
+"""Tests for pool instrumentation and engine configuration."""
+
+from typing import Any
+from unittest.mock import MagicMock
+
+import pytest
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.util import greenlet_spawn
+
+from api.app.database import get_engine_options
+from api.app.pool_metrics import InstrumentedPool, PoolMetrics
+
+
+def make_pool(**kwargs: Any) -> InstrumentedPool:
+    """Instrumented pool over fake DBAPI connections."""
+    return InstrumentedPool(MagicMock, **kwargs)
+
+
+async def test_pool_counts_checkouts_connects_and_timeouts() -> None:
+    """Exhausting the pool records a timeout and leaves no waiters behind."""
+    pool = make_pool(pool_size=1, max_overflow=0, timeout=0.01)
+
+    first = await greenlet_spawn(pool.connect)
+    with pytest.raises(PoolTimeoutError):
+        await greenlet_spawn(pool.connect)
+    first.close()
+    second = await greenlet_spawn(pool.connect)
+    second.close()
+
+    stats = pool.metrics.as_dict()
+    counters = ("checkouts", "connects", "timeouts", "waiting")
+    assert [stats[name] for name in counters] == [3, 1, 1, 0]
+    # The timed-out checkout waited the whole 10 ms timeout
+    assert stats["acquire_ms"]["max"] >= pool.timeout() * 1000
+
+
+def test_recreated_pool_keeps_metrics() -> None:
+    """dispose() recreates the pool; counters carry over."""
+    pool = make_pool(pool_size=1)
+    pool.metrics.timeouts = 3
+    assert pool.recreate().metrics is pool.metrics
+
+
+def test_metrics_percentiles_and_cache_ratio() -> None:
+    """Acquire percentiles come from recent samples; hit ratio from lookups."""
+    metrics = PoolMetrics(statement_cache_hits=3, statement_cache_misses=1)
+    for ms in range(1, 101):
+        metrics.record_acquire(ms / 1000)
+
+    stats = metrics.as_dict()
+    assert stats["acquire_ms"]["p50"] == pytest.approx(50.5)
+    assert stats["acquire_ms"]["max"] == pytest.approx(100)
+    assert stats["statement_cache"]["hit_ratio"] == pytest.approx(3 / 4)
+
+
+def test_engine_options_from_environment(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Echo is off by default; pool and cache sizes follow the environment."""
+    monkeypatch.setenv("DATABASE_POOL_SIZE", "25")
+    monkeypatch.setenv("DATABASE_STATEMENT_CACHE_SIZE", "0")
+    monkeypatch.delenv("DATABASE_ECHO", raising=False)
+
+    options = get_engine_options()
+    assert (options["echo"], options["pool_size"]) == (False, 25)
+    assert options["poolclass"] is InstrumentedPool
+    assert options["connect_args"]["prepared_statement_cache_size"] == 0
+    assert options["connect_args"]["statement_cache_size"] == 0
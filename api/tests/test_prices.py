@@ -0,0 +1,120 @@
+"""Tests for the price observation store."""
+
+import asyncio
+from collections.abc import Sequence
+from datetime import UTC, date, datetime, timedelta
+from decimal import Decimal
+from http import HTTPStatus
+from typing import Any
+from uuid import uuid4
+
+import pytest
+from fastapi.testclient import TestClient
+from pydantic import ValidationError
+
+from api.app.main import app
+from api.app.prices import (
+    PriceAppendBuffer,
+    SaleKey,
+    _create_partition_sql,
+    add_months,
+    plan_partitions,
+)
+from api.app.schemas.prices import PriceObservationCreate
+
+client = TestClient(app)
+
+
+def observation(listing_id: str, **overrides: Any) -> PriceObservationCreate:
+    """A valid observed sale."""
+    values = {
+        "product_id": uuid4(),
+        "source": "ebay",
+        "listing_id": listing_id,
+        "sold_at": datetime(2024, 3, 1, 12, tzinfo=UTC),
+        "price": Decimal("12.50"),
+    }
+    values.update(overrides)
+    return PriceObservationCreate.model_validate(values)
+
+
+def test_add_months_crosses_years() -> None:
+    """Month arithmetic wraps in both directions."""
+    assert add_months(date(2024, 11, 1), 3) == date(2025, 2, 1)
+    assert add_months(date(2024, 1, 1), -1) == date(2023, 12, 1)
+
+
+def test_plan_creates_window_and_drops_expired() -> None:
+    """Missing months in the window are created; older months are dropped."""
+    plan = plan_partitions(
+        ["prices_raw_default", "prices_raw_2023_12", "prices_raw_2024_01"],
+        today=date(2024, 3, 15),
+        retention_months=2,
+        months_ahead=1,
+    )
+    assert plan.create == [date(2024, 2, 1), date(2024, 3, 1), date(2024, 4, 1)]
+    assert plan.drop == ["prices_raw_2023_12"]
+
+
+def test_partition_bounds_are_utc_months() -> None:
+    """A partition covers exactly one UTC month."""
+    sql = _create_partition_sql(date(2024, 12, 1))
+    assert sql.startswith("CREATE TABLE IF NOT EXISTS prices_raw_2024_12 ")
+    assert sql.endswith("FROM ('2024-12-01 00:00+00') TO ('2025-01-01 00:00+00')")
+
+
+def test_sold_at_is_normalized_and_bounded() -> None:
+    """Naive sale times are UTC; sale times in the future are rejected."""
+    naive = observation("a", sold_at=datetime(2024, 3, 1, 12))  # noqa: DTZ001
+    assert naive.sold_at == datetime(2024, 3, 1, 12, tzinfo=UTC)
+    with pytest.raises(ValidationError, match="future"):
+        observation("b", sold_at=datetime.now(UTC) + timedelta(days=2))
+
+
+async def test_buffer_coalesces_concurrent_appends() -> None:
+    """Concurrent callers share one write and each learns its own new rows."""
+    writes: list[int] = []
+
+    async def writer(observations: Sequence[PriceObservationCreate]) -> set[SaleKey]:
+        writes.append(len(observations))
+        # "a" was already stored
+        return {o.key for o in observations if o.listing_id != "a"}
+
+    buffer = PriceAppendBuffer(writer, max_rows=100, max_delay=0.01)
+    first, second = await asyncio.gather(
+        buffer.append([observation("a"), observation("b")]),
+        buffer.append([observation("c")]),
+    )
+    assert writes == [3]
+    assert (first, second) == (1, 1)
+
+
+async def test_buffer_writes_full_batches_immediately_and_propagates_errors() -> None:
+    """Reaching max_rows writes without waiting; write errors reach callers."""
+
+    async def writer(_observations: Sequence[PriceObservationCreate]) -> set[SaleKey]:
+        msg = "database is down"
+        raise RuntimeError(msg)
+
+    buffer = PriceAppendBuffer(writer, max_rows=1, max_delay=60)
+    with pytest.raises(RuntimeError, match="down"):
+        await asyncio.wait_for(buffer.append([observation("a")]), timeout=1)
+    await buffer.close()
+
+
+def test_history_rejects_empty_range() -> None:
+    """start must come before end."""
+    response = client.get(
+        f"/api/v1/products/{uuid4()}/prices",
+        params={"start": "2024-02-01T00:00:00Z", "end": "2024-01-01T00:00:00Z"},
+    )
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+
+
+def test_append_validates_before_buffering() -> None:
+    """Malformed observations fail the request with 422."""
+    response = client.post(
+        "/api/v1/prices",
+        json={"observations": [{"product_id": str(uuid4()), "price": "-1"}]},
+    )
+    assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
@@ -0,0 +1,28 @@
+"""Tests for the batch product fetch endpoint's request validation."""
+
+from http import HTTPStatus
+from uuid import uuid4
+
+from fastapi.testclient import TestClient
+
+from api.app.main import app
+from api.app.schemas.products import PRODUCT_BATCH_MAX_IDS
+
+client = TestClient(app)
+
+
+def test_batch_rejects_too_many_ids() -> None:
+    """Requests over the ID limit fail validation before touching the DB."""
+    ids = [str(uuid4()) for _ in range(PRODUCT_BATCH_MAX_IDS + 1)]
+    response = client.post("/api/v1/products/batch", json={"ids": ids})
+    assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+
+
+def test_batch_rejects_empty_and_malformed_ids() -> None:
+    """An empty list or a non-UUID entry is a validation error."""
+    assert (
+        client.post("/api/v1/products/batch", json={"ids": []}).status_code
+        == HTTPStatus.UNPROCESSABLE_ENTITY
+    )
+    response = client.post("/api/v1/products/batch", json={"ids": ["not-a-uuid"]})
+    assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
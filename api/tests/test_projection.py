@@ -0,0 +1,113 @@
+"""Tests for sparse product fieldsets."""
+
+from types import SimpleNamespace
+from typing import Any, cast
+from unittest.mock import AsyncMock
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import Row
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from api.app.projection import PRODUCT_FIELDS, Projection
+from api.app.schemas.products import Product as ProductSchema
+from api.app.schemas.products import ProductPage
+
+
+def make_row(**values: Any) -> Row[Any]:
+    """Row-like object exposing ``_mapping`` and attribute access."""
+    return cast("Row[Any]", SimpleNamespace(_mapping=values, **values))
+
+
+def test_default_projection_is_the_full_product() -> None:
+    """No parameters keeps the existing representation, aliases included."""
+    projection = Projection.parse(None, None)
+    assert projection.full
+    assert projection.cache_key is None
+    assert projection.model is ProductSchema
+    assert projection.envelope(ProductPage) is ProductPage
+
+
+def test_fields_drop_aliases_unless_included() -> None:
+    """Asking for fields returns only those (plus id), without aliases."""
+    projection = Projection.parse("market_price, name", None)
+    assert projection.fields == ("name", "market_price", "id")
+    assert not projection.aliases
+    assert projection.cache_key == "name,market_price,id"
+
+    with_aliases = Projection.parse("name", "aliases")
+    assert with_aliases.aliases
+    assert with_aliases.cache_key == "name,id+aliases"
+
+
+def test_empty_include_drops_aliases_from_full_fields() -> None:
+    """``include=`` with no value returns every column but no aliases."""
+    projection = Projection.parse(None, "")
+    assert projection.fields == PRODUCT_FIELDS
+    assert not projection.aliases
+    assert not projection.full
+
+
+def test_unknown_names_are_rejected() -> None:
+    """Unknown fields or includes raise ValueError."""
+    with pytest.raises(ValueError, match="search_vector"):
+        Projection.parse("name,search_vector", None)
+    with pytest.raises(ValueError, match="prices"):
+        Projection.parse(None, "prices")
+
+
+def test_select_is_column_only() -> None:
+    """The projection compiles to a select of just the needed columns."""
+    sql = str(
+        Projection.parse("market_price", None)
+        .select()
+        .compile(dialect=postgresql.dialect()),
+    )
+    assert sql.startswith(
+        "SELECT products.id, products.name, products.market_price \nFROM products",
+    )
+
+
+async def test_load_serializes_lean_models_without_alias_query() -> None:
+    """Without aliases, rows serialize straight to the lean model."""
+    projection = Projection.parse("name,market_price", None)
+    product_id = uuid4()
+    row = make_row(id=product_id, name="Charizard", market_price=None, rank=0.5)
+
+    session = AsyncMock(spec=AsyncSession)
+    (product,) = await projection.load(session, [row], fast=False)
+    session.execute.assert_not_awaited()
+    assert product.model_dump() == {
+        "name": "Charizard",
+        "market_price": None,
+        "id": product_id,
+    }
+
+    page = projection.envelope(ProductPage)(
+        products=[product],
+        per_page=1,
+        next_cursor=None,
+    )
+    assert set(page.model_dump()["products"][0]) == {"id", "name", "market_price"}
+
+
+async def test_fast_and_model_paths_dump_identically() -> None:
+    """Both load paths serialize a page to the same bytes."""
+    projection = Projection.parse("name,market_price", None)
+    row = make_row(id=uuid4(), name="Pikachu", market_price=None)
+
+    pages = [
+        projection.dump(
+            ProductPage.model_construct(
+                products=await projection.load(
+                    AsyncMock(spec=AsyncSession),
+                    [row],
+                    fast=fast,
+                ),
+                per_page=20,
+            ),
+        )
+        for fast in (True, False)
+    ]
+    assert pages[0] == pages[1]
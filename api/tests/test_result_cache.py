@@ -0,0 +1,187 @@
+"""Tests for the product result cache and its invalidation."""
+
+from types import SimpleNamespace
+from uuid import uuid4
+
+import fakeredis
+import pytest
+
+from api.app import result_cache
+from api.app.result_cache import (
+    MemoryCacheBackend,
+    ProductScope,
+    RedisCacheBackend,
+    ResultCache,
+    scope_matches,
+)
+
+
+def make_scope(
+    name: str,
+    game: str = "Pokemon",
+    category: str = "Pokemon",
+    set_name: str = "Base Set",
+) -> ProductScope:
+    """Build a product scope from product-like attributes."""
+    product = SimpleNamespace(
+        id=uuid4(),
+        name=name,
+        game=game,
+        category=category,
+        set_name=set_name,
+        variant=None,
+    )
+    return ProductScope.of(product)
+
+
+@pytest.fixture
+def cache() -> ResultCache:
+    """A result cache over a small in-memory backend."""
+    return ResultCache(MemoryCacheBackend(max_entries=100, ttl=60))
+
+
+def test_keys_normalize_text_but_not_cursors() -> None:
+    """Query text is case-folded; opaque cursors are kept verbatim."""
+    assert ResultCache.key("search", q="Base  Set", page=1) == ResultCache.key(
+        "search",
+        q="base set",
+        page=1,
+    )
+    assert ResultCache.key("page", cursor="AbC") != ResultCache.key(
+        "page",
+        cursor="abc",
+    )
+
+
+def test_scope_matching() -> None:
+    """Filters and query tokens decide whether a product can appear."""
+    charizard = make_scope("Charizard")
+    assert scope_matches({"q": "chariz"}, charizard)
+    assert scope_matches({"q": "base charizards"}, charizard)
+    assert scope_matches({"game": "poke"}, charizard)
+    assert not scope_matches({"q": "lotus"}, charizard)
+    assert not scope_matches({"q": "charizard", "game": "magic"}, charizard)
+    # Fuzzy listings can hold any product that passes the filters
+    assert scope_matches({"q": "lotsu", "fuzzy": "1"}, charizard)
+
+
+async def test_write_invalidates_only_affected_entries(cache: ResultCache) -> None:
+    """A new Pokemon card drops Pokemon listings but not Magic ones."""
+    charizard = make_scope("Charizard")
+    await cache.set(
+        "search-char",
+        b"[1]",
+        [charizard.id],
+        scope=ResultCache.scope("search", q="char"),
+    )
+    await cache.set(
+        "list-magic",
+        b"[2]",
+        [],
+        scope=ResultCache.scope("list", game="Magic"),
+    )
+    await cache.set("product-char", b"{}", [charizard.id])
+
+    dropped = await cache.invalidate_product(None, make_scope("Charmander"))
+
+    assert dropped == 1
+    assert await cache.get("search-char") is None
+    assert await cache.get("list-magic") == b"[2]"
+    assert await cache.get("product-char") == b"{}"
+
+
+async def test_update_invalidates_product_entries(cache: ResultCache) -> None:
+    """Updating a product drops its own entries and listings it left."""
+    lotus = make_scope("Black Lotus", game="Magic", category="Magic")
+    await cache.set("product-lotus", b"{}", [lotus.id])
+    await cache.set(
+        "search-lotus",
+        b"[]",
+        [lotus.id],
+        scope=ResultCache.scope("search", q="lotus"),
+    )
+
+    renamed = ProductScope(
+        id=lotus.id,
+        game=lotus.game,
+        category=lotus.category,
+        set_name=lotus.set_name,
+        tokens=frozenset({"mox", "pearl"}),
+    )
+    dropped = await cache.invalidate_product(lotus, renamed)
+    assert (dropped, await cache.stats()) == (
+        2,
+        {"hits": 0, "misses": 0, "evictions": 0, "entries": 0},
+    )
+
+
+async def test_disabled_cache_is_a_no_op() -> None:
+    """Without a backend every lookup misses and writes are ignored."""
+    cache = ResultCache(None)
+    await cache.set("key", b"payload", [uuid4()])
+    assert not cache.enabled
+    assert await cache.get("key") is None
+    assert await cache.stats() == {}
+
+
+@pytest.fixture
+def redis_backend() -> RedisCacheBackend:
+    """A Redis backend over an in-process fake server."""
+    backend = RedisCacheBackend("redis://localhost", ttl=60)
+    backend.client = fakeredis.FakeAsyncRedis()
+    return backend
+
+
+async def test_redis_scopes_expire_with_their_entries(
+    redis_backend: RedisCacheBackend,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Scopes of expired entries are skipped, then trimmed by the next write."""
+    clock = SimpleNamespace(time=lambda: 1000.0)
+    monkeypatch.setattr(result_cache, "time", clock)
+    cache = ResultCache(redis_backend)
+    charizard = make_scope("Charizard")
+    scope = ResultCache.scope("search", q="char")
+    await cache.set("search-char", b"[1]", [charizard.id], scope=scope)
+    assert await redis_backend.scopes() == [scope]
+
+    clock.time = lambda: 1061.0
+    assert await redis_backend.scopes() == []
+    await cache.set("list-magic", b"[2]", [], scope=ResultCache.scope("list"))
+    assert await redis_backend.client.zcard("cardfolio:scopes") == 1
+
+
+async def test_redis_write_invalidates_affected_entries(
+    redis_backend: RedisCacheBackend,
+) -> None:
+    """Invalidation drops matching listings and the product's own entries."""
+    cache = ResultCache(redis_backend)
+    charizard = make_scope("Charizard")
+    await cache.set(
+        "search-char",
+        b"[1]",
+        [charizard.id],
+        scope=ResultCache.scope("search"),
+    )
+    await cache.set("product-char", b"{}", [charizard.id])
+    await cache.set(
+        "list-magic",
+        b"[2]",
+        [],
+        scope=ResultCache.scope("list", game="Magic"),
+    )
+
+    dropped = await cache.invalidate_product(charizard, charizard)
+    assert (dropped, await cache.get("search-char")) == (2, None)
+    assert await cache.get("list-magic") == b"[2]"
+    assert await redis_backend.scopes() == [ResultCache.scope("list", game="Magic")]
+
+
+async def test_redis_outage_falls_through_as_misses() -> None:
+    """Without a reachable server, reads miss and writes are skipped."""
+    cache = ResultCache(RedisCacheBackend("redis://127.0.0.1:1"))
+    charizard = make_scope("Charizard")
+    await cache.set("search-char", b"[1]", [charizard.id], scope="scope:{}")
+    assert await cache.get("search-char") is None
+    assert await cache.invalidate_product(None, charizard) == 0
+    assert (await cache.stats())["misses"] == 1
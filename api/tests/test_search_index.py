@@ -0,0 +1,138 @@
+"""Tests for the in-memory product search index."""
+
+import time
+from types import SimpleNamespace
+from uuid import uuid4
+
+from api.app.search_index import SearchIndex, normalize, tokenize
+
+
+def make_product(
+    name: str,
+    game: str = "Pokemon",
+    category: str = "Pokemon",
+    set_name: str | None = None,
+    variant: str | None = None,
+) -> SimpleNamespace:
+    """Build a minimal product-like object for indexing."""
+    return SimpleNamespace(
+        id=uuid4(),
+        name=name,
+        game=game,
+        category=category,
+        set_name=set_name,
+        variant=variant,
+        image_url=f"https://img.example/{name}.jpg",
+    )
+
+
+def build_index() -> (
+    tuple[SearchIndex, SimpleNamespace, SimpleNamespace, SimpleNamespace]
+):
+    """Index a handful of seed-like products with aliases."""
+    index = SearchIndex()
+    charizard = make_product("Charizard", set_name="Base Set", variant="Holo")
+    pikachu = make_product("Pikachu", set_name="Base Set")
+    lotus = make_product(
+        "Black Lotus",
+        game="Magic: The Gathering",
+        category="Magic",
+        set_name="Alpha",
+    )
+    index.add(charizard, [("Zard", 8), ("Char", 5)])
+    index.add(pikachu, [("Pika", 8)])
+    index.add(lotus, [("Lotus", 9)])
+    return index, charizard, pikachu, lotus
+
+
+def test_normalize_and_tokenize() -> None:
+    """Accents are stripped and stopwords dropped."""
+    assert normalize("Pokémon") == "pokemon"
+    assert tokenize("Magic: The Gathering 4/102") == ["magic", "gathering", "4", "102"]
+
+
+def test_alias_and_name_lookup() -> None:
+    """Aliases, names and prefixes all resolve to the right product."""
+    index, charizard, pikachu, lotus = build_index()
+
+    assert index.search("Zard").product_ids == [charizard.id]
+    assert index.search("Pika").product_ids == [pikachu.id]
+    assert index.search("black lotus").product_ids == [lotus.id]
+    assert index.search("chariz").product_ids == [charizard.id]
+    assert index.search("mewtwo").total == 0
+
+
+def test_scoring_prefers_heavier_matches() -> None:
+    """Exact name matches outrank prefix-only matches."""
+    index, charizard, pikachu, _ = build_index()
+    base_set = index.search("base")
+    # Equal field weight, so ties fall back to name order
+    assert (base_set.total, base_set.product_ids) == (2, [charizard.id, pikachu.id])
+
+    result = index.search("char")
+    assert result.product_ids[0] == charizard.id
+
+
+def test_filters_and_pagination() -> None:
+    """Filters behave like ilike and pages are sliced after ordering."""
+    index, _, pikachu, _ = build_index()
+
+    totals = [index.search("base", game=game).total for game in ("poke", "magic")]
+    assert totals == [2, 0]
+
+    second_page = index.search("base", offset=1, limit=1)
+    assert (second_page.product_ids, second_page.total) == ([pikachu.id], 2)
+
+
+def test_add_replaces_and_discard_removes() -> None:
+    """Re-indexing a product drops its stale tokens."""
+    index, charizard, _, _ = build_index()
+
+    charizard.name = "Charizard EX"
+    index.add(charizard, [])
+    assert index.search("zard").total == 0
+    assert index.search("ex").product_ids == [charizard.id]
+
+    index.discard(charizard.id)
+    assert (index.search("charizard").total, len(index)) == (0, 2)
+
+
+def test_suggest_completes_names_and_aliases() -> None:
+    """Prefixes match name words and aliases, one suggestion per product."""
+    index, charizard, _, lotus = build_index()
+
+    assert [entry.id for entry in index.suggest("char")] == [charizard.id]
+    assert [entry.id for entry in index.suggest("lot")] == [lotus.id]
+    assert [entry.id for entry in index.suggest("black lo")] == [lotus.id]
+    assert index.suggest("pika")[0].image_url == "https://img.example/Pikachu.jpg"
+    assert index.suggest("zzz") == []
+
+    index.discard(lotus.id)
+    assert index.suggest("lot") == []
+
+
+def test_lookup_latency_at_catalog_scale() -> None:
+    """Alias lookups stay well under 1ms with 100k indexed products."""
+    products = [
+        make_product(f"Card {i}", set_name=f"Set {i % 500}") for i in range(100_000)
+    ]
+    index = SearchIndex()
+    index.load(
+        products,
+        {product.id: [(f"alias{i:06d}", 5)] for i, product in enumerate(products)},
+    )
+
+    start = time.perf_counter()
+    for i in range(0, 100_000, 1000):
+        assert index.search(f"alias{i:06d}").total == 1
+    elapsed_ms = (time.perf_counter() - start) * 1000 / 100
+
+    assert elapsed_ms < 1.0, f"Average lookup took {elapsed_ms:.3f}ms"
+
+    limit = 10
+    start = time.perf_counter()
+    for i in range(1, 101):
+        assert len(index.suggest(f"card {i}", limit)) == limit
+    elapsed_ms = (time.perf_counter() - start) * 1000 / 100
+
+    assert elapsed_ms < 1.0, f"Average suggestion took {elapsed_ms:.3f}ms"
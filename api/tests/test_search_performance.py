@@ -7,9 +7,9 @@ import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import func, select
 
-from ..app.database import get_async_session
-from ..app.main import app
-from ..app.models import Product, ProductAlias
+from api.app.database import get_async_session
+from api.app.main import app
+from api.app.models import Product, ProductAlias
 
 
 @pytest.mark.asyncio
@@ -107,7 +107,7 @@ async def test_full_text_search_performance():
         query_time_ms = (end_time - start_time) * 1000
 
         print(
-            f"Full-text query '{query}': {query_time_ms:.2f}ms, found {len(products)} products"
+            f"Full-text query '{query}': {query_time_ms:.2f}ms, found {len(products)} products",
         )
 
         # Assert that the query takes less than 10ms
@@ -141,7 +141,7 @@ def test_api_search_performance():
         query_time_ms = (end_time - start_time) * 1000
 
         print(
-            f"API query '{query}': {query_time_ms:.2f}ms, status: {response.status_code}"
+            f"API query '{query}': {query_time_ms:.2f}ms, status: {response.status_code}",
         )
 
         # Assert successful response
@@ -196,7 +196,7 @@ async def test_search_with_filters_performance():
             products_query = products_query.where(Product.game.ilike(f"%{game}%"))
         if set_name:
             products_query = products_query.where(
-                Product.set_name.ilike(f"%{set_name}%")
+                Product.set_name.ilike(f"%{set_name}%"),
             )
 
         result = await session.execute(products_query)
@@ -206,7 +206,7 @@ async def test_search_with_filters_performance():
         query_time_ms = (end_time - start_time) * 1000
 
         print(
-            f"Filtered query '{query}' (game={game}, set={set_name}): {query_time_ms:.2f}ms, found {len(products)} products"
+            f"Filtered query '{query}' (game={game}, set={set_name}): {query_time_ms:.2f}ms, found {len(products)} products",
         )
 
         # Assert performance
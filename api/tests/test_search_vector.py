@@ -0,0 +1,183 @@
+"""Tests for the stored search vector (warehouse/ddl/01_search_vector.sql).
+
+The DDL tests need PostgreSQL at ``DATABASE_URL`` and are skipped when it
+can't be reached. Each builds the catalog in a scratch schema inside a
+transaction that is rolled back.
+"""
+
+from collections.abc import AsyncIterator
+from pathlib import Path
+from unittest.mock import AsyncMock
+from uuid import UUID
+
+import asyncpg
+import pytest
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from api.app import database
+from api.app.database import (
+    _SEARCH_VECTOR_READY_SQL,
+    SearchVectorMissingError,
+    check_search_vector,
+)
+
+DDL = Path(__file__).resolve().parents[2] / "warehouse" / "ddl"
+
+
+@pytest.fixture
+async def db() -> AsyncIterator[asyncpg.Connection]:
+    dsn = database.DATABASE_URL.replace("postgresql+asyncpg://", "postgresql://", 1)
+    try:
+        conn = await asyncpg.connect(dsn, timeout=2)
+    except (OSError, TimeoutError, asyncpg.PostgresError) as e:
+        pytest.skip(f"PostgreSQL is not available: {e}")
+    transaction = conn.transaction()
+    await transaction.start()
+    try:
+        await conn.execute(
+            "CREATE SCHEMA search_vector_test;"
+            "SET LOCAL search_path TO search_vector_test, public",
+        )
+        await conn.execute((DDL / "00_catalog.sql").read_text())
+        yield conn
+    finally:
+        await transaction.rollback()
+        await conn.close()
+
+
+async def apply_search_vector(conn: asyncpg.Connection) -> None:
+    await conn.execute((DDL / "01_search_vector.sql").read_text())
+
+
+async def add_product(
+    conn: asyncpg.Connection,
+    name: str,
+    set_name: str | None = None,
+    variant: str | None = None,
+) -> UUID:
+    product_id: UUID = await conn.fetchval(
+        "INSERT INTO products (name, game, category, set_name, variant) "
+        "VALUES ($1, 'Pokemon', 'Pokemon', $2, $3) RETURNING id",
+        name,
+        set_name,
+        variant,
+    )
+    return product_id
+
+
+async def add_alias(
+    conn: asyncpg.Connection,
+    product_id: UUID,
+    alias: str,
+    search_weight: int | None,
+) -> UUID:
+    alias_id: UUID = await conn.fetchval(
+        "INSERT INTO product_aliases (product_id, alias, alias_type, search_weight) "
+        "VALUES ($1, $2, 'nickname', $3) RETURNING id",
+        product_id,
+        alias,
+        search_weight,
+    )
+    return alias_id
+
+
+async def weights(
+    conn: asyncpg.Connection,
+    product_id: UUID,
+    *words: str,
+) -> dict[str, str | None]:
+    """Each word's strongest weight in a product's stored vector, if in it."""
+    rows = await conn.fetch(
+        """
+        SELECT word, (
+            SELECT min(weight)
+            FROM unnest(product.search_vector) AS entry, unnest(entry.weights) AS weight
+            WHERE entry.lexeme = ANY(tsvector_to_array(to_tsvector('english', word)))
+        ) AS weight
+        FROM products product, unnest($2::text[]) AS word
+        WHERE product.id = $1
+        """,
+        product_id,
+        list(words),
+    )
+    return {row["word"]: row["weight"] for row in rows}
+
+
+async def test_backfill_fills_existing_products(db: asyncpg.Connection) -> None:
+    """Products that predate the DDL get a vector when it is applied."""
+    product_id = await add_product(db, "Charizard", "Base Set", "Holo")
+    await add_alias(db, product_id, "Zard", 9)
+
+    await apply_search_vector(db)
+
+    assert await weights(db, product_id, "Charizard", "Base", "Holo", "Zard") == {
+        "Charizard": "A",
+        "Base": "C",
+        "Holo": "C",
+        "Zard": "A",
+    }
+
+
+async def test_trigger_follows_product_changes(db: asyncpg.Connection) -> None:
+    """Inserting or renaming a product recomputes its vector."""
+    await apply_search_vector(db)
+    product_id = await add_product(db, "Charizard")
+    assert await weights(db, product_id, "Charizard") == {"Charizard": "A"}
+
+    await db.execute(
+        "UPDATE products SET name = 'Blastoise', variant = 'Shadowless' "
+        "WHERE id = $1",
+        product_id,
+    )
+    assert await weights(db, product_id, "Charizard", "Blastoise", "Shadowless") == {
+        "Charizard": None,
+        "Blastoise": "A",
+        "Shadowless": "C",
+    }
+
+
+async def test_aliases_are_weighted_by_search_weight(db: asyncpg.Connection) -> None:
+    """Alias weights map to classes, and alias edits update the product."""
+    await apply_search_vector(db)
+    product_id = await add_product(db, "Charizard")
+    aliases = {"Zard": 10, "Lizardon": 6, "Flamer": 3, "Chari": 1, "Dragon": None}
+    for alias, search_weight in aliases.items():
+        await add_alias(db, product_id, alias, search_weight)
+    assert await weights(db, product_id, *aliases) == {
+        "Zard": "A",
+        "Lizardon": "B",
+        "Flamer": "C",
+        "Chari": "D",
+        "Dragon": "D",
+    }
+
+    await db.execute(
+        "UPDATE product_aliases SET search_weight = 8 WHERE alias = 'Flamer'",
+    )
+    await db.execute("DELETE FROM product_aliases WHERE alias = 'Dragon'")
+    assert await weights(db, product_id, "Flamer", "Dragon") == {
+        "Flamer": "A",
+        "Dragon": None,
+    }
+
+
+async def test_ready_check_needs_triggers_and_backfill(db: asyncpg.Connection) -> None:
+    """The startup check fails until the DDL has been applied."""
+    ready_sql = _SEARCH_VECTOR_READY_SQL.text
+    await db.execute("ALTER TABLE products ADD COLUMN search_vector tsvector")
+    await add_product(db, "Charizard")
+    assert not await db.fetchval(ready_sql)
+
+    await apply_search_vector(db)
+    assert await db.fetchval(ready_sql)
+
+
+async def test_check_search_vector_fails_loudly() -> None:
+    """Startup stops with a pointer to the DDL when search isn't ready."""
+    conn = AsyncMock(spec=AsyncConnection)
+    conn.scalar.return_value = False
+    with pytest.raises(SearchVectorMissingError, match=r"01_search_vector\.sql"):
+        await check_search_vector(conn)
+
+    conn.scalar.return_value = True
+    await check_search_vector(conn)
@@ -0,0 +1,113 @@
+"""Tests that the fast JSON path matches Pydantic's output byte for byte."""
+
+from datetime import UTC, date, datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Any
+from uuid import UUID, uuid4
+
+from api.app.schemas.products import Product as ProductSchema
+from api.app.schemas.products import ProductAlias as ProductAliasSchema
+from api.app.schemas.products import ProductSearchResult
+from api.app.serialization import RowEncoder, dumps, envelope_values
+
+
+def product_row(**overrides: Any) -> dict[str, Any]:
+    """A products row mapping as the database returns it."""
+    row = {
+        "id": uuid4(),
+        "name": "Charizard",
+        "game": "Pokemon",
+        "set_name": "Base Set",
+        "card_number": "4/102",
+        "rarity": "Holo Rare",
+        "condition": "NM",
+        "variant": "Holo",
+        "category": "Pokemon",
+        "subcategory": None,
+        "release_date": date(1999, 1, 9),
+        "image_url": None,
+        "description": "Iconic fire-type starter",
+        "market_price": Decimal("5000.00"),
+        "low_price": Decimal("1E+3"),
+        "high_price": None,
+        "created_at": datetime(2024, 1, 2, 3, 4, 5, 123456, tzinfo=UTC),
+        "updated_at": datetime(
+            2024,
+            1,
+            2,
+            5,
+            4,
+            5,
+            tzinfo=timezone(timedelta(hours=2)),
+        ),
+    }
+    row.update(overrides)
+    return row
+
+
+def alias_row(product_id: UUID) -> dict[str, Any]:
+    """A product_aliases row mapping."""
+    return {
+        "id": uuid4(),
+        "product_id": product_id,
+        "alias": "Zard",
+        "alias_type": "nickname",
+        "search_weight": 10,
+        "created_at": datetime(2024, 1, 2, 3, 4, 5, tzinfo=UTC),
+    }
+
+
+def encode_product(
+    row: dict[str, Any],
+    aliases: list[dict[str, Any]],
+) -> dict[str, Any]:
+    """Fast-path dict for a full product with aliases."""
+    fields = [name for name in ProductSchema.model_fields if name != "aliases"]
+    return {
+        **RowEncoder(ProductSchema, fields)(row),
+        "aliases": [RowEncoder(ProductAliasSchema)(alias) for alias in aliases],
+    }
+
+
+def test_full_product_matches_pydantic() -> None:
+    """Decimals, UUIDs, UTC/offset datetimes and widened dates all match."""
+    row = product_row()
+    aliases = [alias_row(row["id"]), alias_row(row["id"])]
+
+    expected = ProductSchema.model_validate({**row, "aliases": aliases})
+    assert dumps(encode_product(row, aliases)) == expected.model_dump_json().encode()
+
+
+def test_nulls_and_naive_datetimes_match_pydantic() -> None:
+    """Missing optional values and naive timestamps encode the same way."""
+    row = product_row(
+        release_date=None,
+        market_price=None,
+        created_at=datetime(2024, 1, 2, 3, 4, 5, 120000),  # noqa: DTZ001
+    )
+    expected = ProductSchema.model_validate({**row, "aliases": []})
+    assert dumps(encode_product(row, [])) == expected.model_dump_json().encode()
+
+
+def test_envelope_matches_pydantic() -> None:
+    """A constructed envelope keeps field order and fills defaults."""
+    row = product_row()
+    page = ProductSearchResult.model_construct(
+        products=[encode_product(row, [])],
+        total=1,
+        page=1,
+        per_page=20,
+        has_next=False,
+        has_prev=False,
+    )
+    expected = ProductSearchResult.model_validate(
+        {
+            "products": [{**row, "aliases": []}],
+            "total": 1,
+            "page": 1,
+            "per_page": 20,
+            "has_next": False,
+            "has_prev": False,
+        },
+    )
+    assert dumps(envelope_values(page)) == expected.model_dump_json().encode()
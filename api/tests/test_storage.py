@@ -0,0 +1,98 @@
+"""Tests for streaming, content-addressed local image storage."""
+
+import io
+import os
+from pathlib import Path
+from uuid import uuid4
+
+import pytest
+from fastapi import UploadFile
+
+from api.app import storage
+from api.app.storage import LocalStorageBackend
+
+BASE_URL = "http://test/static"
+
+
+def upload(content: bytes, filename: str = "scan.PNG") -> UploadFile:
+    return UploadFile(file=io.BytesIO(content), filename=filename)
+
+
+@pytest.fixture
+def backend(tmp_path: Path) -> LocalStorageBackend:
+    return LocalStorageBackend(str(tmp_path), BASE_URL)
+
+
+def blobs(backend: LocalStorageBackend) -> list[Path]:
+    return [path for path in backend.blob_path.rglob("*") if path.is_file()]
+
+
+async def test_identical_images_share_one_blob(
+    backend: LocalStorageBackend,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Uploads stream in chunks and are stored once per content."""
+    monkeypatch.setattr(storage, "STORAGE_CHUNK_BYTES", 7)
+    content = os.urandom(100)
+    first = await backend.upload_image(upload(content), uuid4())
+    second = await backend.upload_image(upload(content, "scan.jpeg"), uuid4())
+    other = await backend.upload_image(upload(b"another image"), uuid4())
+
+    assert first != second
+    assert first.startswith(BASE_URL)
+    assert first.endswith(".png")
+    path = backend.base_path / first.rsplit("/", 1)[-1]
+    assert path.read_bytes() == content
+    # Two blobs; the shared one is also linked from both uploads' paths
+    assert (len(blobs(backend)), path.stat().st_nlink) == (2, 3)
+    assert (backend.base_path / other.rsplit("/", 1)[-1]).exists()
+
+
+async def test_reuploading_an_image_adds_no_reference(
+    backend: LocalStorageBackend,
+) -> None:
+    """The same image for the same product keeps its URL."""
+    product_id = uuid4()
+    url = await backend.upload_image(upload(b"image"), product_id)
+    assert await backend.upload_image(upload(b"image"), product_id) == url
+    assert [blob.stat().st_nlink for blob in blobs(backend)] == [2]
+
+
+async def test_blobs_are_deleted_with_their_last_reference(
+    backend: LocalStorageBackend,
+) -> None:
+    """Deleting one of two URLs keeps the blob; deleting both removes it."""
+    first = await backend.upload_image(upload(b"image"), uuid4())
+    second = await backend.upload_image(upload(b"image"), uuid4())
+
+    assert await backend.delete_image(first)
+    assert not await backend.delete_image(first)
+    assert len(blobs(backend)) == 1
+    assert await backend.delete_image(second)
+    assert blobs(backend) == []
+
+
+async def test_oversized_uploads_are_rejected_while_streaming(
+    backend: LocalStorageBackend,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """The limit is checked per chunk and partial files are removed."""
+    monkeypatch.setattr(storage, "STORAGE_CHUNK_BYTES", 4)
+    monkeypatch.setattr(storage, "STORAGE_UPLOAD_MAX_BYTES", 10)
+    with pytest.raises(ValueError, match="10 bytes"):
+        await backend.upload_image(upload(b"x" * 11), uuid4())
+    assert blobs(backend) == []
+    assert await backend.upload_image(upload(b"x" * 10), uuid4())
+
+
+async def test_delete_ignores_paths_outside_storage(
+    backend: LocalStorageBackend,
+    tmp_path: Path,
+) -> None:
+    """Only files directly in the storage directory can be deleted."""
+    assert not await backend.delete_image(f"{BASE_URL}/..")
+    assert not await backend.delete_image(f"{BASE_URL}/blobs")
+    legacy = tmp_path / f"{uuid4()}.jpg"
+    legacy.write_bytes(b"image")
+    assert await backend.delete_image(f"{BASE_URL}/{legacy.name}")
+    assert not legacy.exists()
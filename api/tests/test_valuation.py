@@ -0,0 +1,184 @@
+"""Tests for vectorized portfolio valuation."""
+
+from datetime import date
+from http import HTTPStatus
+from typing import Any
+from uuid import uuid4
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from api.app.main import app
+from api.app.portfolios import valuation_window
+from api.app.valuation import (
+    FloatArray,
+    HoldingEvents,
+    PriceEvents,
+    reprice,
+    value_portfolio,
+)
+
+client = TestClient(app)
+
+START = date(2024, 1, 1)
+
+
+def dense_value(
+    prices: tuple[Any, Any, Any],
+    holdings: tuple[Any, Any, Any, Any],
+    days: int,
+    products: int,
+) -> FloatArray:
+    """Value by filling a days x products grid, one loop per row."""
+    price = np.zeros((days, products))
+    order = np.lexsort((np.arange(len(prices[1])), prices[1], prices[0]))
+    for i in order:
+        price[max(prices[1][i], 0), prices[0][i]] = prices[2][i]
+    for day in range(1, days):
+        unpriced = price[day] == 0
+        price[day, unpriced] = price[day - 1, unpriced]
+    quantity = np.zeros((days, products))
+    for product, day, amount in zip(*holdings[:3], strict=True):
+        quantity[max(day, 0) :, product] += amount
+    value: FloatArray = (quantity * price).sum(axis=1)
+    return value
+
+
+def random_portfolio(
+    rng: np.random.Generator,
+    days: int,
+    products: int = 6,
+    sales: int = 50,
+    acquisitions: int = 10,
+) -> tuple[tuple[Any, Any, Any], tuple[Any, Any, Any, Any]]:
+    """Raw price and holding arrays, some from before the window."""
+    prices = (
+        rng.integers(0, products, sales),
+        rng.integers(-5, days, sales),
+        rng.uniform(1, 100, sales).round(2),
+    )
+    holdings = (
+        rng.integers(0, products, acquisitions),
+        rng.integers(-5, days, acquisitions),
+        rng.integers(1, 4, acquisitions),
+        rng.uniform(1, 100, acquisitions).round(2),
+    )
+    return prices, holdings
+
+
+def test_value_matches_dense_grid() -> None:
+    """Event deltas add up to the value of carried-forward prices."""
+    rng = np.random.default_rng(7)
+    for _ in range(25):
+        days = 40
+        prices, holdings = random_portfolio(rng, days)
+        valuation = value_portfolio(
+            START,
+            days,
+            PriceEvents.from_arrays(*prices, days),
+            HoldingEvents.from_arrays(*holdings),
+        )
+        np.testing.assert_allclose(
+            valuation.value,
+            dense_value(prices, holdings, days, 6),
+        )
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2, 3])
+def test_repricing_matches_full_revaluation(seed: int) -> None:
+    """Applying late prices batch by batch equals valuing the merged prices."""
+    rng = np.random.default_rng(seed)
+    days = 40
+    prices, holdings = random_portfolio(rng, days, sales=400)
+    events = PriceEvents.from_arrays(*prices, days)
+    holding_events = HoldingEvents.from_arrays(*holdings)
+    valuation = value_portfolio(START, days, events, holding_events)
+
+    # Batches replace loaded and earlier late rows, and price unpriced days
+    # of held and unheld products, several per product
+    recent = PriceEvents.from_arrays([], [], [])
+    for _ in range(3):
+        late = PriceEvents.from_arrays(
+            rng.integers(0, 8, 12),
+            rng.integers(0, days, 12),
+            rng.uniform(1, 100, 12),
+        )
+        valuation = reprice(valuation, events, recent, late, holding_events)
+        recent = recent.merge(late)
+
+    merged = events.merge(recent)
+    full = value_portfolio(START, days, merged, holding_events)
+    np.testing.assert_allclose(valuation.value, full.value)
+    np.testing.assert_allclose(valuation.flows, full.flows, atol=1e-9)
+    np.testing.assert_allclose(valuation.returns, full.returns, atol=1e-9)
+    np.testing.assert_array_equal(merged.key, np.sort(merged.key))
+    np.testing.assert_allclose(
+        merged.jump,
+        PriceEvents.from_arrays(
+            np.concatenate([events.product, recent.product]),
+            np.concatenate([events.day, recent.day]),
+            np.concatenate([events.price, recent.price]),
+        ).jump,
+    )
+
+
+def test_window_opens_at_last_price_before_it() -> None:
+    """Of several earlier prices the latest sets day 0; same-day rows replace."""
+    events = PriceEvents.from_arrays([0, 0, 0, 0], [-9, -2, 1, 1], [5.0, 7.0, 8.0, 9.0])
+    assert events.day.tolist() == [0, 1]
+    assert events.price.tolist() == [7.0, 9.0]
+
+
+def test_acquisitions_are_flows_not_returns() -> None:
+    """Buying cards raises value without a return; price moves are returns."""
+    prices = PriceEvents.from_arrays([0, 0, 1], [0, 2, 0], [10.0, 11.0, 4.0])
+    holdings = HoldingEvents.from_arrays([0, 1], [0, 1], [1, 5], [9.0, 3.0])
+    valuation = value_portfolio(START, 3, prices, holdings)
+
+    assert valuation.value.tolist() == [10.0, 30.0, 31.0]
+    assert valuation.cost.tolist() == [9.0, 24.0, 24.0]
+    np.testing.assert_allclose(valuation.returns, [0.0, 0.0, 31 / 30 - 1])
+    summary = valuation.summary()
+    assert (summary["value"], summary["profit"]) == (31.0, 7.0)
+    assert summary["total_return"] == pytest.approx(31 / 30 - 1)
+    assert summary["max_drawdown"] == 0.0
+    assert valuation.dates()[-1] == date(2024, 1, 3)
+
+
+def test_holdings_acquired_after_the_window_are_not_held_yet() -> None:
+    """A future-dated holding adds neither value nor cost to the window."""
+    prices = PriceEvents.from_arrays([0, 1], [0, 0], [10.0, 4.0], 3)
+    held = HoldingEvents.from_arrays([0], [0], [1], [9.0])
+    future = HoldingEvents.from_arrays([0, 1], [0, 3], [1, 5], [9.0, 3.0])
+
+    valuation = value_portfolio(START, 3, prices, future)
+    expected = value_portfolio(START, 3, prices, held)
+    assert valuation.value.tolist() == expected.value.tolist() == [10.0] * 3
+    assert valuation.cost.tolist() == expected.cost.tolist()
+    assert valuation.flows.tolist() == expected.flows.tolist()
+
+
+def test_empty_portfolio_values_to_zero() -> None:
+    """No holdings or no prices is a flat zero series, not an error."""
+    no_prices = PriceEvents.from_arrays([], [], [])
+    no_holdings = HoldingEvents.from_arrays([], [], [], [])
+    some_prices = PriceEvents.from_arrays([0], [0], [3.0])
+    some_holdings = HoldingEvents.from_arrays([0], [1], [2], [1.0])
+
+    assert value_portfolio(START, 5, some_prices, no_holdings).value.tolist() == [0] * 5
+    unpriced = value_portfolio(START, 3, no_prices, some_holdings)
+    assert unpriced.value.tolist() == [0.0, 0.0, 0.0]
+    assert unpriced.cost.tolist() == [0.0, 2.0, 2.0]
+    assert unpriced.summary()["volatility"] == 0.0
+
+
+def test_valuation_window_ends_today() -> None:
+    """A window of years counts back from today inclusive."""
+    assert valuation_window(1, today=date(2024, 12, 31)) == (date(2024, 1, 2), 365)
+
+
+def test_valuation_rejects_long_windows() -> None:
+    """Valuations cover at most five years."""
+    response = client.get(f"/api/v1/portfolios/{uuid4()}/valuation?years=6")
+    assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
@@ -0,0 +1 @@
+# Collectors
@@ -0,0 +1,358 @@
+"""Shared async HTTP runtime for collectors.
+
+A collector fetches every page through one ``Collector``: a keep-alive
+connection pool with at most ``COLLECTOR_CONCURRENCY`` requests in flight
+and a token bucket per host. Failed requests (network errors, 429 and 5xx)
+are retried with jittered exponential backoff, honouring ``Retry-After``.
+Pages are requested conditionally with the ETag / Last-Modified they were
+last served with, so unchanged pages come back as 304 and are skipped.
+Parsing runs in a process pool, so it never holds up fetching.
+"""
+
+import asyncio
+import logging
+import os
+import random
+import time
+from collections.abc import AsyncGenerator, Callable, Iterable, MutableMapping
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from email.utils import parsedate_to_datetime
+from typing import Any, Self, TypeVar
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+COLLECTOR_CONCURRENCY = int(os.getenv("COLLECTOR_CONCURRENCY", "16"))
+# Requests per second to any one host, and how many may go at once
+COLLECTOR_RATE_PER_HOST = float(os.getenv("COLLECTOR_RATE_PER_HOST", "5"))
+COLLECTOR_BURST = int(os.getenv("COLLECTOR_BURST", "10"))
+COLLECTOR_MAX_RETRIES = int(os.getenv("COLLECTOR_MAX_RETRIES", "4"))
+COLLECTOR_BACKOFF_SECONDS = 0.5
+COLLECTOR_BACKOFF_MAX_SECONDS = 60.0
+COLLECTOR_TIMEOUT_SECONDS = float(os.getenv("COLLECTOR_TIMEOUT_SECONDS", "30"))
+COLLECTOR_PARSE_PROCESSES = (
+    int(os.getenv("COLLECTOR_PARSE_PROCESSES", "0")) or os.cpu_count() or 1
+)
+COLLECTOR_USER_AGENT = os.getenv("COLLECTOR_USER_AGENT", "cardfolio-collector/0.1")
+
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+class TokenBucket:
+    """``rate`` requests per second on average, up to ``burst`` at once."""
+
+    def __init__(self, rate: float, burst: int) -> None:
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        # Waiters are served in arrival order
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        elapsed = now - self._updated
+        self._tokens = min(self.burst, self._tokens + elapsed * self.rate)
+        self._updated = now
+
+    async def acquire(self) -> None:
+        """Wait for a token and take it."""
+        async with self._lock:
+            self._refill()
+            while self._tokens < 1:
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+                self._refill()
+            self._tokens -= 1
+
+    def pause(self, seconds: float) -> None:
+        """Hand out no tokens for ``seconds``, e.g. after a Retry-After."""
+        self._refill()
+        self._tokens = min(self._tokens, 1 - seconds * self.rate)
+
+
+@dataclass
+class Validators:
+    """What a page was last served with, for conditional requests."""
+
+    etag: str | None = None
+    last_modified: str | None = None
+
+    def headers(self) -> dict[str, str]:
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+@dataclass(frozen=True)
+class Page:
+    """A fetched page, as handed to parsers."""
+
+    url: str
+    status: int
+    content: bytes
+    content_type: str | None = None
+    encoding: str | None = None
+
+    @property
+    def text(self) -> str:
+        return self.content.decode(self.encoding or "utf-8", errors="replace")
+
+
+@dataclass
+class CollectorStats:
+    """Counters for one collector; throughputs are per second."""
+
+    requests: int = 0
+    fetched: int = 0
+    not_modified: int = 0
+    retries: int = 0
+    failed: int = 0
+    parsed: int = 0
+    parse_failed: int = 0
+    bytes: int = 0
+    parse_seconds: float = 0.0
+    started: float = field(default_factory=time.monotonic)
+
+    def summary(self) -> dict[str, Any]:
+        """Counters plus fetch and parse throughput."""
+        elapsed = max(time.monotonic() - self.started, 1e-9)
+        return {
+            "requests": self.requests,
+            "fetched": self.fetched,
+            "not_modified": self.not_modified,
+            "retries": self.retries,
+            "failed": self.failed,
+            "parsed": self.parsed,
+            "parse_failed": self.parse_failed,
+            "seconds": round(elapsed, 3),
+            "fetch_pages_per_second": round(
+                (self.fetched + self.not_modified) / elapsed,
+                1,
+            ),
+            "fetch_megabytes_per_second": round(self.bytes / elapsed / 1e6, 3),
+            # Per parse process, from the time parsers actually ran
+            "parse_pages_per_second": round(
+                self.parsed / self.parse_seconds if self.parse_seconds else 0.0,
+                1,
+            ),
+        }
+
+
+def backoff_delay(attempt: int, base: float, cap: float) -> float:
+    """Full-jitter exponential backoff before retry number ``attempt + 1``."""
+    return random.uniform(0, min(cap, base * 2**attempt))  # noqa: S311
+
+
+def retry_after(response: httpx.Response) -> float | None:
+    """Seconds a 429 or 503 asks to wait, from either Retry-After form."""
+    value = response.headers.get("Retry-After")
+    if value is None:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max((when - datetime.now(UTC)).total_seconds(), 0.0)
+
+
+def _timed_parse(parse: Callable[[Page], T], page: Page) -> tuple[T, float]:
+    # Runs in a parse process; the duration feeds parse throughput
+    started = time.perf_counter()
+    result = parse(page)
+    return result, time.perf_counter() - started
+
+
+class Collector:
+    """Rate-limited, retrying, conditional HTTP fetching with parallel parsing.
+
+    Use as an async context manager. ``validators`` maps URLs to what they
+    were last served with; pass a persisted mapping to skip unchanged pages
+    across runs. ``parse`` functions must be picklable (module level).
+    """
+
+    def __init__(
+        self,
+        *,
+        concurrency: int = COLLECTOR_CONCURRENCY,
+        rate_per_host: float = COLLECTOR_RATE_PER_HOST,
+        burst: int = COLLECTOR_BURST,
+        max_retries: int = COLLECTOR_MAX_RETRIES,
+        backoff: float = COLLECTOR_BACKOFF_SECONDS,
+        backoff_max: float = COLLECTOR_BACKOFF_MAX_SECONDS,
+        timeout: float = COLLECTOR_TIMEOUT_SECONDS,
+        validators: MutableMapping[str, Validators] | None = None,
+        parse_executor: Executor | None = None,
+        headers: dict[str, str] | None = None,
+    ) -> None:
+        self.concurrency = concurrency
+        self.rate_per_host = rate_per_host
+        self.burst = burst
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.backoff_max = backoff_max
+        self.validators = validators if validators is not None else {}
+        self.stats = CollectorStats()
+        self._buckets: dict[str, TokenBucket] = {}
+        self._slots = asyncio.Semaphore(concurrency)
+        self._client = httpx.AsyncClient(
+            headers={"User-Agent": COLLECTOR_USER_AGENT, **(headers or {})},
+            timeout=timeout,
+            limits=httpx.Limits(
+                max_connections=concurrency,
+                max_keepalive_connections=concurrency,
+            ),
+            follow_redirects=True,
+        )
+        self._owns_executor = parse_executor is None
+        self._executor = parse_executor or ProcessPoolExecutor(
+            COLLECTOR_PARSE_PROCESSES,
+        )
+
+    async def __aenter__(self) -> Self:
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        """Close connections and, if the collector made it, the parse pool."""
+        await self._client.aclose()
+        if self._owns_executor:
+            self._executor.shutdown(cancel_futures=True)
+
+    def _bucket(self, host: str) -> TokenBucket:
+        bucket = self._buckets.get(host)
+        if bucket is None:
+            bucket = self._buckets[host] = TokenBucket(self.rate_per_host, self.burst)
+        return bucket
+
+    async def fetch(self, url: str) -> Page | None:
+        """The page, or ``None`` if it has not changed since last fetched.
+
+        Raises ``httpx.HTTPError`` once retries are exhausted or on a
+        status that retrying cannot fix.
+        """
+        bucket = self._bucket(httpx.URL(url).host)
+        known = self.validators.get(url)
+        headers = known.headers() if known else {}
+        attempt = 0
+        while True:
+            await bucket.acquire()
+            self.stats.requests += 1
+            wait = None
+            try:
+                async with self._slots:
+                    response = await self._client.get(url, headers=headers)
+            except httpx.TransportError:
+                if attempt >= self.max_retries:
+                    self.stats.failed += 1
+                    raise
+            else:
+                retryable = response.status_code in RETRY_STATUSES
+                if not retryable or attempt >= self.max_retries:
+                    return self._page(url, response)
+                wait = retry_after(response)
+                if wait is not None:
+                    bucket.pause(wait)
+
+            self.stats.retries += 1
+            delay = backoff_delay(attempt, self.backoff, self.backoff_max)
+            await asyncio.sleep(max(delay, wait or 0.0))
+            attempt += 1
+
+    def _page(self, url: str, response: httpx.Response) -> Page | None:
+        if response.status_code == httpx.codes.NOT_MODIFIED:
+            self.stats.not_modified += 1
+            return None
+        if response.is_error:
+            self.stats.failed += 1
+            response.raise_for_status()
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if etag or last_modified:
+            self.validators[url] = Validators(etag, last_modified)
+        self.stats.fetched += 1
+        self.stats.bytes += len(response.content)
+        return Page(
+            url,
+            response.status_code,
+            response.content,
+            response.headers.get("Content-Type"),
+            response.charset_encoding,
+        )
+
+    async def parse(self, parse: Callable[[Page], T], page: Page) -> T:
+        """Run ``parse`` on a page in the parse pool."""
+        loop = asyncio.get_running_loop()
+        result, seconds = await loop.run_in_executor(
+            self._executor,
+            _timed_parse,
+            parse,
+            page,
+        )
+        self.stats.parsed += 1
+        self.stats.parse_seconds += seconds
+        return result
+
+    async def collect(
+        self,
+        urls: Iterable[str],
+        parse: Callable[[Page], T],
+    ) -> AsyncGenerator[T, None]:
+        """Fetch URLs concurrently and yield each changed page, parsed.
+
+        Results come in completion order. Pages that fail to fetch or parse
+        are logged and counted, and do not stop the others.
+        """
+        pending = iter(urls)
+        # Parsed pages, then None once every worker is done
+        results: asyncio.Queue[tuple[T] | None] = asyncio.Queue(2 * self.concurrency)
+
+        async def work() -> None:
+            # Workers share the iterator; taking the next URL never awaits
+            for url in pending:
+                try:
+                    page = await self.fetch(url)
+                except httpx.HTTPError as e:
+                    logger.warning("Fetching %s failed: %s", url, e)
+                    continue
+                if page is None:
+                    continue
+                try:
+                    result = await self.parse(parse, page)
+                except Exception:
+                    self.stats.parse_failed += 1
+                    logger.exception("Parsing %s failed", url)
+                    continue
+                await results.put((result,))
+
+        async def run() -> None:
+            try:
+                await asyncio.gather(*(work() for _ in range(self.concurrency)))
+            finally:
+                # Not if the consumer stopped early and cancelled us: nobody
+                # reads the queue then, and a put on a full one never returns
+                if not runner.cancelling():
+                    await results.put(None)
+
+        runner = asyncio.create_task(run())
+        try:
+            while (item := await results.get()) is not None:
+                yield item[0]
+            await runner
+        finally:
+            runner.cancel()
+            await asyncio.gather(runner, return_exceptions=True)
+        logger.info("Collected %s", self.stats.summary())
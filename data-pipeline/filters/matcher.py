@@ -0,0 +1,662 @@
+"""Listing title to catalog product resolution.
+
+Product names, aliases and set names are compiled into an Aho-Corasick
+automaton over normalized tokens, so one left-to-right pass over a title's
+tokens finds every name, alias and set it mentions, however many the
+catalog has. Candidates are the products whose names or aliases appeared,
+narrowed by the card numbers and sets the title mentions, and are scored
+by how much of the title they explain plus set, number, variant and game
+signals. A title resolves when the best candidate clears ``MIN_SCORE`` and
+leads the runner-up by ``MIN_MARGIN``.
+
+Catalog changes are applied in place: an alias whose tokens are already
+known only changes the pattern table, and genuinely new token sequences go
+into a small delta automaton that is folded into the main one once it
+grows past ``COMPACT_RATIO`` of it. Updates that change nothing the
+matcher uses leave its ``version`` alone.
+"""
+
+import os
+import re
+import unicodedata
+from collections import deque
+from collections.abc import Iterable, Iterator, Sequence
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from itertools import islice, pairwise
+from typing import Literal, NamedTuple, Self
+from uuid import UUID
+
+MatchStatus = Literal["matched", "ambiguous", "unmatched"]
+
+# Score of a pattern is its length in tokens times its kind's weight;
+# aliases use their search_weight / 10
+NAME_WEIGHT = 1.0
+SET_WEIGHT = 1.5
+NUMBER_WEIGHT = 3.0
+PARTIAL_NUMBER_WEIGHT = 1.0
+VARIANT_WEIGHT = 1.0
+GAME_WEIGHT = 0.5
+
+MIN_SCORE = 1.0
+MIN_MARGIN = 0.5
+
+# Titles whose only evidence is a name shared by more products than this
+# are ambiguous without being scored
+MAX_CANDIDATES = 64
+
+MATCH_BATCH_TITLES = int(os.getenv("MATCH_BATCH_TITLES", "5000"))
+MATCH_PROCESSES = int(os.getenv("MATCH_PROCESSES", "0")) or os.cpu_count() or 1
+
+# Delta automaton size, relative to the main one, that triggers compaction
+COMPACT_RATIO = 0.05
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_TRAILING_TOKEN_RE = re.compile(r"[a-z0-9]+$")
+_DIGITS_RE = re.compile(r"\d+")
+
+
+def normalize(text: str | None) -> str:
+    """Casefold text and strip accents (``Pokémon`` -> ``pokemon``)."""
+    if not text:
+        return ""
+    if text.isascii():
+        return text.lower()
+    decomposed = unicodedata.normalize("NFKD", text.casefold())
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+
+def tokenize(text: str | None) -> list[str]:
+    """Normalized word tokens of a name or title."""
+    return _TOKEN_RE.findall(normalize(text))
+
+
+def _strip_zeros(part: str) -> str:
+    if part.isdigit():
+        return str(int(part))
+    return _DIGITS_RE.sub(lambda digits: str(int(digits.group())), part)
+
+
+def number_keys(
+    text: str,
+    tokens: Sequence[str] | None = None,
+) -> tuple[set[str], set[str]]:
+    """Card numbers in normalized text: full (``4/102``) and short (``4``).
+
+    Every token containing a digit is a short number, so ``004/102`` yields
+    ``{"4/102"}`` and ``{"4", "102"}``. Leading zeros never matter. Pass the
+    text's tokens if they are at hand.
+    """
+    full = set()
+    if "/" in text:
+        parts = text.split("/")
+        for left, right in pairwise(parts):
+            number = _TRAILING_TOKEN_RE.search(left.rstrip().rpartition(" ")[2])
+            total = _TOKEN_RE.match(right.lstrip())
+            if number is None or total is None:
+                continue
+            first, last = number.group(), total.group()
+            if not (first.isalpha() or last.isalpha()):
+                full.add(f"{_strip_zeros(first)}/{_strip_zeros(last)}")
+    if tokens is None:
+        tokens = _TOKEN_RE.findall(text)
+    short = {_strip_zeros(token) for token in tokens if not token.isalpha()}
+    return full, short
+
+
+@dataclass
+class ProductRecord:
+    """The catalog fields of a product the matcher uses."""
+
+    id: UUID
+    name: str
+    game: str | None = None
+    set_name: str | None = None
+    card_number: str | None = None
+    variant: str | None = None
+    # (alias, search_weight 1-10)
+    aliases: Sequence[tuple[str, int]] = ()
+
+
+class Match(NamedTuple):
+    """How a title resolved: the product, its score and the runner-up's."""
+
+    status: MatchStatus
+    product_id: UUID | None
+    score: float
+    runner_up_score: float
+
+
+@dataclass
+class Automaton:
+    """Aho-Corasick automaton over token sequences."""
+
+    goto: list[dict[str, int]] = field(default_factory=lambda: [{}])
+    fail: list[int] = field(default_factory=lambda: [0])
+    # Pattern IDs ending at each state, including via failure links
+    out: list[tuple[int, ...]] = field(default_factory=lambda: [()])
+    patterns: int = 0
+
+    @classmethod
+    def build(cls, patterns: Iterable[tuple[int, Sequence[str]]]) -> "Automaton":
+        """Compile (pattern ID, tokens) pairs."""
+        automaton = cls()
+        own: list[list[int]] = [[]]
+        for pattern_id, tokens in patterns:
+            state = 0
+            for token in tokens:
+                following = automaton.goto[state].get(token)
+                if following is None:
+                    following = len(automaton.goto)
+                    automaton.goto[state][token] = following
+                    automaton.goto.append({})
+                    own.append([])
+                state = following
+            own[state].append(pattern_id)
+            automaton.patterns += 1
+
+        size = len(automaton.goto)
+        automaton.fail = [0] * size
+        automaton.out = [()] * size
+        automaton.out[0] = tuple(own[0])
+        queue = deque(automaton.goto[0].values())
+        for state in queue:
+            automaton.out[state] = tuple(own[state])
+        while queue:
+            state = queue.popleft()
+            for token, following in automaton.goto[state].items():
+                fallback = automaton.fail[state]
+                while fallback and token not in automaton.goto[fallback]:
+                    fallback = automaton.fail[fallback]
+                automaton.fail[following] = automaton.goto[fallback].get(token, 0)
+                automaton.out[following] = (
+                    tuple(own[following]) + automaton.out[automaton.fail[following]]
+                )
+                queue.append(following)
+        return automaton
+
+    def scan(self, tokens: Sequence[str]) -> list[int]:
+        """IDs of the patterns occurring in ``tokens``, with repeats."""
+        goto, fail, out = self.goto, self.fail, self.out
+        hits: list[int] = []
+        state = 0
+        for token in tokens:
+            following = goto[state].get(token)
+            while following is None and state:
+                state = fail[state]
+                following = goto[state].get(token)
+            state = following or 0
+            if out[state]:
+                hits.extend(out[state])
+        return hits
+
+
+# Status, product index, score and runner-up score
+Resolution = tuple[MatchStatus, int | None, float, float]
+
+
+class _Product(NamedTuple):
+    """What scoring needs of a product."""
+
+    set_id: int | None
+    full_number: str | None
+    short_number: str | None
+    variant: frozenset[str]
+    game: frozenset[str]
+
+    def bonus(
+        self,
+        sets: set[int],
+        full_numbers: set[str],
+        short_numbers: set[str],
+        words: set[str],
+    ) -> float:
+        """Score added to a name match by the title's other clues."""
+        score = 0.0
+        if self.set_id in sets:
+            score += SET_WEIGHT
+        if self.full_number in full_numbers:
+            score += NUMBER_WEIGHT
+        elif self.short_number in short_numbers:
+            score += PARTIAL_NUMBER_WEIGHT
+        if self.variant:
+            score += VARIANT_WEIGHT * len(self.variant & words) / len(self.variant)
+        if self.game & words:
+            score += GAME_WEIGHT
+        return score
+
+
+_UNLINKED = _Product(None, None, None, frozenset(), frozenset())
+
+
+class Matcher:
+    """Compiled catalog dictionary resolving listing titles to products."""
+
+    def __init__(self) -> None:
+        self.version = 0
+        # Patterns are distinct token sequences; per pattern, the products
+        # it names with its score for each (length x weight), the same by
+        # card number and by set, and the sets it is the name of
+        self._pattern_ids: dict[tuple[str, ...], int] = {}
+        self._pattern_tokens: list[tuple[str, ...]] = []
+        self._pattern_scores: list[dict[int, float]] = []
+        self._pattern_numbers: list[dict[str, set[int]]] = []
+        self._pattern_set_products: list[dict[int, set[int]]] = []
+        self._pattern_sets: list[set[int]] = []
+        self._set_ids: dict[tuple[str, ...], int] = {}
+
+        # Products by index; removed ones leave their ID None
+        self._product_index: dict[UUID, int] = {}
+        self._ids: list[UUID | None] = []
+        self._products: list[_Product] = []
+        self._product_patterns: list[list[int]] = []
+
+        self._main = Automaton()
+        self._delta = Automaton()
+        self._compiled = 0
+
+    @classmethod
+    def build(cls, products: Iterable[ProductRecord]) -> "Matcher":
+        """Compile a matcher for a catalog."""
+        matcher = cls()
+        matcher.update(products)
+        return matcher
+
+    def __len__(self) -> int:
+        return len(self._product_index)
+
+    @property
+    def patterns(self) -> int:
+        """Number of distinct token sequences compiled."""
+        return len(self._pattern_tokens)
+
+    @property
+    def uncompacted(self) -> int:
+        """Number of patterns in the delta automaton, awaiting compaction."""
+        return len(self._pattern_tokens) - self._compiled
+
+    def update(self, products: Iterable[ProductRecord]) -> None:
+        """Add products or replace them (with all their aliases)."""
+        changed = False
+        for product in products:
+            index = self._product_index.get(product.id)
+            if index is None:
+                index = len(self._ids)
+                self._product_index[product.id] = index
+                self._ids.append(product.id)
+                self._products.append(_UNLINKED)
+                self._product_patterns.append([])
+                before = None
+            else:
+                before = self._linked(index)
+                self._unlink(index)
+            self._link(index, product)
+            changed = changed or self._linked(index) != before
+        self._refresh(changed)
+
+    def remove(self, product_ids: Iterable[UUID]) -> None:
+        """Forget products, e.g. after they were deleted from the catalog."""
+        changed = False
+        for product_id in product_ids:
+            index = self._product_index.pop(product_id, None)
+            if index is not None:
+                self._unlink(index)
+                self._ids[index] = None
+                changed = True
+        self._refresh(changed)
+
+    def compact(self) -> None:
+        """Fold the delta automaton into the main one."""
+        self._main = Automaton.build(enumerate(self._pattern_tokens))
+        self._delta = Automaton()
+        self._compiled = len(self._pattern_tokens)
+
+    def _pattern(self, tokens: tuple[str, ...]) -> int:
+        pattern_id = self._pattern_ids.get(tokens)
+        if pattern_id is None:
+            pattern_id = len(self._pattern_tokens)
+            self._pattern_ids[tokens] = pattern_id
+            self._pattern_tokens.append(tokens)
+            self._pattern_scores.append({})
+            self._pattern_numbers.append({})
+            self._pattern_set_products.append({})
+            self._pattern_sets.append(set())
+        return pattern_id
+
+    def _link(self, index: int, product: ProductRecord) -> None:
+        set_id = None
+        set_tokens = tuple(tokenize(product.set_name))
+        if set_tokens:
+            set_id = self._set_ids.setdefault(set_tokens, len(self._set_ids))
+            self._pattern_sets[self._pattern(set_tokens)].add(set_id)
+
+        number = normalize(product.card_number)
+        fractions, _ = number_keys(number)
+        full = next(iter(fractions), None)
+        first = _TOKEN_RE.search(number)
+        short = _strip_zeros(first.group()) if first else None
+        self._products[index] = _Product(
+            set_id,
+            full,
+            short,
+            frozenset(tokenize(product.variant)),
+            frozenset(tokenize(product.game)),
+        )
+
+        numbers = [key for key in (full, short) if key is not None]
+        scores: dict[int, float] = {}
+        for text, weight in [(product.name, NAME_WEIGHT * 10), *product.aliases]:
+            tokens = tuple(tokenize(text))
+            if tokens:
+                pattern_id = self._pattern(tokens)
+                score = len(tokens) * weight / 10
+                scores[pattern_id] = max(scores.get(pattern_id, 0.0), score)
+        for pattern_id, score in scores.items():
+            self._pattern_scores[pattern_id][index] = score
+            by_number = self._pattern_numbers[pattern_id]
+            for key in numbers:
+                by_number.setdefault(key, set()).add(index)
+            if set_id is not None:
+                by_set = self._pattern_set_products[pattern_id]
+                by_set.setdefault(set_id, set()).add(index)
+        self._product_patterns[index] = list(scores)
+
+    def _linked(self, index: int) -> tuple[_Product, list[tuple[int, float]]]:
+        """Everything matching knows of a product, to detect no-op updates."""
+        return self._products[index], [
+            (pattern_id, self._pattern_scores[pattern_id][index])
+            for pattern_id in self._product_patterns[index]
+        ]
+
+    def _unlink(self, index: int) -> None:
+        product = self._products[index]
+        numbers = [product.full_number, product.short_number]
+        for pattern_id in self._product_patterns[index]:
+            self._pattern_scores[pattern_id].pop(index, None)
+            by_number = self._pattern_numbers[pattern_id]
+            for key in numbers:
+                if key is not None:
+                    by_number[key].discard(index)
+            if product.set_id is not None:
+                self._pattern_set_products[pattern_id][product.set_id].discard(index)
+        self._products[index] = _UNLINKED
+        self._product_patterns[index] = []
+
+    def _refresh(self, changed: bool) -> None:
+        """Compile new patterns into the delta, compacting when it is large."""
+        if changed:
+            self.version += 1
+        added = len(self._pattern_tokens) - self._compiled
+        if not added:
+            return
+        if added > COMPACT_RATIO * max(self._compiled, 1):
+            self.compact()
+            return
+        self._delta = Automaton.build(
+            (pattern_id, self._pattern_tokens[pattern_id])
+            for pattern_id in range(self._compiled, len(self._pattern_tokens))
+        )
+
+    def _outermost(self, pattern_ids: list[int]) -> list[int]:
+        """Drop patterns inside others (``base set`` in ``base set 2``)."""
+        if len(pattern_ids) <= 1:
+            return pattern_ids
+        spans = [
+            " ".join(self._pattern_tokens[pattern_id]) for pattern_id in pattern_ids
+        ]
+        return [
+            pattern_id
+            for pattern_id, span in zip(pattern_ids, spans, strict=True)
+            if not any(span != other and f" {span} " in f" {other} " for other in spans)
+        ]
+
+    def _candidates(
+        self,
+        named: list[int],
+        numbers: set[str],
+        sets: set[int],
+    ) -> set[int] | None:
+        """Products the title could be; ``None`` when there are too many.
+
+        Products with a number the title mentions are preferred, then
+        products of a set it mentions, then any product it names.
+        """
+        candidates: set[int] = set()
+        for pattern_id in named:
+            by_number = self._pattern_numbers[pattern_id]
+            for key in numbers:
+                products = by_number.get(key)
+                if products:
+                    candidates |= products
+        if candidates:
+            return candidates
+        for pattern_id in named:
+            by_set = self._pattern_set_products[pattern_id]
+            for set_id in sets:
+                products = by_set.get(set_id)
+                if products:
+                    candidates |= products
+        if candidates:
+            return candidates
+        for pattern_id in named:
+            candidates.update(self._pattern_scores[pattern_id])
+            if len(candidates) > MAX_CANDIDATES:
+                return None
+        return candidates
+
+    def match(self, title: str) -> Match:
+        """Resolve one listing title."""
+        status, index, score, runner_up = self.resolve(title)
+        product_id = self._ids[index] if index is not None else None
+        return Match(status, product_id, score, runner_up)
+
+    def resolve(self, title: str) -> Resolution:
+        """Resolve a title to a product index; ``matches`` maps it to the ID.
+
+        Indexes are stable across updates and pickle faster than IDs, so
+        pool workers return these.
+        """
+        text = normalize(title)
+        tokens = _TOKEN_RE.findall(text)
+        hits = set(self._main.scan(tokens))
+        if self._delta.patterns:
+            hits.update(self._delta.scan(tokens))
+        pattern_scores = self._pattern_scores
+        named = [pattern_id for pattern_id in hits if pattern_scores[pattern_id]]
+        if not named:
+            return "unmatched", None, 0.0, 0.0
+
+        sets: set[int] = set()
+        set_names = [
+            pattern_id for pattern_id in hits if self._pattern_sets[pattern_id]
+        ]
+        for pattern_id in self._outermost(set_names):
+            sets |= self._pattern_sets[pattern_id]
+        full_numbers, short_numbers = number_keys(text, tokens)
+        candidates = self._candidates(named, full_numbers | short_numbers, sets)
+        if candidates is None:
+            return "ambiguous", None, 0.0, 0.0
+
+        # Each candidate's best name or alias in the title
+        names: dict[int, float] = {}
+        for pattern_id in named:
+            scores = pattern_scores[pattern_id]
+            for index in candidates.intersection(scores):
+                score = scores[index]
+                if score > names.get(index, 0.0):
+                    names[index] = score
+
+        words = set(tokens)
+        products = self._products
+        best, best_score, runner_up = None, 0.0, 0.0
+        for index, name_score in names.items():
+            score = name_score + products[index].bonus(
+                sets,
+                full_numbers,
+                short_numbers,
+                words,
+            )
+            if score > best_score:
+                best, best_score, runner_up = index, score, best_score
+            elif score > runner_up:
+                runner_up = score
+
+        if best is None or best_score < MIN_SCORE:
+            return "unmatched", None, best_score, runner_up
+        if best_score - runner_up < MIN_MARGIN:
+            return "ambiguous", None, best_score, runner_up
+        return "matched", best, best_score, runner_up
+
+    def match_many(self, titles: Iterable[str]) -> list[Match]:
+        """Resolve a batch of titles."""
+        match = self.match
+        return [match(title) for title in titles]
+
+    def matches(self, resolutions: Iterable[Resolution]) -> Iterator[Match]:
+        """The matches of ``resolve`` results, product indexes mapped to IDs."""
+        ids = self._ids
+        for status, index, score, runner_up in resolutions:
+            product_id = ids[index] if index is not None else None
+            yield Match(status, product_id, score, runner_up)
+
+
+# A change a pool's workers replay: the matcher version it leads to, then
+# the products it updated or the IDs it removed
+_Change = tuple[int, Sequence[ProductRecord], Sequence[UUID]]
+
+
+class _Worker:
+    """The matcher copy of a pool worker process."""
+
+    matcher: Matcher
+
+
+def _batches(titles: Iterable[str], size: int) -> Iterator[list[str]]:
+    iterator = iter(titles)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def _load_worker(matcher: Matcher) -> None:
+    _Worker.matcher = matcher
+
+
+def _resolve_batch(
+    changes: Sequence[_Change],
+    titles: Sequence[str],
+) -> list[Resolution]:
+    matcher = _Worker.matcher
+    # Versions count changes, so a worker started (forked) after some of
+    # them skips those its copy already has
+    for version, updated, removed in changes:
+        if version > matcher.version:
+            if updated:
+                matcher.update(updated)
+            else:
+                matcher.remove(removed)
+    # Product indexes pickle faster than IDs; the pool maps them back
+    return [matcher.resolve(title) for title in titles]
+
+
+class MatcherPool:
+    """Worker processes resolving titles in batches, each with a matcher copy.
+
+    The matcher is sent to each worker once, when the pool starts. Products
+    updated or removed through the pool are sent along with later batches
+    and replayed by the workers instead. The workers restart, taking a fresh
+    copy, only when the token set changed (so that the parent's compiled
+    automaton is shipped rather than rebuilt in every worker), when those
+    changes outgrow ``COMPACT_RATIO`` of the catalog, or when the matcher
+    was changed directly rather than through the pool.
+    """
+
+    def __init__(
+        self,
+        matcher: Matcher,
+        processes: int = MATCH_PROCESSES,
+        batch_titles: int = MATCH_BATCH_TITLES,
+    ) -> None:
+        self.matcher = matcher
+        self.processes = processes
+        self.batch_titles = batch_titles
+        self._executor: ProcessPoolExecutor | None = None
+        # What the workers have, or will have once they replay the changes
+        self._version = matcher.version
+        self._patterns = matcher.patterns
+        self._changes: list[_Change] = []
+        self._changed = 0
+
+    @property
+    def executor(self) -> ProcessPoolExecutor | None:
+        """The running worker processes, if started."""
+        return self._executor
+
+    def update(self, products: Iterable[ProductRecord]) -> None:
+        """Add or replace products in the matcher and in running workers."""
+        records = tuple(products)
+        self.matcher.update(records)
+        self._record(records, (), len(records))
+
+    def remove(self, product_ids: Iterable[UUID]) -> None:
+        """Forget products in the matcher and in running workers."""
+        removed = tuple(product_ids)
+        self.matcher.remove(removed)
+        self._record((), removed, len(removed))
+
+    def _record(
+        self,
+        updated: Sequence[ProductRecord],
+        removed: Sequence[UUID],
+        size: int,
+    ) -> None:
+        # A version skipped means a direct change; the workers restart then
+        if self.matcher.version == self._version + 1:
+            self._version = self.matcher.version
+            self._changes.append((self._version, updated, removed))
+            self._changed += size
+
+    def _workers(self) -> ProcessPoolExecutor:
+        if (
+            self._executor is None
+            or self._version != self.matcher.version
+            or self._patterns != self.matcher.patterns
+            or self._changed > COMPACT_RATIO * max(len(self.matcher), 1)
+        ):
+            self.close()
+            self._version = self.matcher.version
+            self._patterns = self.matcher.patterns
+            self._changes, self._changed = [], 0
+            self._executor = ProcessPoolExecutor(
+                self.processes,
+                initializer=_load_worker,
+                initargs=(self.matcher,),
+            )
+        return self._executor
+
+    def match(self, titles: Iterable[str]) -> Iterator[Match]:
+        """Resolve titles in order, batches running in parallel.
+
+        At most two batches per worker are in flight, so titles can be
+        streamed through without holding them all.
+        """
+        executor = self._workers()
+        pending: deque[Future[list[Resolution]]] = deque()
+        for batch in _batches(titles, self.batch_titles):
+            changes = tuple(self._changes)
+            pending.append(executor.submit(_resolve_batch, changes, batch))
+            if len(pending) >= 2 * self.processes:
+                yield from self.matcher.matches(pending.popleft().result())
+        while pending:
+            yield from self.matcher.matches(pending.popleft().result())
+
+    def close(self) -> None:
+        """Stop the workers."""
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
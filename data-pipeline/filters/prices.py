@@ -0,0 +1,185 @@
+"""Price outlier filter: drops lot sales, misprices and fakes.
+
+Each product keeps a rolling window of its last ``OUTLIER_WINDOW`` accepted
+log prices, seeded from its daily candle medians. A chunk of observations
+is scored in one vectorized pass: the windows of the chunk's products are
+sorted once to give each product's median and MAD, and every observation
+gets a robust z-score, ``0.6745 * (log price - median) / MAD``. Log prices
+make a lot of ten and a tenth of the price equally far out. Observations
+beyond ``OUTLIER_THRESHOLD`` are outliers. The rest are appended to their
+product's window, so outliers never move the baseline.
+
+Products with fewer than ``OUTLIER_MIN_HISTORY`` prices are not scored.
+Chunks are compared with the history before them, so feed them in sale
+order. Memory is the windows alone: products x window x 4 bytes,
+whatever the stream's length.
+"""
+
+import os
+from collections.abc import Iterable, Iterator, Sequence
+from dataclasses import dataclass
+from uuid import UUID
+
+import asyncpg
+import numpy as np
+
+OUTLIER_WINDOW = int(os.getenv("OUTLIER_WINDOW", "32"))
+# Iglewicz and Hoaglin's cut-off for modified z-scores
+OUTLIER_THRESHOLD = float(os.getenv("OUTLIER_THRESHOLD", "3.5"))
+OUTLIER_MIN_HISTORY = 5
+# MAD floor in log space (about 5%), so a product whose recent sales were
+# all the same price does not reject every small move
+OUTLIER_MIN_MAD = 0.05
+
+# MAD of a normal distribution is 0.6745 standard deviations
+_MAD_SCALE = 0.6745
+
+# Last ``$2`` daily medians of each product in ``$1``, oldest first, with
+# the product's position in ``$1`` (from 1)
+_CANDLE_HISTORY_SQL = """
+SELECT requested.position, recent.median_price
+FROM unnest($1::uuid[]) WITH ORDINALITY AS requested(product_id, position)
+CROSS JOIN LATERAL (
+    SELECT bucket_start, median_price
+    FROM price_candles
+    WHERE product_id = requested.product_id AND period = 'day'
+    ORDER BY bucket_start DESC
+    LIMIT $2
+) AS recent
+ORDER BY requested.position, recent.bucket_start
+"""
+
+
+@dataclass
+class PriceChunk:
+    """Observations as arrays: dense product indexes and prices."""
+
+    product: np.ndarray
+    price: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.product)
+
+    def select(self, mask: np.ndarray) -> "PriceChunk":
+        return PriceChunk(self.product[mask], self.price[mask])
+
+
+class PriceOutlierFilter:
+    """Robust z-scores of prices against each product's rolling window.
+
+    Products are dense indexes (e.g. a matcher's); windows grow to fit the
+    largest index seen.
+    """
+
+    def __init__(
+        self,
+        window: int = OUTLIER_WINDOW,
+        threshold: float = OUTLIER_THRESHOLD,
+        min_history: int = OUTLIER_MIN_HISTORY,
+    ) -> None:
+        self.window = window
+        self.threshold = threshold
+        self.min_history = min_history
+        # Log prices, NaN where a window is not yet full; ring buffers
+        self._prices = np.full((0, window), np.nan, dtype=np.float32)
+        self._head = np.zeros(0, dtype=np.int32)
+        self._count = np.zeros(0, dtype=np.int32)
+
+    @property
+    def products(self) -> int:
+        """Number of product windows allocated."""
+        return len(self._head)
+
+    def _reserve(self, products: int) -> None:
+        if products <= len(self._head):
+            return
+        size = max(products, 2 * len(self._head))
+        grown = np.full((size, self.window), np.nan, dtype=np.float32)
+        grown[: len(self._head)] = self._prices
+        self._prices = grown
+        self._head = np.concatenate(
+            [self._head, np.zeros(size - len(self._head), np.int32)],
+        )
+        self._count = np.concatenate(
+            [self._count, np.zeros(size - len(self._count), np.int32)],
+        )
+
+    def seed(self, product: np.ndarray, price: np.ndarray) -> None:
+        """Add known-good prices (oldest first), e.g. candle medians."""
+        self._append(np.asarray(product), np.log(np.asarray(price, np.float64)))
+
+    def _append(self, product: np.ndarray, log_price: np.ndarray) -> None:
+        """Push prices, in order, onto their products' windows."""
+        if not len(product):
+            return
+        self._reserve(int(product.max()) + 1)
+        order = np.argsort(product, kind="stable")
+        product, log_price = product[order], log_price[order]
+        products, starts, counts = np.unique(
+            product,
+            return_index=True,
+            return_counts=True,
+        )
+        rank = np.arange(len(product)) - np.repeat(starts, counts)
+        # Only the last ``window`` prices of a product survive
+        skipped = np.repeat(np.maximum(counts - self.window, 0), counts)
+        keep = rank >= skipped
+        slot = (np.repeat(self._head[products], counts) + rank - skipped) % self.window
+        self._prices[product[keep], slot[keep]] = log_price[keep]
+        kept = counts - np.maximum(counts - self.window, 0)
+        self._head[products] = (self._head[products] + kept) % self.window
+        self._count[products] = np.minimum(self._count[products] + counts, self.window)
+
+    def _baseline(self, products: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Median and floored MAD of products' windows (NaN if too short)."""
+        windows = np.sort(self._prices[products], axis=1)  # NaNs sort last
+        count = self._count[products]
+        rows = np.arange(len(products))
+        low, high = np.maximum(count - 1, 0) // 2, count // 2
+        median = (windows[rows, low] + windows[rows, high]) / 2
+        deviation = np.sort(np.abs(windows - median[:, None]), axis=1)
+        mad = (deviation[rows, low] + deviation[rows, high]) / 2
+        median[count < self.min_history] = np.nan
+        return median, np.maximum(mad, OUTLIER_MIN_MAD)
+
+    def score(self, chunk: PriceChunk) -> np.ndarray:
+        """Robust z-scores of a chunk's prices; NaN for unscored products.
+
+        Prices that are not outliers join their products' windows.
+        """
+        if not len(chunk):
+            return np.empty(0)
+        self._reserve(int(chunk.product.max()) + 1)
+        products, inverse = np.unique(chunk.product, return_inverse=True)
+        median, mad = self._baseline(products)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            log_price = np.log(chunk.price.astype(np.float64))
+            z: np.ndarray = _MAD_SCALE * (log_price - median[inverse]) / mad[inverse]
+        # Free or negative prices are never real sales
+        z[chunk.price <= 0] = np.inf
+        accepted = ~(np.abs(z) > self.threshold)
+        self._append(chunk.product[accepted], log_price[accepted])
+        return z
+
+    def outliers(self, chunk: PriceChunk) -> np.ndarray:
+        """Boolean mask of a chunk's outliers; see ``score``."""
+        flags: np.ndarray = np.abs(self.score(chunk)) > self.threshold
+        return flags
+
+    def filter(self, chunks: Iterable[PriceChunk]) -> Iterator[PriceChunk]:
+        """Stream chunks with their outliers dropped."""
+        for chunk in chunks:
+            yield chunk.select(~self.outliers(chunk))
+
+
+async def load_candle_history(
+    conn: asyncpg.Connection,
+    product_ids: Sequence[UUID],
+    days: int = OUTLIER_WINDOW,
+) -> PriceChunk:
+    """Products' last ``days`` daily medians, indexed by position in the list."""
+    records = await conn.fetch(_CANDLE_HISTORY_SQL, list(product_ids), days)
+    return PriceChunk(
+        np.fromiter((record[0] - 1 for record in records), np.int64, len(records)),
+        np.fromiter((record[1] for record in records), np.float64, len(records)),
+    )
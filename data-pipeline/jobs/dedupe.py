@@ -0,0 +1,103 @@
+"""Content-hash dedupe of observations before they reach the database.
+
+Each observation is reduced to a 64-bit hash of its identity (source,
+listing and sale time, the key ``prices_raw`` dedupes on). A ``SeenSet``
+holds the hashes of recently ingested sales as a sorted array with each
+sale's day, 12 bytes per sale, so a batch is checked with one vectorized
+search. It only needs sales inside a job's overlap window: anything older
+is skipped by the job's watermark, so ``prune`` keeps it small. It is
+saved to disk atomically with the job's checkpoint.
+
+Hashes are exact keys rather than a Bloom filter, so a new sale is never
+dropped as a false positive; two distinct sales colliding in 64 bits is
+vanishingly unlikely at these set sizes.
+"""
+
+import os
+from collections.abc import Sequence
+from datetime import date
+from hashlib import blake2b
+from pathlib import Path
+
+import numpy as np
+from models.observations import PriceObservation
+
+
+def observation_hashes(observations: Sequence[PriceObservation]) -> np.ndarray:
+    """64-bit identity hashes of observations, as uint64."""
+    digests = b"".join(
+        blake2b(
+            f"{obs.source}\x1f{obs.listing_id}\x1f{obs.sold_at.isoformat()}".encode(),
+            digest_size=8,
+        ).digest()
+        for obs in observations
+    )
+    return np.frombuffer(digests, dtype=np.uint64).copy()
+
+
+def observation_days(observations: Sequence[PriceObservation]) -> np.ndarray:
+    """Sale days of observations as proleptic ordinals."""
+    return np.fromiter(
+        (obs.sold_at.toordinal() for obs in observations),
+        dtype=np.int32,
+        count=len(observations),
+    )
+
+
+class SeenSet:
+    """Hashes of ingested sales with their sale days, sorted by hash."""
+
+    def __init__(
+        self,
+        hashes: np.ndarray | None = None,
+        days: np.ndarray | None = None,
+    ) -> None:
+        self.hashes = hashes if hashes is not None else np.empty(0, np.uint64)
+        self.days = days if days is not None else np.empty(0, np.int32)
+
+    def __len__(self) -> int:
+        return len(self.hashes)
+
+    def contains(self, hashes: np.ndarray) -> np.ndarray:
+        """Boolean mask of the hashes already in the set."""
+        if not len(self.hashes):
+            return np.zeros(len(hashes), dtype=bool)
+        positions = np.searchsorted(self.hashes, hashes)
+        found = self.hashes[np.minimum(positions, len(self.hashes) - 1)]
+        seen: np.ndarray = found == hashes
+        return seen
+
+    def add(self, hashes: np.ndarray, days: np.ndarray) -> None:
+        """Add hashes not already present (with the days of their sales)."""
+        hashes, first = np.unique(hashes, return_index=True)
+        new = ~self.contains(hashes)
+        hashes, days = hashes[new], days[first[new]]
+        if not len(hashes):
+            return
+        positions = np.searchsorted(self.hashes, hashes)
+        self.hashes = np.insert(self.hashes, positions, hashes)
+        self.days = np.insert(self.days, positions, days)
+
+    def prune(self, before: date) -> None:
+        """Forget sales from before ``before``."""
+        keep = self.days >= before.toordinal()
+        if not keep.all():
+            self.hashes, self.days = self.hashes[keep], self.days[keep]
+
+    @classmethod
+    def load(cls, path: Path) -> "SeenSet":
+        """The set saved at ``path``, or an empty one if there is none."""
+        try:
+            with np.load(path) as saved:
+                return cls(saved["hashes"], saved["days"])
+        except FileNotFoundError:
+            return cls()
+
+    def save(self, path: Path) -> None:
+        """Write the set so a crash leaves either the old or the new file."""
+        temporary = path.with_suffix(".tmp.npz")
+        with temporary.open("wb") as file:
+            np.savez(file, hashes=self.hashes, days=self.days)
+            file.flush()
+            os.fsync(file.fileno())
+        temporary.replace(path)
@@ -0,0 +1,231 @@
+"""Checkpointed incremental ingestion of observed sales.
+
+An ``IngestJob`` fetches one source's sales in batches, starting from the
+source's watermark less an overlap for sales reported late. For each batch,
+``run_ingest`` drops sales from before that bound and sales the source's
+``SeenSet`` already holds, writes the rest through a sink, then checkpoints
+the seen-set and the job's resume cursor. A crashed run resumes from its
+last checkpoint; at worst one batch is written twice, which ``prices_raw``
+ignores (ON CONFLICT DO NOTHING). A finished run moves the watermark to the
+newest sale it saw and prunes the seen-set to the overlap window, so each
+run costs what is new since the last one, not the source's whole history.
+
+State lives in ``INGEST_STATE_DIR``, one JSON file and one seen-set file per
+source, each replaced atomically. Flows call ``run_ingest`` with their job
+and a sink, normally ``ApiPriceSink``.
+"""
+
+import json
+import os
+import re
+from abc import ABC, abstractmethod
+from collections.abc import AsyncIterator, Sequence
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Protocol
+
+import httpx
+import numpy as np
+from models.observations import PriceObservation
+
+from jobs.dedupe import SeenSet, observation_days, observation_hashes
+
+INGEST_STATE_DIR = Path(os.getenv("INGEST_STATE_DIR", ".ingest-state"))
+INGEST_OVERLAP = timedelta(hours=float(os.getenv("INGEST_OVERLAP_HOURS", "24")))
+INGEST_API_URL = os.getenv("INGEST_API_URL", "http://localhost:8000/api/v1")
+# The API's PRICE_APPEND_MAX_ROWS
+INGEST_SINK_BATCH_ROWS = 10000
+
+_SOURCE_NAME = re.compile(r"^[a-z0-9_-]+$")
+
+
+@dataclass
+class Batch:
+    """Sales from one fetch and where to resume after them."""
+
+    observations: list[PriceObservation]
+    cursor: str | None = None
+
+
+class IngestJob(ABC):
+    """A source of observed sales, fetched from a lower bound onwards."""
+
+    source: str
+    # How far before the watermark each run starts again
+    overlap: timedelta = INGEST_OVERLAP
+
+    @abstractmethod
+    def fetch(self, since: datetime | None, cursor: str | None) -> AsyncIterator[Batch]:
+        """Sales sold at or after ``since`` (all if ``None``), in batches.
+
+        ``cursor`` is the last batch's cursor when resuming a crashed run,
+        to continue after it; ``None`` starts from ``since``.
+        """
+
+
+class Sink(Protocol):
+    """Where new sales are written; must ignore sales already stored."""
+
+    async def write(self, observations: Sequence[PriceObservation]) -> int:
+        """Write sales and return how many were new to the store."""
+        ...
+
+
+class ApiPriceSink:
+    """Writes through the API's ``POST /prices``, which refreshes candles."""
+
+    def __init__(
+        self,
+        base_url: str = INGEST_API_URL,
+        client: httpx.AsyncClient | None = None,
+    ) -> None:
+        self._client = client or httpx.AsyncClient(base_url=base_url, timeout=60)
+
+    async def write(self, observations: Sequence[PriceObservation]) -> int:
+        inserted = 0
+        for start in range(0, len(observations), INGEST_SINK_BATCH_ROWS):
+            chunk = observations[start : start + INGEST_SINK_BATCH_ROWS]
+            response = await self._client.post(
+                "/prices",
+                json={"observations": [obs.model_dump(mode="json") for obs in chunk]},
+            )
+            response.raise_for_status()
+            inserted += response.json()["inserted"]
+        return inserted
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+
+@dataclass
+class JobState:
+    """A source's progress; ``running`` while a run is unfinished."""
+
+    source: str
+    # Every sale before watermark - overlap has been ingested
+    watermark: datetime | None = None
+    running: bool = False
+    # The unfinished run's lower bound, resume cursor and newest sale
+    since: datetime | None = None
+    cursor: str | None = None
+    high_water: datetime | None = None
+
+    def to_json(self) -> bytes:
+        return json.dumps(asdict(self), default=datetime.isoformat).encode()
+
+    @classmethod
+    def from_json(cls, data: bytes) -> "JobState":
+        fields: dict[str, Any] = json.loads(data)
+        for name in ("watermark", "since", "high_water"):
+            if fields[name] is not None:
+                fields[name] = datetime.fromisoformat(fields[name])
+        return cls(**fields)
+
+
+class StateStore:
+    """Job states and seen-sets on disk, one pair of files per source."""
+
+    def __init__(self, directory: Path = INGEST_STATE_DIR) -> None:
+        self.directory = directory
+
+    def _paths(self, source: str) -> tuple[Path, Path]:
+        if not _SOURCE_NAME.match(source):
+            msg = f"Invalid source name: {source!r}"
+            raise ValueError(msg)
+        return (
+            self.directory / f"{source}.json",
+            self.directory / f"{source}.seen.npz",
+        )
+
+    def load(self, source: str) -> tuple[JobState, SeenSet]:
+        """A source's state and seen-set, fresh if it never ran."""
+        state_path, seen_path = self._paths(source)
+        try:
+            state = JobState.from_json(state_path.read_bytes())
+        except FileNotFoundError:
+            state = JobState(source)
+        return state, SeenSet.load(seen_path)
+
+    def save(self, state: JobState, seen: SeenSet) -> None:
+        """Checkpoint; the seen-set first, so it never lags the cursor."""
+        state_path, seen_path = self._paths(state.source)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        seen.save(seen_path)
+        temporary = state_path.with_suffix(".tmp")
+        with temporary.open("wb") as file:
+            file.write(state.to_json())
+            file.flush()
+            os.fsync(file.fileno())
+        temporary.replace(state_path)
+
+
+@dataclass
+class IngestReport:
+    """What one run fetched, skipped and wrote."""
+
+    source: str
+    resumed: bool = False
+    batches: int = 0
+    fetched: int = 0
+    # Older than the run's lower bound
+    stale: int = 0
+    # Already ingested, or repeated within the run
+    duplicate: int = 0
+    written: int = 0
+    inserted: int = 0
+    watermark: datetime | None = None
+
+
+async def run_ingest(
+    job: IngestJob,
+    sink: Sink,
+    store: StateStore | None = None,
+) -> IngestReport:
+    """Ingest a source's new sales, resuming an unfinished run if any."""
+    store = store or StateStore()
+    state, seen = store.load(job.source)
+    report = IngestReport(job.source, resumed=state.running)
+    if not state.running:
+        state.running = True
+        state.since = state.watermark - job.overlap if state.watermark else None
+        state.cursor = None
+        state.high_water = state.watermark
+
+    async for batch in job.fetch(state.since, state.cursor):
+        since = state.since
+        fresh = [
+            obs for obs in batch.observations if since is None or obs.sold_at >= since
+        ]
+        report.batches += 1
+        report.fetched += len(batch.observations)
+        report.stale += len(batch.observations) - len(fresh)
+
+        hashes = observation_hashes(fresh)
+        days = observation_days(fresh)
+        # First occurrence of each hash in the batch, if not seen before
+        new = np.zeros(len(fresh), dtype=bool)
+        new[np.unique(hashes, return_index=True)[1]] = True
+        new &= ~seen.contains(hashes)
+        unseen = [obs for obs, is_new in zip(fresh, new, strict=True) if is_new]
+        report.duplicate += len(fresh) - len(unseen)
+
+        if unseen:
+            report.inserted += await sink.write(unseen)
+            report.written += len(unseen)
+            seen.add(hashes[new], days[new])
+        if fresh:
+            newest = max(obs.sold_at for obs in fresh)
+            if state.high_water is None or newest > state.high_water:
+                state.high_water = newest
+        state.cursor = batch.cursor
+        store.save(state, seen)
+
+    state.watermark = state.high_water
+    state.running = False
+    state.since = state.cursor = state.high_water = None
+    if state.watermark is not None:
+        seen.prune((state.watermark - job.overlap).date())
+    store.save(state, seen)
+    report.watermark = state.watermark
+    return report
@@ -0,0 +1,31 @@
+"""Observed sales as collectors emit them and the API's /prices accepts them."""
+
+from datetime import UTC, datetime
+from decimal import Decimal
+from uuid import UUID
+
+from pydantic import BaseModel, Field, field_validator
+
+
+class PriceObservation(BaseModel):
+    """One observed sale of a catalog product."""
+
+    product_id: UUID
+    source: str = Field(..., min_length=1, max_length=50)
+    listing_id: str = Field(..., min_length=1, max_length=100)
+    sold_at: datetime
+    price: Decimal = Field(..., ge=0, decimal_places=2)
+    currency: str = Field("USD", min_length=3, max_length=3)
+    condition: str | None = Field(None, max_length=50)
+
+    @field_validator("sold_at")
+    @classmethod
+    def _sold_at_is_utc(cls, value: datetime) -> datetime:
+        if value.tzinfo is None:
+            return value.replace(tzinfo=UTC)
+        return value.astimezone(UTC)
+
+    @property
+    def key(self) -> tuple[str, str, datetime]:
+        """The sale's identity: (source, listing_id, sold_at)."""
+        return (self.source, self.listing_id, self.sold_at)
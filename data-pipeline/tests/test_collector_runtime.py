@@ -0,0 +1,159 @@
+"""Tests for the collector runtime against a local stub HTTP server."""
+
+import asyncio
+import threading
+import time
+from collections import Counter
+from collections.abc import Iterator
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+
+import pytest
+from collectors.runtime import Collector, Page, TokenBucket, Validators
+
+
+class StubServer(ThreadingHTTPServer):
+    """Counts requests per path and the client connections they came on."""
+
+    def __init__(self) -> None:
+        super().__init__(("127.0.0.1", 0), StubHandler)
+        self.lock = threading.Lock()
+        self.hits: Counter[str] = Counter()
+        self.connections: set[tuple[str, int]] = set()
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Versioned pages with ETags, plus endpoints that fail."""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self) -> None:
+        server = self.server
+        assert isinstance(server, StubServer)
+        with server.lock:
+            server.hits[self.path] += 1
+            server.connections.add(self.client_address)
+            hits = server.hits[self.path]
+        if self.path.startswith("/cards/"):
+            etag = f'"{self.path}-v1"'
+            if self.headers.get("If-None-Match") == etag:
+                self._respond(304)
+            else:
+                self._respond(200, f"listing {self.path}".encode(), {"ETag": etag})
+        elif self.path == "/flaky" and hits == 1:
+            self._respond(503, headers={"Retry-After": "0"})
+        elif self.path == "/flaky":
+            self._respond(200, b"recovered")
+        elif self.path == "/broken":
+            self._respond(500)
+        else:
+            self._respond(404)
+
+    def _respond(
+        self,
+        status: int,
+        body: bytes = b"",
+        headers: dict[str, str] | None = None,
+    ) -> None:
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        if status != HTTPStatus.NOT_MODIFIED:
+            self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args: object) -> None:
+        pass
+
+
+@pytest.fixture
+def server() -> Iterator[StubServer]:
+    server = StubServer()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def url(server: StubServer, path: str) -> str:
+    return f"http://127.0.0.1:{server.server_port}{path}"
+
+
+def listing(page: Page) -> str:
+    """Module level so it can run in the parse pool."""
+    return page.text
+
+
+async def test_unchanged_pages_are_skipped(server: StubServer) -> None:
+    """A second pass sends validators, gets 304s and parses nothing."""
+    cards = 30
+    urls = [url(server, f"/cards/{n}") for n in range(cards)]
+    validators: dict[str, Validators] = {}
+    options: dict[str, Any] = {"concurrency": 4, "rate_per_host": 1000, "burst": 100}
+
+    async with Collector(validators=validators, **options) as collector:
+        first = [result async for result in collector.collect(urls, listing)]
+    assert sorted(first) == sorted(f"listing /cards/{n}" for n in range(cards))
+    assert collector.stats.parsed == cards
+    assert collector.stats.summary()["parse_pages_per_second"] > 0
+    # Keep-alive: connections are reused rather than opened per request
+    assert len(server.connections) <= options["concurrency"]
+
+    async with Collector(validators=validators, **options) as collector:
+        second = [result async for result in collector.collect(urls, listing)]
+    assert second == []
+    assert (collector.stats.not_modified, collector.stats.parsed) == (cards, 0)
+
+
+async def test_failures_are_retried_then_skipped(server: StubServer) -> None:
+    """Retryable errors are retried; pages that keep failing are dropped."""
+    urls = [url(server, path) for path in ["/flaky", "/broken", "/missing"]]
+    async with Collector(concurrency=2, max_retries=2, backoff=0.001) as collector:
+        results = [result async for result in collector.collect(urls, listing)]
+
+    assert results == ["recovered"]
+    assert [server.hits[path] for path in ["/flaky", "/broken", "/missing"]] == [
+        2,
+        3,
+        1,
+    ]
+    assert (collector.stats.retries, collector.stats.failed) == (3, 2)
+
+
+async def test_stopping_early_with_a_full_queue_returns(server: StubServer) -> None:
+    """Closing ``collect`` while its result queue is full does not hang."""
+    urls = [url(server, f"/cards/{n}") for n in range(30)]
+    concurrency = 2
+    async with Collector(
+        concurrency=concurrency,
+        rate_per_host=1000,
+        burst=100,
+    ) as collector:
+        results = collector.collect(urls, listing)
+        assert await anext(results)
+        # A slow consumer: the workers fill the queue (twice their number)
+        # and hold a page each meanwhile
+        while collector.stats.parsed < 3 * concurrency:
+            await asyncio.sleep(0.01)
+        await asyncio.wait_for(results.aclose(), 5)
+    assert collector.stats.parsed < len(urls)
+
+
+async def test_token_bucket_limits_rate() -> None:
+    """After the burst, tokens come at the configured rate."""
+    rate, burst, acquired = 100, 5, 25
+    bucket = TokenBucket(rate=rate, burst=burst)
+    started = time.monotonic()
+    for _ in range(acquired):
+        await bucket.acquire()
+    # Allow the timers some slack
+    assert time.monotonic() - started >= 0.9 * (acquired - burst) / rate
+
+    pause = 0.1
+    bucket.pause(pause)
+    started = time.monotonic()
+    await bucket.acquire()
+    assert time.monotonic() - started >= 0.9 * pause
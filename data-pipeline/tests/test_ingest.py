@@ -0,0 +1,171 @@
+"""Tests for checkpointed incremental ingestion."""
+
+import json
+from collections.abc import AsyncIterator, Sequence
+from datetime import UTC, date, datetime, timedelta
+from decimal import Decimal
+from pathlib import Path
+from typing import Any
+from uuid import uuid4
+
+import httpx
+import numpy as np
+import pytest
+from jobs.dedupe import SeenSet, observation_days, observation_hashes
+from jobs.ingest import ApiPriceSink, Batch, IngestJob, StateStore, run_ingest
+from models.observations import PriceObservation
+
+PRODUCT = uuid4()
+NOW = datetime(2025, 6, 1, tzinfo=UTC)
+
+
+def sale(listing: int, hours_ago: float) -> PriceObservation:
+    return PriceObservation.model_validate(
+        {
+            "product_id": PRODUCT,
+            "source": "stub",
+            "listing_id": str(listing),
+            "sold_at": NOW - timedelta(hours=hours_ago),
+            "price": Decimal("9.99"),
+        },
+    )
+
+
+class StubJob(IngestJob):
+    """Serves a list of sales from ``since`` in batches of three."""
+
+    source = "stub"
+    overlap = timedelta(hours=2)
+
+    def __init__(
+        self,
+        sales: list[PriceObservation],
+        crash_after: int | None = None,
+    ) -> None:
+        self.sales = sales
+        self.crash_after = crash_after
+        self.calls: list[tuple[datetime | None, str | None]] = []
+
+    async def fetch(
+        self,
+        since: datetime | None,
+        cursor: str | None,
+    ) -> AsyncIterator[Batch]:
+        self.calls.append((since, cursor))
+        sales = sorted(
+            (obs for obs in self.sales if since is None or obs.sold_at >= since),
+            key=lambda obs: obs.sold_at,
+        )
+        start = int(cursor) if cursor else 0
+        for offset in range(start, len(sales), 3):
+            if self.crash_after is not None and offset >= self.crash_after:
+                msg = "source went away"
+                raise ConnectionError(msg)
+            # Re-scrapes repeat a sale within a batch too
+            batch = sales[offset : offset + 3]
+            yield Batch(batch + batch[:1], cursor=str(offset + 3))
+
+
+class MemorySink:
+    """Stores sales by identity, ignoring ones it already has."""
+
+    def __init__(self) -> None:
+        self.rows: dict[tuple[str, str, datetime], PriceObservation] = {}
+        self.writes = 0
+
+    async def write(self, observations: Sequence[PriceObservation]) -> int:
+        self.writes += len(observations)
+        before = len(self.rows)
+        self.rows.update((obs.key, obs) for obs in observations)
+        return len(self.rows) - before
+
+
+async def test_runs_only_write_new_sales(tmp_path: Path) -> None:
+    """The second run skips older sales and the overlap it already has."""
+    store = StateStore(tmp_path)
+    sink = MemorySink()
+    sales = [sale(n, hours_ago=10 - n) for n in range(10)]
+
+    first = await run_ingest(StubJob(sales), sink, store)
+    assert first.written == first.inserted == len(sales)
+    # One repeat per batch of three
+    assert first.duplicate == len(range(0, len(sales), 3))
+    assert first.watermark == NOW - timedelta(hours=1)
+
+    late = [sale(10, hours_ago=0.5), sale(11, hours_ago=0.2)]
+    job = StubJob([*sales, *late])
+    second = await run_ingest(job, sink, store)
+    assert job.calls == [(NOW - timedelta(hours=3), None)]
+    assert second.written == second.inserted == len(late)
+    assert second.fetched - second.duplicate == len(late)
+    assert sink.writes == len(sales) + len(late)
+    assert second.watermark == NOW - timedelta(hours=0.2)
+
+
+async def test_crashed_runs_resume_from_the_checkpoint(tmp_path: Path) -> None:
+    """A rerun continues after the last checkpointed batch."""
+    store = StateStore(tmp_path)
+    sink = MemorySink()
+    sales = [sale(n, hours_ago=10 - n) for n in range(10)]
+
+    crash_after = 6
+    with pytest.raises(ConnectionError):
+        await run_ingest(StubJob(sales, crash_after=crash_after), sink, store)
+    state, seen = store.load("stub")
+    assert state.running
+    assert state.cursor == str(crash_after)
+    assert state.watermark is None
+    assert len(seen) == len(sink.rows) == crash_after
+
+    job = StubJob(sales)
+    report = await run_ingest(job, sink, store)
+    assert report.resumed
+    assert job.calls == [(None, "6")]
+    assert report.written == len(sales) - crash_after
+    assert sink.writes == len(sales)
+    assert store.load("stub")[0].watermark == NOW - timedelta(hours=1)
+
+
+def test_seen_set_round_trip_and_prune(tmp_path: Path) -> None:
+    """Hashes persist, stay sorted and are dropped with their day."""
+    sales = [sale(n, hours_ago=24 * n) for n in range(5)]
+    hashes, days = observation_hashes(sales), observation_days(sales)
+    seen = SeenSet()
+    seen.add(hashes[:3], days[:3])
+    seen.add(hashes, days)
+    assert len(seen) == len(sales)
+    assert np.all(np.diff(seen.hashes.astype(np.float64)) > 0)
+
+    path = tmp_path / "seen.npz"
+    seen.save(path)
+    loaded = SeenSet.load(path)
+    assert loaded.contains(hashes).all()
+
+    loaded.prune(date(2025, 5, 30))
+    assert loaded.contains(hashes).tolist() == [True, True, True, False, False]
+    assert not SeenSet.load(tmp_path / "missing.npz").contains(hashes).any()
+
+
+async def test_api_sink_posts_in_api_sized_batches(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Sales are posted as /prices payloads and inserted counts summed."""
+    monkeypatch.setattr("jobs.ingest.INGEST_SINK_BATCH_ROWS", 2)
+    payloads: list[dict[str, Any]] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        payloads.append(json.loads(request.content))
+        count = len(payloads[-1]["observations"])
+        return httpx.Response(200, json={"received": count, "inserted": count})
+
+    client = httpx.AsyncClient(
+        base_url="http://api/api/v1",
+        transport=httpx.MockTransport(handler),
+    )
+    sink = ApiPriceSink(client=client)
+    sales = [sale(n, hours_ago=n) for n in range(5)]
+    assert await sink.write(sales) == len(sales)
+    await sink.aclose()
+
+    assert [len(payload["observations"]) for payload in payloads] == [2, 2, 1]
+    assert payloads[0]["observations"][0]["sold_at"] == "2025-06-01T00:00:00Z"
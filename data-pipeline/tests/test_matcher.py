@@ -0,0 +1,170 @@
+"""Tests for listing title to product matching."""
+
+import random
+from uuid import uuid4
+
+import pytest
+from filters import matcher as matcher_module
+from filters.matcher import (
+    MIN_MARGIN,
+    Automaton,
+    Matcher,
+    MatcherPool,
+    ProductRecord,
+    number_keys,
+)
+
+BASE = ProductRecord(
+    uuid4(),
+    "Charizard",
+    "Pokémon",
+    "Base Set",
+    "4/102",
+    "Holo",
+    [("Zard", 8)],
+)
+BASE_2 = ProductRecord(uuid4(), "Charizard", "Pokémon", "Base Set 2", "4/130", "Holo")
+DARK = ProductRecord(uuid4(), "Dark Charizard", "Pokémon", "Team Rocket", "4/82")
+PIKACHU = ProductRecord(uuid4(), "Pikachu", "Pokémon", "Jungle", "60/64")
+CATALOG = [BASE, BASE_2, DARK, PIKACHU]
+
+
+@pytest.fixture
+def matcher() -> Matcher:
+    return Matcher.build(CATALOG)
+
+
+@pytest.mark.parametrize(
+    ("title", "product"),
+    [
+        ("Charizard 004/102 Holo Rare WOTC PSA 9", BASE),
+        ("1999 Pokemon Base Set 2 CHARIZARD holo NM", BASE_2),
+        ("zard 4/102 lp", BASE),
+        ("Dark Charizard 4/82 Team Rocket 1st edition", DARK),
+        ("Pikachu Jungle #60 mint", PIKACHU),
+    ],
+)
+def test_titles_resolve_to_the_printing(
+    matcher: Matcher,
+    title: str,
+    product: ProductRecord,
+) -> None:
+    """Numbers, sets and aliases pick one printing of a shared name."""
+    match = matcher.match(title)
+    assert match.status == "matched"
+    assert match.product_id == product.id
+    assert match.score - match.runner_up_score >= MIN_MARGIN
+
+
+def test_unresolvable_titles(matcher: Matcher) -> None:
+    """A shared name alone is ambiguous; unknown cards are unmatched."""
+    assert matcher.match("Charizard card lot").status == "ambiguous"
+    assert matcher.match("Blastoise 2/102 holo").status == "unmatched"
+    assert matcher.match("").status == "unmatched"
+
+
+def test_number_keys_ignore_zero_padding() -> None:
+    """Card numbers compare without leading zeros or spacing."""
+    assert number_keys("charizard 004 / 102 psa 10") == (
+        {"4/102"},
+        {"4", "102", "10"},
+    )
+    assert number_keys("tg05/tg30") == ({"tg5/tg30"}, {"tg5", "tg30"})
+
+
+def test_automaton_finds_every_occurrence() -> None:
+    """Scanning finds the same patterns as checking each one at every offset."""
+    rng = random.Random(3)  # noqa: S311
+    vocabulary = list("abcde")
+    patterns = {tuple(rng.choices(vocabulary, k=rng.randint(1, 4))) for _ in range(40)}
+    automaton = Automaton.build(enumerate(patterns))
+    for _ in range(200):
+        tokens = rng.choices(vocabulary, k=rng.randint(0, 12))
+        expected = sorted(
+            pattern_id
+            for pattern_id, pattern in enumerate(patterns)
+            for start in range(len(tokens))
+            if tuple(tokens[start : start + len(pattern)]) == pattern
+        )
+        assert sorted(automaton.scan(tokens)) == expected
+
+
+def test_incremental_updates_match_a_rebuild(
+    matcher: Matcher,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Updated and removed products resolve as in a fresh build."""
+    monkeypatch.setattr(matcher_module, "COMPACT_RATIO", 1.0)
+    renamed = ProductRecord(
+        PIKACHU.id,
+        "Pikachu",
+        "Pokémon",
+        "Jungle",
+        "60/64",
+        None,
+        [("Yellow Mouse", 9)],
+    )
+    matcher.update([renamed])
+    matcher.remove([DARK.id])
+
+    assert matcher.uncompacted == 1
+    rebuilt = Matcher.build([BASE, BASE_2, renamed])
+    titles = [
+        "yellow mouse 60/64",
+        "Dark Charizard 4/82",
+        "Charizard 4/102 holo",
+        "pikachu jungle",
+    ]
+    assert matcher.match_many(titles) == rebuilt.match_many(titles)
+    assert matcher.match("Yellow Mouse Jungle").product_id == PIKACHU.id
+    assert matcher.match("Dark Charizard 4/82").product_id != DARK.id
+
+
+def test_pool_matches_in_order(matcher: Matcher) -> None:
+    """Batches resolved by workers come back in input order."""
+    titles = ["zard 4/102", "Pikachu Jungle 60", "nothing", "Charizard"] * 25
+    with MatcherPool(matcher, processes=2, batch_titles=7) as pool:
+        assert list(pool.match(titles)) == matcher.match_many(titles)
+        matcher.update([DARK])
+        assert list(pool.match(titles[:4])) == matcher.match_many(titles[:4])
+
+
+def test_updates_that_change_nothing_keep_the_version(matcher: Matcher) -> None:
+    """Re-sending an unchanged product is not a catalog change."""
+    version = matcher.version
+    matcher.update([DARK])
+    matcher.remove([uuid4()])
+    assert matcher.version == version
+
+    matcher.update([ProductRecord(DARK.id, "Dark Charizard", "Pokémon", None, "4/82")])
+    assert matcher.version == version + 1
+
+
+def test_pool_workers_replay_changes_without_restarting(
+    matcher: Matcher,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Changes made through the pool reach the running workers."""
+    # Replay up to as many changes as there are products
+    monkeypatch.setattr(matcher_module, "COMPACT_RATIO", 1.0)
+    titles = ["Dark Charizard 4/82", "Charizard 4/102 holo", "pikachu jungle"] * 5
+    with MatcherPool(matcher, processes=2, batch_titles=4) as pool:
+        assert list(pool.match(titles)) == matcher.match_many(titles)
+        workers = pool.executor
+
+        # Known tokens only: replayed by the workers
+        pool.remove([BASE.id])
+        pool.update([ProductRecord(uuid4(), "Pikachu", "Pokémon", "Jungle", "60/64")])
+        assert list(pool.match(titles)) == matcher.match_many(titles)
+        assert pool.executor is workers
+
+        # New tokens: the workers restart with a fresh copy
+        pool.update([ProductRecord(DARK.id, "Dark Charizard", "Pokémon", "Rocket")])
+        assert list(pool.match(titles)) == matcher.match_many(titles)
+        assert pool.executor is not workers
+        workers = pool.executor
+
+        # Changed behind the pool's back: restart too
+        matcher.remove([DARK.id])
+        assert list(pool.match(titles)) == matcher.match_many(titles)
+        assert pool.executor is not workers
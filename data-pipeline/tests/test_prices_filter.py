@@ -0,0 +1,72 @@
+"""Tests for the vectorized price outlier filter."""
+
+from collections.abc import Sequence
+
+import numpy as np
+from filters.prices import PriceChunk, PriceOutlierFilter
+
+
+def chunk(products: Sequence[int], prices: Sequence[float]) -> PriceChunk:
+    return PriceChunk(np.array(products), np.array(prices, dtype=np.float64))
+
+
+def seeded(
+    window: int = 8,
+    history: Sequence[float] = (10.0, 10.5, 9.5, 10.2, 9.8),
+) -> PriceOutlierFilter:
+    price_filter = PriceOutlierFilter(window=window)
+    price_filter.seed(np.zeros(len(history), int), np.array(history))
+    return price_filter
+
+
+def test_lots_fakes_and_free_sales_are_outliers() -> None:
+    """Ten times the price, a tenth of it and non-positive prices are flagged."""
+    flags = seeded().outliers(chunk([0] * 5, [10.1, 100.0, 1.0, 0.0, -5.0]))
+    assert flags.tolist() == [False, True, True, True, True]
+
+
+def test_outliers_do_not_move_the_baseline() -> None:
+    """Only accepted prices join the window."""
+    price_filter = seeded()
+    for _ in range(10):
+        assert price_filter.outliers(chunk([0] * 4, [100.0] * 4)).all()
+    assert not price_filter.outliers(chunk([0], [10.0])).any()
+
+
+def test_short_histories_are_not_scored() -> None:
+    """Products with too few prices get NaN scores and are kept."""
+    price_filter = seeded()
+    products = [1, 1, 0]
+    z = price_filter.score(chunk(products, [5.0, 500.0, 10.0]))
+    assert np.isnan(z[:2]).all()
+    assert np.isfinite(z[2])
+    assert price_filter.products >= len(set(products))
+
+
+def test_windows_match_the_last_accepted_prices() -> None:
+    """Ring buffers hold each product's last ``window`` prices in any chunking."""
+    rng = np.random.default_rng(0)
+    price_filter = PriceOutlierFilter(window=8, threshold=np.inf, min_history=1)
+    history: dict[int, list[float]] = {}
+    for size in (3, 20, 1, 7, 50):
+        products = rng.integers(0, 4, size)
+        prices = rng.uniform(1, 100, size)
+        z = price_filter.score(PriceChunk(products, prices))
+        for product, price, score in zip(products, prices, z, strict=True):
+            window = np.log(history.get(product, [])[-8:])
+            if len(window):
+                median = np.median(window)
+                mad = max(np.median(np.abs(window - median)), 0.05)
+                expected = 0.6745 * (np.log(price) - median) / mad
+                assert np.isclose(score, expected, atol=1e-4)
+        # A chunk is scored against the history before it
+        for product, price in zip(products, prices, strict=True):
+            history.setdefault(product, []).append(price)
+
+
+def test_filter_streams_chunks_without_outliers() -> None:
+    """Each chunk comes back with its outliers dropped."""
+    kept = list(
+        seeded().filter([chunk([0, 0], [10.0, 1000.0]), chunk([0, 0], [0.1, 9.9])]),
+    )
+    assert [part.price.tolist() for part in kept] == [[10.0], [9.9]]
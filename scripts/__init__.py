@@ -0,0 +1 @@
+# Cardfolio 2.0 Scripts
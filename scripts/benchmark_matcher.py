@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""Benchmark listing title matching on a synthetic catalog.
+
+Builds ``--products`` products spread over ``--sets`` sets, with aliases,
+card numbers and variants, and eBay-style titles for them (grading,
+condition and filler words, zero-padded numbers, some titles for cards
+outside the catalog), then times:
+
+* ``build``: compiling the matcher
+* ``update``: adding ``--changed`` products with new aliases
+* ``match``: resolving ``--titles`` titles on one core
+* ``pool``: the same titles through a ``--processes`` worker pool
+
+No database is needed.
+
+    python scripts/benchmark_matcher.py --products 100000 --titles 200000
+"""
+
+import argparse
+import random
+import sys
+import time
+import uuid
+from pathlib import Path
+
+# Add the data pipeline to Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root / "data-pipeline"))
+
+from filters.matcher import (  # noqa: E402
+    MATCH_PROCESSES,
+    Matcher,
+    MatcherPool,
+    ProductRecord,
+)
+
+SYLLABLES = [
+    "char",
+    "iz",
+    "ard",
+    "pik",
+    "a",
+    "chu",
+    "bul",
+    "ba",
+    "saur",
+    "mew",
+    "two",
+    "gar",
+    "dos",
+    "eev",
+    "ee",
+    "drag",
+    "on",
+    "ite",
+]
+VARIANTS = [None, None, "Holo", "Reverse Holo", "1st Edition", "Shadowless"]
+GAMES = ["Pokemon", "Magic the Gathering", "Yu-Gi-Oh"]
+# Underscores join words that stay together
+FILLER = [
+    "PSA_10",
+    "BGS_9.5",
+    "NM",
+    "LP",
+    "Mint",
+    "Rare",
+    "TCG",
+    "Card",
+    "Lot",
+    "Graded",
+    "WOTC",
+    "Vintage",
+    "L@@K",
+]
+
+
+def word(rng: random.Random) -> str:
+    return "".join(rng.choices(SYLLABLES, k=rng.randint(2, 4))).title()
+
+
+def catalog(rng: random.Random, products: int, sets: int) -> list[ProductRecord]:
+    """Products whose names repeat across sets, as reprints do."""
+    set_names = [
+        f"{word(rng)} {rng.choice(['Base', 'Legends', 'Storm', ''])}"
+        for _ in range(sets)
+    ]
+    names = [
+        " ".join(word(rng) for _ in range(rng.choice([1, 1, 2, 3])))
+        for _ in range(products // 4)
+    ]
+    records = []
+    for _ in range(products):
+        name = rng.choice(names)
+        set_size = rng.randint(60, 250)
+        records.append(
+            ProductRecord(
+                id=uuid.uuid4(),
+                name=name,
+                game=rng.choice(GAMES),
+                set_name=rng.choice(set_names),
+                card_number=f"{rng.randint(1, set_size):03d}/{set_size}",
+                variant=rng.choice(VARIANTS),
+                aliases=[
+                    (f"{name} {word(rng)}", rng.randint(1, 10))
+                    for _ in range(rng.randint(0, 2))
+                ],
+            ),
+        )
+    return records
+
+
+def title(rng: random.Random, product: ProductRecord) -> str:
+    number = product.card_number or ""
+    if rng.getrandbits(1):
+        number = number.lstrip("0")
+    details = [product.set_name or "", number, product.variant or ""]
+    details += [f.replace("_", " ") for f in rng.sample(FILLER, rng.randint(1, 4))]
+    rng.shuffle(details)
+    return " ".join([product.name, *details])
+
+
+def main() -> None:
+    """Main function."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--products", type=int, default=100000)
+    parser.add_argument("--sets", type=int, default=400)
+    parser.add_argument("--titles", type=int, default=200000)
+    parser.add_argument("--changed", type=int, default=500)
+    parser.add_argument("--processes", type=int, default=MATCH_PROCESSES)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)  # noqa: S311
+    # A tenth of the titles are for cards the catalog does not have
+    unknown = args.products // 10
+    records = catalog(rng, args.products + args.changed + unknown, args.sets)
+    listed = records[: args.products]
+    changed = records[args.products : args.products + args.changed]
+    sources = [rng.choice(records) for _ in range(args.titles)]
+    titles = [title(rng, product) for product in sources]
+
+    started = time.perf_counter()
+    matcher = Matcher.build(listed)
+    print(
+        f"build   {time.perf_counter() - started:8.2f} s  "
+        f"{len(matcher)} products, {matcher.patterns} patterns",
+    )
+
+    started = time.perf_counter()
+    matcher.update(changed)
+    print(
+        f"update  {(time.perf_counter() - started) * 1000:8.2f} ms "
+        f"{len(changed)} products",
+    )
+
+    started = time.perf_counter()
+    results = matcher.match_many(titles)
+    elapsed = time.perf_counter() - started
+    matched = [
+        result.product_id == product.id
+        for result, product in zip(results, sources, strict=True)
+        if result.status == "matched"
+    ]
+    print(
+        f"match   {len(titles) / elapsed:8.0f} titles/s on one core, "
+        f"{len(matched) / len(titles):.1%} matched, "
+        f"{sum(matched) / len(matched):.1%} of them correctly",
+    )
+
+    with MatcherPool(matcher, args.processes) as pool:
+        list(pool.match(titles[: args.processes]))  # start the workers
+        started = time.perf_counter()
+        pooled = list(pool.match(titles))
+        elapsed = time.perf_counter() - started
+    assert pooled == results
+    print(
+        f"pool    {len(titles) / elapsed:8.0f} titles/s on "
+        f"{args.processes} processes",
+    )
+
+
+if __name__ == "__main__":
+    main()
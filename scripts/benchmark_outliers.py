@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""Benchmark the price outlier filter on synthetic sales.
+
+Generates ``--rows`` sales of ``--products`` products, each product with
+its own log-normal price level and spread, and turns ``--outliers`` of
+them into lot sales (5-20x) or fakes (1/20-1/5 of the price). Windows are
+seeded from ``--history`` clean prices per product, then the sales are
+streamed through the filter in ``--chunk-rows`` chunks. Prints throughput,
+the share of planted outliers caught and the share of clean sales flagged.
+
+No database is needed.
+
+    python scripts/benchmark_outliers.py --rows 10000000
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Add the data pipeline to Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root / "data-pipeline"))
+
+from filters.prices import PriceChunk, PriceOutlierFilter  # noqa: E402
+
+
+def main() -> None:
+    """Main function."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--products", type=int, default=100_000)
+    parser.add_argument("--outliers", type=float, default=0.02)
+    parser.add_argument("--history", type=int, default=10)
+    parser.add_argument("--chunk-rows", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    level = rng.uniform(np.log(1), np.log(2000), args.products)
+    spread = rng.uniform(0.05, 0.3, args.products)
+
+    price_filter = PriceOutlierFilter()
+    history = np.repeat(np.arange(args.products), args.history)
+    price_filter.seed(
+        history,
+        np.exp(rng.normal(level[history], spread[history])).round(2),
+    )
+
+    caught = flagged = planted = 0
+    elapsed = 0.0
+    for start in range(0, args.rows, args.chunk_rows):
+        rows = min(args.chunk_rows, args.rows - start)
+        product = rng.integers(0, args.products, rows)
+        price = np.exp(rng.normal(level[product], spread[product]))
+        outlier = rng.random(rows) < args.outliers
+        # Half lot sales, half fakes
+        factor = rng.uniform(5, 20, rows)
+        factor[rng.integers(0, 2, rows, dtype=bool)] **= -1
+        price[outlier] *= factor[outlier]
+        chunk = PriceChunk(product, price.round(2))
+
+        started = time.perf_counter()
+        flags = price_filter.outliers(chunk)
+        elapsed += time.perf_counter() - started
+
+        planted += int(outlier.sum())
+        flagged += int(flags.sum())
+        caught += int((flags & outlier).sum())
+
+    print(
+        f"{args.rows / elapsed:,.0f} rows/s ({elapsed:.2f} s for {args.rows:,} rows, "
+        f"{args.chunk_rows:,}-row chunks)",
+    )
+    print(
+        f"caught {caught / max(planted, 1):.1%} of {planted:,} outliers, flagged "
+        f"{(flagged - caught) / (args.rows - planted):.2%} of clean sales, "
+        f"window memory {price_filter.products * price_filter.window * 4 / 1e6:.0f} MB",
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""Benchmark portfolio valuation on a synthetic power-user collection.
+
+Builds ``--cards`` holdings with ``--prices-per-card`` daily prices each,
+spread over a ``--years`` window, and times:
+
+* ``value``: a full valuation (what a cache miss costs after loading)
+* ``reprice``: applying today's prices for ``--repriced`` cards to that
+  valuation (what a cache hit costs)
+
+No database is needed.
+
+    python scripts/benchmark_portfolio.py --cards 20000 --years 5
+"""
+
+import argparse
+import statistics
+import sys
+import timeit
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+
+# Add the project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from api.app.valuation import (  # noqa: E402
+    DAYS_PER_YEAR,
+    HoldingEvents,
+    PriceEvents,
+    reprice,
+    value_portfolio,
+)
+
+
+def main() -> None:
+    """Main function."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cards", type=int, default=20000)
+    parser.add_argument("--years", type=int, default=5)
+    parser.add_argument("--prices-per-card", type=int, default=250)
+    parser.add_argument("--repriced", type=int, default=200)
+    parser.add_argument("--runs", type=int, default=7)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    days = args.years * DAYS_PER_YEAR
+    start = datetime.now(UTC).date() - timedelta(days=days - 1)
+    rows = args.cards * args.prices_per_card
+    prices = PriceEvents.from_arrays(
+        np.repeat(np.arange(args.cards), args.prices_per_card),
+        rng.integers(-30, days, rows),
+        rng.uniform(0.5, 500, rows).round(2),
+        days,
+    )
+    holdings = HoldingEvents.from_arrays(
+        np.arange(args.cards),
+        rng.integers(-DAYS_PER_YEAR, days, args.cards),
+        rng.integers(1, 5, args.cards),
+        rng.uniform(0.5, 500, args.cards).round(2),
+    )
+    today = PriceEvents.from_arrays(
+        rng.choice(args.cards, args.repriced, replace=False),
+        np.full(args.repriced, days - 1),
+        rng.uniform(0.5, 500, args.repriced).round(2),
+    )
+    valuation = value_portfolio(start, days, prices, holdings)
+    recent = PriceEvents.from_arrays([], [], [])
+
+    paths = {
+        "value": lambda: value_portfolio(start, days, prices, holdings),
+        "reprice": lambda: reprice(valuation, prices, recent, today, holdings),
+    }
+
+    print("Cardfolio 2.0 - Portfolio Valuation Benchmark")
+    print("=" * 45)
+    print(
+        f"{args.cards:,} cards, {days:,} days, {len(prices.day):,} price events, "
+        f"{args.repriced} repriced today\n",
+    )
+    print(f"{'path':<16}{'ms':>10}")
+    for name, path in paths.items():
+        timings = timeit.repeat(path, repeat=args.runs, number=1)
+        print(f"{name:<16}{statistics.median(timings) * 1000:>10.1f}")
+    summary = valuation.summary()
+    print(
+        f"\nvalue {summary['value']:,.2f}  cost {summary['cost']:,.2f}  "
+        f"volatility {summary['volatility']:.3f}",
+    )
+
+
+if __name__ == "__main__":
+    main()
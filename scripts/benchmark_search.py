@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""Benchmark product search before and after the stored search vector.
+
+Grows the catalog to ``--rows`` synthetic products (with aliases), then runs
+the legacy expression search and the stored ``search_vector`` search under
+``EXPLAIN (ANALYZE, BUFFERS)`` and reports plan shape and median latency.
+
+    python scripts/benchmark_search.py --rows 1000000
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+from pathlib import Path
+from typing import Any
+
+# Add the project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from sqlalchemy import text  # noqa: E402
+from sqlalchemy.ext.asyncio import AsyncConnection  # noqa: E402
+
+from api.app.database import engine  # noqa: E402
+
+QUERIES = ["Charizard", "Zard", "Black Lotus", "Pokemon", "Base Set", "Holo"]
+
+LEGACY_SQL = """
+SELECT products.id FROM products
+WHERE to_tsvector('english', coalesce(name, '') || ' ' || coalesce(set_name, '')
+                  || ' ' || coalesce(variant, '')) @@ plainto_tsquery(:q)
+   OR products.id IN (
+        SELECT product_id FROM product_aliases
+        WHERE to_tsvector('english', alias) @@ plainto_tsquery(:q))
+ORDER BY name LIMIT 20
+"""
+
+STORED_SQL = """
+SELECT products.id FROM products
+WHERE search_vector @@ plainto_tsquery('english', :q)
+ORDER BY ts_rank(search_vector, plainto_tsquery('english', :q)) DESC, name, id
+LIMIT 20
+"""
+
+GENERATE_PRODUCTS_SQL = """
+INSERT INTO products (name, game, set_name, card_number, category, variant)
+SELECT
+    (ARRAY['Charizard', 'Pikachu', 'Blastoise', 'Shivan Dragon', 'Mox Pearl',
+           'Lightning Bolt', 'Mewtwo', 'Serra Angel'])[1 + g % 8]
+        || ' ' || md5(g::text)::varchar(8),
+    CASE WHEN g % 2 = 0 THEN 'Pokemon' ELSE 'Magic: The Gathering' END,
+    'Synthetic Set ' || (g % 500),
+    (g % 300) || '/300',
+    CASE WHEN g % 2 = 0 THEN 'Pokemon' ELSE 'Magic' END,
+    (ARRAY['Holo', 'Reverse Holo', '1st Edition', NULL])[1 + g % 4]
+FROM generate_series(1, :missing) AS g
+"""
+
+GENERATE_ALIASES_SQL = """
+INSERT INTO product_aliases (product_id, alias, alias_type, search_weight)
+SELECT id, 'alias ' || md5(id::text)::varchar(10), 'nickname', 1 + (random() * 9)::int
+FROM products TABLESAMPLE SYSTEM (20)
+"""
+
+
+async def grow_catalog(conn: AsyncConnection, rows: int) -> None:
+    """Insert synthetic products until the catalog holds ``rows`` products."""
+    current = (await conn.execute(text("SELECT count(*) FROM products"))).scalar()
+    missing = rows - (current or 0)
+    if missing <= 0:
+        print(f"Catalog already has {current:,} products")
+        return
+
+    print(f"Generating {missing:,} synthetic products...")
+    await conn.execute(text(GENERATE_PRODUCTS_SQL), {"missing": missing})
+    print("Generating aliases for ~20% of products...")
+    await conn.execute(text(GENERATE_ALIASES_SQL))
+    await conn.execute(text("ANALYZE products"))
+    await conn.execute(text("ANALYZE product_aliases"))
+
+
+def plan_nodes(plan: dict[str, Any]) -> list[str]:
+    """Flatten a JSON plan into ``Node Type (index)`` labels."""
+    label = plan["Node Type"]
+    if "Index Name" in plan:
+        label += f" ({plan['Index Name']})"
+    children = plan.get("Plans", [])
+    return [label] + [node for child in children for node in plan_nodes(child)]
+
+
+async def measure(
+    conn: AsyncConnection,
+    sql: str,
+    q: str,
+    runs: int,
+) -> tuple[float, list[str]]:
+    """Median execution time in ms and plan nodes of one query."""
+    timings = []
+    nodes: list[str] = []
+    for _ in range(runs):
+        result = await conn.execute(
+            text(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {sql}"),
+            {"q": q},
+        )
+        output = result.scalar_one()
+        explain: list[dict[str, Any]] = (
+            json.loads(output) if isinstance(output, str) else output
+        )
+        timings.append(explain[0]["Execution Time"])
+        nodes = plan_nodes(explain[0]["Plan"])
+    return statistics.median(timings), nodes
+
+
+async def run_benchmark(rows: int, runs: int) -> None:
+    """Grow the catalog and compare both search paths."""
+    async with engine.begin() as conn:
+        await grow_catalog(conn, rows)
+
+    async with engine.connect() as conn:
+        print(f"\n{'query':<14}{'legacy ms':>12}{'stored ms':>12}{'speedup':>10}")
+        plans: dict[str, tuple[list[str], list[str]]] = {}
+        for q in QUERIES:
+            legacy_ms, legacy_nodes = await measure(conn, LEGACY_SQL, q, runs)
+            stored_ms, stored_nodes = await measure(conn, STORED_SQL, q, runs)
+            plans[q] = (legacy_nodes, stored_nodes)
+            print(
+                f"{q:<14}{legacy_ms:>12.2f}{stored_ms:>12.2f}"
+                f"{legacy_ms / max(stored_ms, 0.001):>9.1f}x",
+            )
+
+        for q, (legacy_nodes, stored_nodes) in plans.items():
+            print(f"\nPlan for {q!r}")
+            print(f"  legacy: {' -> '.join(legacy_nodes)}")
+            print(f"  stored: {' -> '.join(stored_nodes)}")
+
+
+def main() -> None:
+    """Main function."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    print("Cardfolio 2.0 - Search Benchmark")
+    print("=" * 40)
+    asyncio.run(run_benchmark(args.rows, args.runs))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""Benchmark product response serialization, Pydantic versus the fast path.
+
+Builds one search page of ``--per-page`` products (each with aliases) and
+times three ways of turning it into JSON bytes:
+
+* ``orm+pydantic``: ORM objects validated with ``from_attributes`` (the old path)
+* ``rows+pydantic``: row mappings validated through the response models
+* ``rows+orjson``: row mappings encoded directly (the fast path)
+
+No database is needed. The script checks that all paths emit identical bytes.
+
+    python scripts/benchmark_serialization.py --per-page 100
+"""
+
+import argparse
+import statistics
+import sys
+import timeit
+from datetime import UTC, date, datetime
+from decimal import Decimal
+from pathlib import Path
+from uuid import uuid4
+
+# Add the project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from api.app.models import Product, ProductAlias  # noqa: E402
+from api.app.projection import ALIAS_FIELDS, PRODUCT_FIELDS  # noqa: E402
+from api.app.schemas.products import Product as ProductSchema  # noqa: E402
+from api.app.schemas.products import ProductAlias as ProductAliasSchema  # noqa: E402
+from api.app.schemas.products import ProductSearchResult  # noqa: E402
+from api.app.serialization import RowEncoder, dumps, envelope_values  # noqa: E402
+
+
+def make_rows(per_page: int, aliases_per_product: int) -> list[tuple[dict, list[dict]]]:
+    """Synthetic product and alias row mappings."""
+    now = datetime.now(UTC)
+    rows = []
+    for i in range(per_page):
+        product = {
+            "id": uuid4(),
+            "name": f"Charizard {i}",
+            "game": "Pokemon",
+            "set_name": "Base Set",
+            "card_number": f"{i}/102",
+            "rarity": "Holo Rare",
+            "condition": "NM",
+            "variant": "Holo",
+            "category": "Pokemon",
+            "subcategory": "Unlimited",
+            "release_date": date(1999, 1, 9),
+            "image_url": f"https://images.example.com/{i}.png",
+            "description": "Iconic fire-type starter Pokemon from the original Base Set",
+            "market_price": Decimal("5000.00"),
+            "low_price": Decimal("3000.00"),
+            "high_price": Decimal("8000.00"),
+            "created_at": now,
+            "updated_at": now,
+        }
+        aliases = [
+            {
+                "id": uuid4(),
+                "product_id": product["id"],
+                "alias": f"Zard {j}",
+                "alias_type": "nickname",
+                "search_weight": 10 - j,
+                "created_at": now,
+            }
+            for j in range(aliases_per_product)
+        ]
+        rows.append((product, aliases))
+    return rows
+
+
+def to_orm(rows: list[tuple[dict, list[dict]]]) -> list[Product]:
+    """Transient ORM objects equivalent to the row mappings."""
+    return [
+        Product(**product, aliases=[ProductAlias(**alias) for alias in aliases])
+        for product, aliases in rows
+    ]
+
+
+def page(products: list) -> ProductSearchResult:
+    """Wrap products in an unvalidated search envelope."""
+    return ProductSearchResult.model_construct(
+        products=products,
+        total=len(products),
+        page=1,
+        per_page=len(products),
+        has_next=True,
+        has_prev=False,
+    )
+
+
+def main() -> None:
+    """Main function."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--per-page", type=int, default=100)
+    parser.add_argument("--aliases", type=int, default=2)
+    parser.add_argument("--runs", type=int, default=7)
+    parser.add_argument("--number", type=int, default=200)
+    args = parser.parse_args()
+
+    rows = make_rows(args.per_page, args.aliases)
+    orm_products = to_orm(rows)
+    encode_product = RowEncoder(ProductSchema, PRODUCT_FIELDS)
+    encode_alias = RowEncoder(ProductAliasSchema, ALIAS_FIELDS)
+
+    def orm_pydantic() -> bytes:
+        products = [ProductSchema.model_validate(product) for product in orm_products]
+        return (
+            ProductSearchResult(**envelope_values(page(products)))
+            .model_dump_json()
+            .encode()
+        )
+
+    def rows_pydantic() -> bytes:
+        products = [
+            ProductSchema.model_validate({**product, "aliases": aliases})
+            for product, aliases in rows
+        ]
+        return (
+            ProductSearchResult(**envelope_values(page(products)))
+            .model_dump_json()
+            .encode()
+        )
+
+    def rows_orjson() -> bytes:
+        products = [
+            {**encode_product(product), "aliases": [encode_alias(a) for a in aliases]}
+            for product, aliases in rows
+        ]
+        return dumps(envelope_values(page(products)))
+
+    paths = {
+        "orm+pydantic": orm_pydantic,
+        "rows+pydantic": rows_pydantic,
+        "rows+orjson": rows_orjson,
+    }
+    outputs = {name: path() for name, path in paths.items()}
+    if len(set(outputs.values())) != 1:
+        sys.exit("Serialization paths disagree; fix the fast path before timing it")
+
+    print("Cardfolio 2.0 - Serialization Benchmark")
+    print("=" * 40)
+    print(
+        f"{args.per_page} products x {args.aliases} aliases, "
+        f"{len(outputs['rows+orjson']):,} bytes per page\n",
+    )
+    print(f"{'path':<16}{'µs/page':>12}{'speedup':>10}")
+    baseline = None
+    for name, path in paths.items():
+        timings = timeit.repeat(path, repeat=args.runs, number=args.number)
+        micros = statistics.median(timings) / args.number * 1e6
+        baseline = baseline or micros
+        print(f"{name:<16}{micros:>12.1f}{baseline / micros:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
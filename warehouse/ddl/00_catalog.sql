@@ -2,7 +2,7 @@
 -- Stage 1: Products and Product Aliases
 
 -- Products table: Core product information
-CREATE TABLE products (
+CREATE TABLE IF NOT EXISTS products (
     id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
     name VARCHAR(255) NOT NULL,
     game VARCHAR(100) NOT NULL,
@@ -24,7 +24,7 @@ CREATE TABLE products (
 );
 
 -- Product aliases table: For fast search optimization
-CREATE TABLE product_aliases (
+CREATE TABLE IF NOT EXISTS product_aliases (
     id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
     product_id UUID NOT NULL REFERENCES products(id) ON DELETE CASCADE,
     alias VARCHAR(255) NOT NULL,
@@ -34,27 +34,25 @@ CREATE TABLE product_aliases (
 );
 
 -- Indexes for optimal search performance (<10ms target)
-CREATE INDEX idx_products_name ON products USING gin(to_tsvector('english', name));
-CREATE INDEX idx_products_game ON products(game);
-CREATE INDEX idx_products_set_name ON products(set_name);
-CREATE INDEX idx_products_category ON products(category);
-CREATE INDEX idx_products_card_number ON products(card_number);
-CREATE INDEX idx_products_created_at ON products(created_at);
+CREATE INDEX IF NOT EXISTS idx_products_name ON products USING gin(to_tsvector('english', name));
+CREATE INDEX IF NOT EXISTS idx_products_game ON products(game);
+CREATE INDEX IF NOT EXISTS idx_products_set_name ON products(set_name);
+CREATE INDEX IF NOT EXISTS idx_products_category ON products(category);
+CREATE INDEX IF NOT EXISTS idx_products_card_number ON products(card_number);
+CREATE INDEX IF NOT EXISTS idx_products_created_at ON products(created_at);
+
+-- Keyset pagination index: ORDER BY name, id with (name, id) > cursor
+CREATE INDEX IF NOT EXISTS idx_products_name_id ON products(name, id);
 
 -- Alias search indexes (critical for <10ms performance)
-CREATE INDEX idx_product_aliases_alias ON product_aliases USING gin(to_tsvector('english', alias));
-CREATE INDEX idx_product_aliases_product_id ON product_aliases(product_id);
-CREATE INDEX idx_product_aliases_alias_type ON product_aliases(alias_type);
-CREATE INDEX idx_product_aliases_search_weight ON product_aliases(search_weight DESC);
+CREATE INDEX IF NOT EXISTS idx_product_aliases_alias ON product_aliases USING gin(to_tsvector('english', alias));
+CREATE INDEX IF NOT EXISTS idx_product_aliases_product_id ON product_aliases(product_id);
+CREATE INDEX IF NOT EXISTS idx_product_aliases_alias_type ON product_aliases(alias_type);
+CREATE INDEX IF NOT EXISTS idx_product_aliases_search_weight ON product_aliases(search_weight DESC);
 
 -- Composite index for common search patterns
-CREATE INDEX idx_products_game_set_name ON products(game, set_name);
-CREATE INDEX idx_products_category_game ON products(category, game);
-
--- Full-text search index combining product name and aliases
-CREATE INDEX idx_products_full_text ON products USING gin(
-    to_tsvector('english', name || ' ' || COALESCE(set_name, '') || ' ' || COALESCE(variant, ''))
-);
+CREATE INDEX IF NOT EXISTS idx_products_game_set_name ON products(game, set_name);
+CREATE INDEX IF NOT EXISTS idx_products_category_game ON products(category, game);
 
 -- Trigger to update updated_at timestamp
 CREATE OR REPLACE FUNCTION update_updated_at_column()
@@ -65,6 +63,7 @@ BEGIN
 END;
 $$ language 'plpgsql';
 
+DROP TRIGGER IF EXISTS update_products_updated_at ON products;
 CREATE TRIGGER update_products_updated_at 
     BEFORE UPDATE ON products 
     FOR EACH ROW 
@@ -0,0 +1,88 @@
+-- Cardfolio 2.0 Stored Search Vector
+-- Stage 1: Weighted full-text search over products and their aliases
+
+-- One stored tsvector per product, kept current by triggers, so search is a
+-- single GIN lookup instead of an expression match OR'd with an alias subquery.
+ALTER TABLE products ADD COLUMN IF NOT EXISTS search_vector tsvector;
+
+-- Weight classes: name 'A', set/variant 'C', aliases by search_weight
+-- (8-10 'A', 5-7 'B', 3-4 'C', 1-2 'D')
+CREATE OR REPLACE FUNCTION product_search_vector(
+    p_id UUID,
+    p_name TEXT,
+    p_set_name TEXT,
+    p_variant TEXT
+)
+RETURNS tsvector AS $$
+DECLARE
+    alias_vector tsvector;
+BEGIN
+    SELECT
+        coalesce(setweight(to_tsvector('english', string_agg(alias, ' ') FILTER (WHERE search_weight >= 8)), 'A'), ''::tsvector)
+        || coalesce(setweight(to_tsvector('english', string_agg(alias, ' ') FILTER (WHERE search_weight BETWEEN 5 AND 7)), 'B'), ''::tsvector)
+        || coalesce(setweight(to_tsvector('english', string_agg(alias, ' ') FILTER (WHERE search_weight BETWEEN 3 AND 4)), 'C'), ''::tsvector)
+        || coalesce(setweight(to_tsvector('english', string_agg(alias, ' ') FILTER (WHERE coalesce(search_weight, 1) <= 2)), 'D'), ''::tsvector)
+    INTO alias_vector
+    FROM product_aliases
+    WHERE product_id = p_id;
+
+    RETURN setweight(to_tsvector('english', coalesce(p_name, '')), 'A')
+        || setweight(to_tsvector('english', coalesce(p_set_name, '') || ' ' || coalesce(p_variant, '')), 'C')
+        || coalesce(alias_vector, ''::tsvector);
+END;
+$$ LANGUAGE plpgsql STABLE;
+
+-- Recompute on insert and whenever a searchable product column changes
+CREATE OR REPLACE FUNCTION products_search_vector_trigger()
+RETURNS TRIGGER AS $$
+BEGIN
+    NEW.search_vector = product_search_vector(NEW.id, NEW.name, NEW.set_name, NEW.variant);
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS update_products_search_vector ON products;
+CREATE TRIGGER update_products_search_vector
+    BEFORE INSERT OR UPDATE OF name, set_name, variant ON products
+    FOR EACH ROW
+    EXECUTE FUNCTION products_search_vector_trigger();
+
+-- Recompute the owning product whenever one of its aliases changes
+CREATE OR REPLACE FUNCTION product_aliases_search_vector_trigger()
+RETURNS TRIGGER AS $$
+DECLARE
+    affected UUID;
+BEGIN
+    FOR affected IN
+        SELECT DISTINCT product_id FROM (
+            SELECT CASE WHEN TG_OP <> 'DELETE' THEN NEW.product_id END AS product_id
+            UNION ALL
+            SELECT CASE WHEN TG_OP <> 'INSERT' THEN OLD.product_id END
+        ) changed
+        WHERE product_id IS NOT NULL
+    LOOP
+        UPDATE products
+        SET search_vector = product_search_vector(id, name, set_name, variant)
+        WHERE id = affected;
+    END LOOP;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS update_product_aliases_search_vector ON product_aliases;
+CREATE TRIGGER update_product_aliases_search_vector
+    AFTER INSERT OR UPDATE OR DELETE ON product_aliases
+    FOR EACH ROW
+    EXECUTE FUNCTION product_aliases_search_vector_trigger();
+
+-- Backfill existing rows
+UPDATE products
+SET search_vector = product_search_vector(id, name, set_name, variant)
+WHERE search_vector IS NULL;
+
+CREATE INDEX IF NOT EXISTS idx_products_search_vector ON products USING gin(search_vector);
+
+-- Superseded: its expression never matched the query's, so it was never used
+DROP INDEX IF EXISTS idx_products_full_text;
+
+COMMENT ON COLUMN products.search_vector IS 'Weighted tsvector of name, set, variant and aliases; maintained by triggers';
@@ -0,0 +1,11 @@
+-- Cardfolio 2.0 Trigram Indexes
+-- Stage 1: Typo-tolerant fuzzy search over product names and aliases
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+-- Word-similarity lookups (lower(:q) <% lower(name)) are served by these
+-- GIN indexes; the expression must match the query's lower() exactly.
+CREATE INDEX IF NOT EXISTS idx_products_name_trgm
+    ON products USING gin (lower(name) gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_product_aliases_alias_trgm
+    ON product_aliases USING gin (lower(alias) gin_trgm_ops);
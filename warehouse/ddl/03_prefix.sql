@@ -0,0 +1,9 @@
+-- Cardfolio 2.0 Prefix Indexes
+-- Stage 1: Typeahead suggestions for /products/suggest
+
+-- text_pattern_ops lets lower(x) LIKE 'pre%' run as a btree range scan
+-- regardless of the database collation
+CREATE INDEX IF NOT EXISTS idx_products_name_prefix
+    ON products (lower(name) text_pattern_ops);
+CREATE INDEX IF NOT EXISTS idx_product_aliases_alias_prefix
+    ON product_aliases (lower(alias) text_pattern_ops);
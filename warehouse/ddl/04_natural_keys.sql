@@ -0,0 +1,18 @@
+-- Cardfolio 2.0 Natural Keys
+-- Stage 1: Upsert targets for bulk catalog ingest
+
+-- A catalog entry is identified by game, set, card number and variant.
+-- Cards without a number (e.g. Alpha) are told apart by name in its place,
+-- so a name correction to a numbered card updates it rather than adding a
+-- second product. COALESCE makes missing parts compare equal, so ON
+-- CONFLICT and the ingest join can both use this index.
+CREATE UNIQUE INDEX IF NOT EXISTS uq_products_natural_key ON products (
+    game,
+    COALESCE(set_name, ''),
+    COALESCE(NULLIF(card_number, ''), name),
+    COALESCE(variant, '')
+);
+
+-- One alias text per product, case-insensitively
+CREATE UNIQUE INDEX IF NOT EXISTS uq_product_aliases_product_alias
+    ON product_aliases (product_id, lower(alias));
@@ -0,0 +1,35 @@
+-- Cardfolio 2.0 Price Observations
+-- Stage 2: Append-only sale history, range-partitioned by sale month
+
+-- One row per observed sale. Monthly partitions keep each range read and
+-- each retention drop to the months involved; partitions are created ahead
+-- of time and dropped after the retention window by the API's partition
+-- maintenance (api/app/prices.py), so only the parent and the safety-net
+-- default partition are created here.
+CREATE TABLE IF NOT EXISTS prices_raw (
+    source VARCHAR(50) NOT NULL, -- e.g., "ebay", "pricecharting"
+    listing_id VARCHAR(100) NOT NULL, -- source's ID for the sale
+    sold_at TIMESTAMP WITH TIME ZONE NOT NULL,
+    -- No foreign key: checking products per appended row costs more than
+    -- the odd orphan left by a deleted product, which joins skip anyway
+    product_id UUID NOT NULL,
+    price DECIMAL(10, 2) NOT NULL,
+    currency VARCHAR(3) NOT NULL DEFAULT 'USD',
+    condition VARCHAR(50),
+    observed_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+    -- Re-scraped sales are dropped on append (ON CONFLICT DO NOTHING)
+    PRIMARY KEY (source, listing_id, sold_at)
+) PARTITION BY RANGE (sold_at);
+
+-- Rows outside every monthly partition land here instead of failing the
+-- append; it should stay empty
+CREATE TABLE IF NOT EXISTS prices_raw_default PARTITION OF prices_raw DEFAULT;
+
+-- Per-product range reads within the pruned partitions
+CREATE INDEX IF NOT EXISTS idx_prices_raw_product_sold_at
+    ON prices_raw (product_id, sold_at);
+
+-- Rows arrive roughly in sale order, so a BRIN index answers cross-product
+-- time-range scans (rollups, exports) at a fraction of a B-tree's size
+CREATE INDEX IF NOT EXISTS idx_prices_raw_sold_at_brin
+    ON prices_raw USING brin (sold_at);
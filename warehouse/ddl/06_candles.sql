@@ -0,0 +1,21 @@
+-- Cardfolio 2.0 Price Candles
+-- Stage 2: Incrementally maintained rollups of prices_raw
+
+-- Daily, weekly (Monday-based) and monthly OHLC/volume/median per product,
+-- in UTC buckets. Appends recompute only the buckets their new sales fall
+-- into (api/app/candles.py), so chart reads and catalog prices never
+-- aggregate raw sales.
+CREATE TABLE IF NOT EXISTS price_candles (
+    product_id UUID NOT NULL,
+    period VARCHAR(10) NOT NULL CHECK (period IN ('day', 'week', 'month')),
+    bucket_start TIMESTAMP WITH TIME ZONE NOT NULL,
+    open DECIMAL(10, 2) NOT NULL,
+    high DECIMAL(10, 2) NOT NULL,
+    low DECIMAL(10, 2) NOT NULL,
+    close DECIMAL(10, 2) NOT NULL,
+    volume INTEGER NOT NULL,
+    median_price DECIMAL(10, 2) NOT NULL,
+    updated_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+    -- A chart is one range read of this index
+    PRIMARY KEY (product_id, period, bucket_start)
+);
@@ -0,0 +1,28 @@
+-- Cardfolio 2.0 Portfolios
+-- Stage 7: Holdings and their valuation over time
+
+CREATE TABLE IF NOT EXISTS portfolios (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    name VARCHAR(255) NOT NULL,
+    created_at TIMESTAMP DEFAULT NOW()
+);
+
+-- One row per acquisition; a product bought several times has several rows.
+-- cost_basis is the unit price paid.
+CREATE TABLE IF NOT EXISTS holdings (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    portfolio_id UUID NOT NULL REFERENCES portfolios(id) ON DELETE CASCADE,
+    product_id UUID NOT NULL REFERENCES products(id) ON DELETE CASCADE,
+    quantity INTEGER NOT NULL CONSTRAINT quantity_positive CHECK (quantity > 0),
+    cost_basis DECIMAL(10, 2) NOT NULL,
+    acquired_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW()
+);
+
+-- Valuation loads a portfolio's holdings in product order
+CREATE INDEX IF NOT EXISTS idx_holdings_portfolio_product
+    ON holdings (portfolio_id, product_id);
+
+-- Cached valuations (api/app/portfolios.py) fetch only the daily candles
+-- changed since they were loaded
+CREATE INDEX IF NOT EXISTS idx_price_candles_updated_at
+    ON price_candles (updated_at);
@@ -0,0 +1,8 @@
+-- Cardfolio 2.0 Catalog Export
+-- Stage 1: Incremental mirroring of the catalog
+
+-- GET /products/export streams products in (updated_at, id) order, from a
+-- watermark for incremental syncs; this index serves both the order and the
+-- since filter without a sort.
+CREATE INDEX IF NOT EXISTS idx_products_updated_at_id
+    ON products (updated_at, id);
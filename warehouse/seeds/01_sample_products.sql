@@ -1,5 +1,6 @@
 -- Sample product data for Cardfolio 2.0 Master Catalog
 -- Pokemon and Magic: The Gathering cards for testing
+-- Re-runnable: rows that already exist (by natural key) are left alone
 
 -- Pokemon Base Set Cards
 INSERT INTO products (name, game, set_name, card_number, rarity, category, variant, market_price, low_price, high_price, description) VALUES
@@ -12,7 +13,8 @@ INSERT INTO products (name, game, set_name, card_number, rarity, category, varia
 ('Chansey', 'Pokemon', 'Base Set', '3/102', 'Holo Rare', 'Pokemon', 'Holo', 350.00, 250.00, 500.00, 'Normal-type Pokemon known for its healing abilities'),
 ('Clefairy', 'Pokemon', 'Base Set', '5/102', 'Holo Rare', 'Pokemon', 'Holo', 400.00, 300.00, 600.00, 'Fairy-type Pokemon with mystical powers'),
 ('Gyarados', 'Pokemon', 'Base Set', '6/102', 'Holo Rare', 'Pokemon', 'Holo', 450.00, 350.00, 650.00, 'Water/Flying-type Pokemon evolved from Magikarp'),
-('Hitmonchan', 'Pokemon', 'Base Set', '7/102', 'Holo Rare', 'Pokemon', 'Holo', 300.00, 200.00, 450.00, 'Fighting-type Pokemon known for its punching attacks');
+('Hitmonchan', 'Pokemon', 'Base Set', '7/102', 'Holo Rare', 'Pokemon', 'Holo', 300.00, 200.00, 450.00, 'Fighting-type Pokemon known for its punching attacks')
+ON CONFLICT DO NOTHING;
 
 -- Magic: The Gathering Alpha/Beta Cards
 INSERT INTO products (name, game, set_name, card_number, rarity, category, variant, market_price, low_price, high_price, description) VALUES
@@ -25,7 +27,8 @@ INSERT INTO products (name, game, set_name, card_number, rarity, category, varia
 ('Mox Emerald', 'Magic: The Gathering', 'Alpha', NULL, 'Rare', 'Magic', 'Alpha', 25000.00, 15000.00, 40000.00, 'Power Nine mana artifact providing green mana'),
 ('Mox Jet', 'Magic: The Gathering', 'Alpha', NULL, 'Rare', 'Magic', 'Alpha', 30000.00, 18000.00, 45000.00, 'Power Nine mana artifact providing black mana'),
 ('Timetwister', 'Magic: The Gathering', 'Alpha', NULL, 'Rare', 'Magic', 'Alpha', 15000.00, 10000.00, 25000.00, 'Power Nine card that resets hands and graveyards'),
-('Shivan Dragon', 'Magic: The Gathering', 'Alpha', NULL, 'Rare', 'Magic', 'Alpha', 2500.00, 1500.00, 4000.00, 'Iconic red dragon creature from the early days of Magic');
+('Shivan Dragon', 'Magic: The Gathering', 'Alpha', NULL, 'Rare', 'Magic', 'Alpha', 2500.00, 1500.00, 4000.00, 'Iconic red dragon creature from the early days of Magic')
+ON CONFLICT DO NOTHING;
 
 -- Modern Pokemon Cards
 INSERT INTO products (name, game, set_name, card_number, rarity, category, variant, market_price, low_price, high_price, description) VALUES
@@ -33,41 +36,51 @@ INSERT INTO products (name, game, set_name, card_number, rarity, category, varia
 ('Pikachu VMAX', 'Pokemon', 'Vivid Voltage', '188/185', 'Secret Rare', 'Pokemon', 'Rainbow Rare', 150.00, 100.00, 250.00, 'Electric-type VMAX card'),
 ('Umbreon VMAX', 'Pokemon', 'Evolving Skies', '215/203', 'Secret Rare', 'Pokemon', 'Alternate Art', 200.00, 150.00, 350.00, 'Dark-type VMAX with alternate artwork'),
 ('Rayquaza VMAX', 'Pokemon', 'Evolving Skies', '218/203', 'Secret Rare', 'Pokemon', 'Alternate Art', 300.00, 200.00, 500.00, 'Dragon-type VMAX with stunning artwork'),
-('Mew VMAX', 'Pokemon', 'Fusion Strike', '269/264', 'Secret Rare', 'Pokemon', 'Rainbow Rare', 180.00, 120.00, 280.00, 'Psychic-type VMAX from Fusion Strike');
+('Mew VMAX', 'Pokemon', 'Fusion Strike', '269/264', 'Secret Rare', 'Pokemon', 'Rainbow Rare', 180.00, 120.00, 280.00, 'Psychic-type VMAX from Fusion Strike')
+ON CONFLICT DO NOTHING;
 
 -- Now insert product aliases for better search
 INSERT INTO product_aliases (product_id, alias, alias_type, search_weight) 
 SELECT p.id, 'Zard', 'nickname', 10
-FROM products p WHERE p.name = 'Charizard' AND p.set_name = 'Base Set';
+FROM products p WHERE p.name = 'Charizard' AND p.set_name = 'Base Set'
+ON CONFLICT DO NOTHING;
 
 INSERT INTO product_aliases (product_id, alias, alias_type, search_weight) 
 SELECT p.id, 'Lotus', 'abbreviation', 10
-FROM products p WHERE p.name = 'Black Lotus';
+FROM products p WHERE p.name = 'Black Lotus'
+ON CONFLICT DO NOTHING;
 
 INSERT INTO product_aliases (product_id, alias, alias_type, search_weight) 
 SELECT p.id, 'Recall', 'abbreviation', 8
-FROM products p WHERE p.name = 'Ancestral Recall';
+FROM products p WHERE p.name = 'Ancestral Recall'
+ON CONFLICT DO NOTHING;
 
 INSERT INTO product_aliases (product_id, alias, alias_type, search_weight) 
 SELECT p.id, 'Pika', 'nickname', 7
-FROM products p WHERE p.name = 'Pikachu' AND p.set_name = 'Base Set';
+FROM products p WHERE p.name = 'Pikachu' AND p.set_name = 'Base Set'
+ON CONFLICT DO NOTHING;
 
 INSERT INTO product_aliases (product_id, alias, alias_type, search_weight) 
 SELECT p.id, 'Blast', 'nickname', 6
-FROM products p WHERE p.name = 'Blastoise';
+FROM products p WHERE p.name = 'Blastoise'
+ON CONFLICT DO NOTHING;
 
 INSERT INTO product_aliases (product_id, alias, alias_type, search_weight) 
 SELECT p.id, 'Venu', 'nickname', 6
-FROM products p WHERE p.name = 'Venusaur';
+FROM products p WHERE p.name = 'Venusaur'
+ON CONFLICT DO NOTHING;
 
 INSERT INTO product_aliases (product_id, alias, alias_type, search_weight) 
 SELECT p.id, 'Shivan', 'abbreviation', 5
-FROM products p WHERE p.name = 'Shivan Dragon';
+FROM products p WHERE p.name = 'Shivan Dragon'
+ON CONFLICT DO NOTHING;
 
 INSERT INTO product_aliases (product_id, alias, alias_type, search_weight) 
 SELECT p.id, 'Champion Path Zard', 'nickname', 9
-FROM products p WHERE p.name = 'Charizard VMAX' AND p.set_name = 'Champion''s Path';
+FROM products p WHERE p.name = 'Charizard VMAX' AND p.set_name = 'Champion''s Path'
+ON CONFLICT DO NOTHING;
 
 INSERT INTO product_aliases (product_id, alias, alias_type, search_weight) 
 SELECT p.id, 'Rainbow Pika', 'nickname', 8
-FROM products p WHERE p.name = 'Pikachu VMAX'; 
\ No newline at end of file
+FROM products p WHERE p.name = 'Pikachu VMAX'
+ON CONFLICT DO NOTHING; 
\ No newline at end of file